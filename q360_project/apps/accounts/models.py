@@ -258,6 +258,14 @@ class User(AbstractUser):
         full_name = self.get_full_name()
         return full_name if full_name else self.username
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Stored department, so a move can invalidate the former department's cached statistics
+        if 'department_id' in field_names:
+            instance._stored_department_id = instance.department_id
+        return instance
+
     def get_full_name(self):
         """Return the user's full name including middle name."""
         parts = [self.first_name, self.middle_name, self.last_name]
@@ -20,7 +20,7 @@ from .models import User, Profile, Role
 from .rbac import RoleManager
 from apps.accounts.permissions import get_accessible_users
 from apps.audit.models import AuditLog
-from apps.evaluations.models import EvaluationAssignment, EvaluationCampaign
+from apps.evaluations.models import EvaluationAssignment
 from apps.notifications.models import Notification
 from apps.security import CRYPTOGRAPHY_AVAILABLE
 
@@ -138,25 +138,12 @@ def user_create_view(request):
 @login_required
 def dashboard_view(request):
     """Main dashboard view with complete backend data."""
-    from django.db.models import Avg, Count
-    from datetime import datetime, timedelta
     import json
+    from apps.dashboard.stats_cache import get_landing_data
     user = request.user
 
-    # Get evaluation statistics
-    pending_evaluations = EvaluationAssignment.objects.filter(
-        evaluator=user,
-        status__in=['pending', 'in_progress']
-    ).select_related('evaluatee', 'campaign')
-
-    completed_evaluations = EvaluationAssignment.objects.filter(
-        evaluator=user,
-        status='completed'
-    ).select_related('evaluatee', 'campaign')
-
-    active_campaigns = EvaluationCampaign.objects.filter(
-        status='active'
-    )
+    # Per-user figures and chart data are cached until one of their sources changes
+    data = get_landing_data(user)
 
     # Get recent notifications
     notifications = Notification.objects.filter(
@@ -165,121 +152,38 @@ def dashboard_view(request):
     ).order_by('-created_at')[:5]
 
     # Get pending assignments (first 5)
-    pending_assignments = pending_evaluations[:5]
-
-    # Calculate average score from evaluation results
-    from apps.evaluations.models import EvaluationResult
-    user_results = EvaluationResult.objects.filter(
-        evaluatee=user
-    ).order_by('-calculated_at')
-
-    average_score = None
-    latest_result = user_results.first()
-    if latest_result and latest_result.overall_score:
-        average_score = f"{latest_result.overall_score:.1f}"
-
-    # Get performance trend data (last 6 months)
-    trend_labels = []
-    trend_data = []
-
-    for i in range(5, -1, -1):
-        month_date = datetime.now() - timedelta(days=30 * i)
-        month_name = month_date.strftime('%b')
-        trend_labels.append(month_name)
-
-        # Get average score for that month
-        month_results = user_results.filter(
-            calculated_at__year=month_date.year,
-            calculated_at__month=month_date.month
-        ).aggregate(avg=Avg('overall_score'))
-
-        score = month_results['avg'] or 0
-        trend_data.append(round(score, 1) if score else 0)
-
-    # Get score distribution by relationship type
-    score_distribution = []
-    relationship_types = ['self', 'supervisor', 'peer', 'subordinate']
-
-    from apps.evaluations.models import Response
-    for rel_type in relationship_types:
-        responses = Response.objects.filter(
-            assignment__evaluatee=user,
-            assignment__relationship=rel_type,
-            score__isnull=False
-        ).aggregate(avg=Avg('score'))
-
-        avg_score = responses['avg'] or 0
-        score_distribution.append(round(avg_score, 1) if avg_score else 0)
-
-    # Get skills and training stats
-    from apps.competencies.models import UserSkill
-    from apps.training.models import UserTraining
-
-    total_skills = UserSkill.objects.filter(user=user, is_approved=True).count()
-    total_trainings = UserTraining.objects.filter(user=user).count()
-    in_progress_trainings = UserTraining.objects.filter(
-        user=user,
-        status='in_progress'
-    ).count()
-
-    # Get development goals
-    from apps.development_plans.models import DevelopmentGoal
-    active_goals = DevelopmentGoal.objects.filter(
-        user=user,
-        status='active'
-    ).count()
-
-    # NEW: Critical Tasks Data for "Mənim İşə Düşən Fəaliyyətlərim" Section
-    # 1. Pending evaluations count (already calculated above as pending_evaluations)
-
-    # 2. Upcoming trainings (within 7 days)
-    upcoming_trainings_count = UserTraining.objects.filter(
-        user=user,
-        due_date__lte=datetime.now().date() + timedelta(days=7),
-        due_date__gte=datetime.now().date(),
+    pending_assignments = EvaluationAssignment.objects.filter(
+        evaluator=user,
         status__in=['pending', 'in_progress']
-    ).count()
-
-    # 3. Role-based third metric
-    if user.role in ['admin', 'manager'] or user.is_staff:
-        # For managers: count skills pending approval from their subordinates
-        pending_skills_count = UserSkill.objects.filter(
-            approval_status='pending',
-            user__supervisor=user
-        ).count()
-        active_goals_count = None  # Not used for managers
-    else:
-        # For employees: count their own active development goals
-        active_goals_count = active_goals  # Already calculated above
-        pending_skills_count = None  # Not used for employees
+    ).select_related('evaluatee', 'campaign')[:5]
 
     context = {
         # Evaluation stats
-        'pending_evaluations_count': pending_evaluations.count(),
-        'completed_evaluations_count': completed_evaluations.count(),
-        'active_campaigns_count': active_campaigns.count(),
-        'average_score': average_score,
+        'pending_evaluations_count': data['pending_evaluations_count'],
+        'completed_evaluations_count': data['completed_evaluations_count'],
+        'active_campaigns_count': data['active_campaigns_count'],
+        'average_score': data['average_score'],
         'pending_assignments': pending_assignments,
 
         # Notifications
         'notifications': notifications,
 
         # Charts data
-        'user_stats': bool(user_results.exists()),  # Flag to enable charts
-        'trend_labels': json.dumps(trend_labels),
-        'trend_data': json.dumps(trend_data),
-        'score_distribution': json.dumps(score_distribution),
+        'user_stats': data['user_stats'],  # Flag to enable charts
+        'trend_labels': json.dumps(data['trend_labels']),
+        'trend_data': json.dumps(data['trend_data']),
+        'score_distribution': json.dumps(data['score_distribution']),
 
         # Additional stats
-        'total_skills': total_skills,
-        'total_trainings': total_trainings,
-        'in_progress_trainings': in_progress_trainings,
-        'active_goals': active_goals,
+        'total_skills': data['total_skills'],
+        'total_trainings': data['total_trainings'],
+        'in_progress_trainings': data['in_progress_trainings'],
+        'active_goals': data['active_goals'],
 
         # NEW: Critical Tasks Section Data
-        'upcoming_trainings_count': upcoming_trainings_count,
-        'pending_skills_count': pending_skills_count,  # For managers
-        'active_goals_count': active_goals_count,  # For employees
+        'upcoming_trainings_count': data['upcoming_trainings_count'],
+        'pending_skills_count': data['pending_skills_count'],  # For managers
+        'active_goals_count': data['active_goals_count'],  # For employees
     }
 
     return render(request, 'accounts/dashboard.html', context)
@@ -508,13 +412,14 @@ class ProfileView(LoginRequiredMixin, TemplateView):
 
         # ==================== NOTIFICATIONS ====================
         from apps.notifications.models import Notification
+        from apps.notifications.utils import get_unread_count
 
         unread_notifications = Notification.objects.filter(
             user=user,
             is_read=False
         ).order_by('-created_at')
         context['unread_notifications'] = unread_notifications[:5]
-        context['unread_count'] = unread_notifications.count()
+        context['unread_count'] = get_unread_count(user)
 
         # ==================== RECENT ACTIVITY ====================
         from apps.audit.models import AuditLog
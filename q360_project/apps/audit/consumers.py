@@ -79,6 +79,16 @@ class ThreatMonitorConsumer(AsyncWebsocketConsumer):
             'data': event['data']
         }))
 
+    async def threat_alerts(self, event):
+        """
+        Broadcast a batch of threat alerts, one message per alert.
+        """
+        for alert in event['data']:
+            await self.send(text_data=json.dumps({
+                'type': 'threat_alert',
+                'data': alert
+            }))
+
     async def stats_update(self, event):
         """
         Broadcast stats update to all connected clients.
@@ -230,3 +240,13 @@ class AuditLogConsumer(AsyncWebsocketConsumer):
             'type': 'new_log',
             'data': event['data']
         }))
+
+    async def new_audit_logs(self, event):
+        """
+        Broadcast a batch of new audit logs, one message per log.
+        """
+        for log in event['data']:
+            await self.send(text_data=json.dumps({
+                'type': 'new_log',
+                'data': log
+            }))
@@ -0,0 +1,42 @@
+"""
+Compare cached sliding-window threat scores with the SQL path.
+Usage:
+    python manage.py check_threat_counters
+    python manage.py check_threat_counters --limit 500 --repair
+"""
+from django.core.management.base import BaseCommand
+
+from apps.audit.threat import check_threat_consistency, warm_threat_counters
+
+
+class Command(BaseCommand):
+    help = 'Check audit threat counters against the audit table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=100,
+            help='Recently active (user, IP) pairs to check (default: 100)',
+        )
+        parser.add_argument(
+            '--repair',
+            action='store_true',
+            help='Reseed the counters from the audit table when they differ',
+        )
+
+    def handle(self, *args, **options):
+        mismatches = check_threat_consistency(limit=options['limit'])
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS('Threat counters match the audit table.'))
+            return
+
+        for mismatch in mismatches:
+            self.stdout.write(self.style.WARNING(
+                f"User {mismatch['user_id']} / IP {mismatch['ip_address']}: "
+                f"windowed {mismatch['windowed']} != SQL {mismatch['sql']}"
+            ))
+
+        if options['repair']:
+            warm_threat_counters(force=True)
+            self.stdout.write(self.style.SUCCESS('Threat counters reseeded.'))
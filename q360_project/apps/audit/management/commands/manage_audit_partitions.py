@@ -0,0 +1,59 @@
+"""
+Create upcoming audit log partitions and archive expired ones.
+Usage:
+    python manage.py manage_audit_partitions
+    python manage.py manage_audit_partitions --months-ahead 6
+    python manage.py manage_audit_partitions --retention-months 24 --archive-dir /backups/audit
+    python manage.py manage_audit_partitions --skip-retention
+"""
+from django.core.management.base import BaseCommand
+
+from apps.audit.partitions import apply_retention, ensure_partitions, is_partitioned, list_partitions
+
+
+class Command(BaseCommand):
+    help = 'Create monthly audit log partitions and archive logs past the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=None,
+            help='Months to create partitions for ahead of the current one (default: AUDIT_PARTITION_MONTHS_AHEAD)',
+        )
+        parser.add_argument(
+            '--retention-months',
+            type=int,
+            default=None,
+            help='Whole months of audit logs to keep (default: AUDIT_LOG_RETENTION_MONTHS)',
+        )
+        parser.add_argument(
+            '--archive-dir',
+            default=None,
+            help='Directory for the compressed exports (default: AUDIT_LOG_ARCHIVE_DIR)',
+        )
+        parser.add_argument(
+            '--skip-retention',
+            action='store_true',
+            help='Only create partitions',
+        )
+
+    def handle(self, *args, **options):
+        if is_partitioned():
+            for name in ensure_partitions(months_ahead=options['months_ahead']):
+                self.stdout.write(self.style.SUCCESS(f'Created partition {name}'))
+            self.stdout.write(f'Partitions: {len(list_partitions())}')
+        else:
+            self.stdout.write(self.style.WARNING('Audit log table is not partitioned; retention deletes rows.'))
+
+        if options['skip_retention']:
+            return
+
+        archives = apply_retention(
+            retention_months=options['retention_months'],
+            archive_dir=options['archive_dir'],
+        )
+        for path in archives:
+            self.stdout.write(self.style.SUCCESS(f'Archived to {path}'))
+        if not archives:
+            self.stdout.write('Nothing to archive.')
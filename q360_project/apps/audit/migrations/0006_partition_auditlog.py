@@ -0,0 +1,116 @@
+"""
+Convert audit_auditlog into a table range-partitioned by month on created_at.
+
+The primary key becomes (id, created_at), as PostgreSQL requires the partition
+key in unique constraints; Django keeps using ``id``. Existing rows are copied
+into monthly partitions (plus a default partition) and the indexes and foreign
+keys are recreated on the partitioned table. Other databases are left as is.
+
+Downtime: the conversion runs in one transaction and holds an ACCESS EXCLUSIVE
+lock on the audit log from the rename until commit. Every request that writes
+an audit log (and every audit log read) blocks for that time. The time is
+dominated by copying every row and then rebuilding the primary key, the
+indexes and the search vector index, so it grows linearly with the table size.
+Plan a maintenance window and time a run against a restored copy of
+production first. With AUDIT_WRITE_MODE=celery the blocked inserts wait in
+the Celery worker rather than in web requests. Running retention beforehand
+(``manage_audit_partitions --retention-months N`` on the unpartitioned table)
+shrinks the copy.
+"""
+from datetime import date
+
+from django.db import migrations
+from django.utils import timezone
+
+TABLE = 'audit_auditlog'
+OLD_TABLE = 'audit_auditlog_unpartitioned'
+# Months created ahead of the current one; manage_audit_partitions keeps this up
+MONTHS_AHEAD = 3
+
+
+def _add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_partition(cursor, month):
+    upper = _add_months(month, 1)
+    cursor.execute(
+        f'CREATE TABLE "{TABLE}_p{month.year:04d}_{month.month:02d}" PARTITION OF "{TABLE}" '
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{upper.isoformat()} 00:00:00+00')"
+    )
+
+
+def partition_audit_log(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [TABLE])
+        if cursor.fetchone():
+            return
+
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename = %s AND indexname <> %s",
+            [TABLE, f'{TABLE}_pkey'],
+        )
+        index_definitions = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+            [TABLE],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(
+            "SELECT attidentity FROM pg_attribute WHERE attrelid = to_regclass(%s) AND attname = 'id'",
+            [TABLE],
+        )
+        is_identity = cursor.fetchone()[0] != ''
+        cursor.execute(f'SELECT min(created_at), max(id) FROM "{TABLE}"')
+        first_created_at, max_id = cursor.fetchone()
+
+        # Deferred foreign key checks would block dropping the old table
+        cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{OLD_TABLE}"')
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{OLD_TABLE}" INCLUDING DEFAULTS INCLUDING IDENTITY '
+            f'INCLUDING CONSTRAINTS INCLUDING STORAGE) PARTITION BY RANGE (created_at)'
+        )
+        if not is_identity:
+            # A serial column's sequence is owned by the old table; keep it alive
+            cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [OLD_TABLE])
+            cursor.execute(f'ALTER SEQUENCE {cursor.fetchone()[0]} OWNED BY "{TABLE}".id')
+
+        now = timezone.now()
+        current = date(now.year, now.month, 1)
+        month = date(first_created_at.year, first_created_at.month, 1) if first_created_at else current
+        while month <= _add_months(current, MONTHS_AHEAD):
+            _create_partition(cursor, month)
+            month = _add_months(month, 1)
+        cursor.execute(f'CREATE TABLE "{TABLE}_default" PARTITION OF "{TABLE}" DEFAULT')
+
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{OLD_TABLE}"')
+        cursor.execute(f'DROP TABLE "{OLD_TABLE}"')
+        if is_identity and max_id:
+            cursor.execute(f"SELECT setval(pg_get_serial_sequence('\"{TABLE}\"', 'id'), %s)", [max_id])
+
+        cursor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_pkey" PRIMARY KEY (id, created_at)')
+        for definition in index_definitions:
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{name}" {definition}')
+
+
+class Migration(migrations.Migration):
+
+    atomic = True
+
+    dependencies = [
+        ("audit", "0005_add_threat_fields"),
+    ]
+
+    operations = [
+        # The partitioned table has the same columns, so reverting needs no change
+        migrations.RunPython(partition_audit_log, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.4 on 2026-10-17 12:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0006_partition_auditlog'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['action', 'ip_address', 'created_at'], name='audit_action_ip_created_idx'),
+        ),
+    ]
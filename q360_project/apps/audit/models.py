@@ -1,10 +1,15 @@
 """Models for audit app."""
-from django.db import models
+import logging
+
+from django.db import DatabaseError, models, transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.contrib.postgres.search import SearchVectorField
 from django.contrib.postgres.indexes import GinIndex
 from apps.accounts.models import User
 
+logger = logging.getLogger(__name__)
+
 
 class AuditLog(models.Model):
     """Comprehensive audit trail for system actions."""
@@ -51,7 +56,8 @@ class AuditLog(models.Model):
     context = models.JSONField(default=dict, blank=True, verbose_name=_('Kontekst'))
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the event is recorded, also for entries written later in a batch
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     # Full-text search field
     search_vector = SearchVectorField(null=True, editable=False)
@@ -64,6 +70,8 @@ class AuditLog(models.Model):
             models.Index(fields=['user', 'created_at']),
             models.Index(fields=['action', 'model_name']),
             models.Index(fields=['severity', 'created_at']),
+            # Login failure scans per IP (brute-force detection, threat counters)
+            models.Index(fields=['action', 'ip_address', 'created_at'], name='audit_action_ip_created_idx'),
             GinIndex(fields=['search_vector'], name='audit_search_idx'),
         ]
 
@@ -87,7 +95,6 @@ class AuditLog(models.Model):
         from django.utils import timezone
         from datetime import timedelta
 
-        threat_score = 0
         start_time = timezone.now() - timedelta(minutes=time_window_minutes)
 
         # Son zaman ərzindəki uğursuz giriş cəhdləri
@@ -98,16 +105,13 @@ class AuditLog(models.Model):
         ).count()
 
         # IP əsaslı təhdid analizi
+        ip_failed_attempts = 0
         if ip_address:
             ip_failed_attempts = cls.objects.filter(
                 ip_address=ip_address,
                 action='login_failure',
                 created_at__gte=start_time
             ).count()
-            threat_score += min(ip_failed_attempts * 15, 50)
-
-        # İstifadəçi əsaslı təhdid analizi
-        threat_score += min(failed_logins * 10, 40)
 
         # İcazə rədd edilmələr
         permission_denials = cls.objects.filter(
@@ -115,7 +119,6 @@ class AuditLog(models.Model):
             action='permission_denied',
             created_at__gte=start_time
         ).count()
-        threat_score += min(permission_denials * 8, 30)
 
         # Kritik əməliyyatlar
         critical_actions = cls.objects.filter(
@@ -123,6 +126,20 @@ class AuditLog(models.Model):
             severity='critical',
             created_at__gte=start_time
         ).count()
+
+        return cls.score_threat(failed_logins, ip_failed_attempts, permission_denials, critical_actions)
+
+    @staticmethod
+    def score_threat(failed_logins, ip_failed_attempts, permission_denials, critical_actions):
+        """
+        Hadisə saylarından təhlükə skorunu və səviyyəsini hesablayır.
+
+        Returns:
+            tuple: (threat_level, threat_score)
+        """
+        threat_score = min(ip_failed_attempts * 15, 50)
+        threat_score += min(failed_logins * 10, 40)
+        threat_score += min(permission_denials * 8, 30)
         threat_score += min(critical_actions * 20, 60)
 
         # Threat level təyini
@@ -140,14 +157,38 @@ class AuditLog(models.Model):
         return threat_level, threat_score
 
     def save(self, *args, **kwargs):
-        """Threat level avtomatik hesablanması."""
+        """
+        Threat level avtomatik hesablanması.
+
+        Skor audit cədvəlinə sorğu göndərmədən keşdəki sürüşən pəncərə
+        sayğaclarından hesablanır (bax: ``apps.audit.threat``).
+        """
+        from .search import audit_search_vector
+        from .threat import record_threat_events, windowed_threat_level
+
+        is_new = self._state.adding
         if not self.threat_level or self.threat_level == 'none':
-            if self.user:
-                threat_level, threat_score = self.calculate_threat_level(
-                    user=self.user,
-                    action=self.action,
-                    ip_address=self.ip_address
-                )
+            if self.user_id:
+                threat_level, threat_score = windowed_threat_level(self.user_id, self.ip_address)
                 self.threat_level = threat_level
                 self.threat_score = threat_score
-        super().save(*args, **kwargs)
+        computed_vector = is_new and self.search_vector is None
+        if computed_vector:
+            # Axtarış vektoru ayrıca UPDATE olmadan INSERT zamanı hesablanır
+            self.search_vector = audit_search_vector(self)
+            try:
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+            except DatabaseError as exc:
+                # Axtarış vektoru alınmasa da audit qeydi itməməlidir
+                logger.error(f"Audit search vector failed, saving without it: {exc}")
+                self.search_vector = None
+                computed_vector = False
+                super().save(*args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+        if computed_vector:
+            # İfadə əvəzinə saxlanmış dəyər lazım olduqda yüklənsin
+            del self.search_vector
+        if is_new:
+            record_threat_events([self])
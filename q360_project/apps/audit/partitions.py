@@ -0,0 +1,258 @@
+"""
+Monthly range partitions and retention for the audit log table.
+
+On PostgreSQL the ``audit_auditlog`` table is partitioned by ``created_at``
+(migration 0006), one partition per calendar month (UTC) plus a default
+partition. ``ensure_partitions`` creates upcoming months ahead of time (daily
+via ``maintain_audit_partitions_task``), moving any rows of a new month out of
+the default partition first. ``apply_retention`` detaches partitions older
+than the retention period, exports them to gzip-compressed CSV files and drops
+them; expired rows left in the default partition are exported and deleted.
+Queries filtering on a ``created_at`` range only scan the partitions of that
+range.
+
+Without partitioning (other databases, or before the migration) retention
+exports and deletes the old rows instead.
+"""
+import csv
+import gzip
+import json
+import logging
+import os
+import re
+from datetime import date, datetime, timezone as dt_timezone
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = AuditLog._meta.db_table
+DEFAULT_PARTITION = f'{PARENT_TABLE}_default'
+PARTITION_NAME_RE = re.compile(rf'^{PARENT_TABLE}_p(\d{{4}})_(\d{{2}})$')
+
+# Rows deleted per statement when retention runs on an unpartitioned table
+DELETE_BATCH_SIZE = 5000
+
+
+def month_start(value) -> date:
+    """First day of the (UTC) month of a date or datetime."""
+    if isinstance(value, datetime):
+        value = value.astimezone(dt_timezone.utc) if timezone.is_aware(value) else value
+        value = value.date()
+    return value.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f'{PARENT_TABLE}_p{month.year:04d}_{month.month:02d}'
+
+
+def _bound(month: date) -> str:
+    return f'{month.isoformat()} 00:00:00+00'
+
+
+def is_partitioned() -> bool:
+    """Whether the audit log table is a partitioned table."""
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)",
+            [PARENT_TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions() -> List[Tuple[str, date]]:
+    """Monthly partitions as (table name, month), oldest first."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = to_regclass(%s)
+            """,
+            [PARENT_TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        match = PARTITION_NAME_RE.match(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def _default_has_rows(cursor, month: date) -> bool:
+    cursor.execute("SELECT to_regclass(%s)", [DEFAULT_PARTITION])
+    if cursor.fetchone()[0] is None:
+        return False
+    cursor.execute(
+        f'SELECT 1 FROM "{DEFAULT_PARTITION}" WHERE created_at >= %s AND created_at < %s LIMIT 1',
+        [_bound(month), _bound(add_months(month, 1))],
+    )
+    return cursor.fetchone() is not None
+
+
+def create_partition(month: date) -> bool:
+    """
+    Create the partition of a month; returns False when it already exists.
+
+    PostgreSQL refuses to create a partition while the default partition
+    holds rows of its range, so those rows are moved into the new partition:
+    the default partition is detached, the month is created, the rows are
+    reinserted through the parent and the default partition is reattached.
+    Run it inside a transaction so a failure leaves the table unchanged.
+    """
+    name = partition_name(month)
+    lower, upper = _bound(month), _bound(add_months(month, 1))
+    create_sql = (
+        f'CREATE TABLE "{name}" PARTITION OF "{PARENT_TABLE}" '
+        f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [name])
+        if cursor.fetchone()[0] is not None:
+            return False
+        if not _default_has_rows(cursor, month):
+            cursor.execute(create_sql)
+            logger.info(f"Created audit log partition {name}")
+            return True
+
+        cursor.execute(f'ALTER TABLE "{PARENT_TABLE}" DETACH PARTITION "{DEFAULT_PARTITION}"')
+        cursor.execute(create_sql)
+        cursor.execute(
+            f'INSERT INTO "{PARENT_TABLE}" SELECT * FROM "{DEFAULT_PARTITION}" '
+            f'WHERE created_at >= %s AND created_at < %s',
+            [lower, upper],
+        )
+        moved = cursor.rowcount
+        cursor.execute(
+            f'DELETE FROM "{DEFAULT_PARTITION}" WHERE created_at >= %s AND created_at < %s',
+            [lower, upper],
+        )
+        cursor.execute(f'ALTER TABLE "{PARENT_TABLE}" ATTACH PARTITION "{DEFAULT_PARTITION}" DEFAULT')
+    logger.info(f"Created audit log partition {name} and moved {moved} rows from the default partition")
+    return True
+
+
+def ensure_partitions(months_ahead: Optional[int] = None, today=None) -> List[str]:
+    """
+    Create partitions from the current month to ``months_ahead`` months ahead.
+
+    Returns:
+        list: Names of the created partitions
+    """
+    if not is_partitioned():
+        return []
+    months_ahead = settings.AUDIT_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    current = month_start(today or timezone.now())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        with transaction.atomic():
+            if create_partition(month):
+                created.append(partition_name(month))
+    return created
+
+
+def _archive_path(archive_dir: str, name: str) -> str:
+    """Path of a new archive file; an earlier export of the same name is never overwritten."""
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f'{name}.csv.gz')
+    suffix = 1
+    while os.path.exists(path):
+        path = os.path.join(archive_dir, f'{name}_{suffix}.csv.gz')
+        suffix += 1
+    return path
+
+
+def archive_partition(name: str, archive_dir: str, drop: bool = True) -> str:
+    """
+    Detach a partition, export it to ``<archive_dir>/<name>.csv.gz`` and drop it.
+
+    Returns:
+        str: Path of the archive file
+    """
+    path = _archive_path(archive_dir, name)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE "{PARENT_TABLE}" DETACH PARTITION "{name}"')
+        with gzip.open(path, 'wt', encoding='utf-8', newline='') as archive:
+            cursor.copy_expert(f'COPY "{name}" TO STDOUT WITH (FORMAT csv, HEADER)', archive)
+        if drop:
+            cursor.execute(f'DROP TABLE "{name}"')
+    logger.info(f"Archived audit log partition {name} to {path}")
+    return path
+
+
+def _archive_rows(cutoff: datetime, archive_dir: str, drop: bool = True,
+                  table: str = PARENT_TABLE) -> Optional[str]:
+    """
+    Export and delete rows before ``cutoff``.
+
+    Retention for an unpartitioned table, and for expired rows of the default
+    partition once the monthly partitions before ``cutoff`` are gone.
+    """
+    old_logs = AuditLog.objects.filter(created_at__lt=cutoff).order_by('id')
+    if not old_logs.exists():
+        return None
+
+    fields = AuditLog._meta.concrete_fields
+    path = _archive_path(archive_dir, f'{table}_before_{cutoff.date().isoformat()}')
+    with gzip.open(path, 'wt', encoding='utf-8', newline='') as archive:
+        writer = csv.writer(archive)
+        writer.writerow([field.column for field in fields])
+        for row in old_logs.values_list(*[field.attname for field in fields]).iterator(chunk_size=DELETE_BATCH_SIZE):
+            writer.writerow([json.dumps(value) if isinstance(value, (dict, list)) else value for value in row])
+
+    if drop:
+        while True:
+            ids = list(old_logs.values_list('id', flat=True)[:DELETE_BATCH_SIZE])
+            if not ids:
+                break
+            AuditLog.objects.filter(id__in=ids).delete()
+    logger.info(f"Archived audit logs before {cutoff.isoformat()} to {path}")
+    return path
+
+
+def apply_retention(retention_months: Optional[int] = None, archive_dir: Optional[str] = None,
+                    drop: bool = True, today=None) -> List[str]:
+    """
+    Archive audit logs older than the retention period.
+
+    Whole months are kept: with 12 months of retention in October 2026,
+    everything before October 2025 is archived.
+
+    Returns:
+        list: Paths of the written archive files
+    """
+    retention_months = settings.AUDIT_LOG_RETENTION_MONTHS if retention_months is None else retention_months
+    archive_dir = archive_dir or settings.AUDIT_LOG_ARCHIVE_DIR
+    cutoff_month = add_months(month_start(today or timezone.now()), -retention_months)
+    cutoff = datetime(cutoff_month.year, cutoff_month.month, 1, tzinfo=dt_timezone.utc)
+
+    if not is_partitioned():
+        path = _archive_rows(cutoff, archive_dir, drop=drop)
+        return [path] if path else []
+
+    archives = [
+        archive_partition(name, archive_dir, drop=drop)
+        for name, month in list_partitions()
+        if month < cutoff_month
+    ]
+    # Detached months are gone, so only the default partition can still hold older rows
+    path = _archive_rows(cutoff, archive_dir, drop=drop, table=DEFAULT_PARTITION)
+    if path:
+        archives.append(path)
+    return archives
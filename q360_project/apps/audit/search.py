@@ -2,10 +2,26 @@
 Full-text search utilities for audit logs using PostgreSQL.
 """
 from django.contrib.postgres.search import SearchVector, SearchQuery, SearchRank
-from django.db.models import Q
+from django.db.models import Q, Value
 from .models import AuditLog
 
 
+def audit_search_vector(audit_log):
+    """
+    Search vector expression built from an entry's own values.
+
+    It can be assigned before the row is inserted, so the vector is computed
+    by the INSERT itself (also for ``bulk_create``).
+    """
+    return (
+        SearchVector(Value(audit_log.model_name or ''), weight='A') +
+        SearchVector(Value(audit_log.action or ''), weight='A') +
+        SearchVector(Value(audit_log.request_path or ''), weight='B') +
+        SearchVector(Value(audit_log.actor_role or ''), weight='C') +
+        SearchVector(Value(audit_log.user_agent or ''), weight='D')
+    )
+
+
 def update_audit_search_vector(audit_log):
     """
     Update search vector for a single audit log entry.
@@ -9,6 +9,7 @@ from django.http import HttpRequest
 from django.utils import timezone
 
 from .models import AuditLog
+from .writer import audit_writer
 
 
 def record_audit_event(
@@ -40,7 +41,8 @@ def record_audit_event(
         check_policy: Whether to check audit policy violations
 
     Returns:
-        AuditLog: Created audit log entry
+        AuditLog: Created audit log entry (not yet saved when ``AUDIT_WRITE_MODE``
+        buffers writes)
     """
     from apps.security.audit_policy import default_audit_policy
 
@@ -85,7 +87,7 @@ def record_audit_event(
             user_agent=request.META.get("HTTP_USER_AGENT", "")[:500],
         )
 
-    return AuditLog.objects.create(**log_kwargs)
+    return audit_writer.write(AuditLog(**log_kwargs))
 
 
 def record_login_event(user, request: HttpRequest, success: bool = True) -> AuditLog:
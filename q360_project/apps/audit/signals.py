@@ -1,41 +1,54 @@
 """
 Signals for audit app.
-Automatically updates search vectors and broadcasts real-time alerts.
+Broadcasts real-time alerts for new audit logs and flushes the audit write buffer.
 """
+from django.core.signals import request_finished
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 from .models import AuditLog
-from .search import update_audit_search_vector
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Threat score from which new logs are pushed to the threat monitor
+THREAT_ALERT_SCORE = 60
 
-@receiver(post_save, sender=AuditLog)
-def update_search_vector_on_save(sender, instance, created, **kwargs):
-    """
-    Automatically update search vector when audit log is saved.
-    """
-    if created:
-        try:
-            update_audit_search_vector(instance)
-            logger.debug(f"Search vector updated for audit log {instance.pk}")
-        except Exception as e:
-            logger.error(f"Error updating search vector for audit log {instance.pk}: {e}")
+
+def _alert_data(log):
+    return {
+        'id': log.id,
+        'user': log.user.username if log.user else 'N/A',
+        'action': log.action,
+        'threat_level': log.threat_level,
+        'threat_score': log.threat_score,
+        'ip_address': log.ip_address,
+        'timestamp': log.created_at.isoformat(),
+        'severity': log.severity
+    }
 
 
-@receiver(post_save, sender=AuditLog)
-def broadcast_high_threat_alert(sender, instance, created, **kwargs):
+def _log_data(log):
+    return {
+        'id': log.id,
+        'user': log.user.username if log.user else 'N/A',
+        'action': log.action,
+        'model_name': log.model_name,
+        'severity': log.severity,
+        'threat_level': log.threat_level,
+        'threat_score': log.threat_score,
+        'timestamp': log.created_at.isoformat()
+    }
+
+
+def broadcast_audit_logs(logs):
     """
-    Broadcast high-threat events to WebSocket clients.
+    Broadcast new audit logs to the admin dashboard and high threats to the
+    threat monitor, with one group message per room for the whole batch.
     """
-    if not created:
-        return
-
-    # Only broadcast high threats
-    if instance.threat_score < 60:
+    logs = list(logs)
+    if not logs:
         return
 
     channel_layer = get_channel_layer()
@@ -43,65 +56,47 @@ def broadcast_high_threat_alert(sender, instance, created, **kwargs):
     if not channel_layer:
         return
 
-    # Prepare alert data
-    alert_data = {
-        'id': instance.id,
-        'user': instance.user.username if instance.user else 'N/A',
-        'action': instance.action,
-        'threat_level': instance.threat_level,
-        'threat_score': instance.threat_score,
-        'ip_address': instance.ip_address,
-        'timestamp': instance.created_at.isoformat(),
-        'severity': instance.severity
-    }
+    alerts = [_alert_data(log) for log in logs if log.threat_score >= THREAT_ALERT_SCORE]
+    if alerts:
+        try:
+            async_to_sync(channel_layer.group_send)(
+                'threat_monitor',
+                {
+                    'type': 'threat_alerts',
+                    'data': alerts
+                }
+            )
+            logger.info(f"Broadcast {len(alerts)} threat alerts")
+        except Exception as e:
+            logger.error(f"Error broadcasting threat alerts: {e}")
 
-    # Broadcast to threat monitor room
     try:
         async_to_sync(channel_layer.group_send)(
-            'threat_monitor',
+            'audit_logs',
             {
-                'type': 'threat_alert',
-                'data': alert_data
+                'type': 'new_audit_logs',
+                'data': [_log_data(log) for log in logs]
             }
         )
-        logger.info(f"Broadcast threat alert for log {instance.id}")
     except Exception as e:
-        logger.error(f"Error broadcasting threat alert: {e}")
+        logger.error(f"Error broadcasting audit logs: {e}")
 
 
 @receiver(post_save, sender=AuditLog)
 def broadcast_new_audit_log(sender, instance, created, **kwargs):
     """
-    Broadcast all new audit logs to admin dashboard.
-    """
-    if not created:
-        return
+    Broadcast a new audit log (and a threat alert for high threats).
 
-    channel_layer = get_channel_layer()
+    The search vector is computed by the INSERT itself (see ``AuditLog.save``);
+    rows written through the audit write buffer are broadcast per batch.
+    """
+    if created:
+        broadcast_audit_logs([instance])
 
-    if not channel_layer:
-        return
 
-    # Prepare log data
-    log_data = {
-        'id': instance.id,
-        'user': instance.user.username if instance.user else 'N/A',
-        'action': instance.action,
-        'model_name': instance.model_name,
-        'severity': instance.severity,
-        'threat_level': instance.threat_level,
-        'threat_score': instance.threat_score,
-        'timestamp': instance.created_at.isoformat()
-    }
+@receiver(request_finished)
+def flush_due_audit_logs(sender, **kwargs):
+    """Write buffered audit logs once the buffer's time threshold has passed."""
+    from .writer import audit_writer
 
-    # Broadcast to audit logs room
-    try:
-        async_to_sync(channel_layer.group_send)(
-            'audit_logs',
-            {
-                'type': 'new_audit_log',
-                'data': log_data
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error broadcasting audit log: {e}")
+    audit_writer.flush_if_due()
@@ -0,0 +1,34 @@
+"""
+Celery tasks for audit app.
+"""
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def write_audit_logs_task(self, payloads):
+    """Write a batch of buffered audit logs (see ``apps.audit.writer``)."""
+    from .writer import audit_log_from_payload, write_audit_logs
+
+    try:
+        return len(write_audit_logs(audit_log_from_payload(payload) for payload in payloads))
+    except Exception as exc:
+        raise self.retry(exc=exc)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def maintain_audit_partitions_task(self):
+    """Create upcoming audit log partitions and archive expired logs (scheduled daily)."""
+    from .partitions import apply_retention, ensure_partitions
+
+    try:
+        created = ensure_partitions()
+        archives = apply_retention()
+    except Exception as exc:
+        raise self.retry(exc=exc)
+    if created or archives:
+        logger.info(f"Audit partitions created: {len(created)}, archives written: {len(archives)}")
+    return {'created': created, 'archives': archives}
@@ -1,67 +1,85 @@
 """Template views for audit app."""
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
+from django.db import connection
 from django.db.models import Count, Q
 from django.utils import timezone
 from datetime import timedelta
 import json
-from collections import defaultdict
+from apps.accounts.models import User
 from .models import AuditLog
 
 
-def detect_brute_force_attacks(login_failures, time_window=5, threshold=5):
+# Most recent burst per IP: the failure whose (threshold - 1)-th predecessor is
+# within the time window, found with LEAD() over each IP's failures; counts and
+# usernames are then aggregated over the burst's time span.
+BRUTE_FORCE_SQL = """
+    WITH failures AS (
+        SELECT ip_address, created_at,
+               LEAD(created_at, %(offset)s) OVER (
+                   PARTITION BY ip_address ORDER BY created_at DESC
+               ) AS burst_start
+        FROM {audit_table}
+        WHERE action = 'login_failure' AND ip_address IS NOT NULL AND created_at >= %(since)s
+    ),
+    bursts AS (
+        SELECT DISTINCT ON (ip_address) ip_address, burst_start, created_at AS burst_end
+        FROM failures
+        WHERE burst_start >= created_at - %(window)s
+        ORDER BY ip_address, created_at DESC
+    )
+    SELECT bursts.ip_address, bursts.burst_start, bursts.burst_end, COUNT(*),
+           ARRAY_REMOVE(ARRAY_AGG(DISTINCT COALESCE(
+               users.username, log.changes ->> 'username', log.changes ->> 'attempted_username'
+           )), NULL)
+    FROM bursts
+    JOIN {audit_table} log
+        ON log.ip_address = bursts.ip_address
+        AND log.action = 'login_failure'
+        AND log.created_at BETWEEN bursts.burst_start AND bursts.burst_end
+    LEFT JOIN {user_table} users ON users.id = log.user_id
+    GROUP BY bursts.ip_address, bursts.burst_start, bursts.burst_end
+    ORDER BY bursts.burst_end DESC
+"""
+
+
+def detect_brute_force_attacks(since, time_window=5, threshold=5):
     """
-    Detect potential brute force attacks.
+    Detect potential brute force attacks with a single SQL query.
 
     Args:
-        login_failures: QuerySet of login failure logs
+        since: Only consider login failures from this moment on
         time_window: Time window in minutes (default: 5)
         threshold: Number of failures to trigger alert (default: 5)
 
     Returns:
-        List of threats with IP address, username, count, and time span
+        List of threats with IP address, usernames, count and time span,
+        most recent first (one per IP)
     """
-    threats = []
-
-    # Group by IP address
-    ip_grouped = defaultdict(list)
-    for log in login_failures.order_by('-created_at'):
-        if log.ip_address:
-            ip_grouped[log.ip_address].append(log)
-
-    # Analyze each IP for brute force patterns
-    for ip, logs in ip_grouped.items():
-        if len(logs) < threshold:
-            continue
-
-        # Check if threshold failures occurred within time_window minutes
-        for i in range(len(logs) - threshold + 1):
-            time_span = logs[i].created_at - logs[i + threshold - 1].created_at
-
-            if time_span <= timedelta(minutes=time_window):
-                # Brute force attack detected!
-                usernames = set()
-                for log in logs[i:i + threshold]:
-                    if log.user:
-                        usernames.add(log.user.username)
-                    elif log.changes and 'username' in log.changes:
-                        usernames.add(log.changes.get('username', 'Unknown'))
-
-                threats.append({
-                    'ip_address': ip,
-                    'usernames': list(usernames),
-                    'failure_count': threshold,
-                    'time_span': time_span.total_seconds() / 60,  # in minutes
-                    'first_attempt': logs[i + threshold - 1].created_at,
-                    'last_attempt': logs[i].created_at,
-                    'severity': 'critical' if threshold >= 10 else 'high'
-                })
-                break  # Only report once per IP
-
-    # Sort by last attempt (most recent first)
-    threats.sort(key=lambda x: x['last_attempt'], reverse=True)
-
-    return threats
+    sql = BRUTE_FORCE_SQL.format(
+        audit_table=connection.ops.quote_name(AuditLog._meta.db_table),
+        user_table=connection.ops.quote_name(User._meta.db_table),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {
+            'offset': threshold - 1,
+            'since': since,
+            'window': timedelta(minutes=time_window),
+        })
+        rows = cursor.fetchall()
+
+    return [
+        {
+            'ip_address': ip_address,
+            'usernames': sorted(usernames),
+            'failure_count': failure_count,
+            'time_span': (last_attempt - first_attempt).total_seconds() / 60,  # in minutes
+            'first_attempt': first_attempt,
+            'last_attempt': last_attempt,
+            'severity': 'critical' if failure_count >= 10 else 'high'
+        }
+        for ip_address, first_attempt, last_attempt, failure_count, usernames in rows
+    ]
 
 
 @login_required
@@ -128,12 +146,8 @@ def security_dashboard(request):
 
     # *** NEW: THREAT DETECTION ***
     # Detect brute force attacks (5+ failures in 5 minutes)
-    recent_failures_for_analysis = login_failures.filter(
-        created_at__gte=timezone.now() - timedelta(hours=24)
-    ).select_related('user').prefetch_related()
-
     detected_threats = detect_brute_force_attacks(
-        recent_failures_for_analysis,
+        since=timezone.now() - timedelta(hours=24),
         time_window=5,
         threshold=5
     )
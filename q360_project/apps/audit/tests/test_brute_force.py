@@ -0,0 +1,64 @@
+"""
+Tests for SQL brute-force detection.
+"""
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.audit.models import AuditLog
+from apps.audit.template_views import detect_brute_force_attacks
+
+
+class BruteForceDetectionTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.victim = User.objects.create_user(username="victim", password="pass1234")
+
+    def failures(self, ip_address, minutes_ago, user=None, username=None):
+        logs = AuditLog.objects.bulk_create([
+            AuditLog(
+                user=user, action="login_failure", model_name="User", ip_address=ip_address,
+                changes={"attempted_username": username} if username else {},
+            )
+            for _ in minutes_ago
+        ])
+        for log, minutes in zip(logs, minutes_ago):
+            AuditLog.objects.filter(pk=log.pk).update(created_at=self.now - timedelta(minutes=minutes))
+
+    def test_flags_bursts_in_one_query(self):
+        # 6 failures within 3 minutes against two accounts; the latest 5 span 2 minutes
+        self.failures("10.0.0.1", [1, 1.5, 2, 2.5], user=self.victim)
+        self.failures("10.0.0.1", [3, 4], username="admin")
+        # Same volume spread over an hour
+        self.failures("10.0.0.2", [0, 12, 24, 36, 48, 60], user=self.victim)
+        # Too few failures
+        self.failures("10.0.0.3", [0, 0.5, 1])
+
+        with self.assertNumQueries(1):
+            threats = detect_brute_force_attacks(self.now - timedelta(hours=24))
+
+        self.assertEqual(len(threats), 1)
+        threat = threats[0]
+        self.assertEqual(threat["ip_address"], "10.0.0.1")
+        self.assertEqual(threat["usernames"], ["admin", "victim"])
+        self.assertEqual(threat["failure_count"], 5)
+        self.assertAlmostEqual(threat["time_span"], 2, places=3)
+        self.assertEqual(threat["severity"], "high")
+
+    def test_reports_most_recent_burst_with_all_failures_in_span(self):
+        self.failures("10.0.0.9", [100, 101, 102, 103, 104])
+        self.failures("10.0.0.9", [i / 4 for i in range(12)])
+
+        threats = detect_brute_force_attacks(self.now - timedelta(hours=24))
+
+        self.assertEqual(len(threats), 1)
+        self.assertEqual(threats[0]["failure_count"], 5)
+        self.assertEqual(threats[0]["last_attempt"], self.now)
+
+    def test_window_and_since_bounds(self):
+        self.failures("10.0.0.4", [0, 1, 2, 3, 6])
+        self.assertEqual(detect_brute_force_attacks(self.now - timedelta(hours=1)), [])
+        self.assertEqual(len(detect_brute_force_attacks(self.now - timedelta(hours=1), time_window=6)), 1)
+        self.assertEqual(detect_brute_force_attacks(self.now - timedelta(minutes=4), time_window=60), [])
@@ -0,0 +1,147 @@
+"""
+Tests for audit log partitioning and retention.
+"""
+import gzip
+import importlib
+import tempfile
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.audit.models import AuditLog
+from apps.audit.partitions import (
+    DEFAULT_PARTITION,
+    add_months,
+    apply_retention,
+    ensure_partitions,
+    is_partitioned,
+    list_partitions,
+    month_start,
+    partition_name,
+)
+from apps.audit.tasks import maintain_audit_partitions_task
+
+partition_migration = importlib.import_module("apps.audit.migrations.0006_partition_auditlog")
+
+
+class AuditRetentionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="retention", password="pass1234")
+        self.archive_dir = tempfile.mkdtemp()
+
+    def log(self, age_days=0):
+        log = AuditLog.objects.create(user=self.user, action="view", model_name="Report")
+        if age_days:
+            AuditLog.objects.filter(pk=log.pk).update(created_at=timezone.now() - timedelta(days=age_days))
+        return log
+
+    def test_unpartitioned_retention_exports_and_deletes_old_rows(self):
+        old = self.log(age_days=500)
+        recent = self.log()
+
+        archives = apply_retention(retention_months=12, archive_dir=self.archive_dir)
+
+        self.assertEqual(len(archives), 1)
+        with gzip.open(archives[0], "rt") as archive:
+            lines = archive.read().splitlines()
+        self.assertTrue(lines[0].startswith("id,"))
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith(f"{old.pk},"))
+        self.assertEqual(list(AuditLog.objects.values_list("pk", flat=True)), [recent.pk])
+        self.assertEqual(apply_retention(retention_months=12, archive_dir=self.archive_dir), [])
+
+    def test_month_helpers(self):
+        self.assertEqual(add_months(date(2026, 11, 1), 3), date(2027, 2, 1))
+        self.assertEqual(add_months(date(2026, 1, 1), -1), date(2025, 12, 1))
+        self.assertEqual(partition_name(date(2026, 3, 1)), "audit_auditlog_p2026_03")
+
+
+class AuditPartitionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="partitioned", password="pass1234")
+        self.old = AuditLog.objects.create(user=self.user, action="view", model_name="Report")
+        AuditLog.objects.filter(pk=self.old.pk).update(created_at=timezone.now() - timedelta(days=500))
+        # Converted inside the test transaction, so the change is rolled back
+        partition_migration.partition_audit_log(None, SimpleNamespace(connection=connection))
+
+    def test_conversion_keeps_rows_and_ids(self):
+        self.assertTrue(is_partitioned())
+        current = month_start(timezone.now())
+        names = [name for name, _ in list_partitions()]
+        self.assertIn(partition_name(current), names)
+        self.assertIn(partition_name(add_months(current, 3)), names)
+        self.assertIn(partition_name(month_start(AuditLog.objects.get(pk=self.old.pk).created_at)), names)
+
+        new = AuditLog.objects.create(user=self.user, action="login", model_name="User")
+        self.assertGreater(new.pk, self.old.pk)
+        self.assertTrue(AuditLog.objects.filter(search_vector="login").exists())
+
+    def test_ensure_partitions_creates_future_months(self):
+        current = month_start(timezone.now())
+        created = ensure_partitions(months_ahead=5)
+        self.assertEqual(created, [partition_name(add_months(current, 4)), partition_name(add_months(current, 5))])
+        self.assertEqual(ensure_partitions(months_ahead=5), [])
+
+    def partition_of(self, log):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT tableoid::regclass::text FROM audit_auditlog WHERE id = %s", [log.pk])
+            return cursor.fetchone()[0]
+
+    def test_ensure_partitions_moves_rows_out_of_the_default_partition(self):
+        month = add_months(month_start(timezone.now()), 4)
+        early = AuditLog.objects.create(user=self.user, action="view", model_name="Report")
+        AuditLog.objects.filter(pk=early.pk).update(created_at=timezone.now() + timedelta(days=130))
+        early.refresh_from_db()
+        self.assertEqual(month_start(early.created_at), month)
+        self.assertEqual(self.partition_of(early), DEFAULT_PARTITION)
+
+        created = ensure_partitions(months_ahead=4)
+
+        self.assertEqual(created, [partition_name(month)])
+        self.assertEqual(self.partition_of(early), partition_name(month))
+        self.assertEqual(AuditLog.objects.filter(pk=early.pk).count(), 1)
+
+    def test_recent_queries_prune_old_partitions(self):
+        plan = AuditLog.objects.filter(created_at__gte=timezone.now() - timedelta(days=7)).explain()
+        old_partition = partition_name(month_start(timezone.now() - timedelta(days=500)))
+        self.assertNotIn(old_partition, plan)
+        self.assertIn(partition_name(month_start(timezone.now())), plan)
+
+    def test_retention_detaches_and_archives_partitions(self):
+        archive_dir = tempfile.mkdtemp()
+        archives = apply_retention(retention_months=12, archive_dir=archive_dir)
+
+        old_partition = partition_name(month_start(timezone.now() - timedelta(days=500)))
+        old_archive = next(path for path in archives if path.endswith(f"{old_partition}.csv.gz"))
+        with gzip.open(old_archive, "rt") as archive:
+            self.assertTrue(archive.read().splitlines()[1].startswith(f"{self.old.pk},"))
+        self.assertFalse(AuditLog.objects.filter(pk=self.old.pk).exists())
+        self.assertNotIn(old_partition, [name for name, _ in list_partitions()])
+
+    def test_retention_archives_expired_rows_of_the_default_partition(self):
+        # Older than the first partition created by the conversion
+        stray = AuditLog.objects.create(user=self.user, action="view", model_name="Report")
+        AuditLog.objects.filter(pk=stray.pk).update(created_at=timezone.now() - timedelta(days=900))
+        self.assertEqual(self.partition_of(stray), DEFAULT_PARTITION)
+
+        archives = apply_retention(retention_months=12, archive_dir=tempfile.mkdtemp())
+
+        default_archive = next(path for path in archives if f"{DEFAULT_PARTITION}_before_" in path)
+        with gzip.open(default_archive, "rt") as archive:
+            self.assertTrue(archive.read().splitlines()[1].startswith(f"{stray.pk},"))
+        self.assertFalse(AuditLog.objects.filter(pk=stray.pk).exists())
+
+    def test_maintenance_task_creates_partitions_and_applies_retention(self):
+        current = month_start(timezone.now())
+        with override_settings(AUDIT_PARTITION_MONTHS_AHEAD=4, AUDIT_LOG_RETENTION_MONTHS=12,
+                               AUDIT_LOG_ARCHIVE_DIR=tempfile.mkdtemp()):
+            result = maintain_audit_partitions_task.delay().get()
+
+        self.assertEqual(result["created"], [partition_name(add_months(current, 4))])
+        old_partition = partition_name(month_start(timezone.now() - timedelta(days=500)))
+        self.assertTrue(any(path.endswith(f"{old_partition}.csv.gz") for path in result["archives"]))
+        self.assertFalse(AuditLog.objects.filter(pk=self.old.pk).exists())
@@ -0,0 +1,85 @@
+"""
+Tests for sliding-window audit threat counters.
+"""
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.accounts.models import User
+from apps.audit.models import AuditLog
+from apps.audit.threat import check_threat_consistency, warm_threat_counters, windowed_threat_level
+
+
+class WindowedThreatScoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="suspect", password="pass1234")
+        self.other = User.objects.create_user(username="bystander", password="pass1234")
+
+    def log(self, user=None, action="view", severity="info", ip_address="10.0.0.1"):
+        return AuditLog.objects.create(
+            user=user, action=action, model_name="User", severity=severity, ip_address=ip_address
+        )
+
+    def test_save_does_not_query_audit_table(self):
+        self.log(self.user)
+        # Only the insert itself, in its savepoint
+        with self.assertNumQueries(3):
+            self.log(self.user, action="login_failure")
+
+    def test_scores_match_sql_path(self):
+        for _ in range(3):
+            self.log(self.user, action="login_failure")
+        self.log(None, action="login_failure", ip_address="10.0.0.1")
+        self.log(self.user, action="permission_denied", ip_address="10.0.0.2")
+        self.log(self.user, action="delete", severity="critical", ip_address="10.0.0.2")
+        self.log(self.other, action="login_failure", ip_address="10.0.0.9")
+
+        expected = AuditLog.calculate_threat_level(self.user, "view", ip_address="10.0.0.1")
+        self.assertEqual(windowed_threat_level(self.user.pk, "10.0.0.1"), expected)
+        # 4 IP failures (50 cap) + 3 user failures (30) + 1 denial (8) + 1 critical (20)
+        self.assertEqual(expected, ("critical", 108))
+
+        entry = self.log(self.user, action="view")
+        self.assertEqual((entry.threat_level, entry.threat_score), expected)
+        self.assertEqual(check_threat_consistency(), [])
+
+    def test_cold_cache_is_seeded_from_database(self):
+        self.log(self.user, action="login_failure")
+        self.log(self.user, action="login_failure")
+        cache.clear()
+
+        self.assertEqual(windowed_threat_level(self.user.pk, "10.0.0.1"), ("medium", 50))
+        self.assertFalse(warm_threat_counters())
+
+    def test_events_outside_window_are_not_counted(self):
+        old = self.log(self.user, action="login_failure")
+        AuditLog.objects.filter(pk=old.pk).update(created_at=old.created_at - timedelta(hours=2))
+        warm_threat_counters(force=True)
+
+        self.assertEqual(windowed_threat_level(self.user.pk, "10.0.0.1"), ("none", 0))
+
+    def test_scoring_reads_few_coarse_buckets(self):
+        self.log(self.user, action="login_failure")
+        with patch("apps.audit.threat.cache.get_many", wraps=cache.get_many) as get_many:
+            windowed_threat_level(self.user.pk, "10.0.0.1")
+
+        keys = get_many.call_args.args[0]
+        # 13 five-minute buckets per counter kind
+        self.assertEqual(len(keys), 4 * 13)
+
+    def test_consistency_command_repairs_drift(self):
+        self.log(self.user, action="login_failure")
+        # Rows written without save() bypass the counters
+        AuditLog.objects.bulk_create([
+            AuditLog(user=self.user, action="login_failure", model_name="User", ip_address="10.0.0.1")
+        ])
+
+        out = StringIO()
+        call_command("check_threat_counters", "--repair", stdout=out)
+        self.assertIn("SQL", out.getvalue())
+        self.assertEqual(check_threat_consistency(), [])
@@ -0,0 +1,110 @@
+"""
+Tests for the batched audit log writer.
+"""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.accounts.models import User
+from apps.audit.models import AuditLog
+from apps.audit.services import record_audit_event
+from apps.audit.threat import warm_threat_counters
+from apps.audit.writer import audit_writer
+
+
+class AuditWriterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="writer", password="pass1234", role="manager")
+        warm_threat_counters()
+
+    def tearDown(self):
+        audit_writer.flush()
+
+    def record(self, action="view", **kwargs):
+        return record_audit_event(user=self.user, action=action, model_name="reports.Report",
+                                  check_policy=False, **kwargs)
+
+    def test_sync_write_is_a_single_insert_with_search_vector(self):
+        # The INSERT runs in a savepoint so a failing vector cannot fail the write
+        with self.assertNumQueries(3):
+            log = self.record()
+
+        self.assertIsNotNone(log.pk)
+        self.assertIn("report", AuditLog.objects.get(pk=log.pk).search_vector)
+
+    @override_settings(AUDIT_WRITE_MODE="buffer", AUDIT_WRITE_BUFFER_SIZE=3, AUDIT_WRITE_BUFFER_MAX_DELAY=60)
+    def test_buffer_flushes_on_size_with_one_insert(self):
+        with self.assertNumQueries(0):
+            self.record(action="login_failure")
+            self.record(action="login_failure")
+        self.assertEqual(len(audit_writer), 2)
+
+        channel_layer = MagicMock(group_send=AsyncMock())
+        with patch("apps.audit.signals.get_channel_layer", return_value=channel_layer):
+            # The write waits for the caller's transaction: savepoint, insert, release
+            with self.assertNumQueries(3), self.captureOnCommitCallbacks(execute=True):
+                last = self.record(action="view")
+                self.assertEqual(len(audit_writer), 3)
+
+        logs = list(AuditLog.objects.order_by("id"))
+        self.assertEqual([log.action for log in logs], ["login_failure", "login_failure", "view"])
+        self.assertTrue(all(log.search_vector for log in logs))
+        # Earlier events of the batch count toward later scores
+        self.assertEqual((last.threat_level, last.threat_score), ("low", 20))
+
+        channel_layer.group_send.assert_awaited_once()
+        group, event = channel_layer.group_send.await_args.args
+        self.assertEqual(group, "audit_logs")
+        self.assertEqual(len(event["data"]), 3)
+
+    @override_settings(AUDIT_WRITE_MODE="buffer", AUDIT_WRITE_BUFFER_SIZE=100, AUDIT_WRITE_BUFFER_MAX_DELAY=0)
+    def test_buffer_flushes_when_due(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.record()
+        self.assertEqual(AuditLog.objects.count(), 1)
+        self.assertEqual(len(audit_writer), 0)
+
+    @override_settings(AUDIT_WRITE_MODE="celery", AUDIT_WRITE_BUFFER_SIZE=2, AUDIT_WRITE_BUFFER_MAX_DELAY=60)
+    def test_celery_mode_writes_batch_in_task(self):
+        first = self.record(changes={"field": ["old", "new"]})
+        self.assertFalse(AuditLog.objects.exists())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.record()
+
+        logs = AuditLog.objects.filter(user=self.user)
+        self.assertEqual(logs.count(), 2)
+        self.assertEqual(logs.filter(changes__field=["old", "new"]).count(), 1)
+        # Rows keep the time the event was recorded, not the task's run time
+        self.assertEqual(logs.get(changes__field=["old", "new"]).created_at, first.created_at)
+
+    @override_settings(AUDIT_WRITE_MODE="buffer", AUDIT_WRITE_BUFFER_SIZE=100, AUDIT_WRITE_BUFFER_MAX_DELAY=60)
+    def test_failed_flush_keeps_entries_buffered(self):
+        self.record()
+        with patch("apps.audit.writer.write_audit_logs", side_effect=RuntimeError("db down")):
+            with self.captureOnCommitCallbacks(execute=True):
+                audit_writer.flush()
+        self.assertEqual(len(audit_writer), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            audit_writer.flush()
+        self.assertEqual(AuditLog.objects.count(), 1)
+        self.assertEqual(len(audit_writer), 0)
+
+    @override_settings(AUDIT_WRITE_MODE="buffer", AUDIT_WRITE_BUFFER_SIZE=1, AUDIT_WRITE_BUFFER_MAX_DELAY=60)
+    def test_rolled_back_transaction_does_not_lose_buffered_entries(self):
+        from django.db import transaction
+
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.record()
+                    raise RuntimeError("request failed")
+            except RuntimeError:
+                pass
+        self.assertEqual(len(audit_writer), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            audit_writer.flush()
+        self.assertEqual(AuditLog.objects.count(), 1)
@@ -0,0 +1,221 @@
+"""
+Sliding-window threat counters for audit events.
+
+``AuditLog.calculate_threat_level`` counts login failures (per user and per
+IP), permission denials and critical actions of the last hour with four SQL
+queries. The same counts are kept here in five-minute cache buckets that are
+incremented when audit rows are written, so scoring a new event costs one
+``get_many`` of at most 52 keys (13 buckets of four kinds) instead of touching
+the audit table. Counters are seeded from the database with one grouped query
+when the cache is cold; reseeding starts a new key generation so stale buckets
+are simply never read again. ``check_threat_consistency`` compares both paths.
+
+The counters must live in a cache shared by every web and worker process
+(e.g. Redis). With the default per-process LocMemCache each process only
+counts the events it wrote itself, and the buckets compete with the other
+cached data for its 1000 entries.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMinute
+from django.utils import timezone
+
+from .models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+# Same window as AuditLog.calculate_threat_level's default
+THREAT_WINDOW_MINUTES = 60
+# Coarse buckets keep the keys per scored event and per subject few
+BUCKET_SECONDS = 5 * 60
+
+THREAT_COUNTER_KEY = 'audit:threat:{generation}:{kind}:{subject}:{bucket}'
+THREAT_GENERATION_KEY = 'audit:threat:generation'
+
+# Counter kinds
+USER_LOGIN_FAILURES = 'user_login_failure'
+IP_LOGIN_FAILURES = 'ip_login_failure'
+USER_PERMISSION_DENIALS = 'user_permission_denied'
+USER_CRITICAL_ACTIONS = 'user_critical'
+
+
+def _counter_kinds(action: str, severity: str) -> List[Tuple[str, str]]:
+    """Counters an event contributes to, as (kind, subject attribute) pairs."""
+    kinds = []
+    if action == 'login_failure':
+        kinds.append((USER_LOGIN_FAILURES, 'user_id'))
+        kinds.append((IP_LOGIN_FAILURES, 'ip_address'))
+    elif action == 'permission_denied':
+        kinds.append((USER_PERMISSION_DENIALS, 'user_id'))
+    if severity == 'critical':
+        kinds.append((USER_CRITICAL_ACTIONS, 'user_id'))
+    return kinds
+
+
+def _bucket(timestamp: float) -> int:
+    return int(timestamp // BUCKET_SECONDS)
+
+
+def _key(generation: int, kind: str, subject, bucket: int) -> str:
+    return THREAT_COUNTER_KEY.format(generation=generation, kind=kind, subject=subject, bucket=bucket)
+
+
+def _window_buckets(now: Optional[float] = None) -> range:
+    now = time.time() if now is None else now
+    return range(_bucket(now - THREAT_WINDOW_MINUTES * 60), _bucket(now) + 1)
+
+
+def _bucket_timeout() -> int:
+    return THREAT_WINDOW_MINUTES * 60 + 2 * BUCKET_SECONDS
+
+
+def _increment(counts: Dict[str, int]) -> None:
+    timeout = _bucket_timeout()
+    for key, count in counts.items():
+        if not cache.add(key, count, timeout):
+            try:
+                cache.incr(key, count)
+            except ValueError:
+                # Expired between add() and incr()
+                cache.set(key, count, timeout)
+
+
+def warm_threat_counters(force: bool = False) -> bool:
+    """
+    Seed the bucket counters from the audit table with one grouped query.
+
+    Runs once per cold cache (the generation key has no expiry); ``force``
+    reseeds into a new generation.
+
+    Returns:
+        bool: Whether the counters were (re)seeded
+    """
+    generation = time.time_ns()
+    if force:
+        cache.set(THREAT_GENERATION_KEY, generation, None)
+    elif not cache.add(THREAT_GENERATION_KEY, generation, None):
+        return False
+
+    # From the start of the window's first bucket, which window_counts reads in full
+    start = datetime.fromtimestamp(_window_buckets()[0] * BUCKET_SECONDS, tz=dt_timezone.utc)
+    rows = (
+        AuditLog.objects.filter(created_at__gte=start)
+        .filter(Q(action__in=['login_failure', 'permission_denied']) | Q(severity='critical'))
+        .annotate(minute=TruncMinute('created_at'))
+        .values('user_id', 'ip_address', 'action', 'severity', 'minute')
+        .annotate(count=Count('id'))
+    )
+    counts: Counter = Counter()
+    for row in rows:
+        bucket = _bucket(row['minute'].timestamp())
+        for kind, attribute in _counter_kinds(row['action'], row['severity']):
+            subject = row[attribute]
+            if subject is not None:
+                counts[_key(generation, kind, subject, bucket)] += row['count']
+
+    cache.set_many(dict(counts), _bucket_timeout())
+    logger.info(f"Seeded {len(counts)} audit threat counters")
+    return True
+
+
+def _current_generation() -> Tuple[int, bool]:
+    """Counter key generation, and whether the counters were seeded just now."""
+    generation = cache.get(THREAT_GENERATION_KEY)
+    if generation is not None:
+        return generation, False
+    seeded = warm_threat_counters()
+    return cache.get(THREAT_GENERATION_KEY), seeded
+
+
+def record_threat_events(logs: Iterable[AuditLog]) -> None:
+    """Count written audit rows in their time buckets."""
+    generation, seeded = _current_generation()
+    if seeded:
+        # The seed query already counted the written rows
+        return
+    counts: Counter = Counter()
+    for log in logs:
+        created_at = log.created_at or timezone.now()
+        bucket = _bucket(created_at.timestamp())
+        for kind, attribute in _counter_kinds(log.action, log.severity):
+            subject = getattr(log, attribute)
+            if subject is not None:
+                counts[_key(generation, kind, subject, bucket)] += 1
+    if counts:
+        _increment(counts)
+
+
+def window_counts(user_id, ip_address: Optional[str] = None) -> Dict[str, int]:
+    """Event counts of the last window for a user (and IP) from the cache."""
+    generation, _ = _current_generation()
+    subjects = {
+        USER_LOGIN_FAILURES: user_id,
+        USER_PERMISSION_DENIALS: user_id,
+        USER_CRITICAL_ACTIONS: user_id,
+    }
+    if ip_address:
+        subjects[IP_LOGIN_FAILURES] = ip_address
+
+    buckets = _window_buckets()
+    keys = {
+        _key(generation, kind, subject, bucket): kind
+        for kind, subject in subjects.items()
+        for bucket in buckets
+    }
+    totals = dict.fromkeys((USER_LOGIN_FAILURES, IP_LOGIN_FAILURES, USER_PERMISSION_DENIALS,
+                            USER_CRITICAL_ACTIONS), 0)
+    for key, value in cache.get_many(list(keys)).items():
+        totals[keys[key]] += value
+    return totals
+
+
+def windowed_threat_level(user_id, ip_address: Optional[str] = None) -> Tuple[str, int]:
+    """Threat level and score like ``AuditLog.calculate_threat_level``, without SQL."""
+    counts = window_counts(user_id, ip_address)
+    return AuditLog.score_threat(
+        failed_logins=counts[USER_LOGIN_FAILURES],
+        ip_failed_attempts=counts[IP_LOGIN_FAILURES],
+        permission_denials=counts[USER_PERMISSION_DENIALS],
+        critical_actions=counts[USER_CRITICAL_ACTIONS],
+    )
+
+
+def check_threat_consistency(limit: int = 100) -> List[Dict]:
+    """
+    Compare windowed scores with the SQL path for recently active users.
+
+    The window starts at a bucket boundary, so it can reach up to
+    ``BUCKET_SECONDS`` further back than the SQL path and small differences
+    at the window edge are expected.
+
+    Returns:
+        list: One dict per (user, IP) pair whose scores differ
+    """
+    start = timezone.now() - timedelta(minutes=THREAT_WINDOW_MINUTES)
+    pairs = (
+        AuditLog.objects.filter(created_at__gte=start, user__isnull=False)
+        .values_list('user_id', 'ip_address')
+        .distinct()[:limit]
+    )
+    mismatches = []
+    for user_id, ip_address in pairs:
+        windowed = windowed_threat_level(user_id, ip_address)
+        expected = AuditLog.calculate_threat_level(user=user_id, action=None, ip_address=ip_address)
+        if windowed != expected:
+            mismatches.append({
+                'user_id': user_id,
+                'ip_address': ip_address,
+                'windowed': windowed,
+                'sql': expected,
+            })
+    if mismatches:
+        logger.warning(f"Audit threat counters differ from SQL for {len(mismatches)} users")
+    return mismatches
@@ -5,7 +5,7 @@ from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.db.models import Count
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, time, timedelta
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -192,6 +192,12 @@ class AuditLogListView(APIView):
         })
 
 
+def _day_start(value):
+    """Start of a YYYY-MM-DD day in the current time zone."""
+    day = datetime.strptime(value, '%Y-%m-%d').date()
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
 @login_required
 def log_search(request):
     """
@@ -208,12 +214,12 @@ def log_search(request):
     # Base queryset
     logs = AuditLog.objects.all()
     
-    # Apply filters
+    # Apply filters (plain created_at ranges, so only the matching partitions are scanned)
     if start_date:
-        logs = logs.filter(created_at__date__gte=start_date)
+        logs = logs.filter(created_at__gte=_day_start(start_date))
     
     if end_date:
-        logs = logs.filter(created_at__date__lte=end_date)
+        logs = logs.filter(created_at__lt=_day_start(end_date) + timedelta(days=1))
     
     if user_filter:
         logs = logs.filter(user__username__icontains=user_filter)
@@ -0,0 +1,183 @@
+"""
+Batched audit log writer.
+
+``record_audit_event`` hands new entries to ``audit_writer``. Depending on
+``AUDIT_WRITE_MODE`` entries are
+
+* ``sync``: saved immediately (one INSERT per event),
+* ``buffer``: collected per process and written with one ``bulk_create`` when
+  ``AUDIT_WRITE_BUFFER_SIZE`` entries are buffered or the oldest entry is
+  ``AUDIT_WRITE_BUFFER_MAX_DELAY`` seconds old (checked when events arrive and
+  when requests finish, and at process exit),
+* ``celery``: collected the same way and written by ``write_audit_logs_task``.
+
+Threat scores and ``created_at`` are set when the event is recorded (so they do
+not depend on when the batch is written), search vectors are computed by the
+INSERT and the WebSocket broadcasts are sent once per batch. A flush requested
+inside a transaction waits for it to commit, so a rolled-back request cannot
+take other requests' entries with it, and a batch that fails to write goes back
+into the buffer.
+"""
+import atexit
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import AuditLog
+from .search import audit_search_vector
+
+logger = logging.getLogger(__name__)
+
+# Fields a buffered entry carries to the Celery task
+PAYLOAD_FIELDS = [
+    'user_id', 'action', 'model_name', 'object_id', 'changes', 'request_path', 'http_method',
+    'status_code', 'severity', 'threat_level', 'threat_score', 'actor_role', 'context',
+    'ip_address', 'user_agent', 'created_at',
+]
+
+# Entries kept in the buffer (as a multiple of AUDIT_WRITE_BUFFER_SIZE) while writes keep failing
+MAX_BUFFERED_BATCHES = 10
+
+
+def prepare_audit_log(log: AuditLog) -> AuditLog:
+    """Score an entry that will be written without ``AuditLog.save``."""
+    from .threat import record_threat_events, warm_threat_counters, windowed_threat_level
+
+    warm_threat_counters()
+    log.created_at = log.created_at or timezone.now()
+    if log.user_id and (not log.threat_level or log.threat_level == 'none'):
+        log.threat_level, log.threat_score = windowed_threat_level(log.user_id, log.ip_address)
+    record_threat_events([log])
+    return log
+
+
+def write_audit_logs(logs: Iterable[AuditLog]) -> List[AuditLog]:
+    """Insert prepared entries with one ``bulk_create`` and broadcast them once."""
+    from .signals import broadcast_audit_logs
+
+    logs = list(logs)
+    if not logs:
+        return []
+    for log in logs:
+        if log.search_vector is None:
+            log.search_vector = audit_search_vector(log)
+    try:
+        with transaction.atomic():
+            created = AuditLog.objects.bulk_create(logs)
+    except DatabaseError as exc:
+        # The entries matter more than their search vectors
+        logger.error(f"Audit search vectors failed, writing {len(logs)} logs without them: {exc}")
+        for log in logs:
+            log.search_vector = None
+        created = AuditLog.objects.bulk_create(logs)
+    for log in created:
+        # Load the stored vector on access instead of keeping the expression
+        del log.search_vector
+    broadcast_audit_logs(created)
+    return created
+
+
+def audit_log_payload(log: AuditLog) -> Dict:
+    payload = {field: getattr(log, field) for field in PAYLOAD_FIELDS}
+    payload['created_at'] = payload['created_at'].isoformat() if payload['created_at'] else None
+    return payload
+
+
+def audit_log_from_payload(payload: Dict) -> AuditLog:
+    payload = dict(payload)
+    created_at = payload.pop('created_at', None)
+    log = AuditLog(**payload)
+    if created_at:
+        log.created_at = parse_datetime(created_at)
+    return log
+
+
+class AuditLogBuffer:
+    """Per-process buffer of prepared audit entries."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._logs: List[AuditLog] = []
+        self._oldest = None
+
+    @property
+    def mode(self) -> str:
+        return settings.AUDIT_WRITE_MODE
+
+    def write(self, log: AuditLog) -> AuditLog:
+        """Record an entry; returns it unsaved unless the mode is ``sync``."""
+        if self.mode == 'sync':
+            log.save()
+            return log
+
+        prepare_audit_log(log)
+        with self._lock:
+            if not self._logs:
+                self._oldest = time.monotonic()
+            self._logs.append(log)
+            full = len(self._logs) >= settings.AUDIT_WRITE_BUFFER_SIZE
+        if full:
+            self.flush()
+        else:
+            self.flush_if_due()
+        return log
+
+    def __len__(self):
+        return len(self._logs)
+
+    def flush_if_due(self) -> None:
+        oldest = self._oldest
+        if oldest is not None and time.monotonic() - oldest >= settings.AUDIT_WRITE_BUFFER_MAX_DELAY:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Write everything buffered so far; returns the number of entries.
+
+        Inside a transaction the write waits for it to commit (and returns 0).
+        """
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(self._write_buffered)
+            return 0
+        return self._write_buffered()
+
+    def _write_buffered(self) -> int:
+        with self._lock:
+            logs, self._logs, self._oldest = self._logs, [], None
+        if not logs:
+            return 0
+
+        try:
+            if self.mode == 'celery':
+                from .tasks import write_audit_logs_task
+
+                write_audit_logs_task.delay([audit_log_payload(log) for log in logs])
+            else:
+                write_audit_logs(logs)
+        except Exception as exc:
+            logger.error(f"Failed to write {len(logs)} buffered audit logs, keeping them buffered: {exc}")
+            self._requeue(logs)
+            return 0
+        return len(logs)
+
+    def _requeue(self, logs: List[AuditLog]) -> None:
+        """Put a failed batch back in front of the buffer for the next flush."""
+        limit = settings.AUDIT_WRITE_BUFFER_SIZE * MAX_BUFFERED_BATCHES
+        with self._lock:
+            self._logs = logs + self._logs
+            if len(self._logs) > limit:
+                dropped = len(self._logs) - limit
+                self._logs = self._logs[dropped:]
+                logger.critical(f"Audit buffer over capacity: dropped the {dropped} oldest unwritten audit logs")
+            # Retry after the usual delay instead of on the next event
+            self._oldest = time.monotonic()
+
+
+audit_writer = AuditLogBuffer()
+atexit.register(audit_writer.flush)
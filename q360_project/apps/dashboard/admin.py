@@ -2,7 +2,10 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from .models import SystemKPI, DashboardWidget, AnalyticsReport, TrendData, ForecastData, RealTimeStat
+from .models import (
+    SystemKPI, DashboardWidget, AnalyticsReport, TrendData, ForecastData, RealTimeStat,
+    DailyMetricRollup, MonthlyMetricRollup,
+)
 
 
 @admin.register(SystemKPI)
@@ -56,4 +59,18 @@ class ForecastDataAdmin(admin.ModelAdmin):
 class RealTimeStatAdmin(admin.ModelAdmin):
     list_display = ['stat_type', 'current_value', 'unit', 'organization', 'last_updated']
     list_filter = ['stat_type', 'organization', 'last_updated']
-    search_fields = ['stat_type', 'organization__name']
\ No newline at end of file
+    search_fields = ['stat_type', 'organization__name']
+
+
+@admin.register(DailyMetricRollup)
+class DailyMetricRollupAdmin(admin.ModelAdmin):
+    list_display = ['metric', 'day', 'department', 'total', 'count', 'updated_at']
+    list_filter = ['metric', 'department']
+    date_hierarchy = 'day'
+
+
+@admin.register(MonthlyMetricRollup)
+class MonthlyMetricRollupAdmin(admin.ModelAdmin):
+    list_display = ['metric', 'month', 'department', 'total', 'count', 'updated_at']
+    list_filter = ['metric', 'department']
+    date_hierarchy = 'month'
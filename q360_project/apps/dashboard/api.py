@@ -10,8 +10,8 @@ from datetime import timedelta
 
 from apps.evaluations.models import EvaluationCampaign, EvaluationResult
 from apps.training.models import UserTraining
-from apps.accounts.models import User
-from apps.development_plans.models import DevelopmentGoal
+
+from .stats_cache import get_dashboard_stats
 
 
 @api_view(['GET'])
@@ -19,121 +19,13 @@ from apps.development_plans.models import DevelopmentGoal
 def dashboard_stats(request):
     """
     Get real-time dashboard statistics.
-    """
-    user = request.user
-
-    # Time ranges
-    now = timezone.now()
-    last_30_days = now - timedelta(days=30)
-    last_7_days = now - timedelta(days=7)
-
-    # User stats
-    if user.is_admin():
-        total_users = User.objects.filter(is_active=True).count()
-        active_users = User.objects.filter(
-            last_login__gte=last_30_days,
-            is_active=True
-        ).count()
-    else:
-        total_users = User.objects.filter(
-            department=user.department,
-            is_active=True
-        ).count()
-        active_users = User.objects.filter(
-            department=user.department,
-            last_login__gte=last_30_days,
-            is_active=True
-        ).count()
-
-    # Evaluation stats
-    if user.is_admin():
-        active_campaigns = EvaluationCampaign.objects.filter(
-            status='active'
-        ).count()
-        completed_evaluations = EvaluationResult.objects.filter(
-            status='completed',
-            completed_at__gte=last_30_days
-        ).count()
-        avg_score = EvaluationResult.objects.filter(
-            status='completed'
-        ).aggregate(Avg('overall_score'))['overall_score__avg'] or 0
-    else:
-        active_campaigns = EvaluationCampaign.objects.filter(
-            status='active',
-            department=user.department
-        ).count()
-        completed_evaluations = EvaluationResult.objects.filter(
-            status='completed',
-            completed_at__gte=last_30_days,
-            evaluated_user__department=user.department
-        ).count()
-        avg_score = EvaluationResult.objects.filter(
-            status='completed',
-            evaluated_user__department=user.department
-        ).aggregate(Avg('overall_score'))['overall_score__avg'] or 0
-
-    # Training stats
-    if user.is_admin():
-        completed_trainings = UserTraining.objects.filter(
-            status='completed',
-            completed_at__gte=last_30_days
-        ).count()
-        in_progress_trainings = UserTraining.objects.filter(
-            status='in_progress'
-        ).count()
-    else:
-        completed_trainings = UserTraining.objects.filter(
-            user=user,
-            status='completed',
-            completed_at__gte=last_30_days
-        ).count()
-        in_progress_trainings = UserTraining.objects.filter(
-            user=user,
-            status='in_progress'
-        ).count()
-
-    # Development goals
-    if user.is_admin():
-        active_goals = DevelopmentGoal.objects.filter(
-            status='in_progress'
-        ).count()
-        completed_goals = DevelopmentGoal.objects.filter(
-            status='completed',
-            completed_at__gte=last_30_days
-        ).count()
-    else:
-        active_goals = DevelopmentGoal.objects.filter(
-            user=user,
-            status='in_progress'
-        ).count()
-        completed_goals = DevelopmentGoal.objects.filter(
-            user=user,
-            status='completed',
-            completed_at__gte=last_30_days
-        ).count()
 
+    Served from the versioned dashboard cache; saves of the underlying models
+    invalidate the affected scopes (see ``apps.dashboard.stats_cache``).
+    """
     return Response({
         'success': True,
-        'stats': {
-            'users': {
-                'total': total_users,
-                'active': active_users,
-                'growth_rate': round((active_users / total_users * 100) if total_users > 0 else 0, 1)
-            },
-            'evaluations': {
-                'active_campaigns': active_campaigns,
-                'completed_last_30_days': completed_evaluations,
-                'average_score': round(avg_score, 2)
-            },
-            'training': {
-                'completed_last_30_days': completed_trainings,
-                'in_progress': in_progress_trainings
-            },
-            'goals': {
-                'active': active_goals,
-                'completed_last_30_days': completed_goals
-            }
-        }
+        'stats': get_dashboard_stats(request.user),
     })
 
 
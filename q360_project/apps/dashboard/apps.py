@@ -4,4 +4,8 @@ from django.apps import AppConfig
 class DashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.dashboard'
-    verbose_name = 'Analytics Dashboard'
\ No newline at end of file
+    verbose_name = 'Analytics Dashboard'
+
+    def ready(self):
+        """Import signal handlers when app is ready."""
+        import apps.dashboard.signals
@@ -0,0 +1,256 @@
+"""
+Vectorized trend forecasting with persisted fits.
+
+Every forecast is a degree-2 polynomial trend fitted by least squares over the
+monthly series (the same model as the former scikit-learn
+``PolynomialFeatures`` + ``LinearRegression`` pipeline). ``fit_trends`` fits
+any number of equally long series with one ``numpy.linalg.lstsq`` call.
+
+Fits are stored in ``FittedForecast`` with a fingerprint of the series they
+were fitted on; ``fit_forecasts`` only refits the series whose fingerprint
+changed and reuses the stored prediction for the rest.
+``run_department_forecasts`` forecasts every department and metric from the
+monthly rollups this way.
+"""
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+from django.db import transaction
+from django.utils import timezone
+
+from .models import FittedForecast, ForecastData, MonthlyMetricRollup
+from .timeseries import month_axis
+
+logger = logging.getLogger(__name__)
+
+POLYNOMIAL_DEGREE = 2
+
+# Months between the forecasting run and the stored forecast date
+FORECAST_HORIZON_MONTHS = 6
+
+# Monthly rollup metric -> forecast type of the department forecasts
+ROLLUP_FORECAST_TYPES = {
+    'hiring': 'staffing',
+    'salary': 'budget',
+    'performance': 'performance',
+}
+
+
+@dataclass(frozen=True)
+class ConfidenceProfile:
+    """How a forecast type turns fit quality into a confidence level."""
+    min_base: float
+    max_base: float
+    size_weight: float
+    cap: float
+    max_value: Optional[float] = None
+
+
+CONFIDENCE_PROFILES = {
+    'staffing': ConfidenceProfile(min_base=50, max_base=95, size_weight=15, cap=98.0),
+    'budget': ConfidenceProfile(min_base=50, max_base=95, size_weight=20, cap=98.0),
+    'performance': ConfidenceProfile(min_base=40, max_base=90, size_weight=25, cap=95.0, max_value=5.0),
+}
+
+
+@dataclass
+class Forecast:
+    predicted_value: float
+    confidence_level: float
+    refitted: bool
+
+
+def series_fingerprint(values) -> str:
+    """Stable hash of a series (and of the model it is fitted with)."""
+    digest = hashlib.sha256(f'poly{POLYNOMIAL_DEGREE}:'.encode())
+    digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def fit_trends(series: np.ndarray, degree: int = POLYNOMIAL_DEGREE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fit a polynomial trend to every row of ``series`` in one least-squares pass.
+
+    Args:
+        series: Array of shape (series, months)
+
+    Returns:
+        tuple: Coefficients (series, degree + 1), lowest power first, and R² per series
+    """
+    series = np.atleast_2d(np.asarray(series, dtype=np.float64))
+    months = series.shape[1]
+    design = np.vander(np.arange(months, dtype=np.float64), degree + 1, increasing=True)
+    coefficients, *_ = np.linalg.lstsq(design, series.T, rcond=None)
+
+    residuals = series.T - design @ coefficients
+    ss_res = (residuals ** 2).sum(axis=0)
+    ss_tot = ((series.T - series.mean(axis=1)) ** 2).sum(axis=0)
+    constant = np.isclose(ss_tot, 0)
+    # A constant series scores 1 when fitted exactly, like sklearn's r2_score
+    r_squared = np.where(
+        constant,
+        np.where(np.isclose(ss_res, 0), 1.0, 0.0),
+        1 - ss_res / np.where(constant, 1, ss_tot),
+    )
+    return coefficients.T, r_squared
+
+
+def predict_trends(coefficients: np.ndarray, position: float) -> np.ndarray:
+    """Value of every fitted trend at month ``position`` (0 = first month)."""
+    powers = position ** np.arange(coefficients.shape[1])
+    return coefficients @ powers
+
+
+def forecast_confidence(r_squared: np.ndarray, months: int, months_back: int,
+                        profile: ConfidenceProfile) -> np.ndarray:
+    """Confidence level from R² and the amount of history, per series."""
+    base = np.clip(r_squared * 100, profile.min_base, profile.max_base)
+    size_factor = min(profile.size_weight, months / months_back * profile.size_weight)
+    return np.minimum(base + size_factor, profile.cap)
+
+
+def fit_forecasts(forecast_type: str, series: Dict[Optional[int], np.ndarray], months_back: int,
+                  stored: Optional[Dict[Tuple[str, Optional[int]], FittedForecast]] = None,
+                  force: bool = False) -> Dict[Optional[int], Forecast]:
+    """
+    Forecast the next month of each series, refitting only changed series.
+
+    Args:
+        series: Equally long monthly series keyed by department id (None = company-wide)
+        stored: Stored fits keyed by (forecast type, department id); loaded when omitted
+        force: Refit every series
+
+    Returns:
+        dict: Forecast per department id
+    """
+    if not series:
+        return {}
+    profile = CONFIDENCE_PROFILES[forecast_type]
+    if stored is None:
+        stored = load_fitted_forecasts([forecast_type], series.keys())
+
+    fingerprints = {key: series_fingerprint(values) for key, values in series.items()}
+    forecasts = {}
+    stale = []
+    for key, fingerprint in fingerprints.items():
+        fit = stored.get((forecast_type, key))
+        if not force and fit is not None and fit.fingerprint == fingerprint:
+            forecasts[key] = Forecast(float(fit.predicted_value), float(fit.confidence_level), refitted=False)
+        else:
+            stale.append(key)
+    if not stale:
+        return forecasts
+
+    matrix = np.vstack([series[key] for key in stale])
+    coefficients, r_squared = fit_trends(matrix)
+    predictions = np.maximum(predict_trends(coefficients, matrix.shape[1]), 0)
+    if profile.max_value is not None:
+        predictions = np.minimum(predictions, profile.max_value)
+    confidences = forecast_confidence(r_squared, matrix.shape[1], months_back, profile)
+
+    fits = []
+    for row, key in enumerate(stale):
+        forecasts[key] = Forecast(float(predictions[row]), float(confidences[row]), refitted=True)
+        fits.append(FittedForecast(
+            forecast_type=forecast_type,
+            department_id=key,
+            fingerprint=fingerprints[key],
+            coefficients=coefficients[row].tolist(),
+            r_squared=float(r_squared[row]),
+            predicted_value=_decimal(predictions[row]),
+            confidence_level=_decimal(confidences[row]),
+        ))
+    FittedForecast.objects.bulk_create(
+        fits,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['forecast_type', 'department'],
+        update_fields=['fingerprint', 'coefficients', 'r_squared', 'predicted_value',
+                       'confidence_level', 'trained_at'],
+    )
+    return forecasts
+
+
+def load_fitted_forecasts(forecast_types: Iterable[str],
+                          department_ids: Iterable[Optional[int]]) -> Dict[Tuple[str, Optional[int]], FittedForecast]:
+    """Stored fits of the given types and departments with one query."""
+    department_ids = set(department_ids)
+    fits = FittedForecast.objects.filter(forecast_type__in=list(forecast_types))
+    if department_ids == {None}:
+        fits = fits.filter(department__isnull=True)
+    elif None not in department_ids:
+        fits = fits.filter(department__isnull=False)
+    return {(fit.forecast_type, fit.department_id): fit for fit in fits}
+
+
+def _decimal(value) -> Decimal:
+    return Decimal(str(round(float(value), 2)))
+
+
+def department_series(months_back: int = 24, end: Optional[date] = None) -> Dict[str, Dict[int, np.ndarray]]:
+    """
+    Monthly series per forecast type and department from the monthly rollups (one query).
+
+    Returns:
+        dict: ``{forecast_type: {department_id: values}}``, months without rows are 0
+    """
+    months = month_axis(months_back, end)
+    index = {month: position for position, month in enumerate(months)}
+    rows = (
+        MonthlyMetricRollup.objects.filter(department__isnull=False, month__range=(months[0], months[-1]))
+        .values_list('metric', 'department_id', 'month', 'total', 'count')
+    )
+    series: Dict[str, Dict[int, np.ndarray]] = {forecast_type: {} for forecast_type in ROLLUP_FORECAST_TYPES.values()}
+    for metric, department_id, month, total, count in rows:
+        forecast_type = ROLLUP_FORECAST_TYPES.get(metric)
+        if forecast_type is None:
+            continue
+        values = series[forecast_type].setdefault(department_id, np.zeros(len(months)))
+        if metric == 'performance':
+            values[index[month]] = float(total) / count if count else 0.0
+        else:
+            values[index[month]] = float(total)
+    return series
+
+
+def run_department_forecasts(months_back: int = 24, force: bool = False) -> Dict[str, int]:
+    """
+    Forecast every department and forecast type, refitting only changed series.
+
+    Returns:
+        dict: Number of forecast series and of refitted series
+    """
+    series = department_series(months_back)
+    stored = load_fitted_forecasts(series.keys(), {department_id for by_type in series.values()
+                                                   for department_id in by_type})
+    forecast_date = timezone.localdate() + relativedelta(months=FORECAST_HORIZON_MONTHS)
+
+    rows = []
+    refitted = 0
+    for forecast_type, by_department in series.items():
+        for department_id, forecast in fit_forecasts(forecast_type, by_department, months_back,
+                                                     stored=stored, force=force).items():
+            refitted += forecast.refitted
+            rows.append(ForecastData(
+                forecast_type=forecast_type,
+                forecast_date=forecast_date,
+                department_id=department_id,
+                predicted_value=_decimal(forecast.predicted_value),
+                confidence_level=_decimal(forecast.confidence_level),
+                explanation='Şöbənin son aylıq trendinə əsasən proqnozlaşdırılıb.',
+            ))
+
+    with transaction.atomic():
+        ForecastData.objects.filter(
+            forecast_type__in=list(series), forecast_date=forecast_date, department__isnull=False
+        ).delete()
+        ForecastData.objects.bulk_create(rows, batch_size=1000)
+
+    logger.info(f"Department forecasts: {len(rows)} series, {refitted} refitted")
+    return {'series': len(rows), 'refitted': refitted}
@@ -0,0 +1,74 @@
+"""
+Backfill the daily and monthly metric rollups.
+Usage:
+    python manage.py backfill_metric_rollups
+    python manage.py backfill_metric_rollups --start 2024-01-01 --end 2024-12-31
+    python manage.py backfill_metric_rollups --chunk-months 1
+    python manage.py backfill_metric_rollups --sync
+"""
+from datetime import date
+
+from celery import group
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.dashboard.rollups import earliest_metric_date, month_chunks, update_rollups
+from apps.dashboard.tasks import rebuild_metric_rollups_chunk_task
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the dashboard metric rollups for a date range in parallel month-aligned chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start',
+            type=date.fromisoformat,
+            default=None,
+            help='First day (YYYY-MM-DD, default: the earliest day with data)',
+        )
+        parser.add_argument(
+            '--end',
+            type=date.fromisoformat,
+            default=None,
+            help='Last day (YYYY-MM-DD, default: today)',
+        )
+        parser.add_argument(
+            '--chunk-months',
+            type=int,
+            default=None,
+            help='Whole months per chunk (default: DASHBOARD_ROLLUP_BACKFILL_CHUNK_MONTHS)',
+        )
+        parser.add_argument(
+            '--sync',
+            action='store_true',
+            help='Process the chunks one by one in this process instead of Celery workers',
+        )
+
+    def handle(self, *args, **options):
+        start = options['start'] or earliest_metric_date()
+        end = options['end'] or timezone.localdate()
+        if start is None:
+            self.stdout.write('Nothing to backfill.')
+            return
+        if start > end:
+            raise CommandError('--start must not be after --end')
+
+        chunk_months = options['chunk_months'] or settings.DASHBOARD_ROLLUP_BACKFILL_CHUNK_MONTHS
+        chunks = month_chunks(start, end, chunk_months)
+        self.stdout.write(f'Backfilling {start} - {end} in {len(chunks)} chunk(s)')
+
+        if options['sync']:
+            for chunk_start, chunk_end in chunks:
+                result = update_rollups(chunk_start, chunk_end)
+                self.stdout.write(
+                    f'{chunk_start} - {chunk_end}: {result["daily"]} daily, {result["monthly"]} monthly rows'
+                )
+            self.stdout.write(self.style.SUCCESS('Backfill completed'))
+            return
+
+        group(
+            rebuild_metric_rollups_chunk_task.s(chunk_start.isoformat(), chunk_end.isoformat())
+            for chunk_start, chunk_end in chunks
+        ).apply_async()
+        self.stdout.write(self.style.SUCCESS(f'Queued {len(chunks)} chunk(s)'))
@@ -6,14 +6,21 @@ class Command(BaseCommand):
     help = 'Run AI-based forecasting for staffing, budget, and performance'
 
     def add_arguments(self, parser):
-        pass
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Refit every series, including those whose data is unchanged',
+        )
 
     def handle(self, *args, **options):
         self.stdout.write('Running AI forecasting...')
-        success = run_ai_forecasting()
-        if success:
+        summary = run_ai_forecasting(force=options['force'])
+        if summary:
             self.stdout.write(
-                self.style.SUCCESS('Successfully completed AI forecasting')
+                self.style.SUCCESS(
+                    f"Successfully completed AI forecasting "
+                    f"({summary['series']} department series, {summary['refitted']} refitted)"
+                )
             )
         else:
             self.stdout.write(
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.4 on 2026-10-17 12:53
+
+from django.db import migrations, models
+
+
+def remove_duplicate_stats(apps, schema_editor):
+    """Keep the most recently updated row of each (stat_type, organization)."""
+    RealTimeStat = apps.get_model('dashboard', 'RealTimeStat')
+    seen = set()
+    duplicates = []
+    for stat in RealTimeStat.objects.order_by('-last_updated', '-id').only('id', 'stat_type', 'organization_id'):
+        key = (stat.stat_type, stat.organization_id)
+        if key in seen:
+            duplicates.append(stat.id)
+        seen.add(key)
+    RealTimeStat.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+        ('departments', '0014_remove_department_departments_department_tref4ab'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_stats, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='realtimestat',
+            constraint=models.UniqueConstraint(fields=('stat_type', 'organization'), name='unique_realtime_stat_per_organization', nulls_distinct=False),
+        ),
+    ]
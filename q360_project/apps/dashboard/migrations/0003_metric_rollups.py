@@ -0,0 +1,53 @@
+# Generated by Django 5.1.4 on 2026-10-17 12:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0002_realtimestat_unique'),
+        ('departments', '0014_remove_department_departments_department_tref4ab'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMetricRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('hiring', 'Hiring'), ('performance', 'Performance'), ('salary', 'Salary')], max_length=30, verbose_name='Metric')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='Total')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Count')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('day', models.DateField(verbose_name='Day')),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='departments.department', verbose_name='Department')),
+            ],
+            options={
+                'verbose_name': 'Daily Metric Rollup',
+                'verbose_name_plural': 'Daily Metric Rollups',
+                'ordering': ['metric', 'day'],
+                'indexes': [models.Index(fields=['metric', 'day'], name='daily_rollup_metric_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('metric', 'department', 'day'), name='unique_daily_metric_rollup', nulls_distinct=False)],
+            },
+        ),
+        migrations.CreateModel(
+            name='MonthlyMetricRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('hiring', 'Hiring'), ('performance', 'Performance'), ('salary', 'Salary')], max_length=30, verbose_name='Metric')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='Total')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Count')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('month', models.DateField(help_text='Ayın ilk günü', verbose_name='Month')),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='departments.department', verbose_name='Department')),
+            ],
+            options={
+                'verbose_name': 'Monthly Metric Rollup',
+                'verbose_name_plural': 'Monthly Metric Rollups',
+                'ordering': ['metric', 'month'],
+                'indexes': [models.Index(fields=['metric', 'month'], name='monthly_rollup_metric_idx')],
+                'constraints': [models.UniqueConstraint(fields=('metric', 'department', 'month'), name='unique_monthly_metric_rollup', nulls_distinct=False)],
+            },
+        ),
+    ]
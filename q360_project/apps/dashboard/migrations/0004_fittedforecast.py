@@ -0,0 +1,35 @@
+# Generated by Django 5.1.4 on 2026-10-17 13:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0003_metric_rollups'),
+        ('departments', '0014_remove_department_departments_department_tref4ab'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FittedForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('forecast_type', models.CharField(max_length=50, verbose_name='Forecast Type')),
+                ('fingerprint', models.CharField(max_length=64, verbose_name='Data Fingerprint')),
+                ('coefficients', models.JSONField(default=list, verbose_name='Coefficients')),
+                ('r_squared', models.FloatField(default=0.0, verbose_name='R²')),
+                ('predicted_value', models.DecimalField(decimal_places=2, max_digits=15, verbose_name='Predicted Value')),
+                ('confidence_level', models.DecimalField(decimal_places=2, max_digits=5, verbose_name='Confidence Level')),
+                ('trained_at', models.DateTimeField(auto_now=True, verbose_name='Trained At')),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='departments.department', verbose_name='Department')),
+            ],
+            options={
+                'verbose_name': 'Fitted Forecast',
+                'verbose_name_plural': 'Fitted Forecasts',
+                'ordering': ['forecast_type', 'department'],
+                'constraints': [models.UniqueConstraint(fields=('forecast_type', 'department'), name='unique_fitted_forecast', nulls_distinct=False)],
+            },
+        ),
+    ]
@@ -166,6 +166,36 @@ class ForecastData(models.Model):
         return f"{self.forecast_type} forecast - {self.forecast_date}: {self.predicted_value}"
 
 
+class FittedForecast(models.Model):
+    """
+    Fitted trend of a forecast series, reused while the series is unchanged
+    """
+    forecast_type = models.CharField(_('Forecast Type'), max_length=50)
+    department = models.ForeignKey('departments.Department', on_delete=models.CASCADE,
+                                   null=True, blank=True, related_name='+', verbose_name=_('Department'))
+    fingerprint = models.CharField(_('Data Fingerprint'), max_length=64)
+    coefficients = models.JSONField(_('Coefficients'), default=list)
+    r_squared = models.FloatField(_('R²'), default=0.0)
+    predicted_value = models.DecimalField(_('Predicted Value'), max_digits=15, decimal_places=2)
+    confidence_level = models.DecimalField(_('Confidence Level'), max_digits=5, decimal_places=2)
+    trained_at = models.DateTimeField(_('Trained At'), auto_now=True)
+
+    class Meta:
+        verbose_name = _('Fitted Forecast')
+        verbose_name_plural = _('Fitted Forecasts')
+        ordering = ['forecast_type', 'department']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['forecast_type', 'department'],
+                nulls_distinct=False,
+                name='unique_fitted_forecast',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.forecast_type} fit - {self.fingerprint[:12]}"
+
+
 class RealTimeStat(models.Model):
     """
     Real-time statistics for dashboard display
@@ -193,6 +223,89 @@ class RealTimeStat(models.Model):
         verbose_name = _('Real-time Stat')
         verbose_name_plural = _('Real-time Stats')
         ordering = ['stat_type']
+        constraints = [
+            # One row per metric and organization (site-wide rows have no organization);
+            # the snapshot service upserts on it
+            models.UniqueConstraint(
+                fields=['stat_type', 'organization'],
+                nulls_distinct=False,
+                name='unique_realtime_stat_per_organization',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.stat_type}: {self.current_value}{self.unit}"
+
+
+class MetricRollup(models.Model):
+    """
+    Additive fact row of a trend metric for one department and period.
+
+    ``total`` and ``count`` add up across departments, so company-wide
+    values are a grouped sum over the same range.
+    """
+    METRIC_CHOICES = [
+        ('hiring', _('Hiring')),
+        ('performance', _('Performance')),
+        ('salary', _('Salary')),
+    ]
+
+    metric = models.CharField(_('Metric'), max_length=30, choices=METRIC_CHOICES)
+    department = models.ForeignKey('departments.Department', on_delete=models.CASCADE,
+                                   null=True, blank=True, related_name='+', verbose_name=_('Department'))
+    total = models.DecimalField(_('Total'), max_digits=18, decimal_places=2, default=0)
+    count = models.PositiveIntegerField(_('Count'), default=0)
+    updated_at = models.DateTimeField(_('Updated At'), auto_now=True)
+
+    class Meta:
+        abstract = True
+
+
+class DailyMetricRollup(MetricRollup):
+    """
+    Per-day trend metric facts maintained by ``apps.dashboard.rollups``
+    """
+    day = models.DateField(_('Day'))
+
+    class Meta:
+        verbose_name = _('Daily Metric Rollup')
+        verbose_name_plural = _('Daily Metric Rollups')
+        ordering = ['metric', 'day']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['metric', 'department', 'day'],
+                nulls_distinct=False,
+                name='unique_daily_metric_rollup',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['metric', 'day'], name='daily_rollup_metric_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.metric} - {self.day} - {self.total}/{self.count}"
+
+
+class MonthlyMetricRollup(MetricRollup):
+    """
+    Per-month trend metric facts derived from the daily rollups
+    """
+    month = models.DateField(_('Month'), help_text=_('Ayın ilk günü'))
+
+    class Meta:
+        verbose_name = _('Monthly Metric Rollup')
+        verbose_name_plural = _('Monthly Metric Rollups')
+        ordering = ['metric', 'month']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['metric', 'department', 'month'],
+                nulls_distinct=False,
+                name='unique_monthly_metric_rollup',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['metric', 'month'], name='monthly_rollup_metric_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.stat_type}: {self.current_value}{self.unit}"
\ No newline at end of file
+        return f"{self.metric} - {self.month:%Y-%m} - {self.total}/{self.count}"
@@ -0,0 +1,236 @@
+"""
+Real-time statistics snapshot.
+
+All real-time dashboard metrics are computed together with one
+conditional-aggregate query per source table and cached as one snapshot.
+``refresh_realtime_stats_task`` (scheduled by Celery Beat) also upserts the
+``RealTimeStat`` rows with a single ``bulk_create(update_conflicts=True)``.
+
+Readers are served from the cached snapshot as long as it is at most
+``REALTIME_STATS_MAX_AGE`` seconds old. When it is older or missing, one
+request recomputes it under a cache lock while concurrent requests keep
+serving the stale copy (or briefly wait for the first one on a cold cache).
+Reads never write to the database.
+"""
+import logging
+import time
+from datetime import timedelta
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Avg, Count, Q, Sum
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.audit.models import AuditLog
+from apps.compensation.models import SalaryInformation
+from apps.evaluations.models import EvaluationAssignment, Response
+from apps.leave_attendance.models import LeaveRequest
+from apps.notifications.counters import get_total_unread_count
+from apps.onboarding.models import OnboardingProcess, OnboardingTask
+
+from .models import RealTimeStat, SystemKPI
+
+logger = logging.getLogger(__name__)
+
+REALTIME_SNAPSHOT_CACHE_KEY = 'dashboard:realtime:snapshot'
+REALTIME_SNAPSHOT_LOCK_KEY = 'dashboard:realtime:snapshot:lock'
+# Upper bound of a recomputation; a crashed worker cannot block refreshes longer
+REFRESH_LOCK_TIMEOUT = 30
+# How long a request on a cold cache waits for a concurrent recomputation (seconds)
+COLD_SNAPSHOT_WAIT = 5
+
+# stat_type -> (unit, description) of the persisted RealTimeStat rows
+STAT_DEFINITIONS = {
+    'active_users': ('', 'Aktiv İstifadəçilər'),
+    'pending_evaluations': ('', 'Gözləyən Qiymətləndirmələr'),
+    'new_hires': ('', 'Bu Ay Yeni İşə Qəbul'),
+    'avg_performance': ('', 'Ortalama Performans'),
+    'budget_utilization': ('₼', 'Ümumi Maaş Fonduna'),
+    'leave_requests': ('', 'Gözləyən Məzuniyyət Sorğuları'),
+    'training_completions': ('', 'Təlim Tamamlamaları'),
+}
+
+
+def _completed_trainings() -> int:
+    try:
+        from apps.training.models import UserTraining
+        return UserTraining.objects.filter(status='completed').count()
+    except Exception:
+        # Təlim modulu olmadıqda 0 saxlayırıq
+        return 0
+
+
+def compute_realtime_metrics(now=None) -> Dict:
+    """
+    Compute every real-time metric, one query per source table.
+
+    Returns:
+        dict: Snapshot with the metric values and ``generated_at``
+    """
+    now = now or timezone.now()
+    this_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    users = User.objects.aggregate(
+        active=Count('id', filter=Q(is_active=True)),
+        new_this_month=Count('id', filter=Q(date_joined__gte=this_month)),
+        new_last_24h=Count('id', filter=Q(date_joined__gte=now - timedelta(days=1))),
+    )
+    onboarding = OnboardingProcess.objects.aggregate(active=Count('id', filter=Q(status='active')))
+    onboarding_tasks = OnboardingTask.objects.aggregate(pending=Count('id', filter=Q(status='pending')))
+    audit = AuditLog.objects.filter(created_at__gte=now - timedelta(hours=1)).aggregate(
+        alerts=Count('id', filter=Q(action__in=['permission_denied', 'login_failure'])),
+    )
+    latest_kpi = (
+        SystemKPI.objects.order_by('-created_at')
+        .values('name', 'value', 'unit', 'created_at')
+        .first()
+    )
+
+    return {
+        'stats': {
+            'active_users': users['active'],
+            'pending_evaluations': EvaluationAssignment.objects.filter(
+                status__in=['pending', 'in_progress']
+            ).count(),
+            'new_hires': users['new_this_month'],
+            'avg_performance': Response.objects.aggregate(avg=Avg('score'))['avg'],
+            'budget_utilization': SalaryInformation.objects.aggregate(
+                total=Sum('base_salary')
+            )['total'] or 0,
+            'leave_requests': LeaveRequest.objects.filter(status='pending').count(),
+            'training_completions': _completed_trainings(),
+        },
+        'users': {
+            'active': users['active'],
+            'new_last_24h': users['new_last_24h'],
+        },
+        'onboarding': {
+            'active_processes': onboarding['active'],
+            'pending_tasks': onboarding_tasks['pending'],
+        },
+        'notifications': {
+            'unread': get_total_unread_count(),
+        },
+        'security': {
+            'alerts_last_hour': audit['alerts'],
+        },
+        'latest_kpi': latest_kpi,
+        'generated_at': now.isoformat(),
+        'generated_ts': now.timestamp(),
+    }
+
+
+def save_realtime_stats(stats: Dict) -> int:
+    """
+    Upsert the site-wide ``RealTimeStat`` rows in one statement.
+
+    The stored value moves to ``previous_value``; metrics without a value
+    (e.g. no scores yet for ``avg_performance``) are left untouched. Databases
+    without ``NULLS NOT DISTINCT`` constraints (SQLite) cannot upsert on the
+    nullable organization, so existing rows are updated and missing ones
+    inserted instead.
+
+    Returns:
+        int: Number of upserted rows
+    """
+    existing = {
+        stat_type: (pk, value)
+        for pk, stat_type, value in RealTimeStat.objects.filter(organization__isnull=True)
+        .values_list('pk', 'stat_type', 'current_value')
+    }
+    rows = [
+        RealTimeStat(
+            stat_type=stat_type,
+            current_value=value,
+            previous_value=existing[stat_type][1] if stat_type in existing else None,
+            unit=STAT_DEFINITIONS[stat_type][0],
+            description=STAT_DEFINITIONS[stat_type][1],
+            last_updated=timezone.now(),
+        )
+        for stat_type, value in stats.items()
+        if value is not None
+    ]
+    update_fields = ['current_value', 'previous_value', 'unit', 'description', 'last_updated']
+    if connection.features.supports_nulls_distinct_unique_constraints:
+        RealTimeStat.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['stat_type', 'organization'],
+            update_fields=update_fields,
+        )
+    else:
+        for row in rows:
+            row.pk = existing[row.stat_type][0] if row.stat_type in existing else None
+        RealTimeStat.objects.bulk_update([row for row in rows if row.pk], update_fields)
+        RealTimeStat.objects.bulk_create([row for row in rows if not row.pk])
+    return len(rows)
+
+
+def refresh_realtime_snapshot(persist: bool = True) -> Dict:
+    """
+    Recompute the metrics and replace the cached snapshot.
+
+    Args:
+        persist: Also upsert the ``RealTimeStat`` rows
+    """
+    snapshot = compute_realtime_metrics()
+    if persist:
+        save_realtime_stats(snapshot['stats'])
+    # Kept past its max age so concurrent readers can serve it during a refresh
+    cache.set(REALTIME_SNAPSHOT_CACHE_KEY, snapshot, settings.REALTIME_STATS_CACHE_TIMEOUT)
+    return snapshot
+
+
+def empty_snapshot() -> Dict:
+    """Snapshot without figures, served when none can be computed."""
+    return {
+        'stats': dict.fromkeys(STAT_DEFINITIONS),
+        'users': {'active': None, 'new_last_24h': None},
+        'onboarding': {'active_processes': None, 'pending_tasks': None},
+        'notifications': {'unread': None},
+        'security': {'alerts_last_hour': None},
+        'latest_kpi': None,
+        'generated_at': None,
+        'generated_ts': 0,
+    }
+
+
+def _wait_for_snapshot() -> Optional[Dict]:
+    deadline = time.monotonic() + COLD_SNAPSHOT_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(0.1)
+        snapshot = cache.get(REALTIME_SNAPSHOT_CACHE_KEY)
+        if snapshot is not None:
+            return snapshot
+    return None
+
+
+def get_realtime_snapshot(max_age: Optional[int] = None) -> Dict:
+    """
+    Cached real-time snapshot that is at most ``max_age`` seconds old.
+
+    Defaults to ``REALTIME_STATS_MAX_AGE``. Only the request holding the
+    refresh lock recomputes the snapshot, and it does not persist the
+    ``RealTimeStat`` rows (``refresh_realtime_stats_task`` does). When no
+    snapshot can be computed an empty one is returned.
+    """
+    max_age = settings.REALTIME_STATS_MAX_AGE if max_age is None else max_age
+    snapshot = cache.get(REALTIME_SNAPSHOT_CACHE_KEY)
+    if snapshot is not None and time.time() - snapshot['generated_ts'] <= max_age:
+        return snapshot
+
+    if not cache.add(REALTIME_SNAPSHOT_LOCK_KEY, 1, REFRESH_LOCK_TIMEOUT):
+        # Another request is already recomputing it
+        if snapshot is None:
+            snapshot = _wait_for_snapshot()
+        return snapshot or empty_snapshot()
+    try:
+        return refresh_realtime_snapshot(persist=False)
+    except Exception as exc:
+        logger.error(f"Failed to refresh real-time statistics: {exc}")
+        return snapshot or empty_snapshot()
+    finally:
+        cache.delete(REALTIME_SNAPSHOT_LOCK_KEY)
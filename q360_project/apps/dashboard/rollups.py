@@ -0,0 +1,256 @@
+"""
+Daily and monthly rollups of the dashboard trend metrics.
+
+``DailyMetricRollup`` holds one additive (total, count) fact per metric,
+department and day; ``MonthlyMetricRollup`` holds the same per month and is
+derived from the daily rows. Rebuilding a date range costs one grouped query
+per metric plus one bulk insert, so the rollups are kept current by refreshing
+the last ``DASHBOARD_ROLLUP_REFRESH_DAYS`` days periodically, and history is
+backfilled in month-aligned chunks (``backfill_metric_rollups`` command) that
+can run in parallel. Trend charts then read a single indexed range.
+
+Metrics:
+
+* ``hiring``: users joined on the day (flow; months sum the days),
+* ``performance``: evaluation response scores given on the day (flow),
+* ``salary``: salaries in effect on the day (stock; a month takes its last
+  rolled-up day).
+
+Departments are the users' current departments.
+"""
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.compensation.models import SalaryInformation
+from apps.evaluations.models import Response
+
+from .models import DailyMetricRollup, MonthlyMetricRollup
+
+logger = logging.getLogger(__name__)
+
+FLOW_METRICS = ('hiring', 'performance')
+STOCK_METRICS = ('salary',)
+# Metrics charted as total / count instead of the total
+AVERAGE_METRICS = ('performance', 'salary')
+
+# (metric, department_id, day) -> [total, count]
+Facts = Dict[Tuple[str, Optional[int], date], list]
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def next_month(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _day_bounds(start: date, end: date) -> Tuple[datetime, datetime]:
+    """Aware datetimes of [start 00:00, end + 1 day 00:00) in the current time zone."""
+    return (
+        timezone.make_aware(datetime.combine(start, time.min)),
+        timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min)),
+    )
+
+
+def _hiring_facts(start: date, end: date, facts: Facts) -> None:
+    since, until = _day_bounds(start, end)
+    rows = (
+        User.objects.filter(date_joined__gte=since, date_joined__lt=until)
+        .annotate(day=TruncDate('date_joined'))
+        .values('day', 'department_id')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    for row in rows:
+        facts[('hiring', row['department_id'], row['day'])] = [Decimal(row['count']), row['count']]
+
+
+def _performance_facts(start: date, end: date, facts: Facts) -> None:
+    since, until = _day_bounds(start, end)
+    rows = (
+        Response.objects.filter(created_at__gte=since, created_at__lt=until, score__isnull=False)
+        .annotate(day=TruncDate('created_at'))
+        .values('day', 'assignment__evaluatee__department_id')
+        .annotate(total=Sum('score'), count=Count('score'))
+        .order_by()
+    )
+    for row in rows:
+        key = ('performance', row['assignment__evaluatee__department_id'], row['day'])
+        facts[key] = [Decimal(row['total']), row['count']]
+
+
+def _salary_facts(start: date, end: date, facts: Facts) -> None:
+    """Salaries in effect on each day, swept from their validity intervals in one query."""
+    records = (
+        SalaryInformation.objects.filter(effective_date__lte=end)
+        .filter(Q(end_date__isnull=True) | Q(end_date__gte=start))
+        # Deactivated records without an end date have no known validity interval
+        .filter(Q(is_active=True) | Q(end_date__isnull=False))
+        .values_list('user__department_id', 'base_salary', 'effective_date', 'end_date')
+    )
+    days = (end - start).days + 1
+    deltas = defaultdict(lambda: [[Decimal(0), 0] for _ in range(days + 1)])
+    for department_id, salary, effective_date, end_date in records:
+        first = (max(effective_date, start) - start).days
+        last = (min(end_date or end, end) - start).days
+        if last < first:
+            continue
+        delta = deltas[department_id]
+        delta[first][0] += salary
+        delta[first][1] += 1
+        delta[last + 1][0] -= salary
+        delta[last + 1][1] -= 1
+
+    for department_id, delta in deltas.items():
+        total, count = Decimal(0), 0
+        for offset in range(days):
+            total += delta[offset][0]
+            count += delta[offset][1]
+            if count:
+                facts[('salary', department_id, start + timedelta(days=offset))] = [total, count]
+
+
+def rebuild_daily_rollups(start: date, end: date) -> int:
+    """
+    Recompute the daily rollups of [start, end] (inclusive).
+
+    Returns:
+        int: Number of daily rows written
+    """
+    facts: Facts = {}
+    _hiring_facts(start, end, facts)
+    _performance_facts(start, end, facts)
+    _salary_facts(start, end, facts)
+
+    rows = [
+        DailyMetricRollup(metric=metric, department_id=department_id, day=day, total=total, count=count)
+        for (metric, department_id, day), (total, count) in facts.items()
+    ]
+    with transaction.atomic():
+        DailyMetricRollup.objects.filter(day__range=(start, end)).delete()
+        DailyMetricRollup.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def rebuild_monthly_rollups(start: date, end: date) -> int:
+    """
+    Recompute the monthly rollups of the months from ``start`` to ``end`` from the daily rows.
+
+    Returns:
+        int: Number of monthly rows written
+    """
+    first_month = month_start(start)
+    last_day = next_month(month_start(end)) - timedelta(days=1)
+    daily = (
+        DailyMetricRollup.objects.filter(day__range=(first_month, last_day))
+        .values_list('metric', 'department_id', 'day', 'total', 'count')
+    )
+
+    months: Dict[Tuple[str, Optional[int], date], list] = defaultdict(lambda: [Decimal(0), 0])
+    stock_days: Dict[Tuple[str, date], Dict] = defaultdict(dict)
+    for metric, department_id, day, total, count in daily:
+        if metric in STOCK_METRICS:
+            stock_days[(metric, month_start(day))].setdefault(day, []).append((department_id, total, count))
+        else:
+            month = months[(metric, department_id, month_start(day))]
+            month[0] += total
+            month[1] += count
+    for (metric, month), by_day in stock_days.items():
+        for department_id, total, count in by_day[max(by_day)]:
+            months[(metric, department_id, month)] = [total, count]
+
+    rows = [
+        MonthlyMetricRollup(metric=metric, department_id=department_id, month=month, total=total, count=count)
+        for (metric, department_id, month), (total, count) in months.items()
+    ]
+    with transaction.atomic():
+        MonthlyMetricRollup.objects.filter(month__range=(first_month, month_start(end))).delete()
+        MonthlyMetricRollup.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def update_rollups(start: date, end: date) -> Dict[str, int]:
+    """Recompute the daily rollups of [start, end] and the monthly rollups of their months."""
+    daily = rebuild_daily_rollups(start, end)
+    monthly = rebuild_monthly_rollups(start, end)
+    logger.info(f"Rolled up metrics for {start} - {end}: {daily} daily, {monthly} monthly rows")
+    return {'daily': daily, 'monthly': monthly}
+
+
+def refresh_recent_rollups(days: Optional[int] = None, today: Optional[date] = None) -> Dict[str, int]:
+    """Recompute the last ``days`` days (default ``DASHBOARD_ROLLUP_REFRESH_DAYS``)."""
+    days = settings.DASHBOARD_ROLLUP_REFRESH_DAYS if days is None else days
+    today = today or timezone.localdate()
+    return update_rollups(today - timedelta(days=max(days, 1) - 1), today)
+
+
+def earliest_metric_date() -> Optional[date]:
+    """First day with data for any metric, for full backfills."""
+    candidates = [
+        User.objects.aggregate(first=Min('date_joined'))['first'],
+        Response.objects.aggregate(first=Min('created_at'))['first'],
+        SalaryInformation.objects.aggregate(first=Min('effective_date'))['first'],
+    ]
+    days = [
+        timezone.localtime(value).date() if isinstance(value, datetime) else value
+        for value in candidates
+        if value is not None
+    ]
+    return min(days) if days else None
+
+
+def month_chunks(start: date, end: date, months: int) -> List[Tuple[date, date]]:
+    """Split [start, end] into ranges of ``months`` whole months (the ends are clipped)."""
+    chunks = []
+    chunk_start = start
+    while chunk_start <= end:
+        boundary = month_start(chunk_start)
+        for _ in range(max(months, 1)):
+            boundary = next_month(boundary)
+        chunk_end = min(boundary - timedelta(days=1), end)
+        chunks.append((chunk_start, chunk_end))
+        chunk_start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def metric_series(metric: str, start: date, end: date, department_id=None,
+                  granularity: str = 'month') -> List[Dict]:
+    """
+    Chart points of a metric, one range scan over the rollup table.
+
+    Args:
+        granularity: ``'month'`` or ``'day'``
+
+    Returns:
+        list: ``{'date': ISO date, 'value': float}`` per period with data
+    """
+    if granularity == 'day':
+        model, period = DailyMetricRollup, 'day'
+    else:
+        model, period = MonthlyMetricRollup, 'month'
+        start = month_start(start)
+
+    rows = model.objects.filter(metric=metric, **{f'{period}__range': (start, end)})
+    if department_id:
+        rows = rows.filter(department_id=department_id)
+    rows = rows.values(period).annotate(total=Sum('total'), count=Sum('count')).order_by(period)
+
+    series = []
+    for row in rows:
+        if metric in AVERAGE_METRICS:
+            value = float(row['total']) / row['count'] if row['count'] else 0.0
+        else:
+            value = float(row['total'])
+        series.append({'date': row[period].isoformat(), 'value': value})
+    return series
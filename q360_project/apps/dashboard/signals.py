@@ -0,0 +1,76 @@
+"""
+Signal handlers for dashboard app.
+
+Saves and deletes of the models behind the dashboard statistics bump the
+version tags of the cached entries they affect (see ``stats_cache``).
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.accounts.models import User
+from apps.competencies.models import UserSkill
+from apps.development_plans.models import DevelopmentGoal
+from apps.evaluations.models import EvaluationAssignment, EvaluationCampaign, EvaluationResult, Response
+from apps.training.models import UserTraining
+
+from .stats_cache import (
+    CAMPAIGNS_TAG, GLOBAL_TAG, department_tag, invalidate_dashboard_data, invalidate_user_dashboard_data, user_tag,
+)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_dashboard_on_user_change(sender, instance, **kwargs):
+    """Users count towards the company and department figures."""
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) <= {'last_login'}:
+        # Logins only move the "active users" figure, which the cache timeout bounds
+        return
+    tags = [GLOBAL_TAG, department_tag(instance.department_id), user_tag(instance.pk)]
+    stored_department_id = getattr(instance, '_stored_department_id', instance.department_id)
+    if stored_department_id != instance.department_id:
+        # Moved users leave their former department's figures too
+        tags.append(department_tag(stored_department_id))
+    invalidate_dashboard_data(*tags)
+    instance._stored_department_id = instance.department_id
+
+
+@receiver(post_save, sender=EvaluationResult)
+@receiver(post_delete, sender=EvaluationResult)
+def invalidate_dashboard_on_result_change(sender, instance, **kwargs):
+    invalidate_user_dashboard_data([instance.evaluatee_id], GLOBAL_TAG, departments=True)
+
+
+@receiver(post_save, sender=EvaluationCampaign)
+@receiver(post_delete, sender=EvaluationCampaign)
+def invalidate_dashboard_on_campaign_change(sender, instance, **kwargs):
+    invalidate_dashboard_data(GLOBAL_TAG, CAMPAIGNS_TAG)
+
+
+@receiver(post_save, sender=EvaluationAssignment)
+@receiver(post_delete, sender=EvaluationAssignment)
+def invalidate_dashboard_on_assignment_change(sender, instance, **kwargs):
+    """Assignments make up the evaluator's to-do figures and the department's active campaigns."""
+    invalidate_dashboard_data(CAMPAIGNS_TAG, user_tag(instance.evaluator_id))
+
+
+@receiver(post_save, sender=Response)
+def invalidate_dashboard_on_response_change(sender, instance, **kwargs):
+    """Responses feed the evaluatee's score distribution."""
+    invalidate_dashboard_data(user_tag(instance.assignment.evaluatee_id))
+
+
+@receiver(post_save, sender=UserTraining)
+@receiver(post_delete, sender=UserTraining)
+@receiver(post_save, sender=DevelopmentGoal)
+@receiver(post_delete, sender=DevelopmentGoal)
+def invalidate_dashboard_on_user_progress_change(sender, instance, **kwargs):
+    invalidate_dashboard_data(GLOBAL_TAG, user_tag(instance.user_id))
+
+
+@receiver(post_save, sender=UserSkill)
+@receiver(post_delete, sender=UserSkill)
+def invalidate_dashboard_on_skill_change(sender, instance, **kwargs):
+    """Skills count for their owner and, while pending, for the owner's supervisor."""
+    supervisor_id = User.objects.filter(pk=instance.user_id).values_list('supervisor_id', flat=True).first()
+    invalidate_dashboard_data(user_tag(instance.user_id), supervisor_id and user_tag(supervisor_id))
@@ -0,0 +1,329 @@
+"""
+Versioned cache of dashboard data.
+
+Dashboard figures are cached per scope (company-wide, department, user). Each
+cached entry depends on version tags (``global``, ``campaigns``,
+``department:<id>``, ``user:<id>``) whose current numbers are part of its
+cache key, so invalidating is a single ``incr`` of a tag: entries built with
+the old number are simply never read again and expire on their own. Saves of
+the underlying models bump the tags they affect (see ``signals``), so a
+landing page is served from the cache until something it shows changes.
+Entries also expire after ``DASHBOARD_STATS_CACHE_TIMEOUT`` seconds, which
+bounds the staleness of time-window figures such as "active in the last 30
+days" (logins do not invalidate).
+"""
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+DASHBOARD_DATA_CACHE_KEY = 'dashboard:data:{name}:{versions}'
+DASHBOARD_TAG_VERSION_KEY = 'dashboard:version:{tag}'
+
+GLOBAL_TAG = 'global'
+CAMPAIGNS_TAG = 'campaigns'
+
+
+def department_tag(department_id) -> str:
+    return f'department:{department_id}'
+
+
+def user_tag(user_id) -> str:
+    return f'user:{user_id}'
+
+
+def _version_key(tag: str) -> str:
+    return DASHBOARD_TAG_VERSION_KEY.format(tag=tag)
+
+
+def tag_versions(tags: List[str]) -> List[int]:
+    """Current version of each tag with one ``get_many``."""
+    keys = [_version_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Start from the clock so an evicted tag never reuses an old version
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def get_cached_data(name: str, tags: List[str], builder: Callable[[], Dict],
+                    timeout: Optional[int] = None):
+    """
+    Cached result of ``builder`` for the current versions of ``tags``.
+
+    Args:
+        name: Entry name including its scope, e.g. ``stats:user:42``
+    """
+    versions = '.'.join(str(version) for version in tag_versions(tags))
+    key = DASHBOARD_DATA_CACHE_KEY.format(name=name, versions=versions)
+    data = cache.get(key)
+    if data is None:
+        data = builder()
+        cache.set(key, data, settings.DASHBOARD_STATS_CACHE_TIMEOUT if timeout is None else timeout)
+    return data
+
+
+def _bump(tags: Iterable[str]) -> None:
+    for tag in set(tags):
+        key = _version_key(tag)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def invalidate_dashboard_data(*tags: str) -> None:
+    """Invalidate every entry depending on ``tags`` once the current transaction commits."""
+    tags = [tag for tag in tags if tag]
+    if tags:
+        transaction.on_commit(lambda: _bump(tags))
+
+
+def invalidate_user_dashboard_data(user_ids: Iterable[int], *tags: str, departments: bool = False) -> None:
+    """
+    Invalidate the user scopes of many users (and ``tags``) once the transaction commits.
+
+    For bulk writes that bypass model signals. With ``departments`` the users'
+    departments are looked up with one query after the commit and invalidated too.
+    """
+    user_ids = set(user_ids)
+    if not user_ids and not tags:
+        return
+
+    def bump():
+        from apps.accounts.models import User
+
+        department_tags = []
+        if departments and user_ids:
+            department_tags = [
+                department_tag(department_id)
+                for department_id in User.objects.filter(pk__in=user_ids)
+                .values_list('department_id', flat=True).distinct()
+            ]
+        _bump([*tags, *department_tags, *(user_tag(user_id) for user_id in user_ids)])
+
+    transaction.on_commit(bump)
+
+
+# ---------------------------------------------------------------------------
+# Dashboard statistics API
+# ---------------------------------------------------------------------------
+
+def _user_counts(users, last_30_days) -> Dict:
+    counts = users.aggregate(
+        total=Count('id', filter=Q(is_active=True)),
+        active=Count('id', filter=Q(is_active=True, last_login__gte=last_30_days)),
+    )
+    return {
+        'total': counts['total'],
+        'active': counts['active'],
+        'growth_rate': round((counts['active'] / counts['total'] * 100) if counts['total'] > 0 else 0, 1),
+    }
+
+
+def _evaluation_counts(results, campaigns, last_30_days) -> Dict:
+    summary = results.aggregate(
+        completed=Count('id', filter=Q(is_finalized=True, finalized_at__gte=last_30_days)),
+        average=Avg('overall_score', filter=Q(is_finalized=True)),
+    )
+    return {
+        'active_campaigns': campaigns.filter(status='active').values('id').distinct().count(),
+        'completed_last_30_days': summary['completed'],
+        'average_score': round(float(summary['average'] or 0), 2),
+    }
+
+
+def _training_and_goal_counts(trainings, goals, last_30_days) -> Dict:
+    since = last_30_days.date()
+    training = trainings.aggregate(
+        completed=Count('id', filter=Q(status='completed', completed_date__gte=since)),
+        in_progress=Count('id', filter=Q(status='in_progress')),
+    )
+    goal = goals.aggregate(
+        active=Count('id', filter=Q(status='active')),
+        completed=Count('id', filter=Q(status='completed', completion_date__gte=since)),
+    )
+    return {
+        'training': {
+            'completed_last_30_days': training['completed'],
+            'in_progress': training['in_progress'],
+        },
+        'goals': {
+            'active': goal['active'],
+            'completed_last_30_days': goal['completed'],
+        },
+    }
+
+
+def build_admin_stats() -> Dict:
+    """Company-wide dashboard statistics."""
+    from apps.accounts.models import User
+    from apps.development_plans.models import DevelopmentGoal
+    from apps.evaluations.models import EvaluationCampaign, EvaluationResult
+    from apps.training.models import UserTraining
+
+    last_30_days = timezone.now() - timedelta(days=30)
+    stats = {
+        'users': _user_counts(User.objects.all(), last_30_days),
+        'evaluations': _evaluation_counts(EvaluationResult.objects.all(), EvaluationCampaign.objects.all(),
+                                          last_30_days),
+    }
+    stats.update(_training_and_goal_counts(UserTraining.objects.all(), DevelopmentGoal.objects.all(),
+                                           last_30_days))
+    return stats
+
+
+def build_department_stats(department_id) -> Dict:
+    """User and evaluation statistics of a department."""
+    from apps.accounts.models import User
+    from apps.evaluations.models import EvaluationCampaign, EvaluationResult
+
+    last_30_days = timezone.now() - timedelta(days=30)
+    return {
+        'users': _user_counts(User.objects.filter(department_id=department_id), last_30_days),
+        'evaluations': _evaluation_counts(
+            EvaluationResult.objects.filter(evaluatee__department_id=department_id),
+            EvaluationCampaign.objects.filter(assignments__evaluatee__department_id=department_id),
+            last_30_days,
+        ),
+    }
+
+
+def build_user_stats(user_id) -> Dict:
+    """Training and goal statistics of a user."""
+    from apps.development_plans.models import DevelopmentGoal
+    from apps.training.models import UserTraining
+
+    last_30_days = timezone.now() - timedelta(days=30)
+    return _training_and_goal_counts(
+        UserTraining.objects.filter(user_id=user_id),
+        DevelopmentGoal.objects.filter(user_id=user_id),
+        last_30_days,
+    )
+
+
+def get_dashboard_stats(user) -> Dict:
+    """Dashboard statistics of the user's scope, from the cache."""
+    if user.is_admin():
+        return get_cached_data('stats:admin', [GLOBAL_TAG], build_admin_stats)
+
+    department_id = user.department_id
+    stats = dict(get_cached_data(
+        f'stats:department:{department_id}',
+        [department_tag(department_id), CAMPAIGNS_TAG],
+        lambda: build_department_stats(department_id),
+    ))
+    stats.update(get_cached_data(
+        f'stats:user:{user.pk}',
+        [user_tag(user.pk)],
+        lambda: build_user_stats(user.pk),
+    ))
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# Landing page (accounts dashboard)
+# ---------------------------------------------------------------------------
+
+def build_landing_data(user) -> Dict:
+    """Per-user figures and chart data of the landing page."""
+    from apps.competencies.models import UserSkill
+    from apps.development_plans.models import DevelopmentGoal
+    from apps.evaluations.models import EvaluationAssignment, EvaluationCampaign, EvaluationResult, Response
+    from apps.training.models import UserTraining
+
+    assignments = EvaluationAssignment.objects.filter(evaluator=user).aggregate(
+        pending=Count('id', filter=Q(status__in=['pending', 'in_progress'])),
+        completed=Count('id', filter=Q(status='completed')),
+    )
+
+    user_results = EvaluationResult.objects.filter(evaluatee=user)
+    latest_result = user_results.order_by('-calculated_at').values('overall_score').first()
+    average_score = None
+    if latest_result and latest_result['overall_score']:
+        average_score = f"{latest_result['overall_score']:.1f}"
+
+    # Performance trend of the last 6 months in one grouped query
+    now = datetime.now()
+    trend_months = [now - timedelta(days=30 * i) for i in range(5, -1, -1)]
+    first_month = timezone.make_aware(trend_months[0].replace(day=1, hour=0, minute=0, second=0, microsecond=0))
+    monthly = {
+        (timezone.localtime(row['month']).year, timezone.localtime(row['month']).month): row['avg']
+        for row in user_results.filter(calculated_at__gte=first_month)
+        .annotate(month=TruncMonth('calculated_at'))
+        .values('month')
+        .annotate(avg=Avg('overall_score'))
+        .order_by()
+    }
+    trend_labels = [month.strftime('%b') for month in trend_months]
+    trend_data = []
+    for month in trend_months:
+        score = monthly.get((month.year, month.month)) or 0
+        trend_data.append(round(float(score), 1) if score else 0)
+
+    # Score distribution by relationship type in one grouped query
+    by_relationship = dict(
+        Response.objects.filter(assignment__evaluatee=user, score__isnull=False)
+        .values('assignment__relationship')
+        .annotate(avg=Avg('score'))
+        .values_list('assignment__relationship', 'avg')
+        .order_by()
+    )
+    score_distribution = [
+        round(by_relationship[rel_type], 1) if by_relationship.get(rel_type) else 0
+        for rel_type in ['self', 'supervisor', 'peer', 'subordinate']
+    ]
+
+    today = timezone.localdate()
+    trainings = UserTraining.objects.filter(user=user).aggregate(
+        total=Count('id'),
+        in_progress=Count('id', filter=Q(status='in_progress')),
+        upcoming=Count('id', filter=Q(
+            due_date__gte=today, due_date__lte=today + timedelta(days=7),
+            status__in=['pending', 'in_progress'],
+        )),
+    )
+    active_goals = DevelopmentGoal.objects.filter(user=user, status='active').count()
+
+    if user.role in ['admin', 'manager'] or user.is_staff:
+        # Rəhbərlər üçün: tabeliyindəkilərin təsdiq gözləyən bacarıqları
+        pending_skills_count = UserSkill.objects.filter(approval_status='pending', user__supervisor=user).count()
+        active_goals_count = None
+    else:
+        pending_skills_count = None
+        active_goals_count = active_goals
+
+    return {
+        'pending_evaluations_count': assignments['pending'],
+        'completed_evaluations_count': assignments['completed'],
+        'active_campaigns_count': EvaluationCampaign.objects.filter(status='active').count(),
+        'average_score': average_score,
+        'user_stats': latest_result is not None,
+        'trend_labels': trend_labels,
+        'trend_data': trend_data,
+        'score_distribution': score_distribution,
+        'total_skills': UserSkill.objects.filter(user=user, is_approved=True).count(),
+        'total_trainings': trainings['total'],
+        'in_progress_trainings': trainings['in_progress'],
+        'active_goals': active_goals,
+        'upcoming_trainings_count': trainings['upcoming'],
+        'pending_skills_count': pending_skills_count,
+        'active_goals_count': active_goals_count,
+    }
+
+
+def get_landing_data(user) -> Dict:
+    """Landing page figures of a user, from the cache."""
+    return get_cached_data(
+        f'landing:user:{user.pk}',
+        [user_tag(user.pk), CAMPAIGNS_TAG],
+        lambda: build_landing_data(user),
+    )
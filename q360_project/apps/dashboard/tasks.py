@@ -9,12 +9,15 @@ logger = logging.getLogger(__name__)
 
 
 @shared_task
-def run_ai_forecasting_task():
+def run_ai_forecasting_task(force=False):
     """
     Background task to run AI forecasting and update ForecastData.
 
     This should be scheduled to run periodically (e.g., weekly or monthly).
 
+    Args:
+        force: Refit every series instead of only the changed ones
+
     Returns:
         Dict with task results
     """
@@ -23,13 +26,15 @@ def run_ai_forecasting_task():
 
         logger.info("Starting AI forecasting task...")
 
-        result = run_ai_forecasting()
+        summary = run_ai_forecasting(force=force)
 
         logger.info("AI forecasting task completed successfully")
 
         return {
             'success': True,
             'message': 'AI forecasting completed',
+            'series': summary['series'],
+            'refitted': summary['refitted'],
             'timestamp': timezone.now().isoformat()
         }
 
@@ -190,3 +195,38 @@ def generate_kpi_report_task(user_id=None):
             'error': str(e),
             'timestamp': timezone.now().isoformat()
         }
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def refresh_realtime_stats_task(self):
+    """Recompute the real-time statistics snapshot (schedule periodically via Celery Beat)."""
+    from .realtime import refresh_realtime_snapshot
+
+    try:
+        snapshot = refresh_realtime_snapshot()
+        return snapshot['generated_at']
+    except Exception as exc:
+        raise self.retry(exc=exc)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def refresh_metric_rollups_task(self):
+    """Recompute the recent daily/monthly metric rollups (schedule periodically via Celery Beat)."""
+    from .rollups import refresh_recent_rollups
+
+    try:
+        return refresh_recent_rollups()
+    except Exception as exc:
+        raise self.retry(exc=exc)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def rebuild_metric_rollups_chunk_task(self, start, end):
+    """Backfill the metric rollups of one month-aligned chunk (ISO dates, inclusive)."""
+    from datetime import date
+    from .rollups import update_rollups
+
+    try:
+        return update_rollups(date.fromisoformat(start), date.fromisoformat(end))
+    except Exception as exc:
+        raise self.retry(exc=exc)
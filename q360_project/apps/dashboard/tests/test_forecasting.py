@@ -0,0 +1,123 @@
+"""Tests for vectorized trend forecasting with persisted fits."""
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.dashboard.forecasting import (
+    fit_forecasts, fit_trends, predict_trends, run_department_forecasts, series_fingerprint,
+)
+from apps.dashboard.models import FittedForecast, ForecastData, MonthlyMetricRollup
+from apps.departments.models import Department, Organization
+
+
+class FitTrendsTest(TestCase):
+    """Test the batched least-squares fit."""
+
+    def test_matches_polynomial_regression(self):
+        from sklearn.linear_model import LinearRegression
+        from sklearn.metrics import r2_score
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import PolynomialFeatures
+
+        series = np.random.default_rng(7).normal(10, 3, size=(4, 25))
+        coefficients, r_squared = fit_trends(series)
+
+        X = np.arange(25).reshape(-1, 1)
+        for row, values in enumerate(series):
+            model = Pipeline([('poly', PolynomialFeatures(degree=2)), ('linear', LinearRegression())])
+            model.fit(X, values)
+            self.assertAlmostEqual(predict_trends(coefficients, 25)[row], model.predict([[25]])[0])
+            self.assertAlmostEqual(r_squared[row], r2_score(values, model.predict(X)))
+
+    def test_constant_series(self):
+        _, r_squared = fit_trends(np.zeros((1, 10)))
+        self.assertEqual(r_squared.tolist(), [1.0])
+
+
+class FitForecastsTest(TestCase):
+    """Test fingerprint-based reuse of fitted forecasts."""
+
+    def test_unchanged_series_are_not_refitted(self):
+        series = {None: np.arange(25, dtype=float)}
+        first = fit_forecasts('staffing', series, 24)[None]
+        self.assertTrue(first.refitted)
+        self.assertAlmostEqual(first.predicted_value, 25.0)
+
+        with self.assertNumQueries(1):
+            second = fit_forecasts('staffing', series, 24)[None]
+        self.assertFalse(second.refitted)
+        self.assertAlmostEqual(second.predicted_value, 25.0)
+
+        changed = fit_forecasts('staffing', {None: np.arange(25, dtype=float) * 2}, 24)[None]
+        self.assertTrue(changed.refitted)
+        self.assertEqual(FittedForecast.objects.get().fingerprint, series_fingerprint(np.arange(25) * 2))
+
+    def test_performance_is_capped(self):
+        forecast = fit_forecasts('performance', {None: np.linspace(3, 5, 25)}, 24)[None]
+        self.assertEqual(forecast.predicted_value, 5.0)
+
+
+class DepartmentForecastsTest(TestCase):
+    """Test per-department forecasts from the monthly rollups."""
+
+    def setUp(self):
+        organization = Organization.objects.create(name='Forecast Org', short_name='FO')
+        self.departments = [
+            Department.objects.create(organization=organization, name=f'Şöbə {i}', code=f'D{i}')
+            for i in range(3)
+        ]
+        current = timezone.localdate().replace(day=1)
+        rows = []
+        for position, department in enumerate(self.departments):
+            for offset in range(25):
+                month = current - relativedelta(months=offset)
+                rows.append(MonthlyMetricRollup(metric='hiring', department=department, month=month,
+                                                total=position + 1, count=position + 1))
+                rows.append(MonthlyMetricRollup(metric='performance', department=department, month=month,
+                                                total=8, count=2))
+        MonthlyMetricRollup.objects.bulk_create(rows)
+
+    def test_forecasts_every_department_and_reuses_fits(self):
+        self.assertEqual(run_department_forecasts(), {'series': 6, 'refitted': 6})
+
+        forecasts = ForecastData.objects.filter(department__isnull=False)
+        self.assertEqual(forecasts.count(), 6)
+        performance = forecasts.get(forecast_type='performance', department=self.departments[0])
+        self.assertEqual(float(performance.predicted_value), 4.0)
+
+        with self.assertNumQueries(6):
+            # series, stored fits, and the ForecastData rewrite (savepoint, delete, insert, release)
+            self.assertEqual(run_department_forecasts(), {'series': 6, 'refitted': 0})
+        self.assertEqual(ForecastData.objects.filter(department__isnull=False).count(), 6)
+
+        MonthlyMetricRollup.objects.filter(metric='hiring', department=self.departments[2]).update(total=9)
+        self.assertEqual(run_department_forecasts(), {'series': 6, 'refitted': 1})
+
+
+class TrainModelViewTest(TestCase):
+    """Test that retraining is restricted to admins and queued."""
+
+    def test_employees_cannot_retrain(self):
+        from apps.accounts.models import User
+
+        User.objects.create_user(username='employee', password='x')
+        self.client.login(username='employee', password='x')
+        response = self.client.post('/dashboard/train-model/')
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(FittedForecast.objects.exists())
+
+    def test_admin_queues_training(self):
+        from unittest.mock import patch
+        from apps.accounts.models import User
+
+        User.objects.create_user(username='boss', password='x', role='admin')
+        self.client.login(username='boss', password='x')
+        with patch('apps.dashboard.tasks.run_ai_forecasting_task.delay') as delay:
+            delay.return_value.id = 'task-1'
+            response = self.client.post('/dashboard/train-model/', {'force': '1'})
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['task_id'], 'task-1')
+        delay.assert_called_once_with(force=True)
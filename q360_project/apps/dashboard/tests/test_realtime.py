@@ -0,0 +1,125 @@
+"""Tests for the real-time statistics snapshot service."""
+from decimal import Decimal
+from unittest.mock import PropertyMock, patch
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from apps.accounts.models import User
+from apps.audit.models import AuditLog
+from apps.dashboard.models import RealTimeStat
+from apps.dashboard.realtime import (
+    REALTIME_SNAPSHOT_CACHE_KEY,
+    REALTIME_SNAPSHOT_LOCK_KEY,
+    get_realtime_snapshot,
+    refresh_realtime_snapshot,
+    save_realtime_stats,
+)
+from apps.dashboard.utils import update_real_time_statistics
+from apps.onboarding.models import OnboardingProcess, OnboardingTask
+
+
+class RealTimeSnapshotTest(TestCase):
+    """Test snapshot computation, upserts and cached serving."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='analyst', password='x')
+        User.objects.create_user(username='former', password='x', is_active=False)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_refresh_upserts_one_row_per_stat(self):
+        update_real_time_statistics()
+        update_real_time_statistics()
+
+        stats = {stat.stat_type: stat for stat in RealTimeStat.objects.all()}
+        self.assertEqual(RealTimeStat.objects.count(), len(stats))
+        self.assertEqual(stats['active_users'].current_value, Decimal('1'))
+        self.assertEqual(stats['active_users'].previous_value, Decimal('1'))
+        self.assertEqual(stats['new_hires'].current_value, Decimal('2'))
+        self.assertEqual(stats['budget_utilization'].unit, '₼')
+        # No evaluation scores yet
+        self.assertNotIn('avg_performance', stats)
+
+    def test_upsert_is_a_single_statement(self):
+        save_realtime_stats({'active_users': 5, 'leave_requests': 2})
+        with self.assertNumQueries(2):
+            save_realtime_stats({'active_users': 7, 'leave_requests': 2})
+
+        stat = RealTimeStat.objects.get(stat_type='active_users')
+        self.assertEqual(stat.current_value, Decimal('7'))
+        self.assertEqual(stat.previous_value, Decimal('5'))
+
+    def test_upsert_without_nulls_not_distinct_support(self):
+        save_realtime_stats({'active_users': 5})
+        with patch.object(type(connection.features), 'supports_nulls_distinct_unique_constraints',
+                          new_callable=PropertyMock, return_value=False):
+            save_realtime_stats({'active_users': 7, 'leave_requests': 2})
+
+        stats = {stat.stat_type: stat for stat in RealTimeStat.objects.all()}
+        self.assertEqual(len(stats), 2)
+        self.assertEqual(stats['active_users'].current_value, Decimal('7'))
+        self.assertEqual(stats['active_users'].previous_value, Decimal('5'))
+        self.assertEqual(stats['leave_requests'].current_value, Decimal('2'))
+
+    def test_snapshot_metrics(self):
+        AuditLog.objects.create(user=self.user, action='login_failure', ip_address='10.0.0.1')
+        snapshot = refresh_realtime_snapshot()
+
+        self.assertEqual(snapshot['users'], {'active': 1, 'new_last_24h': 2})
+        self.assertEqual(snapshot['security']['alerts_last_hour'], 1)
+        self.assertEqual(snapshot['onboarding'], {
+            'active_processes': OnboardingProcess.objects.filter(status='active').count(),
+            'pending_tasks': OnboardingTask.objects.filter(status='pending').count(),
+        })
+
+    def test_cached_snapshot_is_served_within_max_age(self):
+        first = get_realtime_snapshot(max_age=60)
+        User.objects.create_user(username='newcomer', password='x')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_realtime_snapshot(max_age=60), first)
+        self.assertEqual(get_realtime_snapshot(max_age=0)['users']['active'], 2)
+
+    def test_stale_snapshot_is_served_while_another_request_refreshes(self):
+        stale = get_realtime_snapshot()
+        with patch('apps.dashboard.realtime.cache.add', return_value=False), \
+                patch('apps.dashboard.realtime.refresh_realtime_snapshot') as refresh:
+            self.assertEqual(get_realtime_snapshot(max_age=0), stale)
+        refresh.assert_not_called()
+
+    def test_reads_do_not_persist_stats(self):
+        get_realtime_snapshot()
+        self.assertFalse(RealTimeStat.objects.exists())
+        self.assertIn('refresh-realtime-stats', settings.CELERY_BEAT_SCHEDULE)
+
+    @patch('apps.dashboard.realtime.COLD_SNAPSHOT_WAIT', 0)
+    def test_cold_cache_is_not_recomputed_by_concurrent_requests(self):
+        cache.set(REALTIME_SNAPSHOT_LOCK_KEY, 1)
+        with patch('apps.dashboard.realtime.compute_realtime_metrics') as compute:
+            snapshot = get_realtime_snapshot()
+        compute.assert_not_called()
+        self.assertIsNone(snapshot['generated_at'])
+        self.assertIn('active_users', snapshot['stats'])
+
+    def test_failed_cold_refresh_serves_empty_snapshot(self):
+        with patch('apps.dashboard.realtime.compute_realtime_metrics', side_effect=RuntimeError('db down')):
+            snapshot = get_realtime_snapshot()
+        self.assertEqual(snapshot['users'], {'active': None, 'new_last_24h': None})
+        self.assertIsNone(cache.get(REALTIME_SNAPSHOT_LOCK_KEY))
+
+    @override_settings(REALTIME_STATS_MAX_AGE=300)
+    def test_api_serves_cached_snapshot(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/api/realtime-stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['users']['active'], 1)
+        self.assertIsNotNone(cache.get(REALTIME_SNAPSHOT_CACHE_KEY))
+
+        User.objects.create_user(username='newcomer', password='x')
+        response = self.client.get('/api/realtime-stats/')
+        self.assertEqual(response.json()['users']['active'], 1)
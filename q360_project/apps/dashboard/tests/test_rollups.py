@@ -0,0 +1,133 @@
+"""Tests for the daily and monthly metric rollups."""
+from datetime import date, datetime, time
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.compensation.models import SalaryInformation
+from apps.dashboard.models import DailyMetricRollup, MonthlyMetricRollup
+from apps.dashboard.rollups import metric_series, month_chunks, update_rollups
+from apps.departments.models import Department, Organization
+from apps.evaluations.models import (
+    EvaluationAssignment, EvaluationCampaign, Question, QuestionCategory, Response,
+)
+
+
+def at(day):
+    return timezone.make_aware(datetime.combine(day, time(10, 0)))
+
+
+class MetricRollupTest(TestCase):
+    """Test rollup rebuilds, derived months and chart series."""
+
+    def setUp(self):
+        organization = Organization.objects.create(name='Rollup Org', short_name='RO')
+        self.finance = Department.objects.create(organization=organization, name='Maliyyə', code='FIN')
+        self.sales = Department.objects.create(organization=organization, name='Satış', code='SAL')
+
+    def hire(self, username, day, department):
+        user = User.objects.create_user(username=username, password='x', department=department)
+        User.objects.filter(pk=user.pk).update(date_joined=at(day))
+        return user
+
+    def test_hiring_rolls_up_by_day_department_and_month(self):
+        self.hire('a', date(2026, 1, 5), self.finance)
+        self.hire('b', date(2026, 1, 5), self.finance)
+        self.hire('c', date(2026, 1, 20), self.sales)
+        self.hire('d', date(2026, 2, 1), self.sales)
+
+        update_rollups(date(2026, 1, 1), date(2026, 2, 28))
+
+        day = DailyMetricRollup.objects.get(metric='hiring', day=date(2026, 1, 5), department=self.finance)
+        self.assertEqual(day.count, 2)
+        self.assertEqual(
+            metric_series('hiring', date(2026, 1, 1), date(2026, 2, 28)),
+            [{'date': '2026-01-01', 'value': 3.0}, {'date': '2026-02-01', 'value': 1.0}],
+        )
+        self.assertEqual(
+            metric_series('hiring', date(2026, 1, 1), date(2026, 2, 28), department_id=self.sales.id),
+            [{'date': '2026-01-01', 'value': 1.0}, {'date': '2026-02-01', 'value': 1.0}],
+        )
+
+    def test_salary_months_take_their_last_day(self):
+        first = self.hire('a', date(2025, 1, 1), self.finance)
+        second = self.hire('b', date(2025, 1, 1), self.sales)
+        SalaryInformation.objects.create(user=first, base_salary=Decimal('1000'),
+                                         effective_date=date(2026, 1, 1), end_date=date(2026, 1, 14))
+        SalaryInformation.objects.create(user=first, base_salary=Decimal('1200'),
+                                         effective_date=date(2026, 1, 15))
+        SalaryInformation.objects.create(user=second, base_salary=Decimal('800'),
+                                         effective_date=date(2026, 2, 1))
+
+        update_rollups(date(2026, 1, 1), date(2026, 2, 10))
+
+        self.assertEqual(
+            DailyMetricRollup.objects.get(metric='salary', day=date(2026, 1, 14)).total, Decimal('1000')
+        )
+        january = MonthlyMetricRollup.objects.get(metric='salary', month=date(2026, 1, 1))
+        self.assertEqual((january.total, january.count), (Decimal('1200'), 1))
+        self.assertEqual(
+            metric_series('salary', date(2026, 1, 1), date(2026, 2, 10)),
+            [{'date': '2026-01-01', 'value': 1200.0}, {'date': '2026-02-01', 'value': 1000.0}],
+        )
+
+    def test_performance_averages_scores(self):
+        evaluatee = self.hire('evaluatee', date(2025, 1, 1), self.finance)
+        evaluator = self.hire('evaluator', date(2025, 1, 1), self.sales)
+        campaign = EvaluationCampaign.objects.create(
+            title='Rollup', start_date=date(2026, 1, 1), end_date=date(2026, 1, 31), status='active',
+            created_by=evaluatee,
+        )
+        assignment = EvaluationAssignment.objects.create(
+            campaign=campaign, evaluator=evaluator, evaluatee=evaluatee, relationship='peer',
+        )
+        category = QuestionCategory.objects.create(name='Rollup Category')
+        for score in (3, 4, 5):
+            question = Question.objects.create(category=category, text=f'Question {score}')
+            Response.objects.create(assignment=assignment, question=question, score=score)
+        Response.objects.update(created_at=at(date(2026, 1, 10)))
+
+        update_rollups(date(2026, 1, 1), date(2026, 1, 31))
+
+        self.assertEqual(
+            metric_series('performance', date(2026, 1, 1), date(2026, 1, 31), department_id=self.finance.id),
+            [{'date': '2026-01-01', 'value': 4.0}],
+        )
+
+    def test_rebuild_replaces_stale_rows(self):
+        user = self.hire('a', date(2026, 3, 3), self.finance)
+        update_rollups(date(2026, 3, 1), date(2026, 3, 31))
+        user.delete()
+        update_rollups(date(2026, 3, 1), date(2026, 3, 31))
+
+        self.assertFalse(DailyMetricRollup.objects.filter(metric='hiring').exists())
+        self.assertFalse(MonthlyMetricRollup.objects.filter(metric='hiring').exists())
+
+    def test_series_is_one_query(self):
+        with self.assertNumQueries(1):
+            metric_series('hiring', date(2025, 1, 1), date(2026, 1, 1))
+
+    def test_month_chunks(self):
+        self.assertEqual(month_chunks(date(2026, 1, 15), date(2026, 5, 3), 2), [
+            (date(2026, 1, 15), date(2026, 2, 28)),
+            (date(2026, 3, 1), date(2026, 4, 30)),
+            (date(2026, 5, 1), date(2026, 5, 3)),
+        ])
+
+    def test_backfill_command(self):
+        self.hire('a', date(2026, 1, 5), self.finance)
+        self.hire('b', date(2026, 4, 5), self.finance)
+
+        for extra in ([], ['--sync']):
+            DailyMetricRollup.objects.all().delete()
+            MonthlyMetricRollup.objects.all().delete()
+            call_command('backfill_metric_rollups', '--start', '2026-01-01', '--end', '2026-04-30',
+                         '--chunk-months', '1', *extra, stdout=StringIO())
+            self.assertEqual(
+                list(MonthlyMetricRollup.objects.filter(metric='hiring').values_list('month', 'count')),
+                [(date(2026, 1, 1), 1), (date(2026, 4, 1), 1)],
+            )
@@ -0,0 +1,165 @@
+"""Tests for the versioned dashboard statistics cache."""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.dashboard.stats_cache import get_dashboard_stats, get_landing_data
+from apps.departments.models import Department, Organization
+from apps.development_plans.models import DevelopmentGoal
+from apps.training.models import TrainingResource, UserTraining
+
+
+class DashboardStatsCacheTest(TestCase):
+    """Test cached dashboard statistics and their invalidation."""
+
+    def setUp(self):
+        cache.clear()
+        organization = Organization.objects.create(name='Stats Org', short_name='SO')
+        self.department = Department.objects.create(organization=organization, name='Analitika', code='AN')
+        self.user = User.objects.create_user(username='employee', password='x', department=self.department)
+        self.admin = User.objects.create_user(username='boss', password='x', role='admin')
+        self.resource = TrainingResource.objects.create(
+            title='SQL Fundamentals',
+            description='SQL sorğularına giriş.',
+            type='course',
+        )
+        self.training = UserTraining.objects.create(user=self.user, resource=self.resource, status='in_progress')
+        DevelopmentGoal.objects.create(
+            user=self.user, title='Liderlik', description='-', category='soft',
+            status='active', target_date=timezone.localdate() + timedelta(days=90),
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_scoped_stats(self):
+        stats = get_dashboard_stats(self.user)
+        self.assertEqual(stats['users']['total'], 1)
+        self.assertEqual(stats['training'], {'completed_last_30_days': 0, 'in_progress': 1})
+        self.assertEqual(stats['goals'], {'active': 1, 'completed_last_30_days': 0})
+
+        admin_stats = get_dashboard_stats(self.admin)
+        self.assertEqual(admin_stats['users']['total'], 2)
+        self.assertEqual(admin_stats['evaluations']['active_campaigns'], 0)
+
+    def test_warm_cache_reads_no_tables(self):
+        get_dashboard_stats(self.user)
+        get_dashboard_stats(self.admin)
+        with self.assertNumQueries(0):
+            get_dashboard_stats(self.user)
+            get_dashboard_stats(self.admin)
+
+    def test_training_save_invalidates_user_and_company_stats(self):
+        get_dashboard_stats(self.user)
+        get_dashboard_stats(self.admin)
+
+        self.training.status = 'completed'
+        self.training.completed_date = timezone.localdate()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.training.save()
+
+        expected = {'completed_last_30_days': 1, 'in_progress': 0}
+        self.assertEqual(get_dashboard_stats(self.user)['training'], expected)
+        self.assertEqual(get_dashboard_stats(self.admin)['training'], expected)
+
+    def test_login_does_not_invalidate(self):
+        get_dashboard_stats(self.user)
+        self.user.last_login = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save(update_fields=['last_login'])
+
+        with self.assertNumQueries(0):
+            get_dashboard_stats(self.user)
+
+    def test_api_response_shape(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('dashboard:api_stats'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['success'])
+        self.assertEqual(set(response.json()['stats']), {'users', 'evaluations', 'training', 'goals'})
+
+
+class LandingPageCacheTest(TestCase):
+    """Test the cached landing page figures."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='employee', password='x')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_landing_data(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            DevelopmentGoal.objects.create(
+                user=self.user, title='Liderlik', description='-', category='soft',
+                status='active', target_date=timezone.localdate() + timedelta(days=90),
+            )
+
+        data = get_landing_data(self.user)
+        self.assertEqual(data['active_goals'], 1)
+        self.assertEqual(data['active_goals_count'], 1)
+        self.assertEqual(len(data['trend_labels']), 6)
+        self.assertEqual(data['trend_data'], [0] * 6)
+        self.assertEqual(data['score_distribution'], [0] * 4)
+        self.assertFalse(data['user_stats'])
+
+        with self.assertNumQueries(0):
+            get_landing_data(self.user)
+
+    def test_dashboard_view_renders(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('dashboard'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['trend_data'], '[0, 0, 0, 0, 0, 0]')
+
+
+@override_settings(SEARCH_TEXT_CONFIG='simple')
+class BulkWriteInvalidationTest(TestCase):
+    """Test invalidation from write paths that bypass model signals."""
+
+    def setUp(self):
+        cache.clear()
+        organization = Organization.objects.create(name='Bulk Org', short_name='BO')
+        self.old_department = Department.objects.create(organization=organization, name='Köhnə', code='OLD')
+        self.new_department = Department.objects.create(organization=organization, name='Yeni', code='NEW')
+        self.evaluator = User.objects.create_user(username='evaluator', password='x')
+        self.evaluatee = User.objects.create_user(username='evaluatee', password='x',
+                                                  department=self.old_department)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_generated_assignments_invalidate_evaluator(self):
+        from apps.evaluations.assignment_generator import generate_campaign_assignments
+        from apps.evaluations.models import EvaluationCampaign
+
+        campaign = EvaluationCampaign.objects.create(
+            title='Bulk', start_date=timezone.localdate(),
+            end_date=timezone.localdate() + timedelta(days=30), created_by=self.evaluator,
+        )
+        self.assertEqual(get_landing_data(self.evaluator)['pending_evaluations_count'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            generate_campaign_assignments(campaign, include_supervisor=False, include_peers=False,
+                                          include_subordinates=False)
+
+        self.assertEqual(get_landing_data(self.evaluator)['pending_evaluations_count'], 1)
+
+    def test_department_move_invalidates_both_departments(self):
+        stayer = User.objects.create_user(username='stayer', password='x', department=self.old_department)
+        self.assertEqual(get_dashboard_stats(stayer)['users']['total'], 2)
+
+        evaluatee = User.objects.get(pk=self.evaluatee.pk)
+        evaluatee.department = self.new_department
+        with self.captureOnCommitCallbacks(execute=True):
+            evaluatee.save()
+
+        self.assertEqual(get_dashboard_stats(stayer)['users']['total'], 1)
+        self.assertEqual(get_dashboard_stats(evaluatee)['users']['total'], 1)
@@ -0,0 +1,68 @@
+"""Tests for the monthly forecasting time series."""
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.compensation.models import SalaryInformation
+from apps.dashboard.ai_forecasting import AIForecastingEngine
+from apps.dashboard.timeseries import hiring_series, month_axis, payroll_series, performance_series
+
+
+class MonthlySeriesTest(TestCase):
+    """Test single-query monthly series with zero-filled gaps."""
+
+    def setUp(self):
+        self.end = date(2026, 6, 15)
+
+    def hire(self, username, day):
+        user = User.objects.create_user(username=username, password='x')
+        User.objects.filter(pk=user.pk).update(
+            date_joined=timezone.make_aware(datetime.combine(day, time(9, 0)))
+        )
+        return user
+
+    def test_month_axis(self):
+        self.assertEqual(month_axis(2, self.end), [date(2026, 4, 1), date(2026, 5, 1), date(2026, 6, 1)])
+
+    def test_hiring_series_fills_gaps(self):
+        self.hire('a', date(2026, 3, 31))
+        self.hire('b', date(2026, 3, 2))
+        self.hire('c', date(2026, 6, 1))
+        self.hire('d', date(2025, 1, 1))
+
+        with self.assertNumQueries(1):
+            months, values = hiring_series(3, self.end)
+
+        self.assertEqual(months[0], date(2026, 3, 1))
+        self.assertEqual(values.tolist(), [2.0, 0.0, 0.0, 1.0])
+
+    def test_payroll_series_is_cumulative(self):
+        user = self.hire('a', date(2025, 1, 1))
+        SalaryInformation.objects.create(user=user, base_salary=Decimal('1000'), effective_date=date(2025, 12, 1))
+        SalaryInformation.objects.create(user=user, base_salary=Decimal('500'), effective_date=date(2026, 5, 20))
+        SalaryInformation.objects.create(user=user, base_salary=Decimal('300'), effective_date=date(2026, 7, 1))
+
+        with self.assertNumQueries(1):
+            _, values = payroll_series(2, self.end)
+
+        self.assertEqual(values.tolist(), [1000.0, 1500.0, 1500.0])
+
+    def test_performance_series_without_responses(self):
+        _, values = performance_series(5, self.end)
+        self.assertEqual(values.tolist(), [0.0] * 6)
+
+    def test_forecasting_run_reads_each_series_once(self):
+        self.hire('a', date(2026, 1, 5))
+
+        def train(engine):
+            engine.train_staffing_forecast()
+            engine.train_budget_forecast()
+            engine.train_performance_forecast()
+
+        train(AIForecastingEngine())
+        # One query per series plus one for the stored fits; unchanged series are not refitted
+        with self.assertNumQueries(4):
+            train(AIForecastingEngine())
@@ -0,0 +1,107 @@
+"""
+Monthly time series for forecasting.
+
+Each series is pulled with one ``TruncMonth`` grouped query and laid out on a
+fixed calendar-month axis as a NumPy array, with months without data filled
+in (zeros, or the running total for cumulative series). The forecasting models
+share these helpers instead of counting month by month.
+"""
+from datetime import date, datetime, time
+from typing import List, Optional, Tuple
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+from django.db import models
+from django.db.models import Avg, Count, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.compensation.models import SalaryInformation
+from apps.evaluations.models import Response
+
+# (calendar months, values)
+MonthlySeries = Tuple[List[date], np.ndarray]
+
+
+def month_axis(months_back: int, end: Optional[date] = None) -> List[date]:
+    """First days of the ``months_back`` months before ``end``'s month and of that month."""
+    last = (end or timezone.localdate()).replace(day=1)
+    return [last - relativedelta(months=offset) for offset in range(months_back, -1, -1)]
+
+
+def _as_month(value) -> date:
+    if isinstance(value, datetime):
+        value = timezone.localtime(value) if timezone.is_aware(value) else value
+        value = value.date()
+    return value.replace(day=1)
+
+
+def _bound(queryset, date_field: str, day: date):
+    """``day`` as a filter value for ``date_field`` (local midnight for datetime fields)."""
+    if isinstance(queryset.model._meta.get_field(date_field), models.DateTimeField):
+        return timezone.make_aware(datetime.combine(day, time.min))
+    return day
+
+
+def monthly_series(queryset, date_field: str, aggregate, months: List[date],
+                   cumulative: bool = False) -> np.ndarray:
+    """
+    Aggregate ``queryset`` per calendar month of ``date_field`` with one query.
+
+    Args:
+        aggregate: Aggregate expression evaluated per month, e.g. ``Count('id')``
+        months: Month axis from ``month_axis``
+        cumulative: Running total instead of per-month values; rows before the
+            first month count towards the starting total
+
+    Returns:
+        numpy.ndarray: One float per month, zero for months without rows
+    """
+    index = {month: position for position, month in enumerate(months)}
+    until = months[-1] + relativedelta(months=1)
+    queryset = queryset.filter(**{f'{date_field}__lt': _bound(queryset, date_field, until)})
+    if not cumulative:
+        queryset = queryset.filter(**{f'{date_field}__gte': _bound(queryset, date_field, months[0])})
+
+    values = np.zeros(len(months))
+    baseline = 0.0
+    rows = (
+        queryset.annotate(month=TruncMonth(date_field))
+        .values('month')
+        .annotate(value=aggregate)
+        .order_by()
+    )
+    for row in rows:
+        if row['value'] is None:
+            continue
+        position = index.get(_as_month(row['month']))
+        if position is not None:
+            values[position] += float(row['value'])
+        else:
+            baseline += float(row['value'])
+
+    if cumulative:
+        values = baseline + np.cumsum(values)
+    return values
+
+
+def hiring_series(months_back: int = 24, end: Optional[date] = None) -> MonthlySeries:
+    """Users joined per month."""
+    months = month_axis(months_back, end)
+    return months, monthly_series(User.objects.all(), 'date_joined', Count('id'), months)
+
+
+def payroll_series(months_back: int = 24, end: Optional[date] = None) -> MonthlySeries:
+    """Total base salary of the records effective by the end of each month."""
+    months = month_axis(months_back, end)
+    values = monthly_series(
+        SalaryInformation.objects.all(), 'effective_date', Sum('base_salary'), months, cumulative=True
+    )
+    return months, values
+
+
+def performance_series(months_back: int = 24, end: Optional[date] = None) -> MonthlySeries:
+    """Average evaluation response score per month (0 for months without responses)."""
+    months = month_axis(months_back, end)
+    return months, monthly_series(Response.objects.all(), 'created_at', Avg('score'), months)
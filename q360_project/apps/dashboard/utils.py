@@ -13,115 +13,11 @@ from .models import SystemKPI, TrendData, ForecastData, RealTimeStat
 
 def update_real_time_statistics():
     """
-    Real vaxt statistikalarını yeniləyir
+    Real vaxt statistikalarını yeniləyir (bax: ``apps.dashboard.realtime``)
     """
-    # Aktiv istifadəçilər
-    active_users_count = User.objects.filter(is_active=True).count()
-    stat, created = RealTimeStat.objects.get_or_create(
-        stat_type='active_users',
-        defaults={
-            'current_value': active_users_count, 
-            'unit': '', 
-            'description': 'Aktiv İstifadəçilər'
-        }
-    )
-    if not created:
-        stat.current_value = active_users_count
-        stat.save()
+    from .realtime import refresh_realtime_snapshot
 
-    # Gözləyən qiymətləndirmələr
-    pending_evaluations_count = EvaluationAssignment.objects.filter(
-        status__in=['pending', 'in_progress']
-    ).count()
-    stat, created = RealTimeStat.objects.get_or_create(
-        stat_type='pending_evaluations',
-        defaults={
-            'current_value': pending_evaluations_count, 
-            'unit': '', 
-            'description': 'Gözləyən Qiymətləndirmələr'
-        }
-    )
-    if not created:
-        stat.current_value = pending_evaluations_count
-        stat.save()
-
-    # Bu ay yeni işə qəbul olunanlar
-    this_month = timezone.now().replace(day=1)
-    new_hires_count = User.objects.filter(date_joined__gte=this_month).count()
-    stat, created = RealTimeStat.objects.get_or_create(
-        stat_type='new_hires',
-        defaults={
-            'current_value': new_hires_count, 
-            'unit': '', 
-            'description': 'Bu Ay Yeni İşə Qəbul'
-        }
-    )
-    if not created:
-        stat.current_value = new_hires_count
-        stat.save()
-
-    # Ortalama performans
-    avg_performance = Response.objects.aggregate(Avg('score'))['score__avg']
-    if avg_performance:
-        stat, created = RealTimeStat.objects.get_or_create(
-            stat_type='avg_performance',
-            defaults={
-                'current_value': avg_performance, 
-                'unit': '', 
-                'description': 'Ortalama Performans'
-            }
-        )
-        if not created:
-            stat.current_value = avg_performance
-            stat.save()
-
-    # Büdcə istifadəsi
-    total_budget = SalaryInformation.objects.aggregate(Sum('base_salary'))['base_salary__sum'] or 0
-    stat, created = RealTimeStat.objects.get_or_create(
-        stat_type='budget_utilization',
-        defaults={
-            'current_value': total_budget, 
-            'unit': '₼', 
-            'description': 'Ümumi Maaş Fonduna'
-        }
-    )
-    if not created:
-        stat.current_value = total_budget
-        stat.save()
-
-    # Məzuniyyət sorğuları
-    pending_leaves = LeaveRequest.objects.filter(status='pending').count()
-    stat, created = RealTimeStat.objects.get_or_create(
-        stat_type='leave_requests',
-        defaults={
-            'current_value': pending_leaves, 
-            'unit': '', 
-            'description': 'Gözləyən Məzuniyyət Sorğuları'
-        }
-    )
-    if not created:
-        stat.current_value = pending_leaves
-        stat.save()
-
-    # FIXED: Təlim tamamlamaları - real UserTraining modelindən götürülür
-    try:
-        from apps.training.models import UserTraining
-        completed_trainings = UserTraining.objects.filter(status='completed').count()
-    except (ImportError, Exception):
-        # Əgər training app mövcud deyilsə və ya UserTraining modeli yoxdursa, 0 saxlayırıq
-        completed_trainings = 0
-
-    stat, created = RealTimeStat.objects.get_or_create(
-        stat_type='training_completions',
-        defaults={
-            'current_value': completed_trainings,
-            'unit': '',
-            'description': 'Təlim Tamamlamaları'
-        }
-    )
-    if not created:
-        stat.current_value = completed_trainings
-        stat.save()
+    return refresh_realtime_snapshot()
 
 
 def update_trend_data():
@@ -163,6 +59,10 @@ def update_trend_data():
         defaults={'value': daily_hires}
     )
 
+    # Gündəlik və aylıq rollup cədvəlləri (son günlər yenidən hesablanır)
+    from .rollups import refresh_recent_rollups
+    refresh_recent_rollups()
+
 
 def update_forecast_data():
     """
@@ -295,25 +195,12 @@ def get_salary_trends(department_id=None, months=12):
     """
     from datetime import date
     from dateutil.relativedelta import relativedelta
-    
+    from .rollups import metric_series
+
     end_date = date.today()
     start_date = end_date - relativedelta(months=months)
-    
-    trend_data = TrendData.objects.filter(
-        data_type='salary',
-        period__range=[start_date, end_date]
-    )
-    
-    if department_id:
-        trend_data = trend_data.filter(department_id=department_id)
-    
-    return [
-        {
-            'date': item.period.isoformat(),
-            'value': float(item.value)
-        }
-        for item in trend_data.order_by('period')
-    ]
+
+    return metric_series('salary', start_date, end_date, department_id=department_id)
 
 
 def get_performance_trends(department_id=None, months=12):
@@ -322,25 +209,12 @@ def get_performance_trends(department_id=None, months=12):
     """
     from datetime import date
     from dateutil.relativedelta import relativedelta
-    
+    from .rollups import metric_series
+
     end_date = date.today()
     start_date = end_date - relativedelta(months=months)
-    
-    trend_data = TrendData.objects.filter(
-        data_type='performance',
-        period__range=[start_date, end_date]
-    )
-    
-    if department_id:
-        trend_data = trend_data.filter(department_id=department_id)
-    
-    return [
-        {
-            'date': item.period.isoformat(),
-            'value': float(item.value)
-        }
-        for item in trend_data.order_by('period')
-    ]
+
+    return metric_series('performance', start_date, end_date, department_id=department_id)
 
 
 def get_hiring_trends(department_id=None, months=12):
@@ -349,25 +223,12 @@ def get_hiring_trends(department_id=None, months=12):
     """
     from datetime import date
     from dateutil.relativedelta import relativedelta
-    
+    from .rollups import metric_series
+
     end_date = date.today()
     start_date = end_date - relativedelta(months=months)
-    
-    trend_data = TrendData.objects.filter(
-        data_type='hiring',
-        period__range=[start_date, end_date]
-    )
-    
-    if department_id:
-        trend_data = trend_data.filter(department_id=department_id)
-    
-    return [
-        {
-            'date': item.period.isoformat(),
-            'value': float(item.value)
-        }
-        for item in trend_data.order_by('period')
-    ]
+
+    return metric_series('hiring', start_date, end_date, department_id=department_id)
 
 
 def calculate_trend_analysis():
@@ -397,48 +397,10 @@ def update_real_time_stats(request):
     Real vaxt statistikalarını yeniləyir
     """
     if request.method == 'POST':
-        # Aktiv istifadəçilər
-        active_users_count = User.objects.filter(is_active=True).count()
-        stat, created = RealTimeStat.objects.get_or_create(
-            stat_type='active_users',
-            defaults={'current_value': active_users_count, 'unit': '', 'description': _('Aktiv İstifadəçilər')}
-        )
-        if not created:
-            stat.current_value = active_users_count
-            stat.save()
-        
-        # Gözləyən qiymətləndirmələr
-        pending_evaluations_count = Response.objects.filter(is_completed=False).count()
-        stat, created = RealTimeStat.objects.get_or_create(
-            stat_type='pending_evaluations',
-            defaults={'current_value': pending_evaluations_count, 'unit': '', 'description': _('Gözləyən Qiymətləndirmələr')}
-        )
-        if not created:
-            stat.current_value = pending_evaluations_count
-            stat.save()
-        
-        # Yeni işə qəbul olunanlar (bu ay)
-        this_month = timezone.now().replace(day=1)
-        new_hires_count = User.objects.filter(date_joined__gte=this_month).count()
-        stat, created = RealTimeStat.objects.get_or_create(
-            stat_type='new_hires',
-            defaults={'current_value': new_hires_count, 'unit': '', 'description': _('Bu Ay Yeni İşə Qəbul')}
-        )
-        if not created:
-            stat.current_value = new_hires_count
-            stat.save()
-        
-        # Ortalama performans
-        avg_performance = Response.objects.aggregate(Avg('score'))['score__avg']
-        if avg_performance:
-            stat, created = RealTimeStat.objects.get_or_create(
-                stat_type='avg_performance',
-                defaults={'current_value': avg_performance, 'unit': '', 'description': _('Ortalama Performans')}
-            )
-            if not created:
-                stat.current_value = avg_performance
-                stat.save()
-        
+        from .realtime import refresh_realtime_snapshot
+
+        refresh_realtime_snapshot()
+
         return JsonResponse({'status': 'success', 'message': _('Statistika yeniləndi')})
     
     return JsonResponse({'status': 'error', 'message': _('Yalnız POST sorğuları qəbul olunur')})
@@ -720,14 +682,19 @@ def train_model(request):
     """
     Modeli yenidən təlim et
     """
+    if not request.user.is_admin():
+        return JsonResponse({'success': False, 'message': _('Yalnız admin icazə verilir')}, status=403)
+
     if request.method == 'POST':
-        # Burada modeli təlim etmə məntiqi olacaq
-        # Mock implementation for now
+        from .tasks import run_ai_forecasting_task
+
+        # Təlim fon tapşırığında aparılır; yalnız məlumatı dəyişmiş seriyalar yenidən təlim edilir
+        task = run_ai_forecasting_task.delay(force=request.POST.get('force') == '1')
         return JsonResponse({
             'success': True,
-            'message': _('Model uğurla təlim edildi'),
-            'model_version': '1.2.4'
-        })
+            'message': _('Modelin təlimi növbəyə əlavə edildi'),
+            'task_id': task.id,
+        }, status=202)
     
     return JsonResponse({
         'success': False,
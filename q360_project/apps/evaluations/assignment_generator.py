@@ -0,0 +1,319 @@
+"""
+Bulk 360° assignment generator for evaluation campaigns.
+
+Builds the self / supervisor / peer / subordinate matrix for a whole
+organization from a single in-memory snapshot of users and departments, and
+inserts it with chunked ``bulk_create`` calls. Re-running the generator for
+the same campaign only adds missing pairs.
+"""
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Set, Tuple
+
+from django.db import transaction
+from django.db.models import Count
+
+from apps.accounts.models import User
+from apps.dashboard.stats_cache import CAMPAIGNS_TAG, invalidate_user_dashboard_data
+from apps.departments.models import Department
+
+from .models import EvaluationAssignment, EvaluationCampaign
+
+
+# Earlier entries win when one evaluator/evaluatee pair qualifies for several relationships
+RELATIONSHIP_PRIORITY = ('self', 'supervisor', 'subordinate', 'peer')
+
+
+@dataclass
+class AssignmentGenerationSummary:
+    """Outcome of an assignment generation run."""
+
+    campaign_id: int
+    dry_run: bool
+    created: int = 0
+    skipped_existing: int = 0
+    by_relationship: Dict[str, int] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict:
+        return {
+            'campaign_id': self.campaign_id,
+            'dry_run': self.dry_run,
+            'created': self.created,
+            'skipped_existing': self.skipped_existing,
+            'by_relationship': dict(self.by_relationship),
+        }
+
+
+class AssignmentMatrixGenerator:
+    """
+    Generate evaluation assignments for every evaluatee in scope.
+
+    Peers are picked from the evaluatee's own department first and topped up
+    from sibling departments in the MPTT tree. Colleagues are rotated so the
+    peer workload is spread evenly across a department.
+    """
+
+    def __init__(
+        self,
+        campaign: EvaluationCampaign,
+        organization=None,
+        include_self: bool = True,
+        include_supervisor: bool = True,
+        include_peers: bool = True,
+        include_subordinates: bool = True,
+        max_peers: int = 3,
+        max_subordinates: int = 5,
+        chunk_size: int = 2000,
+    ):
+        """
+        Initialize generator.
+
+        Args:
+            campaign: Campaign to generate assignments for
+            organization: Limit evaluatees to this organization (defaults to
+                the campaign's target users/departments, or everyone active)
+            include_*: Relationship types to generate
+            max_peers: Peer evaluators per evaluatee
+            max_subordinates: Subordinate evaluators per evaluatee
+            chunk_size: Rows per bulk insert
+        """
+        self.campaign = campaign
+        self.organization = organization
+        self.include_self = include_self and campaign.allow_self_evaluation
+        self.include_supervisor = include_supervisor
+        self.include_peers = include_peers
+        self.include_subordinates = include_subordinates
+        self.max_peers = max_peers
+        self.max_subordinates = max_subordinates
+        self.chunk_size = chunk_size
+
+    # ------------------------------------------------------------------
+    # Snapshot loading
+    # ------------------------------------------------------------------
+
+    def _load_snapshot(self):
+        """Load active users and the department tree with two queries."""
+        users = list(
+            User.objects.filter(is_active=True)
+            .order_by('id')
+            .values_list('id', 'supervisor_id', 'department_id')
+        )
+        departments = list(
+            Department.objects.filter(is_active=True)
+            .order_by()
+            .values_list('id', 'parent_id', 'organization_id')
+        )
+        return users, departments
+
+    def _evaluatee_ids(self, users, departments) -> List[int]:
+        """Resolve the evaluatee population."""
+        if self.organization is not None:
+            organization_id = int(getattr(self.organization, 'pk', self.organization))
+            org_departments = {
+                dept_id for dept_id, _, org_id in departments if org_id == organization_id
+            }
+            return [user_id for user_id, _, dept_id in users if dept_id in org_departments]
+
+        target_user_ids = set(self.campaign.target_users.values_list('id', flat=True))
+        target_departments = self.campaign.target_departments.all()
+        if target_departments:
+            # Include sub-departments of every targeted department
+            department_ids = set()
+            for department in target_departments:
+                department_ids.update(
+                    department.get_descendants(include_self=True).values_list('id', flat=True)
+                )
+            target_user_ids.update(
+                user_id for user_id, _, dept_id in users if dept_id in department_ids
+            )
+
+        if target_user_ids:
+            return [user_id for user_id, _, _ in users if user_id in target_user_ids]
+        return [user_id for user_id, _, _ in users]
+
+    # ------------------------------------------------------------------
+    # Matrix construction
+    # ------------------------------------------------------------------
+
+    def iter_pairs(self) -> Iterator[Tuple[int, int, str]]:
+        """
+        Yield unique ``(evaluator_id, evaluatee_id, relationship)`` triples.
+
+        Each evaluator/evaluatee pair appears at most once, keeping the
+        highest-priority relationship (campaign assignments are unique per pair).
+        """
+        users, departments = self._load_snapshot()
+        active_ids = {user_id for user_id, _, _ in users}
+        supervisor_of = {user_id: supervisor_id for user_id, supervisor_id, _ in users}
+        department_of = {user_id: dept_id for user_id, _, dept_id in users}
+
+        members = defaultdict(list)
+        subordinates = defaultdict(list)
+        for user_id, supervisor_id, dept_id in users:
+            if dept_id:
+                members[dept_id].append(user_id)
+            if supervisor_id:
+                subordinates[supervisor_id].append(user_id)
+
+        parent_of = {dept_id: parent_id for dept_id, parent_id, _ in departments}
+        children = defaultdict(list)
+        for dept_id, parent_id, _ in departments:
+            if parent_id:
+                children[parent_id].append(dept_id)
+        position = {
+            dept_id: {user_id: index for index, user_id in enumerate(dept_members)}
+            for dept_id, dept_members in members.items()
+        }
+
+        for evaluatee_id in self._evaluatee_ids(users, departments):
+            candidates = []
+            if self.include_self:
+                candidates.append((evaluatee_id, 'self'))
+
+            supervisor_id = supervisor_of.get(evaluatee_id)
+            if self.include_supervisor and supervisor_id in active_ids:
+                candidates.append((supervisor_id, 'supervisor'))
+
+            if self.include_subordinates:
+                candidates.extend(
+                    (sub_id, 'subordinate')
+                    for sub_id in subordinates.get(evaluatee_id, [])[:self.max_subordinates]
+                )
+
+            if self.include_peers:
+                dept_id = department_of.get(evaluatee_id)
+                if dept_id:
+                    candidates.extend(
+                        (peer_id, 'peer')
+                        for peer_id in self._pick_peers(
+                            evaluatee_id, dept_id, members, position, parent_of, children
+                        )
+                    )
+
+            chosen: Dict[int, str] = {}
+            for evaluator_id, relationship in candidates:
+                current = chosen.get(evaluator_id)
+                if current is None or (
+                    RELATIONSHIP_PRIORITY.index(relationship) < RELATIONSHIP_PRIORITY.index(current)
+                ):
+                    chosen[evaluator_id] = relationship
+            if not self.include_self:
+                chosen.pop(evaluatee_id, None)
+
+            for evaluator_id, relationship in chosen.items():
+                yield evaluator_id, evaluatee_id, relationship
+
+    def _pick_peers(self, evaluatee_id, dept_id, members, position, parent_of, children) -> List[int]:
+        """Rotate through department colleagues, then sibling departments."""
+        peers = []
+        colleagues = members.get(dept_id, [])
+        if len(colleagues) > 1:
+            start = position[dept_id][evaluatee_id]
+            for offset in range(1, len(colleagues)):
+                if len(peers) >= self.max_peers:
+                    return peers
+                peers.append(colleagues[(start + offset) % len(colleagues)])
+
+        parent_id = parent_of.get(dept_id)
+        if parent_id and len(peers) < self.max_peers:
+            for sibling_id in children.get(parent_id, []):
+                if sibling_id == dept_id:
+                    continue
+                for peer_id in members.get(sibling_id, []):
+                    peers.append(peer_id)
+                    if len(peers) >= self.max_peers:
+                        return peers
+        return peers
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _existing_pairs(self) -> Set[Tuple[int, int]]:
+        return set(
+            EvaluationAssignment.objects.filter(campaign=self.campaign)
+            .values_list('evaluator_id', 'evaluatee_id')
+        )
+
+    def _stored_counts(self) -> Counter:
+        """Assignments of the campaign per relationship, with one grouped query."""
+        return Counter(dict(
+            EvaluationAssignment.objects.filter(campaign=self.campaign)
+            .order_by()
+            .values('relationship')
+            .annotate(count=Count('id'))
+            .values_list('relationship', 'count')
+        ))
+
+    def generate(self, dry_run: bool = False) -> AssignmentGenerationSummary:
+        """
+        Create missing assignments (or only count them when ``dry_run``).
+
+        Inserts bypass model signals; generated assignments start as pending.
+        Runs for the same campaign are serialized by a row lock on the campaign,
+        and ``created`` counts the rows that were actually inserted, so pairs
+        skipped by ``ignore_conflicts`` are reported as existing.
+        """
+        summary = AssignmentGenerationSummary(campaign_id=self.campaign.pk, dry_run=dry_run)
+        counts = Counter()
+        batch = []
+
+        with transaction.atomic():
+            if not dry_run:
+                EvaluationCampaign.objects.select_for_update().filter(pk=self.campaign.pk).first()
+                stored_before = self._stored_counts()
+            existing = self._existing_pairs()
+
+            for evaluator_id, evaluatee_id, relationship in self.iter_pairs():
+                if (evaluator_id, evaluatee_id) in existing:
+                    summary.skipped_existing += 1
+                    continue
+                counts[relationship] += 1
+                if dry_run:
+                    continue
+                batch.append(EvaluationAssignment(
+                    campaign=self.campaign,
+                    evaluator_id=evaluator_id,
+                    evaluatee_id=evaluatee_id,
+                    relationship=relationship,
+                ))
+                if len(batch) >= self.chunk_size:
+                    self._flush(batch)
+                    batch = []
+            if batch:
+                self._flush(batch)
+
+            if not dry_run:
+                planned = sum(counts.values())
+                counts = self._stored_counts() - stored_before
+                summary.skipped_existing += planned - sum(counts.values())
+
+        summary.by_relationship = dict(counts)
+        summary.created = sum(counts.values())
+        return summary
+
+    def _flush(self, batch: List[EvaluationAssignment]) -> None:
+        EvaluationAssignment.objects.bulk_create(batch, ignore_conflicts=True)
+        # Inserts bypass the assignment signals behind the evaluators' cached to-do figures
+        invalidate_user_dashboard_data({assignment.evaluator_id for assignment in batch}, CAMPAIGNS_TAG)
+
+
+def generate_campaign_assignments(
+    campaign: EvaluationCampaign,
+    dry_run: bool = False,
+    **options,
+) -> AssignmentGenerationSummary:
+    """
+    Convenience function to generate the assignment matrix for a campaign.
+
+    Args:
+        campaign: EvaluationCampaign instance
+        dry_run: Only count the assignments that would be created
+        **options: Extra AssignmentMatrixGenerator options
+
+    Returns:
+        AssignmentGenerationSummary
+    """
+    return AssignmentMatrixGenerator(campaign, **options).generate(dry_run=dry_run)
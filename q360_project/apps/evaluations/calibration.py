@@ -0,0 +1,161 @@
+"""
+Materialized calibration statistics for evaluation campaigns.
+
+The calibration dashboard summary (score histogram, per-department figures
+and percentiles) is derived from one grouped query over a campaign's results
+and cached per campaign. Every code path that writes results invalidates the
+cached summary once its transaction commits.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from .models import EvaluationResult
+
+
+CALIBRATION_STATS_CACHE_KEY = 'evaluations:calibration_stats:{campaign_id}'
+
+# (key, lower bound inclusive) in descending order; scores below the last bound fall into the last bucket
+SCORE_BUCKETS = (
+    ('excellent', Decimal('4.5')),
+    ('good', Decimal('3.5')),
+    ('average', Decimal('2.5')),
+    ('needs_improvement', None),
+)
+
+PERCENTILES = (25, 50, 75, 90)
+
+
+def _bucket_for(score: Decimal) -> str:
+    for key, lower_bound in SCORE_BUCKETS:
+        if lower_bound is None or score >= lower_bound:
+            return key
+    return SCORE_BUCKETS[-1][0]
+
+
+def _percentile(distribution: List[Tuple[Decimal, int]], total: int, percent: int) -> Optional[float]:
+    """
+    Linear-interpolated percentile (``percentile_cont`` semantics) over a
+    sorted ``(score, count)`` distribution.
+    """
+    if not total:
+        return None
+    rank = (total - 1) * percent / 100
+    lower_index = int(rank)
+    fraction = rank - lower_index
+
+    lower = upper = None
+    seen = 0
+    for score, count in distribution:
+        if lower is None and lower_index < seen + count:
+            lower = score
+        if lower_index + 1 < seen + count:
+            upper = score
+            break
+        seen += count
+    if upper is None:
+        upper = lower
+    return round(float(lower) + (float(upper) - float(lower)) * fraction, 2)
+
+
+def build_calibration_stats(campaign_id: int) -> Dict:
+    """
+    Compute the calibration summary of a campaign with one grouped query.
+
+    Results are grouped by department, exact score and finalization state,
+    which is enough to derive counts, averages, the histogram and percentiles
+    without further queries.
+    """
+    rows = (
+        EvaluationResult.objects.filter(campaign_id=campaign_id)
+        .order_by()
+        .values(
+            'evaluatee__department_id',
+            'evaluatee__department__name',
+            'evaluatee__department__is_active',
+            'overall_score',
+            'is_finalized',
+        )
+        .annotate(count=Count('id'))
+    )
+
+    total = finalized = scored = 0
+    score_sum = Decimal('0')
+    distribution = {key: 0 for key, _ in SCORE_BUCKETS}
+    score_counts: Dict[Decimal, int] = defaultdict(int)
+    departments: Dict[int, Dict] = {}
+
+    for row in rows:
+        count = row['count']
+        score = row['overall_score']
+        total += count
+        if row['is_finalized']:
+            finalized += count
+        if score is not None:
+            scored += count
+            score_sum += score * count
+            distribution[_bucket_for(score)] += count
+            score_counts[score] += count
+
+        department_id = row['evaluatee__department_id']
+        if department_id is None or not row['evaluatee__department__is_active']:
+            continue
+        department = departments.setdefault(department_id, {
+            'id': department_id,
+            'name': row['evaluatee__department__name'],
+            'count': 0,
+            'finalized': 0,
+            '_scored': 0,
+            '_score_sum': Decimal('0'),
+        })
+        department['count'] += count
+        if row['is_finalized']:
+            department['finalized'] += count
+        if score is not None:
+            department['_scored'] += count
+            department['_score_sum'] += score * count
+
+    dept_stats = []
+    for department in sorted(departments.values(), key=lambda item: item['name']):
+        dept_scored = department.pop('_scored')
+        dept_score_sum = department.pop('_score_sum')
+        department['avg_score'] = float(dept_score_sum / dept_scored) if dept_scored else None
+        dept_stats.append(department)
+
+    sorted_scores = sorted(score_counts.items())
+    return {
+        'stats': {
+            'total_evaluations': total,
+            'avg_score': float(score_sum / scored) if scored else None,
+            'finalized_count': finalized,
+            'pending_count': total - finalized,
+        },
+        'score_distribution': distribution,
+        'percentiles': {
+            f'p{percent}': _percentile(sorted_scores, scored, percent) for percent in PERCENTILES
+        },
+        'dept_stats': dept_stats,
+    }
+
+
+def get_calibration_stats(campaign_id: int) -> Dict:
+    """Return the cached calibration summary, building it on a cache miss."""
+    key = CALIBRATION_STATS_CACHE_KEY.format(campaign_id=campaign_id)
+    stats = cache.get(key)
+    if stats is None:
+        stats = build_calibration_stats(campaign_id)
+        cache.set(key, stats, settings.CALIBRATION_STATS_CACHE_TIMEOUT)
+    return stats
+
+
+def invalidate_calibration_stats(campaign_id: int) -> None:
+    """Drop the cached summary of a campaign once the current transaction commits."""
+    key = CALIBRATION_STATS_CACHE_KEY.format(campaign_id=campaign_id)
+    transaction.on_commit(lambda: cache.delete(key))
@@ -0,0 +1,51 @@
+"""
+Management command to generate the 360° assignment matrix for a campaign.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.evaluations.assignment_generator import generate_campaign_assignments
+from apps.evaluations.models import EvaluationCampaign
+
+
+class Command(BaseCommand):
+    help = 'Kampaniya üçün 360° qiymətləndirmə tapşırıqlarını toplu yaradır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('campaign_id', type=int, help='Kampaniya ID')
+        parser.add_argument('--organization', type=int, help='Yalnız bu təşkilatın işçiləri')
+        parser.add_argument('--dry-run', action='store_true', help='Yalnız sayları göstər')
+        parser.add_argument('--max-peers', type=int, default=3)
+        parser.add_argument('--max-subordinates', type=int, default=5)
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--no-self', action='store_true')
+        parser.add_argument('--no-supervisor', action='store_true')
+        parser.add_argument('--no-peers', action='store_true')
+        parser.add_argument('--no-subordinates', action='store_true')
+
+    def handle(self, *args, **options):
+        try:
+            campaign = EvaluationCampaign.objects.get(pk=options['campaign_id'])
+        except EvaluationCampaign.DoesNotExist:
+            raise CommandError(f"Kampaniya tapılmadı: {options['campaign_id']}")
+
+        summary = generate_campaign_assignments(
+            campaign,
+            dry_run=options['dry_run'],
+            organization=options['organization'],
+            include_self=not options['no_self'],
+            include_supervisor=not options['no_supervisor'],
+            include_peers=not options['no_peers'],
+            include_subordinates=not options['no_subordinates'],
+            max_peers=options['max_peers'],
+            max_subordinates=options['max_subordinates'],
+            chunk_size=options['chunk_size'],
+        )
+
+        for relationship, count in sorted(summary.by_relationship.items()):
+            self.stdout.write(f'  {relationship}: {count}')
+        self.stdout.write(f'  Mövcud (ötürüldü): {summary.skipped_existing}')
+
+        verb = 'yaradılacaq' if summary.dry_run else 'yaradıldı'
+        self.stdout.write(
+            self.style.SUCCESS(f'{summary.created} tapşırıq {verb} ({campaign.title})')
+        )
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.4 on 2026-10-17 11:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluations', '0005_evaluationcampaign_weight_peer_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingResultRecalculation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('requested_at', models.DateTimeField(verbose_name='Sorğu Vaxtı')),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pending_recalculations', to='evaluations.evaluationcampaign', verbose_name='Kampaniya')),
+                ('evaluatee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pending_result_recalculations', to=settings.AUTH_USER_MODEL, verbose_name='Qiymətləndirilən')),
+            ],
+            options={
+                'verbose_name': 'Gözləyən Nəticə Hesablaması',
+                'verbose_name_plural': 'Gözləyən Nəticə Hesablamaları',
+                'ordering': ['requested_at'],
+                'indexes': [models.Index(fields=['requested_at'], name='evaluations_request_e03308_idx')],
+                'unique_together': {('campaign', 'evaluatee')},
+            },
+        ),
+    ]
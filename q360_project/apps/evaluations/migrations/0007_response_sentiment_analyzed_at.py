@@ -0,0 +1,27 @@
+# Generated by Django 5.1.4 on 2026-10-17 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluations', '0006_pendingresultrecalculation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='response',
+            name='sentiment_analyzed_at',
+            field=models.DateTimeField(blank=True, help_text='Boşdursa, mətn toplu sentiment analizini gözləyir', null=True, verbose_name='Sentiment Analiz Vaxtı'),
+        ),
+        # Existing responses were analyzed by the per-response task
+        migrations.RunSQL(
+            "UPDATE evaluations_response SET sentiment_analyzed_at = updated_at;",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='response',
+            index=models.Index(condition=models.Q(('sentiment_analyzed_at__isnull', True)), fields=['id'], name='eval_resp_sentiment_pending'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluations', '0007_response_sentiment_analyzed_at'),
+    ]
+
+    operations = [
+        # Responses without text have nothing to analyze; drop them from the pending index
+        migrations.RunSQL(
+            "UPDATE evaluations_response SET sentiment_analyzed_at = updated_at "
+            "WHERE sentiment_analyzed_at IS NULL "
+            "AND COALESCE(text_answer, '') = '' AND COALESCE(comment, '') = '';",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
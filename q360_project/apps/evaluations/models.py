@@ -488,6 +488,12 @@ class Response(models.Model):
         default='neutral',
         verbose_name=_('Sentiment Kateqoriyası')
     )
+    sentiment_analyzed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_('Sentiment Analiz Vaxtı'),
+        help_text=_('Boşdursa, mətn toplu sentiment analizini gözləyir')
+    )
 
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
@@ -503,6 +509,11 @@ class Response(models.Model):
             models.Index(fields=['assignment']),  # For filtering by assignment
             models.Index(fields=['question']),    # For filtering by question
             models.Index(fields=['sentiment_category']),  # For sentiment analysis queries
+            models.Index(
+                fields=['id'],
+                name='eval_resp_sentiment_pending',
+                condition=models.Q(sentiment_analyzed_at__isnull=True),
+            ),  # Pending batch sentiment analysis
         ]
 
     def __str__(self):
@@ -612,88 +623,43 @@ class EvaluationResult(models.Model):
 
     def calculate_scores(self):
         """Calculate and update all scores for this result with weighted averages."""
-        from django.db.models import Avg
-        from decimal import Decimal
+        from .scoring import calculate_result_scores
 
-        assignments = EvaluationAssignment.objects.filter(
-            campaign=self.campaign,
-            evaluatee=self.evaluatee,
-            status='completed'
-        )
+        calculate_result_scores(self)
+
+
+class PendingResultRecalculation(models.Model):
+    """
+    Deduplicated marker for an evaluation result that needs recalculation.
+
+    Assignment completions only upsert a marker; a Celery worker drains the
+    markers in batches so bursts of submissions cause a single recompute.
+    """
+
+    campaign = models.ForeignKey(
+        EvaluationCampaign,
+        on_delete=models.CASCADE,
+        related_name='pending_recalculations',
+        verbose_name=_('Kampaniya')
+    )
+    evaluatee = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='pending_result_recalculations',
+        verbose_name=_('Qiymətləndirilən')
+    )
+    requested_at = models.DateTimeField(
+        verbose_name=_('Sorğu Vaxtı')
+    )
 
-        self.total_evaluators = assignments.count()
-
-        # Calculate scores by relationship
-        relationship_scores = {}
-        for relationship, field in [
-            ('self', 'self_score'),
-            ('supervisor', 'supervisor_score'),
-            ('peer', 'peer_score'),
-            ('subordinate', 'subordinate_score'),
-        ]:
-            rel_assignments = assignments.filter(relationship=relationship)
-            if rel_assignments.exists():
-                rel_scores = Response.objects.filter(
-                    assignment__in=rel_assignments,
-                    score__isnull=False
-                ).aggregate(avg_score=Avg('score'))
-                score = rel_scores['avg_score']
-                # IMPORTANT: Convert to Decimal to maintain precision
-                if score is not None:
-                    decimal_score = Decimal(str(score))
-                    setattr(self, field, decimal_score)
-                    relationship_scores[relationship] = decimal_score
-                else:
-                    setattr(self, field, None)
-                    relationship_scores[relationship] = Decimal('0')
-            else:
-                setattr(self, field, None)
-                relationship_scores[relationship] = Decimal('0')
-
-        # Calculate weighted overall score using campaign weights
-        # CRITICAL FIX: Properly normalize weights when some relationships are missing
-        weight_map = {
-            'self': self.campaign.weight_self,
-            'supervisor': self.campaign.weight_supervisor,
-            'peer': self.campaign.weight_peer,
-            'subordinate': self.campaign.weight_subordinate,
-        }
-
-        # Calculate total weight of relationships that actually have scores AND non-zero weights
-        total_weight_available = Decimal('0')
-        for relationship, score in relationship_scores.items():
-            if score > 0:  # Only count relationships with actual scores
-                weight = Decimal(str(weight_map[relationship]))
-                if weight > 0:  # Only count non-zero weights
-                    total_weight_available += weight
-
-        # Calculate weighted average with normalized weights
-        if total_weight_available > 0:
-            weighted_sum = Decimal('0')
-            for relationship, score in relationship_scores.items():
-                if score > 0:
-                    original_weight = Decimal(str(weight_map[relationship]))
-                    if original_weight > 0:  # Only include non-zero weights
-                        # Normalize weight: scale to 100%
-                        normalized_weight = (original_weight / total_weight_available) * Decimal('100')
-                        weighted_sum += score * normalized_weight
-
-            # Final score is weighted_sum / 100 (since weights are percentages)
-            self.overall_score = weighted_sum / Decimal('100')
-        else:
-            # Fallback to simple average if no scores available
-            all_scores = Response.objects.filter(
-                assignment__in=assignments,
-                score__isnull=False
-            ).aggregate(avg_score=Avg('score'))
-            self.overall_score = all_scores['avg_score']
-
-        # Calculate completion rate
-        total_expected = EvaluationAssignment.objects.filter(
-            campaign=self.campaign,
-            evaluatee=self.evaluatee
-        ).count()
-        if total_expected > 0:
-            self.completion_rate = (self.total_evaluators / total_expected) * 100
-
-        self.save()
+    class Meta:
+        verbose_name = _('Gözləyən Nəticə Hesablaması')
+        verbose_name_plural = _('Gözləyən Nəticə Hesablamaları')
+        unique_together = [['campaign', 'evaluatee']]
+        ordering = ['requested_at']
+        indexes = [
+            models.Index(fields=['requested_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.campaign_id}:{self.evaluatee_id} @ {self.requested_at}"
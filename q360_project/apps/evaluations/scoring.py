@@ -0,0 +1,355 @@
+"""
+Set-based scoring engine for evaluation results.
+
+Scores are aggregated with grouped queries (one pass per campaign, or per
+evaluatee) into running sums/counts, and the weighted overall score is then
+derived in memory. This replaces the per-relationship query fan-out that
+``EvaluationResult.calculate_scores`` used to perform.
+"""
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from apps.dashboard.stats_cache import GLOBAL_TAG, invalidate_user_dashboard_data
+
+from .calibration import invalidate_calibration_stats
+from .models import (
+    EvaluationAssignment,
+    EvaluationCampaign,
+    EvaluationResult,
+    PendingResultRecalculation,
+    Response,
+)
+
+logger = logging.getLogger(__name__)
+
+RECALC_SCHEDULED_CACHE_KEY = 'evaluations:result_recalc_scheduled'
+
+
+RELATIONSHIP_FIELDS = (
+    ('self', 'self_score'),
+    ('supervisor', 'supervisor_score'),
+    ('peer', 'peer_score'),
+    ('subordinate', 'subordinate_score'),
+)
+
+RESULT_SCORE_FIELDS = [
+    'overall_score',
+    'self_score',
+    'supervisor_score',
+    'peer_score',
+    'subordinate_score',
+    'total_evaluators',
+    'completion_rate',
+    'calculated_at',
+]
+
+
+def campaign_weights(campaign: EvaluationCampaign) -> Dict[str, Decimal]:
+    """Return relationship weights of a campaign as Decimals."""
+    return {
+        'self': Decimal(str(campaign.weight_self)),
+        'supervisor': Decimal(str(campaign.weight_supervisor)),
+        'peer': Decimal(str(campaign.weight_peer)),
+        'subordinate': Decimal(str(campaign.weight_subordinate)),
+    }
+
+
+@dataclass
+class ScoreAccumulator:
+    """
+    Running score sums/counts for a single evaluatee in a campaign.
+
+    Totals can be fed from grouped aggregates or added incrementally, and the
+    result fields are derived without touching the database again.
+    """
+
+    score_sums: Dict[str, int] = field(default_factory=dict)
+    score_counts: Dict[str, int] = field(default_factory=dict)
+    total_assignments: int = 0
+    completed_assignments: int = 0
+
+    def add(self, relationship: str, score_sum: int, score_count: int = 1) -> None:
+        """Add scored answers for a relationship type."""
+        if not score_count:
+            return
+        self.score_sums[relationship] = self.score_sums.get(relationship, 0) + (score_sum or 0)
+        self.score_counts[relationship] = self.score_counts.get(relationship, 0) + score_count
+
+    def relationship_average(self, relationship: str) -> Optional[Decimal]:
+        """Average score for a relationship type, or None without answers."""
+        count = self.score_counts.get(relationship)
+        if not count:
+            return None
+        # Mirror AVG() semantics of the database (float) before converting to Decimal
+        return Decimal(str(self.score_sums[relationship] / count))
+
+    def overall_average(self) -> Optional[float]:
+        """Plain average over every scored answer."""
+        count = sum(self.score_counts.values())
+        if not count:
+            return None
+        return sum(self.score_sums.values()) / count
+
+    def compute(self, weights: Dict[str, Decimal]) -> Dict:
+        """
+        Derive EvaluationResult field values.
+
+        Weights of relationships without scores (or with a zero weight) are
+        dropped and the remaining weights are normalized to 100%.
+        """
+        values = {}
+        relationship_scores = {}
+        for relationship, field_name in RELATIONSHIP_FIELDS:
+            score = self.relationship_average(relationship)
+            values[field_name] = score
+            relationship_scores[relationship] = score if score is not None else Decimal('0')
+
+        total_weight_available = sum(
+            (weights[relationship] for relationship, score in relationship_scores.items()
+             if score > 0 and weights[relationship] > 0),
+            Decimal('0'),
+        )
+
+        if total_weight_available > 0:
+            weighted_sum = Decimal('0')
+            for relationship, score in relationship_scores.items():
+                weight = weights[relationship]
+                if score > 0 and weight > 0:
+                    normalized_weight = (weight / total_weight_available) * Decimal('100')
+                    weighted_sum += score * normalized_weight
+            values['overall_score'] = weighted_sum / Decimal('100')
+        else:
+            values['overall_score'] = self.overall_average()
+
+        values['total_evaluators'] = self.completed_assignments
+        if self.total_assignments > 0:
+            values['completion_rate'] = (self.completed_assignments / self.total_assignments) * 100
+
+        return values
+
+
+def _completed_score_totals(**filters):
+    """Grouped score sums/counts over completed assignments."""
+    return (
+        Response.objects.filter(
+            assignment__status='completed',
+            score__isnull=False,
+            **filters,
+        )
+        .order_by()
+        .values('assignment__evaluatee_id', 'assignment__relationship')
+        .annotate(score_sum=Sum('score'), score_count=Count('score'))
+    )
+
+
+def _assignment_totals(**filters):
+    """Grouped total/completed assignment counts per evaluatee."""
+    return (
+        EvaluationAssignment.objects.filter(**filters)
+        .order_by()
+        .values('evaluatee_id')
+        .annotate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(status='completed')),
+        )
+    )
+
+
+def build_accumulator(campaign: EvaluationCampaign, evaluatee) -> ScoreAccumulator:
+    """Collect running totals for one evaluatee with two grouped queries."""
+    evaluatee_id = getattr(evaluatee, 'pk', evaluatee)
+    accumulator = ScoreAccumulator()
+
+    for row in _completed_score_totals(
+        assignment__campaign=campaign,
+        assignment__evaluatee_id=evaluatee_id,
+    ):
+        accumulator.add(row['assignment__relationship'], row['score_sum'], row['score_count'])
+
+    for row in _assignment_totals(campaign=campaign, evaluatee_id=evaluatee_id):
+        accumulator.total_assignments = row['total']
+        accumulator.completed_assignments = row['completed']
+
+    return accumulator
+
+
+def calculate_result_scores(result: EvaluationResult, save: bool = True) -> EvaluationResult:
+    """Recalculate a single result incrementally from grouped totals."""
+    accumulator = build_accumulator(result.campaign, result.evaluatee_id)
+    for field_name, value in accumulator.compute(campaign_weights(result.campaign)).items():
+        setattr(result, field_name, value)
+    if save:
+        result.save()
+    return result
+
+
+def recalculate_evaluatee(campaign: EvaluationCampaign, evaluatee) -> EvaluationResult:
+    """Get or create the result for an evaluatee and refresh its scores."""
+    result, _ = EvaluationResult.objects.get_or_create(
+        campaign=campaign,
+        evaluatee_id=getattr(evaluatee, 'pk', evaluatee),
+    )
+    result.campaign = campaign
+    return calculate_result_scores(result)
+
+
+@transaction.atomic
+def recalculate_campaign_results(
+    campaign: EvaluationCampaign,
+    evaluatee_ids: Optional[Iterable[int]] = None,
+    batch_size: int = 1000,
+) -> int:
+    """
+    Recalculate every result of a campaign in one grouped aggregate pass.
+
+    Results are created for evaluatees with at least one completed assignment
+    and refreshed for evaluatees that already have a result. All rows are
+    written with a single upsert per batch.
+
+    Returns:
+        int: Number of results written.
+    """
+    filters = {}
+    if evaluatee_ids is not None:
+        evaluatee_ids = list(evaluatee_ids)
+        filters['evaluatee_id__in'] = evaluatee_ids
+
+    accumulators: Dict[int, ScoreAccumulator] = {}
+
+    response_filters = {f'assignment__{key}': value for key, value in filters.items()}
+    for row in _completed_score_totals(assignment__campaign=campaign, **response_filters):
+        accumulators.setdefault(row['assignment__evaluatee_id'], ScoreAccumulator()).add(
+            row['assignment__relationship'], row['score_sum'], row['score_count']
+        )
+
+    for row in _assignment_totals(campaign=campaign, **filters):
+        if not row['completed'] and row['evaluatee_id'] not in accumulators:
+            continue
+        accumulator = accumulators.setdefault(row['evaluatee_id'], ScoreAccumulator())
+        accumulator.total_assignments = row['total']
+        accumulator.completed_assignments = row['completed']
+
+    # Existing results keep their completion rate when no assignments remain
+    existing_rates = dict(
+        EvaluationResult.objects.filter(campaign=campaign, **filters)
+        .values_list('evaluatee_id', 'completion_rate')
+    )
+    for evaluatee_id in existing_rates:
+        accumulators.setdefault(evaluatee_id, ScoreAccumulator())
+
+    weights = campaign_weights(campaign)
+    now = timezone.now()
+    results = []
+    for evaluatee_id, accumulator in accumulators.items():
+        values = accumulator.compute(weights)
+        values.setdefault('completion_rate', existing_rates.get(evaluatee_id, 0))
+        results.append(EvaluationResult(
+            campaign=campaign,
+            evaluatee_id=evaluatee_id,
+            created_at=now,
+            **values,
+        ))
+
+    if results:
+        EvaluationResult.objects.bulk_create(
+            results,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['campaign', 'evaluatee'],
+            update_fields=RESULT_SCORE_FIELDS,
+        )
+        invalidate_calibration_stats(campaign.pk)
+        # The upsert bypasses the result signals
+        invalidate_user_dashboard_data(accumulators, GLOBAL_TAG, departments=True)
+    return len(results)
+
+
+# ==================== Recalculation queue ====================
+
+def mark_result_dirty(campaign_id: int, evaluatee_id: int) -> None:
+    """
+    Queue a result for recalculation and schedule a debounced drain.
+
+    The marker is upserted, so repeated completions for the same evaluatee
+    collapse into one row; only the first call within a debounce window
+    schedules the worker. Markers whose drain was never sent (e.g. a lost
+    on-commit callback or an evicted debounce flag) are picked up by the
+    periodic run in ``CELERY_BEAT_SCHEDULE``.
+    """
+    PendingResultRecalculation.objects.bulk_create(
+        [PendingResultRecalculation(
+            campaign_id=campaign_id,
+            evaluatee_id=evaluatee_id,
+            requested_at=timezone.now(),
+        )],
+        update_conflicts=True,
+        unique_fields=['campaign', 'evaluatee'],
+        update_fields=['requested_at'],
+    )
+
+    debounce = settings.EVALUATION_RECALC_DEBOUNCE_SECONDS
+    if cache.add(RECALC_SCHEDULED_CACHE_KEY, True, timeout=max(debounce * 2, 60)):
+        transaction.on_commit(lambda: _schedule_drain(debounce))
+
+
+def _schedule_drain(countdown: int) -> None:
+    """Send the drain task, falling back to a synchronous drain without Celery."""
+    try:
+        from .tasks import process_pending_result_recalculations
+        process_pending_result_recalculations.apply_async(countdown=countdown)
+    except Exception as exc:
+        logger.warning(f"Could not schedule result recalculation task, draining inline: {exc}")
+        cache.delete(RECALC_SCHEDULED_CACHE_KEY)
+        drain_pending_recalculations()
+
+
+def drain_pending_recalculations(batch_size: Optional[int] = None) -> Dict[str, int]:
+    """
+    Recalculate one batch of queued results, grouped per campaign.
+
+    Markers are removed only if they were not re-queued while the batch was
+    being processed, so completions arriving mid-drain are never lost.
+
+    Returns:
+        dict: ``processed`` markers, ``results`` written and ``remaining`` markers.
+    """
+    batch_size = batch_size or settings.EVALUATION_RECALC_BATCH_SIZE
+    markers = list(
+        PendingResultRecalculation.objects.order_by('requested_at')
+        .values_list('pk', 'campaign_id', 'evaluatee_id', 'requested_at')[:batch_size]
+    )
+    if not markers:
+        return {'processed': 0, 'results': 0, 'remaining': 0}
+
+    by_campaign = defaultdict(list)
+    for _, campaign_id, evaluatee_id, _ in markers:
+        by_campaign[campaign_id].append(evaluatee_id)
+
+    campaigns = EvaluationCampaign.objects.in_bulk(list(by_campaign))
+    results = 0
+    for campaign_id, evaluatee_ids in by_campaign.items():
+        campaign = campaigns.get(campaign_id)
+        if campaign is not None:
+            results += recalculate_campaign_results(campaign, evaluatee_ids)
+
+    stale = Q()
+    for pk, _, _, requested_at in markers:
+        stale |= Q(pk=pk, requested_at=requested_at)
+    PendingResultRecalculation.objects.filter(stale).delete()
+
+    return {
+        'processed': len(markers),
+        'results': results,
+        'remaining': PendingResultRecalculation.objects.count(),
+    }
@@ -120,6 +120,32 @@ class ResponseSerializer(serializers.ModelSerializer):
         return data
 
 
+class BulkResponseItemSerializer(serializers.Serializer):
+    """A single answer in a bulk response submission."""
+
+    question = serializers.IntegerField()
+    score = serializers.IntegerField(required=False, allow_null=True)
+    boolean_answer = serializers.BooleanField(required=False, allow_null=True)
+    text_answer = serializers.CharField(required=False, allow_blank=True)
+    comment = serializers.CharField(required=False, allow_blank=True)
+
+
+class BulkResponseSubmitSerializer(serializers.Serializer):
+    """Payload for submitting all answers of an assignment at once."""
+
+    assignment = serializers.PrimaryKeyRelatedField(
+        queryset=EvaluationAssignment.objects.select_related('campaign')
+    )
+    responses = BulkResponseItemSerializer(many=True)
+    complete = serializers.BooleanField(default=True)
+
+    def validate_responses(self, value):
+        question_ids = [item['question'] for item in value]
+        if len(question_ids) != len(set(question_ids)):
+            raise serializers.ValidationError("Hər sual yalnız bir dəfə cavablandırıla bilər.")
+        return value
+
+
 class EvaluationAssignmentSerializer(serializers.ModelSerializer):
     """Serializer for EvaluationAssignment model."""
 
@@ -1,26 +1,55 @@
 """
 Signal handlers for evaluations app.
 """
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
+from django.utils import timezone
 from .models import EvaluationAssignment, EvaluationResult, Response
 
 
 @receiver(post_save, sender=EvaluationAssignment)
 def update_result_on_completion(sender, instance, **kwargs):
-    """Update evaluation result when assignment is completed."""
+    """Queue the evaluatee's result for a debounced recalculation on completion."""
     if instance.status == 'completed':
-        result, created = EvaluationResult.objects.get_or_create(
-            campaign=instance.campaign,
-            evaluatee=instance.evaluatee
-        )
-        result.calculate_scores()
+        from .scoring import mark_result_dirty
+
+        mark_result_dirty(instance.campaign_id, instance.evaluatee_id)
+
+
+@receiver(post_save, sender=EvaluationResult)
+@receiver(post_delete, sender=EvaluationResult)
+def invalidate_calibration_on_result_change(sender, instance, **kwargs):
+    """Drop the campaign's cached calibration summary when a result changes."""
+    from .calibration import invalidate_calibration_stats
+
+    invalidate_calibration_stats(instance.campaign_id)
+
+
+def _updates_sentiment_only(update_fields):
+    return bool(update_fields) and 'sentiment_score' in update_fields
+
+
+@receiver(pre_save, sender=Response)
+def mark_sentiment_pending(sender, instance, **kwargs):
+    """
+    Flag responses with text for the next batch sentiment run.
+
+    Responses without text are stamped as analyzed so they never sit in the
+    pending index. The flag is written by the same save, so no extra query
+    is needed.
+    """
+    if _updates_sentiment_only(kwargs.get('update_fields')):
+        return
+    if instance.text_answer or instance.comment:
+        instance.sentiment_analyzed_at = None
+    elif instance.sentiment_analyzed_at is None:
+        instance.sentiment_analyzed_at = timezone.now()
 
 
 @receiver(post_save, sender=Response)
 def trigger_sentiment_analysis(sender, instance, created, **kwargs):
     """
-    Trigger asynchronous sentiment analysis when a Response is created or updated.
+    Schedule batched sentiment analysis when a Response with text is saved.
 
     Args:
         sender: The Response model class
@@ -29,40 +58,15 @@ def trigger_sentiment_analysis(sender, instance, created, **kwargs):
         **kwargs: Additional keyword arguments
 
     Note:
-        - Uses Celery task to analyze sentiment asynchronously
+        - Responses are analyzed in chunks by a debounced Celery task, so a
+          submitted form triggers one batch instead of one task per answer
         - Only triggers if there's text to analyze (text_answer or comment)
-        - Avoids infinite loops by checking if sentiment was just updated
-        - Disabled if Celery/Redis is not available (development mode)
+        - Skips saves that only update sentiment fields
+        - Falls back to synchronous analysis if Celery/Redis is not available
     """
-    # Check if the update is specifically for sentiment fields to avoid infinite recursion
-    update_fields = kwargs.get('update_fields')
-    if update_fields and 'sentiment_score' in update_fields:
-        # Skip if this save is updating sentiment fields (to avoid infinite recursion)
+    if _updates_sentiment_only(kwargs.get('update_fields')):
         return
 
-    # Check if there's any text to analyze
-    has_text = bool(instance.text_answer or instance.comment)
-
-    # Only trigger analysis if there's text
-    if has_text:
-        try:
-            # Import task here to avoid circular imports
-            from .tasks import analyze_sentiment_task
-            # Trigger the Celery task asynchronously
-            analyze_sentiment_task.delay(instance.pk)
-        except Exception as e:
-            # If Celery/Redis is not available, perform sync analysis
-            from apps.sentiment_analysis.services import analyze_text
-            from django.db import transaction
-
-            text_to_analyze = instance.text_answer.strip() if instance.text_answer else ""
-            if not text_to_analyze and instance.comment:
-                text_to_analyze = instance.comment.strip()
-
-            if text_to_analyze:
-                score, category = analyze_text(text_to_analyze)
-                # Use update_queryset to avoid triggering the signal again
-                Response.objects.filter(pk=instance.pk).update(
-                    sentiment_score=score,
-                    sentiment_category=category
-                )
+    if instance.text_answer or instance.comment:
+        from apps.sentiment_analysis.services import queue_sentiment_analysis
+        queue_sentiment_analysis()
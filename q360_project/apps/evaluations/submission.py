@@ -0,0 +1,232 @@
+"""
+Bulk submission of evaluation form responses.
+
+All answers of a form are validated up front and written with a single
+``bulk_create(update_conflicts=True)`` upsert, so a submission costs a fixed
+number of queries regardless of the number of questions. Sentiment analysis
+is not run per answer; changed texts are flagged for the batch job instead.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.dashboard.stats_cache import invalidate_user_dashboard_data
+
+from .models import CampaignQuestion, EvaluationAssignment, Question, Response
+
+
+RESPONSE_ANSWER_FIELDS = ['score', 'boolean_answer', 'text_answer', 'comment']
+
+REQUIRED_ANSWER_MESSAGE = 'Bu sual cavablandırılmalıdır.'
+
+
+@dataclass
+class SubmissionResult:
+    """Outcome of a bulk response submission."""
+
+    assignment_id: int
+    saved: int = 0
+    completed: bool = False
+    errors: Dict[int, str] = field(default_factory=dict)
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.errors
+
+    def as_dict(self) -> Dict:
+        return {
+            'assignment_id': self.assignment_id,
+            'saved': self.saved,
+            'completed': self.completed,
+            'errors': {str(question_id): error for question_id, error in self.errors.items()},
+        }
+
+
+def campaign_questions(campaign) -> List[Question]:
+    """Questions of a campaign in form order."""
+    return [
+        cq.question for cq in CampaignQuestion.objects.filter(campaign=campaign)
+        .select_related('question', 'question__category')
+        .order_by('order')
+    ]
+
+
+def parse_form_answers(questions: Iterable[Question], data: Mapping) -> Dict[int, Dict]:
+    """
+    Extract answers from evaluation form POST data.
+
+    Field names follow the ``question_<id>_<score|boolean|text|comment>``
+    convention of the assignment form template. Empty inputs are omitted.
+    """
+    answers = {}
+    for question in questions:
+        prefix = f'question_{question.id}'
+        answer = {}
+        if question.question_type == 'scale':
+            score = data.get(f'{prefix}_score')
+            if score:
+                answer['score'] = score
+        elif question.question_type == 'boolean':
+            boolean_answer = data.get(f'{prefix}_boolean')
+            if boolean_answer is not None:
+                answer['boolean_answer'] = boolean_answer == 'true'
+        elif question.question_type == 'text':
+            text_answer = data.get(f'{prefix}_text')
+            if text_answer:
+                answer['text_answer'] = text_answer
+
+        comment = data.get(f'{prefix}_comment')
+        if comment:
+            answer['comment'] = comment
+        answers[question.id] = answer
+    return answers
+
+
+def _clean_answer(question: Question, answer: Mapping, require: bool = True) -> Dict:
+    """
+    Validate a single answer against its question.
+
+    Raises:
+        ValueError: With a user-facing message
+    """
+    cleaned = {}
+    if answer.get('score') not in (None, ''):
+        try:
+            score = int(answer['score'])
+        except (TypeError, ValueError):
+            raise ValueError('Bal tam ədəd olmalıdır.')
+        if not 1 <= score <= question.max_score:
+            raise ValueError(f'Bal 1 ilə {question.max_score} arasında olmalıdır.')
+        cleaned['score'] = score
+
+    if answer.get('boolean_answer') is not None:
+        cleaned['boolean_answer'] = bool(answer['boolean_answer'])
+
+    for text_field in ('text_answer', 'comment'):
+        value = answer.get(text_field)
+        if value:
+            cleaned[text_field] = str(value).strip()
+
+    if require and question.is_required:
+        missing = (
+            (question.question_type == 'scale' and 'score' not in cleaned)
+            or (question.question_type == 'boolean' and 'boolean_answer' not in cleaned)
+            or (question.question_type == 'text' and not cleaned.get('text_answer'))
+        )
+        if missing:
+            raise ValueError(REQUIRED_ANSWER_MESSAGE)
+
+    return cleaned
+
+
+def submit_responses(
+    assignment: EvaluationAssignment,
+    answers: Mapping[int, Mapping],
+    questions: Optional[List[Question]] = None,
+    complete: bool = True,
+) -> SubmissionResult:
+    """
+    Validate and save all answers of an evaluation form at once.
+
+    Nothing is written when any answer is invalid. Existing responses are
+    updated in place; fields left empty in the submission keep their
+    previous value. Only responses whose text changed are re-queued for
+    sentiment analysis.
+
+    Args:
+        assignment: Assignment being filled in
+        answers: Mapping of question id to answer fields (``score``,
+            ``boolean_answer``, ``text_answer``, ``comment``)
+        questions: Campaign questions (loaded when omitted)
+        complete: Validate required questions and mark the assignment as
+            completed; otherwise only the given answers are saved as a draft
+
+    Returns:
+        SubmissionResult with per-question errors
+    """
+    if questions is None:
+        questions = campaign_questions(assignment.campaign)
+    questions_by_id = {question.id: question for question in questions}
+    result = SubmissionResult(assignment_id=assignment.pk)
+
+    for question_id in answers:
+        if question_id not in questions_by_id:
+            result.errors[question_id] = 'Sual bu kampaniyaya aid deyil.'
+
+    cleaned_answers = {}
+    for question in questions:
+        if question.id not in answers and not complete:
+            continue
+        try:
+            # Drafts may leave required questions unanswered
+            cleaned_answers[question.id] = _clean_answer(
+                question, answers.get(question.id) or {}, require=complete
+            )
+        except ValueError as exc:
+            result.errors[question.id] = str(exc)
+
+    if not result.is_valid:
+        return result
+
+    existing = {
+        response.question_id: response
+        for response in Response.objects.filter(
+            assignment=assignment, question_id__in=list(cleaned_answers)
+        )
+    }
+
+    responses = []
+    for question_id, cleaned in cleaned_answers.items():
+        previous = existing.get(question_id)
+        # Fresh instances so the upsert conflicts on (assignment, question), not on pk
+        response = Response(assignment=assignment, question_id=question_id)
+        if previous is not None:
+            for field_name in RESPONSE_ANSWER_FIELDS + ['sentiment_analyzed_at']:
+                setattr(response, field_name, getattr(previous, field_name))
+        for field_name, value in cleaned.items():
+            setattr(response, field_name, value)
+
+        has_text = bool(response.text_answer or response.comment)
+        text_changed = previous is None or (
+            (response.text_answer, response.comment) != (previous.text_answer, previous.comment)
+        )
+        if has_text and text_changed:
+            response.sentiment_analyzed_at = None
+        elif not has_text and response.sentiment_analyzed_at is None:
+            # Nothing to analyze; keep it out of the pending index
+            response.sentiment_analyzed_at = timezone.now()
+        responses.append(response)
+
+    with transaction.atomic():
+        Response.objects.bulk_create(
+            responses,
+            update_conflicts=True,
+            unique_fields=['assignment', 'question'],
+            update_fields=RESPONSE_ANSWER_FIELDS + ['sentiment_analyzed_at', 'updated_at'],
+        )
+        result.saved = len(responses)
+        # The upsert bypasses the response signals; answers feed the evaluatee's score distribution
+        invalidate_user_dashboard_data([assignment.evaluatee_id])
+
+        if any(
+            response.sentiment_analyzed_at is None and (response.text_answer or response.comment)
+            for response in responses
+        ):
+            from apps.sentiment_analysis.services import queue_sentiment_analysis
+            queue_sentiment_analysis()
+
+        if complete:
+            assignment.status = 'completed'
+            assignment.completed_at = timezone.now()
+            assignment.save()
+        elif assignment.status == 'pending':
+            assignment.status = 'in_progress'
+            assignment.started_at = assignment.started_at or timezone.now()
+            assignment.save()
+        result.completed = assignment.status == 'completed'
+
+    return result
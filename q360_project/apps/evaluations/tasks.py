@@ -5,6 +5,7 @@ Includes asynchronous sentiment analysis for responses.
 import logging
 from celery import shared_task
 from django.db import transaction
+from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +34,7 @@ def analyze_sentiment_task(self, response_id):
             }
     """
     from apps.evaluations.models import Response
-    from apps.sentiment_analysis.services import analyze_text
+    from apps.sentiment_analysis.services import analyze_texts, response_text
 
     try:
         logger.info(f"Starting sentiment analysis for Response ID: {response_id}")
@@ -50,25 +51,25 @@ def analyze_sentiment_task(self, response_id):
             }
 
         # Get the text to analyze (prioritize text_answer, fallback to comment)
-        text_to_analyze = response.text_answer.strip() if response.text_answer else ""
-
-        if not text_to_analyze and response.comment:
-            text_to_analyze = response.comment.strip()
+        text_to_analyze = response_text(response.text_answer, response.comment)
 
         # If there's no text, set neutral sentiment
         if not text_to_analyze:
             logger.debug(f"No text found for Response ID {response_id}, setting neutral")
             score, category = 0.0, 'neutral'
         else:
-            # Perform sentiment analysis
-            score, category = analyze_text(text_to_analyze)
+            # Shared analyzer + content-hash cache
+            score, category = analyze_texts([text_to_analyze])[0]
 
         # Update the response with sentiment data using atomic transaction
         # Use update_fields to avoid triggering the post_save signal again (preventing loops)
         with transaction.atomic():
             response.sentiment_score = score
             response.sentiment_category = category
-            response.save(update_fields=['sentiment_score', 'sentiment_category', 'updated_at'])
+            response.sentiment_analyzed_at = timezone.now()
+            response.save(update_fields=[
+                'sentiment_score', 'sentiment_category', 'sentiment_analyzed_at', 'updated_at'
+            ])
 
         logger.info(
             f"Sentiment analysis complete for Response ID {response_id}: "
@@ -90,3 +91,76 @@ def analyze_sentiment_task(self, response_id):
         )
         # Retry the task
         raise self.retry(exc=exc)
+
+
+@shared_task(
+    bind=True,
+    max_retries=3,
+    default_retry_delay=60,
+    autoretry_for=(Exception,)
+)
+def process_pending_result_recalculations(self, batch_size=None):
+    """
+    Drain queued result recalculations in batches.
+
+    Scheduled (debounced) by ``mark_result_dirty`` and periodically by Celery
+    Beat as a fallback; reschedules itself while markers remain so large
+    backlogs are processed in bounded chunks.
+
+    Args:
+        batch_size: Maximum markers processed per run (defaults to settings)
+
+    Returns:
+        dict: Processed markers, written results and remaining markers
+    """
+    from django.core.cache import cache
+    from apps.evaluations.scoring import (
+        RECALC_SCHEDULED_CACHE_KEY,
+        drain_pending_recalculations,
+    )
+
+    # Allow completions arriving from now on to schedule a follow-up run
+    cache.delete(RECALC_SCHEDULED_CACHE_KEY)
+
+    stats = drain_pending_recalculations(batch_size)
+    logger.info(
+        f"Processed {stats['processed']} queued result recalculations, "
+        f"{stats['remaining']} remaining"
+    )
+
+    if stats['remaining']:
+        process_pending_result_recalculations.apply_async(kwargs={'batch_size': batch_size})
+
+    return stats
+
+
+@shared_task(
+    bind=True,
+    max_retries=3,
+    default_retry_delay=60,
+    autoretry_for=(Exception,)
+)
+def analyze_pending_sentiment_task(self, batch_size=None):
+    """
+    Analyze every pending Response in chunks with the shared VADER analyzer.
+
+    Scheduled (debounced) by the Response post_save signal.
+
+    Args:
+        batch_size: Responses per chunk (defaults to settings)
+
+    Returns:
+        dict: Number of analyzed responses
+    """
+    from django.core.cache import cache
+    from apps.sentiment_analysis.services import (
+        SENTIMENT_BATCH_SCHEDULED_CACHE_KEY,
+        analyze_pending_responses,
+    )
+
+    # Allow responses saved from now on to schedule a follow-up run
+    cache.delete(SENTIMENT_BATCH_SCHEDULED_CACHE_KEY)
+
+    analyzed = analyze_pending_responses(batch_size)
+    logger.info(f"Batch sentiment analysis complete: {analyzed} responses")
+    return {'success': True, 'analyzed': analyzed}
@@ -24,6 +24,9 @@ from .forms import (
     EvaluationCampaignForm, QuestionForm, QuestionCategoryForm,
     ResponseForm, BulkAssignmentForm, CampaignQuestionForm
 )
+from .scoring import recalculate_campaign_results
+from .assignment_generator import generate_campaign_assignments
+from .submission import parse_form_answers, submit_responses
 from apps.accounts.models import User
 
 
@@ -140,6 +143,12 @@ def campaign_activate(request, pk):
     campaign.save()
     messages.success(request, f'{campaign.title} kampaniyası aktivləşdirildi.')
 
+    # Build the 360° matrix on first activation (or when explicitly requested)
+    generate = request.POST.get('generate_assignments')
+    if generate in ('true', '1', 'on') or (generate is None and not campaign.assignments.exists()):
+        summary = generate_campaign_assignments(campaign)
+        messages.info(request, f'{summary.created} qiymətləndirmə tapşırığı yaradıldı.')
+
     return redirect('evaluations:campaign-detail', pk=pk)
 
 
@@ -154,6 +163,7 @@ def campaign_complete(request, pk):
 
     campaign.status = 'completed'
     campaign.save()
+    recalculate_campaign_results(campaign)
     messages.success(request, f'{campaign.title} kampaniyası tamamlandı.')
 
     return redirect('evaluations:campaign-detail', pk=pk)
@@ -289,56 +299,23 @@ def assignment_detail(request, pk):
     }
 
     if request.method == 'POST':
-        # Process form submission
-        all_valid = True
-
-        for question in questions:
-            response = existing_responses.get(question.id)
-            if not response:
-                response = Response(assignment=assignment, question=question)
-
-            # Get form data based on question type
-            if question.question_type == 'scale':
-                score = request.POST.get(f'question_{question.id}_score')
-                if score:
-                    response.score = int(score)
-                elif question.is_required:
-                    all_valid = False
-                    messages.error(request, f'Sual "{question.text[:50]}..." cavablandırılmalıdır.')
-
-            elif question.question_type == 'boolean':
-                bool_answer = request.POST.get(f'question_{question.id}_boolean')
-                if bool_answer is not None:
-                    response.boolean_answer = bool_answer == 'true'
-                elif question.is_required:
-                    all_valid = False
-                    messages.error(request, f'Sual "{question.text[:50]}..." cavablandırılmalıdır.')
-
-            elif question.question_type == 'text':
-                text_answer = request.POST.get(f'question_{question.id}_text')
-                if text_answer:
-                    response.text_answer = text_answer
-                elif question.is_required:
-                    all_valid = False
-                    messages.error(request, f'Sual "{question.text[:50]}..." cavablandırılmalıdır.')
-
-            # Get comment
-            comment = request.POST.get(f'question_{question.id}_comment')
-            if comment:
-                response.comment = comment
-
-            if all_valid or not question.is_required:
-                response.save()
-
-        if all_valid:
-            # Mark assignment as completed
-            assignment.status = 'completed'
-            assignment.completed_at = timezone.now()
-            assignment.save()
+        # Validate every answer first, then save them in one upsert
+        result = submit_responses(
+            assignment,
+            parse_form_answers(questions, request.POST),
+            questions=questions,
+        )
 
+        if result.is_valid:
             messages.success(request, 'Qiymətləndirmə uğurla təqdim edildi!')
             return redirect('evaluations:my-assignments')
 
+        questions_by_id = {question.id: question for question in questions}
+        for question_id, error in result.errors.items():
+            question = questions_by_id.get(question_id)
+            label = f'Sual "{question.text[:50]}..."' if question else f'Sual #{question_id}'
+            messages.error(request, f'{label}: {error}')
+
     # Calculate progress
     total_questions = len(questions)
     answered_questions = len(existing_responses)
@@ -846,58 +823,14 @@ def bulk_assign(request):
             include_peers = form.cleaned_data['include_peers']
             include_subordinates = form.cleaned_data['include_subordinates']
 
-            created_count = 0
-            users = User.objects.filter(is_active=True)
-
-            for user in users:
-                # Self evaluation
-                if include_self:
-                    EvaluationAssignment.objects.get_or_create(
-                        campaign=campaign,
-                        evaluator=user,
-                        evaluatee=user,
-                        defaults={'relationship': 'self'}
-                    )
-                    created_count += 1
-
-                # Supervisor evaluation
-                if include_supervisor and user.supervisor:
-                    EvaluationAssignment.objects.get_or_create(
-                        campaign=campaign,
-                        evaluator=user.supervisor,
-                        evaluatee=user,
-                        defaults={'relationship': 'supervisor'}
-                    )
-                    created_count += 1
-
-                # Peer evaluations
-                if include_peers and user.department:
-                    peers = User.objects.filter(
-                        department=user.department,
-                        is_active=True
-                    ).exclude(id=user.id)[:3]  # Limit to 3 peers
-
-                    for peer in peers:
-                        EvaluationAssignment.objects.get_or_create(
-                            campaign=campaign,
-                            evaluator=peer,
-                            evaluatee=user,
-                            defaults={'relationship': 'peer'}
-                        )
-                        created_count += 1
-
-                # Subordinate evaluations
-                if include_subordinates:
-                    subordinates = user.get_subordinates()[:5]  # Limit to 5
-
-                    for sub in subordinates:
-                        EvaluationAssignment.objects.get_or_create(
-                            campaign=campaign,
-                            evaluator=sub,
-                            evaluatee=user,
-                            defaults={'relationship': 'subordinate'}
-                        )
-                        created_count += 1
+            summary = generate_campaign_assignments(
+                campaign,
+                include_self=include_self,
+                include_supervisor=include_supervisor,
+                include_peers=include_peers,
+                include_subordinates=include_subordinates,
+            )
+            created_count = summary.created
 
             messages.success(request, f'{created_count} tapşırıq yaradıldı.')
             return redirect('evaluations:campaign-detail', pk=campaign.pk)
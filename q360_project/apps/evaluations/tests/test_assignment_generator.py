@@ -0,0 +1,153 @@
+"""
+Tests for the bulk 360° assignment generator.
+"""
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.departments.models import Department, Organization
+from apps.evaluations.assignment_generator import (
+    AssignmentMatrixGenerator, generate_campaign_assignments
+)
+from apps.evaluations.models import EvaluationAssignment, EvaluationCampaign
+
+
+class AssignmentGeneratorTests(TestCase):
+    """Test assignment matrix generation."""
+
+    def setUp(self):
+        self.organization = Organization.objects.create(
+            name='Generator Organization', short_name='GEN', code='GEN'
+        )
+        self.root = Department.objects.create(
+            organization=self.organization, name='Root', code='ROOT'
+        )
+        self.dept_a = Department.objects.create(
+            organization=self.organization, name='A', code='A', parent=self.root
+        )
+        self.dept_b = Department.objects.create(
+            organization=self.organization, name='B', code='B', parent=self.root
+        )
+
+        self.manager = User.objects.create_user(
+            username='gen_manager', password='test123', role='manager', department=self.root
+        )
+        self.team_a = [
+            User.objects.create_user(
+                username=f'gen_a_{i}', password='test123',
+                department=self.dept_a, supervisor=self.manager
+            )
+            for i in range(4)
+        ]
+        self.loner = User.objects.create_user(
+            username='gen_b_0', password='test123', department=self.dept_b, supervisor=self.manager
+        )
+        User.objects.create_user(
+            username='gen_inactive', password='test123', department=self.dept_a, is_active=False
+        )
+
+        self.campaign = EvaluationCampaign.objects.create(
+            title='Generator Campaign',
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=30),
+            created_by=self.manager
+        )
+
+    def test_generates_full_matrix(self):
+        """Every active employee gets self, supervisor, peer and subordinate evaluators."""
+        summary = generate_campaign_assignments(self.campaign, organization=self.organization)
+
+        self.assertEqual(summary.created, EvaluationAssignment.objects.filter(campaign=self.campaign).count())
+        self.assertEqual(summary.by_relationship['self'], 6)
+        self.assertEqual(summary.by_relationship['supervisor'], 5)
+        self.assertEqual(summary.by_relationship['subordinate'], 5)
+
+        member = self.team_a[0]
+        received = EvaluationAssignment.objects.filter(campaign=self.campaign, evaluatee=member)
+        self.assertEqual(received.get(relationship='supervisor').evaluator, self.manager)
+        self.assertEqual(received.filter(relationship='peer').count(), 3)
+        self.assertFalse(received.filter(evaluator__is_active=False).exists())
+
+        # The only member of department B borrows peers from sibling department A
+        loner_peers = EvaluationAssignment.objects.filter(
+            campaign=self.campaign, evaluatee=self.loner, relationship='peer'
+        )
+        self.assertEqual(loner_peers.count(), 3)
+        self.assertTrue(all(a.evaluator.department_id == self.dept_a.pk for a in loner_peers))
+
+    def test_peer_workload_is_rotated(self):
+        """Each department colleague evaluates the same number of peers."""
+        generate_campaign_assignments(
+            self.campaign, organization=self.organization,
+            include_self=False, include_supervisor=False, include_subordinates=False
+        )
+        given = [
+            EvaluationAssignment.objects.filter(
+                campaign=self.campaign, evaluator=member, evaluatee__department=self.dept_a
+            ).count()
+            for member in self.team_a
+        ]
+        self.assertEqual(given, [3, 3, 3, 3])
+
+    def test_dry_run_does_not_write(self):
+        """Dry runs only count the assignments that would be created."""
+        summary = generate_campaign_assignments(self.campaign, dry_run=True)
+
+        self.assertTrue(summary.dry_run)
+        self.assertGreater(summary.created, 0)
+        self.assertFalse(EvaluationAssignment.objects.filter(campaign=self.campaign).exists())
+
+    def test_rerun_is_idempotent(self):
+        """A second run skips existing pairs and creates nothing."""
+        first = generate_campaign_assignments(self.campaign)
+        second = generate_campaign_assignments(self.campaign)
+
+        self.assertEqual(second.created, 0)
+        self.assertEqual(second.skipped_existing, first.created)
+        self.assertEqual(
+            EvaluationAssignment.objects.filter(campaign=self.campaign).count(), first.created
+        )
+
+    def test_query_count_independent_of_population(self):
+        """Generation cost does not grow with the number of employees."""
+        generator = AssignmentMatrixGenerator(self.campaign, organization=self.organization)
+        # campaign lock + counts before/after + existing pairs + users + departments
+        # + savepoint/insert/release
+        with self.assertNumQueries(9):
+            generator.generate()
+
+    def test_pairs_inserted_concurrently_are_not_counted_as_created(self):
+        """Rows skipped by ignore_conflicts count as existing, not created."""
+        EvaluationAssignment.objects.create(
+            campaign=self.campaign, evaluator=self.manager, evaluatee=self.loner, relationship='supervisor'
+        )
+        generator = AssignmentMatrixGenerator(self.campaign, organization=self.organization)
+        # As if the row was committed by another run after the existing pairs were read
+        with patch.object(generator, '_existing_pairs', return_value=set()):
+            summary = generator.generate()
+
+        total = EvaluationAssignment.objects.filter(campaign=self.campaign).count()
+        self.assertEqual(summary.created, total - 1)
+        self.assertEqual(summary.skipped_existing, 1)
+        self.assertEqual(summary.by_relationship['supervisor'], 4)
+
+    def test_api_accepts_organization_id_as_string(self):
+        """Form-encoded and JSON string organization IDs limit the evaluatees."""
+        other = Organization.objects.create(name='Other Organization', short_name='OTH', code='OTH')
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='gen_admin', password='x', role='admin'))
+        url = reverse('evaluations:campaign-api-generate-assignments', kwargs={'pk': self.campaign.pk})
+
+        response = client.post(url, {'organization': str(other.pk)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 0)
+
+        response = client.post(url, {'organization': str(self.organization.pk), 'dry_run': 'true'})
+        self.assertGreater(response.json()['created'], 0)
+
+        response = client.post(url, {'organization': 'abc'}, format='json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,169 @@
+"""
+Tests for bulk evaluation form submission.
+"""
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.evaluations.models import (
+    CampaignQuestion, EvaluationAssignment, EvaluationCampaign, Question,
+    QuestionCategory, Response
+)
+from apps.evaluations.scoring import RECALC_SCHEDULED_CACHE_KEY
+from apps.evaluations.submission import submit_responses
+from apps.sentiment_analysis.services import SENTIMENT_BATCH_SCHEDULED_CACHE_KEY
+
+
+class BulkResponseSubmissionTests(TestCase):
+    """Test validating and upserting a whole evaluation form."""
+
+    def setUp(self):
+        cache.delete(RECALC_SCHEDULED_CACHE_KEY)
+        cache.delete(SENTIMENT_BATCH_SCHEDULED_CACHE_KEY)
+        self.evaluator = User.objects.create_user(username='bulk_evaluator', password='test123')
+        self.evaluatee = User.objects.create_user(username='bulk_evaluatee', password='test123')
+        self.campaign = EvaluationCampaign.objects.create(
+            title='Bulk Campaign',
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=30),
+            status='active',
+            created_by=self.evaluator,
+        )
+        category = QuestionCategory.objects.create(name='Bulk Category')
+        self.scale_questions = []
+        for i in range(20):
+            question = Question.objects.create(category=category, text=f'Scale question {i}')
+            CampaignQuestion.objects.create(campaign=self.campaign, question=question, order=i)
+            self.scale_questions.append(question)
+        self.text_question = Question.objects.create(
+            category=category, text='Text question', question_type='text', is_required=False
+        )
+        CampaignQuestion.objects.create(campaign=self.campaign, question=self.text_question, order=99)
+        self.assignment = EvaluationAssignment.objects.create(
+            campaign=self.campaign,
+            evaluator=self.evaluator,
+            evaluatee=self.evaluatee,
+            relationship='peer',
+        )
+
+    def full_answers(self, score=4):
+        answers = {question.id: {'score': score} for question in self.scale_questions}
+        answers[self.text_question.id] = {'text_answer': 'Very supportive colleague'}
+        return answers
+
+    def test_submission_upserts_all_answers(self):
+        """All answers are saved and the assignment is completed."""
+        with patch('apps.evaluations.scoring._schedule_drain'), \
+                patch('apps.sentiment_analysis.services._schedule_batch'):
+            result = submit_responses(self.assignment, self.full_answers())
+
+        self.assertTrue(result.is_valid)
+        self.assertEqual(result.saved, 21)
+        self.assertTrue(result.completed)
+        self.assertEqual(Response.objects.filter(assignment=self.assignment).count(), 21)
+        self.assertTrue(
+            Response.objects.filter(
+                question=self.text_question, sentiment_analyzed_at__isnull=True
+            ).exists()
+        )
+        # Score-only answers have nothing to analyze and never wait in the pending index
+        self.assertFalse(
+            Response.objects.filter(
+                question__in=self.scale_questions, sentiment_analyzed_at__isnull=True
+            ).exists()
+        )
+        self.assignment.refresh_from_db()
+        self.assertEqual(self.assignment.status, 'completed')
+
+    def test_resubmission_updates_in_place(self):
+        """A second submission updates existing rows and keeps untouched fields."""
+        with patch('apps.evaluations.scoring._schedule_drain'), \
+                patch('apps.sentiment_analysis.services._schedule_batch'):
+            submit_responses(self.assignment, self.full_answers(score=2))
+            Response.objects.filter(question=self.text_question).update(
+                sentiment_analyzed_at=self.campaign.created_at, comment='Keep me'
+            )
+            submit_responses(self.assignment, self.full_answers(score=5))
+
+        self.assertEqual(Response.objects.filter(assignment=self.assignment).count(), 21)
+        self.assertEqual(
+            set(Response.objects.filter(question__in=self.scale_questions).values_list('score', flat=True)),
+            {5}
+        )
+        text_response = Response.objects.get(question=self.text_question)
+        self.assertEqual(text_response.comment, 'Keep me')
+        # Unchanged text is not re-queued for sentiment analysis
+        self.assertIsNotNone(text_response.sentiment_analyzed_at)
+
+    def test_invalid_answers_report_errors_and_write_nothing(self):
+        """Per-question errors are returned and no response is saved."""
+        answers = self.full_answers()
+        answers[self.scale_questions[0].id] = {'score': 9}
+        del answers[self.scale_questions[1].id]
+        answers[123456] = {'score': 3}
+
+        result = submit_responses(self.assignment, answers)
+
+        self.assertFalse(result.is_valid)
+        self.assertEqual(
+            set(result.errors), {self.scale_questions[0].id, self.scale_questions[1].id, 123456}
+        )
+        self.assertFalse(Response.objects.filter(assignment=self.assignment).exists())
+        self.assignment.refresh_from_db()
+        self.assertEqual(self.assignment.status, 'pending')
+
+    def test_query_count_independent_of_question_count(self):
+        """Saving a form costs a fixed number of queries."""
+        answers = self.full_answers()
+        questions = [cq.question for cq in CampaignQuestion.objects.filter(campaign=self.campaign)]
+        with patch('apps.evaluations.scoring._schedule_drain'), \
+                patch('apps.sentiment_analysis.services._schedule_batch'):
+            # existing responses + savepoint/upsert/release + assignment update,
+            # its history row and the recalculation marker upsert
+            with self.assertNumQueries(7):
+                submit_responses(self.assignment, answers, questions=questions)
+
+    def test_form_view_submits_in_bulk(self):
+        """The assignment form view saves through the bulk path."""
+        self.client.login(username='bulk_evaluator', password='test123')
+        data = {f'question_{question.id}_score': '3' for question in self.scale_questions}
+        data[f'question_{self.text_question.id}_text'] = 'Great collaboration'
+
+        with patch('apps.sentiment_analysis.services._schedule_batch') as schedule:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    reverse('evaluations:assignment-detail', kwargs={'pk': self.assignment.pk}), data
+                )
+
+        self.assertRedirects(response, reverse('evaluations:my-assignments'), fetch_redirect_response=False)
+        self.assertEqual(Response.objects.filter(assignment=self.assignment).count(), 21)
+        self.assertEqual(schedule.call_count, 1)
+
+    def test_api_bulk_submit(self):
+        """The API endpoint returns per-question errors keyed by question id."""
+        client = APIClient()
+        client.force_authenticate(self.evaluator)
+        url = reverse('evaluations:response-api-bulk-submit')
+        payload = {
+            'assignment': self.assignment.pk,
+            'responses': [{'question': self.scale_questions[0].id, 'score': 0}],
+            'complete': False,
+        }
+
+        response = client.post(url, payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(self.scale_questions[0].id), response.json()['errors'])
+
+        payload['responses'][0]['score'] = 4
+        with patch('apps.sentiment_analysis.services._schedule_batch'):
+            response = client.post(url, payload, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['saved'], 1)
+        self.assertFalse(response.json()['completed'])
+        self.assignment.refresh_from_db()
+        self.assertEqual(self.assignment.status, 'in_progress')
@@ -0,0 +1,121 @@
+"""
+Tests for materialized calibration statistics.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.accounts.models import User
+from apps.departments.models import Department, Organization
+from apps.evaluations.calibration import (
+    CALIBRATION_STATS_CACHE_KEY, build_calibration_stats, get_calibration_stats
+)
+from apps.evaluations.models import EvaluationCampaign, EvaluationResult
+
+
+class CalibrationStatsTests(TestCase):
+    """Test the cached per-campaign calibration summary."""
+
+    def setUp(self):
+        organization = Organization.objects.create(
+            name='Calibration Organization', short_name='CAL', code='CAL'
+        )
+        self.departments = [
+            Department.objects.create(organization=organization, name=f'Dept {i}', code=f'CAL{i}')
+            for i in range(3)
+        ]
+        self.admin = User.objects.create_user(
+            username='calibration_admin', password='test123', role='admin'
+        )
+        self.campaign = EvaluationCampaign.objects.create(
+            title='Calibration Stats Campaign',
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=30),
+            created_by=self.admin,
+        )
+        cache.delete(CALIBRATION_STATS_CACHE_KEY.format(campaign_id=self.campaign.id))
+
+        scores = ['4.80', '4.00', '3.00', '2.00', '3.00', '1.50']
+        for i, score in enumerate(scores):
+            evaluatee = User.objects.create_user(
+                username=f'calibration_user_{i}', password='test123',
+                department=self.departments[i % 3]
+            )
+            EvaluationResult.objects.create(
+                campaign=self.campaign,
+                evaluatee=evaluatee,
+                overall_score=Decimal(score),
+                is_finalized=i < 2,
+            )
+
+    def test_summary_matches_results(self):
+        """Counts, histogram, department figures and percentiles are derived correctly."""
+        with self.assertNumQueries(1):
+            summary = build_calibration_stats(self.campaign.id)
+
+        self.assertEqual(summary['stats'], {
+            'total_evaluations': 6,
+            'avg_score': 3.05,
+            'finalized_count': 2,
+            'pending_count': 4,
+        })
+        self.assertEqual(summary['score_distribution'], {
+            'excellent': 1, 'good': 1, 'average': 2, 'needs_improvement': 2,
+        })
+        self.assertEqual(summary['percentiles']['p50'], 3.0)
+        self.assertEqual(summary['percentiles']['p25'], 2.25)
+        self.assertEqual(summary['percentiles']['p90'], 4.4)
+
+        dept_stats = {dept['name']: dept for dept in summary['dept_stats']}
+        self.assertEqual(dept_stats['Dept 0']['count'], 2)
+        self.assertEqual(dept_stats['Dept 0']['avg_score'], 3.4)
+        self.assertEqual(dept_stats['Dept 0']['finalized'], 1)
+
+    def test_summary_is_cached_and_invalidated(self):
+        """The summary is served from cache until a result changes."""
+        get_calibration_stats(self.campaign.id)
+        with self.assertNumQueries(0):
+            get_calibration_stats(self.campaign.id)
+
+        result = EvaluationResult.objects.filter(campaign=self.campaign).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            result.is_finalized = True
+            result.save()
+
+        self.assertIsNone(cache.get(CALIBRATION_STATS_CACHE_KEY.format(campaign_id=self.campaign.id)))
+
+    def test_dashboard_query_count_independent_of_departments(self):
+        """Adding departments does not add dashboard queries."""
+        self.client.login(username='calibration_admin', password='test123')
+        url = reverse('evaluations:calibration-dashboard', kwargs={'campaign_id': self.campaign.id})
+        cache_key = CALIBRATION_STATS_CACHE_KEY.format(campaign_id=self.campaign.id)
+
+        cache.delete(cache_key)
+        with CaptureQueriesContext(connection) as before:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['dept_stats']), 3)
+
+        organization = self.departments[0].organization
+        for i in range(3, 8):
+            department = Department.objects.create(
+                organization=organization, name=f'Dept {i}', code=f'CAL{i}'
+            )
+            EvaluationResult.objects.create(
+                campaign=self.campaign,
+                evaluatee=User.objects.create_user(
+                    username=f'calibration_extra_{i}', password='test123', department=department
+                ),
+                overall_score=Decimal('3.50'),
+            )
+
+        cache.delete(cache_key)
+        with CaptureQueriesContext(connection) as after:
+            response = self.client.get(url)
+        self.assertEqual(len(response.context['dept_stats']), 8)
+        self.assertEqual(len(after.captured_queries), len(before.captured_queries))
@@ -0,0 +1,123 @@
+"""
+Tests for the debounced evaluation result recalculation queue.
+"""
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.evaluations.models import (
+    EvaluationAssignment, EvaluationCampaign, EvaluationResult,
+    PendingResultRecalculation, Question, QuestionCategory, Response
+)
+from apps.evaluations.scoring import (
+    RECALC_SCHEDULED_CACHE_KEY, drain_pending_recalculations, mark_result_dirty
+)
+from apps.evaluations.tasks import process_pending_result_recalculations
+
+
+class ResultRecalculationQueueTests(TestCase):
+    """Test coalescing of result recalculations."""
+
+    def setUp(self):
+        cache.delete(RECALC_SCHEDULED_CACHE_KEY)
+        self.evaluatee = User.objects.create_user(username='queue_evaluatee', password='test123')
+        self.evaluators = [
+            User.objects.create_user(username=f'queue_evaluator_{i}', password='test123')
+            for i in range(3)
+        ]
+        self.campaign = EvaluationCampaign.objects.create(
+            title='Queue Campaign',
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=30),
+            status='active',
+            created_by=self.evaluatee,
+        )
+        category = QuestionCategory.objects.create(name='Queue Category')
+        self.question = Question.objects.create(category=category, text='Queue question')
+
+    def complete_assignment(self, evaluator, score):
+        assignment = EvaluationAssignment.objects.create(
+            campaign=self.campaign,
+            evaluator=evaluator,
+            evaluatee=self.evaluatee,
+            relationship='peer',
+        )
+        Response.objects.create(assignment=assignment, question=self.question, score=score)
+        assignment.status = 'completed'
+        assignment.completed_at = timezone.now()
+        assignment.save()
+        return assignment
+
+    def test_completions_are_coalesced_into_one_marker(self):
+        """A burst of completions leaves a single marker and schedules one drain."""
+        with patch('apps.evaluations.scoring._schedule_drain') as schedule:
+            with self.captureOnCommitCallbacks(execute=True):
+                for evaluator, score in zip(self.evaluators, [3, 4, 5]):
+                    self.complete_assignment(evaluator, score)
+
+        self.assertEqual(schedule.call_count, 1)
+        self.assertEqual(
+            PendingResultRecalculation.objects.filter(
+                campaign=self.campaign, evaluatee=self.evaluatee
+            ).count(),
+            1
+        )
+        self.assertFalse(EvaluationResult.objects.filter(evaluatee=self.evaluatee).exists())
+
+    def test_drain_recalculates_and_clears_markers(self):
+        """Draining computes the result once and removes the marker."""
+        with patch('apps.evaluations.scoring._schedule_drain'):
+            for evaluator, score in zip(self.evaluators, [3, 4, 5]):
+                self.complete_assignment(evaluator, score)
+
+        stats = drain_pending_recalculations()
+
+        self.assertEqual(stats, {'processed': 1, 'results': 1, 'remaining': 0})
+        result = EvaluationResult.objects.get(campaign=self.campaign, evaluatee=self.evaluatee)
+        self.assertEqual(float(result.peer_score), 4.0)
+        self.assertEqual(result.total_evaluators, 3)
+        self.assertFalse(PendingResultRecalculation.objects.exists())
+
+    def test_requeued_marker_survives_drain(self):
+        """A marker refreshed while a batch runs is kept for the next drain."""
+        with patch('apps.evaluations.scoring._schedule_drain'):
+            self.complete_assignment(self.evaluators[0], 4)
+
+            def requeue(*args, **kwargs):
+                mark_result_dirty(self.campaign.pk, self.evaluatee.pk)
+                return 1
+
+            with patch('apps.evaluations.scoring.recalculate_campaign_results', side_effect=requeue):
+                stats = drain_pending_recalculations()
+
+        self.assertEqual(stats['remaining'], 1)
+        self.assertTrue(PendingResultRecalculation.objects.exists())
+
+    def test_scheduled_task_drains_queue(self):
+        """The Celery task (eager in tests) drains the queue after commit."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.complete_assignment(self.evaluators[0], 5)
+
+        result = EvaluationResult.objects.get(campaign=self.campaign, evaluatee=self.evaluatee)
+        self.assertEqual(float(result.overall_score), 5.0)
+        self.assertFalse(PendingResultRecalculation.objects.exists())
+
+    def test_periodic_run_drains_stranded_markers(self):
+        """Markers whose drain was never sent are processed by the beat-scheduled run."""
+        with patch('apps.evaluations.scoring._schedule_drain'):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.complete_assignment(self.evaluators[0], 4)
+        self.assertTrue(PendingResultRecalculation.objects.exists())
+
+        schedule = settings.CELERY_BEAT_SCHEDULE['process-pending-result-recalculations']
+        self.assertEqual(schedule['task'], process_pending_result_recalculations.name)
+
+        stats = process_pending_result_recalculations.apply().get()
+        self.assertEqual(stats['processed'], 1)
+        self.assertFalse(PendingResultRecalculation.objects.exists())
+        self.assertIsNone(cache.get(RECALC_SCHEDULED_CACHE_KEY))
@@ -3,6 +3,7 @@ Comprehensive Tests for Evaluation Scoring Logic.
 Tests weighted averages, decimal precision, and edge cases.
 """
 from django.test import TestCase
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from decimal import Decimal
 from datetime import date, timedelta
@@ -13,6 +14,9 @@ from apps.evaluations.models import (
     EvaluationCampaign, QuestionCategory, Question,
     EvaluationAssignment, Response, EvaluationResult
 )
+from apps.evaluations.scoring import (
+    RECALC_SCHEDULED_CACHE_KEY, calculate_result_scores, recalculate_campaign_results
+)
 
 
 class WeightValidationTests(TestCase):
@@ -399,3 +403,125 @@ class ScoringCalculationTests(TestCase):
         expected_score = Decimal('4.60')
         self.assertIsNotNone(result.overall_score, "Overall score should not be None")
         self.assertAlmostEqual(float(result.overall_score), float(expected_score), places=2)
+
+
+class CampaignScoringEngineTests(TestCase):
+    """Test the grouped, campaign-wide scoring engine."""
+
+    def setUp(self):
+        """Set up a campaign with several evaluatees."""
+        self.department = Department.objects.create(
+            organization=Organization.objects.create(
+                name='Engine Organization',
+                short_name='ENG-ORG',
+                code='ENG'
+            ),
+            name='Engine Dept',
+            code='ENG'
+        )
+        self.users = [
+            User.objects.create_user(
+                username=f'engine_user_{i}',
+                email=f'engine{i}@test.com',
+                password='test123',
+                department=self.department
+            )
+            for i in range(4)
+        ]
+        self.campaign = EvaluationCampaign.objects.create(
+            title='Engine Campaign',
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=30),
+            status='active',
+            created_by=self.users[0]
+        )
+        category = QuestionCategory.objects.create(name='Engine Category', order=1)
+        self.questions = [
+            Question.objects.create(category=category, text=f'Engine question {i}', order=i)
+            for i in range(2)
+        ]
+
+    def add_evaluation(self, evaluator, evaluatee, relationship, scores, status='completed'):
+        """Create an assignment with one response per score, completing it afterwards."""
+        assignment = EvaluationAssignment.objects.create(
+            campaign=self.campaign,
+            evaluator=evaluator,
+            evaluatee=evaluatee,
+            relationship=relationship,
+        )
+        for question, score in zip(self.questions, scores):
+            Response.objects.create(assignment=assignment, question=question, score=score)
+        if status != 'pending':
+            EvaluationAssignment.objects.filter(pk=assignment.pk).update(status=status)
+        return assignment
+
+    def build_matrix(self):
+        first, second, third, fourth = self.users
+        self.add_evaluation(first, first, 'self', [4, 5])
+        self.add_evaluation(second, first, 'supervisor', [3, 4])
+        self.add_evaluation(third, first, 'peer', [5, 5])
+        self.add_evaluation(fourth, first, 'peer', [2, 3], status='pending')
+        self.add_evaluation(second, second, 'self', [5, 5])
+        self.add_evaluation(first, second, 'subordinate', [1, 2])
+        self.add_evaluation(first, third, 'peer', [4, 4], status='pending')
+
+    def test_campaign_pass_matches_single_result_calculation(self):
+        """Grouped recalculation yields the same values as calculate_scores."""
+        self.build_matrix()
+        written = recalculate_campaign_results(self.campaign)
+        self.assertEqual(written, 2)
+
+        for evaluatee in self.users[:2]:
+            stored = EvaluationResult.objects.get(campaign=self.campaign, evaluatee=evaluatee)
+            expected = EvaluationResult(campaign=self.campaign, evaluatee=evaluatee)
+            calculate_result_scores(expected, save=False)
+
+            for field in ('overall_score', 'self_score', 'supervisor_score',
+                          'peer_score', 'subordinate_score', 'completion_rate'):
+                expected_value = getattr(expected, field)
+                stored_value = getattr(stored, field)
+                if expected_value is None:
+                    self.assertIsNone(stored_value, field)
+                else:
+                    self.assertAlmostEqual(float(stored_value), float(expected_value), places=2)
+            self.assertEqual(stored.total_evaluators, expected.total_evaluators)
+
+        first_result = EvaluationResult.objects.get(campaign=self.campaign, evaluatee=self.users[0])
+        self.assertEqual(float(first_result.completion_rate), 75.0)
+        self.assertFalse(
+            EvaluationResult.objects.filter(campaign=self.campaign, evaluatee=self.users[2]).exists()
+        )
+
+    def test_campaign_pass_query_count_is_constant(self):
+        """Query count does not grow with the number of evaluatees."""
+        self.build_matrix()
+        # savepoint + 3 aggregate reads + 1 upsert + release
+        with self.assertNumQueries(6):
+            recalculate_campaign_results(self.campaign)
+
+    def test_campaign_pass_preserves_finalization(self):
+        """Upserting scores leaves finalization state untouched."""
+        self.build_matrix()
+        result = EvaluationResult.objects.create(
+            campaign=self.campaign,
+            evaluatee=self.users[0],
+            is_finalized=True
+        )
+        recalculate_campaign_results(self.campaign)
+
+        result.refresh_from_db()
+        self.assertTrue(result.is_finalized)
+        self.assertIsNotNone(result.overall_score)
+
+    def test_signal_recalculates_single_evaluatee(self):
+        """Completing an assignment refreshes the evaluatee's result."""
+        cache.delete(RECALC_SCHEDULED_CACHE_KEY)
+        assignment = self.add_evaluation(self.users[1], self.users[0], 'supervisor', [4, 4], status='pending')
+        assignment.status = 'completed'
+        with self.captureOnCommitCallbacks(execute=True):
+            assignment.save()
+
+        result = EvaluationResult.objects.get(campaign=self.campaign, evaluatee=self.users[0])
+        self.assertEqual(float(result.supervisor_score), 4.0)
+        self.assertEqual(float(result.overall_score), 4.0)
+        self.assertEqual(result.total_evaluators, 1)
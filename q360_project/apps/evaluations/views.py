@@ -15,11 +15,21 @@ from .models import (
 from .serializers import (
     EvaluationCampaignSerializer, QuestionCategorySerializer,
     QuestionSerializer, EvaluationAssignmentSerializer,
-    ResponseSerializer, EvaluationResultSerializer
+    ResponseSerializer, EvaluationResultSerializer, BulkResponseSubmitSerializer
 )
+from .scoring import recalculate_campaign_results
+from .assignment_generator import generate_campaign_assignments
+from .submission import submit_responses
 from apps.accounts.permissions import IsSuperAdminOrAdmin
 
 
+def _as_bool(value):
+    """Interpret JSON booleans and form-encoded strings alike."""
+    if isinstance(value, str):
+        return value.strip().lower() in {'true', '1', 'yes', 'on'}
+    return bool(value)
+
+
 class EvaluationCampaignViewSet(viewsets.ModelViewSet):
     """ViewSet for managing evaluation campaigns."""
 
@@ -42,13 +52,59 @@ class EvaluationCampaignViewSet(viewsets.ModelViewSet):
         campaign = self.get_object()
         campaign.status = 'active'
         campaign.save()
-        return Response({'detail': 'Kampaniya aktivləşdirildi.'})
+
+        # Build the 360° matrix on first activation (or when explicitly requested)
+        generate = request.data.get('generate_assignments')
+        if generate is None:
+            generate = not campaign.assignments.exists()
+        else:
+            generate = _as_bool(generate)
+        summary = generate_campaign_assignments(campaign) if generate else None
+
+        return Response({
+            'detail': 'Kampaniya aktivləşdirildi.',
+            'assignments': summary.as_dict() if summary else None,
+        })
+
+    @action(detail=True, methods=['post'])
+    def generate_assignments(self, request, pk=None):
+        """Generate missing assignments; pass ``dry_run`` to only count them."""
+        campaign = self.get_object()
+        if not request.user.is_admin():
+            return Response(
+                {'detail': 'Bu əməliyyatı yerinə yetirmək icazəniz yoxdur.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        options = {
+            key: _as_bool(request.data[key])
+            for key in ('include_self', 'include_supervisor', 'include_peers', 'include_subordinates')
+            if key in request.data
+        }
+        organization = request.data.get('organization') or None
+        if organization is not None:
+            try:
+                organization = int(organization)
+            except (TypeError, ValueError):
+                return Response(
+                    {'organization': 'Təşkilat ID-si tam ədəd olmalıdır.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        summary = generate_campaign_assignments(
+            campaign,
+            dry_run=_as_bool(request.data.get('dry_run', False)),
+            organization=organization,
+            **options
+        )
+        return Response(summary.as_dict())
 
     @action(detail=True, methods=['post'])
     def complete(self, request, pk=None):
         campaign = self.get_object()
         campaign.status = 'completed'
         campaign.save()
+        recalculate_campaign_results(campaign)
         return Response({'detail': 'Kampaniya tamamlandı.'})
 
 
@@ -105,6 +161,30 @@ class ResponseViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['assignment', 'question']
 
+    @action(detail=False, methods=['post'], url_path='bulk-submit')
+    def bulk_submit(self, request):
+        """Validate and save every answer of an assignment in one request."""
+        serializer = BulkResponseSubmitSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        assignment = serializer.validated_data['assignment']
+
+        if assignment.evaluator_id != request.user.pk and not request.user.is_admin():
+            return Response(
+                {'detail': 'Bu qiymətləndirməyə giriş icazəniz yoxdur.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        answers = {
+            item['question']: item for item in serializer.validated_data['responses']
+        }
+        result = submit_responses(
+            assignment, answers, complete=serializer.validated_data['complete']
+        )
+        return Response(
+            result.as_dict(),
+            status=status.HTTP_200_OK if result.is_valid else status.HTTP_400_BAD_REQUEST
+        )
+
 
 class EvaluationResultViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = EvaluationResult.objects.select_related('campaign', 'evaluatee')
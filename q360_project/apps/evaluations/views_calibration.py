@@ -11,7 +11,9 @@ from django.db.models import Avg, Count, Q
 from decimal import Decimal
 
 from .models import EvaluationCampaign, EvaluationResult
+from .calibration import get_calibration_stats, invalidate_calibration_stats
 from apps.accounts.models import User
+from apps.dashboard.stats_cache import GLOBAL_TAG, invalidate_user_dashboard_data
 
 
 @login_required
@@ -30,37 +32,12 @@ def calibration_dashboard(request, campaign_id):
         campaign=campaign
     ).select_related('evaluatee', 'evaluatee__department').order_by('-overall_score')
 
-    # Calculate statistics
-    stats = {
-        'total_evaluations': results.count(),
-        'avg_score': results.aggregate(Avg('overall_score'))['overall_score__avg'],
-        'finalized_count': results.filter(is_finalized=True).count(),
-        'pending_count': results.filter(is_finalized=False).count(),
-    }
-
-    # Score distribution
-    score_distribution = {
-        'excellent': results.filter(overall_score__gte=4.5).count(),
-        'good': results.filter(overall_score__gte=3.5, overall_score__lt=4.5).count(),
-        'average': results.filter(overall_score__gte=2.5, overall_score__lt=3.5).count(),
-        'needs_improvement': results.filter(overall_score__lt=2.5).count(),
-    }
-
-    # Department breakdown (if admin)
-    dept_stats = []
-    if request.user.is_admin:
-        from apps.departments.models import Department
-        departments = Department.objects.filter(is_active=True)
-
-        for dept in departments:
-            dept_results = results.filter(evaluatee__department=dept)
-            if dept_results.exists():
-                dept_stats.append({
-                    'name': dept.name,
-                    'count': dept_results.count(),
-                    'avg_score': dept_results.aggregate(Avg('overall_score'))['overall_score__avg'],
-                    'finalized': dept_results.filter(is_finalized=True).count(),
-                })
+    # Statistics, score distribution and department breakdown come from the
+    # cached per-campaign summary (one grouped query on a cache miss)
+    calibration_stats = get_calibration_stats(campaign.id)
+    stats = calibration_stats['stats']
+    score_distribution = calibration_stats['score_distribution']
+    dept_stats = calibration_stats['dept_stats'] if request.user.is_admin else []
 
     context = {
         'campaign': campaign,
@@ -68,6 +45,7 @@ def calibration_dashboard(request, campaign_id):
         'stats': stats,
         'score_distribution': score_distribution,
         'dept_stats': dept_stats,
+        'percentiles': calibration_stats['percentiles'],
     }
 
     return render(request, 'evaluations/calibration/dashboard.html', context)
@@ -232,10 +210,13 @@ def bulk_finalize(request, campaign_id):
             is_finalized=False
         )
 
+        evaluatee_ids = list(results.values_list('evaluatee_id', flat=True))
         count = results.update(
             is_finalized=True,
             finalized_at=timezone.now()
         )
+        invalidate_calibration_stats(campaign.id)
+        invalidate_user_dashboard_data(evaluatee_ids, GLOBAL_TAG, departments=True)
 
         return JsonResponse({
             'success': True,
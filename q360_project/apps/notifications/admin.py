@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Notification, EmailTemplate, EmailLog
+from .counters import invalidate_unread_counts
+from .models import BroadcastNotification, Notification, EmailTemplate, EmailLog
 
 
 @admin.register(Notification)
@@ -11,7 +12,9 @@ class NotificationAdmin(admin.ModelAdmin):
 
     def mark_as_read(self, request, queryset):
         """Bulk mark notifications as read."""
+        user_ids = list(queryset.values_list('user_id', flat=True).distinct())
         updated = queryset.update(is_read=True)
+        invalidate_unread_counts(user_ids)
         self.message_user(
             request,
             f'{updated} bildiriş oxunmuş kimi qeyd edildi.',
@@ -21,7 +24,9 @@ class NotificationAdmin(admin.ModelAdmin):
 
     def mark_as_unread(self, request, queryset):
         """Bulk mark notifications as unread."""
+        user_ids = list(queryset.values_list('user_id', flat=True).distinct())
         updated = queryset.update(is_read=False)
+        invalidate_unread_counts(user_ids)
         self.message_user(
             request,
             f'{updated} bildiriş oxunmamış kimi qeyd edildi.',
@@ -75,3 +80,11 @@ class EmailLogAdmin(admin.ModelAdmin):
     list_filter = ['status', 'created_at', 'sent_at']
     search_fields = ['recipient_email', 'subject']
     readonly_fields = ['created_at', 'sent_at', 'opened_at', 'clicked_at']
+
+
+@admin.register(BroadcastNotification)
+class BroadcastNotificationAdmin(admin.ModelAdmin):
+    list_display = ['title', 'audience', 'role', 'department', 'notification_type', 'created_at']
+    list_filter = ['audience', 'notification_type', 'created_at']
+    search_fields = ['title', 'message']
+    raw_id_fields = ['created_by']
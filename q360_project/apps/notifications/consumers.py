@@ -1,4 +1,5 @@
 import json
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from django.utils import timezone
 
@@ -11,20 +12,29 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         else:
             self.group_name = f"notifications_{self.user.id}"
 
-            # Join user notification group
-            await self.channel_layer.group_add(
-                self.group_name,
-                self.channel_name
-            )
+            # Join user notification group and the broadcast groups of the
+            # user's audiences, so broadcasts are published once per audience
+            self.group_names = [self.group_name, "notifications_all"]
+            if self.user.role:
+                self.group_names.append(f"notifications_role_{self.user.role}")
+            if self.user.department_id:
+                self.group_names.append(f"notifications_department_{self.user.department_id}")
+
+            for group_name in self.group_names:
+                await self.channel_layer.group_add(
+                    group_name,
+                    self.channel_name
+                )
 
             await self.accept()
 
     async def disconnect(self, close_code):
-        # Leave user notification group
-        await self.channel_layer.group_discard(
-            self.group_name,
-            self.channel_name
-        )
+        # Leave user notification and broadcast groups
+        for group_name in getattr(self, 'group_names', []):
+            await self.channel_layer.group_discard(
+                group_name,
+                self.channel_name
+            )
 
     # Receive message from WebSocket
     async def receive(self, text_data):
@@ -37,11 +47,17 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             notification_id = text_data_json.get('notification_id')
             # Handle marking notification as read
             await self.mark_notification_as_read(notification_id)
+        elif action == 'read_broadcast':
+            await self.mark_broadcast_as_read(text_data_json.get('broadcast_id'))
 
     # Receive message from room group
     async def notification_message(self, event):
         message = event['message']
 
+        # Broadcast groups are shared; skip users the broadcast excludes
+        if self.user.id in event.get('excluded_user_ids', ()):
+            return
+
         # Send message to WebSocket
         await self.send(text_data=json.dumps({
             'type': 'notification',
@@ -52,4 +68,10 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     async def mark_notification_as_read(self, notification_id):
         # This would update the notification status in the database
         # Implementation would depend on the Notification model
-        pass
\ No newline at end of file
+        pass
+
+    @database_sync_to_async
+    def mark_broadcast_as_read(self, broadcast_id):
+        from .services import mark_broadcast_as_read
+
+        return mark_broadcast_as_read(broadcast_id, self.user)
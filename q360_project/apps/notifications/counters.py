@@ -0,0 +1,178 @@
+"""
+Cached unread notification counters.
+
+Each user's unread count, and the site-wide total, live in the cache and are
+moved with ``incr``/``decr`` when notifications are created, read or deleted,
+so the navbar badge does not hit the database. A missing counter is loaded
+with one ``COUNT(*)``.
+
+Counters are only as shared as the cache backend: with the per-process
+LocMem cache a change moves the counters of the process that made it, and
+other processes (e.g. a notification created by a Celery worker) catch up
+when their counter expires after ``NOTIFICATION_UNREAD_COUNT_TIMEOUT`` or
+when the beat-scheduled ``reconcile_unread_counts_task`` overwrites the
+counters with the database figures. Use a shared cache (Redis, Memcached) for
+exact cross-process badges.
+
+Unread broadcasts have no per-user rows, so they are counted separately per
+user (``get_unread_broadcast_count``). Those counts are keyed by a broadcast
+version that every new or deleted broadcast bumps; a read receipt drops the
+reader's count. ``get_badge_count`` adds both for the navbar badge.
+"""
+import logging
+import time
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from .models import BroadcastNotification, Notification
+
+logger = logging.getLogger(__name__)
+
+UNREAD_COUNT_CACHE_KEY = 'notifications:unread:{user_id}'
+UNREAD_TOTAL_CACHE_KEY = 'notifications:unread:total'
+BROADCAST_UNREAD_CACHE_KEY = 'notifications:broadcast_unread:{version}:{user_id}'
+BROADCAST_VERSION_CACHE_KEY = 'notifications:broadcast_unread:version'
+
+
+def _user_key(user_id) -> str:
+    return UNREAD_COUNT_CACHE_KEY.format(user_id=user_id)
+
+
+def _missed_key(key: str) -> str:
+    return f'{key}:missed'
+
+
+def _cached_count(key: str, queryset) -> int:
+    count = cache.get(key)
+    if count is None:
+        cache.delete(_missed_key(key))
+        count = queryset.count()
+        # add() keeps a counter that was created while we were counting
+        cache.add(key, count, settings.NOTIFICATION_UNREAD_COUNT_TIMEOUT)
+        if cache.get(_missed_key(key)):
+            # A change committed while we were counting could not move the counter
+            cache.delete(key)
+    return count
+
+
+def get_unread_count(user_id) -> int:
+    """Unread notifications of a user, from the cache when available."""
+    return _cached_count(_user_key(user_id), Notification.objects.filter(user_id=user_id, is_read=False))
+
+
+def get_total_unread_count() -> int:
+    """Unread notifications of all users, from the cache when available."""
+    return _cached_count(UNREAD_TOTAL_CACHE_KEY, Notification.objects.filter(is_read=False))
+
+
+def _broadcast_key(user_id) -> str:
+    version = cache.get(BROADCAST_VERSION_CACHE_KEY)
+    if version is None:
+        # Start from the clock so an evicted version never reuses old counts
+        cache.add(BROADCAST_VERSION_CACHE_KEY, time.time_ns(), None)
+        version = cache.get(BROADCAST_VERSION_CACHE_KEY)
+    return BROADCAST_UNREAD_CACHE_KEY.format(version=version, user_id=user_id)
+
+
+def get_unread_broadcast_count(user) -> int:
+    """Broadcasts addressed to a user that they have not read, from the cache when available."""
+    key = _broadcast_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = BroadcastNotification.objects.unread_for_user(user).count()
+        cache.set(key, count, settings.NOTIFICATION_UNREAD_COUNT_TIMEOUT)
+    return count
+
+
+def get_badge_count(user) -> int:
+    """Unread notifications plus unread broadcasts of a user."""
+    return get_unread_count(user.pk) + get_unread_broadcast_count(user)
+
+
+def invalidate_broadcast_counts(user_id=None) -> None:
+    """
+    Drop broadcast counts once the transaction commits.
+
+    With ``user_id`` only that user's count is dropped (e.g. after a read
+    receipt); otherwise every user's count is (a broadcast was added or removed).
+    """
+    def apply():
+        if user_id is not None:
+            cache.delete(_broadcast_key(user_id))
+            return
+        try:
+            cache.incr(BROADCAST_VERSION_CACHE_KEY)
+        except ValueError:
+            cache.set(BROADCAST_VERSION_CACHE_KEY, time.time_ns(), None)
+
+    transaction.on_commit(apply)
+
+
+def _incr(key: str, delta: int) -> None:
+    try:
+        value = cache.incr(key, delta)
+    except ValueError:
+        # Not cached: the next read loads it from the database. A read that is
+        # counting right now may miss this change, so tell it to drop its count.
+        cache.set(_missed_key(key), True, 60)
+        return
+    if value < 0:
+        cache.delete(key)
+
+
+def adjust_unread_count(user_id, delta: int) -> None:
+    """Move a user's counter and the total once the transaction commits."""
+    if delta:
+        transaction.on_commit(lambda: (_incr(_user_key(user_id), delta), _incr(UNREAD_TOTAL_CACHE_KEY, delta)))
+
+
+def clear_unread_count(user_id, marked: int) -> None:
+    """All notifications of a user were marked read (``marked`` of them were unread)."""
+    def apply():
+        cache.set(_user_key(user_id), 0, settings.NOTIFICATION_UNREAD_COUNT_TIMEOUT)
+        _incr(UNREAD_TOTAL_CACHE_KEY, -marked)
+
+    transaction.on_commit(apply)
+
+
+def invalidate_unread_counts(user_ids: Optional[Iterable[int]] = None) -> None:
+    """Drop counters after changes made without per-row signals (``QuerySet.update``)."""
+    keys = [UNREAD_TOTAL_CACHE_KEY]
+    if user_ids is not None:
+        keys.extend(_user_key(user_id) for user_id in set(user_ids))
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def reconcile_unread_counts() -> int:
+    """
+    Overwrite cached counters with the database figures.
+
+    Counters of users without unread notifications are set to zero only when
+    they are already cached, so idle users do not take cache space.
+
+    Returns:
+        Number of users with unread notifications
+    """
+    timeout = settings.NOTIFICATION_UNREAD_COUNT_TIMEOUT
+    counts = {
+        row['user_id']: row['count']
+        for row in Notification.objects.filter(is_read=False).values('user_id').annotate(count=Count('id'))
+    }
+    values = {_user_key(user_id): count for user_id, count in counts.items()}
+    values[UNREAD_TOTAL_CACHE_KEY] = sum(counts.values())
+    cache.set_many(values, timeout)
+
+    stale_user_ids = Notification.objects.filter(is_read=True).exclude(
+        user_id__in=list(counts)
+    ).values_list('user_id', flat=True).distinct()
+    stale_keys = [_user_key(user_id) for user_id in stale_user_ids]
+    cached = cache.get_many(stale_keys)
+    if cached:
+        cache.set_many({key: 0 for key in cached}, timeout)
+
+    logger.info(f"Reconciled unread counters for {len(counts)} users")
+    return len(counts)
@@ -0,0 +1,373 @@
+"""
+Bulk notification fan-out.
+
+Routing rules (channel preferences, Do Not Disturb, working hours) are pure
+functions of a ``UserNotificationPreference``, so a whole chunk of recipients
+is routed in memory after loading their preferences with one query. In-app
+notifications are written with ``bulk_create`` and email/SMS/push deliveries
+are queued as one Celery job per channel and chunk.
+"""
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .counters import adjust_unread_count
+from .models import Notification, UserNotificationPreference
+
+logger = logging.getLogger(__name__)
+
+URGENT_PRIORITIES = ('high', 'urgent')
+
+# Master switch per delivery channel
+CHANNEL_FLAGS = {
+    'email': 'email_notifications',
+    'sms': 'sms_notifications',
+    'push': 'push_notifications',
+}
+
+# Per notification type opt-outs per delivery channel
+CHANNEL_TYPE_FLAGS = {
+    'email': {
+        'assignment': 'email_assignment',
+        'reminder': 'email_reminder',
+        'announcement': 'email_announcement',
+        'security': 'email_security',
+    },
+    'sms': {
+        'assignment': 'sms_assignment',
+        'reminder': 'sms_reminder',
+        'security': 'sms_security',
+    },
+    'push': {
+        'assignment': 'push_assignment',
+        'reminder': 'push_reminder',
+        'announcement': 'push_announcement',
+    },
+}
+
+
+@dataclass
+class RoutingDecision:
+    """Outcome of the routing rules for one recipient and channel."""
+
+    create: bool
+    scheduled_time: Optional[datetime] = None
+    email: bool = False
+    sms: bool = False
+    push: bool = False
+
+
+@dataclass
+class FanOutResult:
+    """Summary of a fan-out run."""
+
+    recipients: int = 0
+    notifications: List[Notification] = field(default_factory=list)
+    scheduled: int = 0
+    email: int = 0
+    sms: int = 0
+    push: int = 0
+
+    def as_dict(self):
+        return {
+            'recipients': self.recipients,
+            'created': len(self.notifications),
+            'scheduled': self.scheduled,
+            'email': self.email,
+            'sms': self.sms,
+            'push': self.push,
+        }
+
+
+# ==================== Routing rules ====================
+
+def _as_time(value) -> Optional[time]:
+    # Unsaved preferences keep string defaults such as '08:00'
+    if isinstance(value, str):
+        return time.fromisoformat(value)
+    return value
+
+
+def is_dnd_time(prefs: UserNotificationPreference, now: datetime) -> bool:
+    """Whether ``now`` falls in the user's Do Not Disturb window or an unwanted weekend."""
+    current_time = now.time()
+    start, end = _as_time(prefs.dnd_start_time), _as_time(prefs.dnd_end_time)
+    is_dnd = False
+    if start and end:
+        if start <= end:
+            is_dnd = start <= current_time <= end
+        else:
+            # Overnight window (e.g. 22:00 - 08:00)
+            is_dnd = current_time >= start or current_time <= end
+    if not prefs.weekend_notifications and now.weekday() >= 5:
+        is_dnd = True
+    return is_dnd
+
+
+def is_outside_working_hours(prefs: UserNotificationPreference, now: datetime) -> bool:
+    """Whether ``now`` is a weekday outside the user's working hours."""
+    if now.weekday() >= 5:
+        return False
+    return not (_as_time(prefs.weekday_start) <= now.time() <= _as_time(prefs.weekday_end))
+
+
+def dnd_end_datetime(prefs: UserNotificationPreference, now: datetime) -> Optional[datetime]:
+    """Next moment the user's DND window ends, or None without a window end."""
+    end = _as_time(prefs.dnd_end_time)
+    if not end:
+        return None
+    day = now if now.time() < end else now + timedelta(days=1)
+    return day.replace(hour=end.hour, minute=end.minute, second=0, microsecond=0)
+
+
+def channel_allowed(prefs: UserNotificationPreference, channel: str, notification_type: str,
+                    priority: str = 'normal') -> bool:
+    """Whether the user accepts this notification type on a delivery channel."""
+    if channel not in CHANNEL_FLAGS:
+        return True
+    allowed = getattr(prefs, CHANNEL_FLAGS[channel])
+    if channel == 'sms' and prefs.sms_important_only and priority not in URGENT_PRIORITIES:
+        allowed = False
+    type_flag = CHANNEL_TYPE_FLAGS[channel].get(notification_type)
+    if type_flag and not getattr(prefs, type_flag):
+        allowed = False
+    return allowed
+
+
+def route_notification(prefs: UserNotificationPreference, channel='in_app', notification_type='info',
+                       priority='normal', send_email=False, send_sms=False, send_push=False,
+                       now: Optional[datetime] = None) -> RoutingDecision:
+    """
+    Apply the routing rules for one recipient.
+
+    Non-urgent notifications during DND are deferred to the end of the window
+    without any external delivery.
+    """
+    now = now or timezone.now()
+    allowed = channel_allowed(prefs, channel, notification_type, priority)
+
+    is_dnd = is_dnd_time(prefs, now)
+    if is_dnd and priority not in URGENT_PRIORITIES:
+        scheduled_time = dnd_end_datetime(prefs, now)
+        if scheduled_time:
+            return RoutingDecision(create=True, scheduled_time=scheduled_time)
+    elif is_dnd and is_outside_working_hours(prefs, now):
+        # Urgent notifications may bypass DND outside working hours
+        if priority != 'urgent' and not prefs.push_notifications:
+            allowed = False
+
+    return RoutingDecision(
+        create=allowed or channel == 'in_app',
+        email=send_email and prefs.email_notifications,
+        sms=send_sms and prefs.sms_notifications,
+        push=send_push and prefs.push_notifications,
+    )
+
+
+def recipient_phone(user) -> Optional[str]:
+    """Phone number used for SMS delivery."""
+    if getattr(user, 'phone_number', None):
+        return user.phone_number
+    profile = getattr(user, 'profile', None)
+    if profile is None:
+        return None
+    return getattr(profile, 'work_phone', None) or getattr(profile, 'phone_number', None)
+
+
+def smart_channels(prefs: UserNotificationPreference, user, notification_type='info',
+                   priority='normal') -> List[str]:
+    """Channels picked by smart routing for a user's preferences and the priority."""
+    has_email = bool(user.email)
+    channels = []
+
+    if priority in URGENT_PRIORITIES:
+        # Important notifications go out on every enabled channel
+        if prefs.push_notifications:
+            channels.append('push')
+        if prefs.email_notifications and has_email:
+            channels.append('email')
+        if prefs.sms_notifications and recipient_phone(user):
+            channels.append('sms')
+        if prefs.email_notifications:
+            channels.append('in_app')
+        return channels
+
+    if notification_type in ('assignment', 'reminder'):
+        if getattr(prefs, f'push_{notification_type}') or getattr(prefs, f'email_{notification_type}'):
+            if prefs.push_notifications:
+                channels.append('push')
+            elif prefs.email_notifications and has_email:
+                channels.append('email')
+        else:
+            channels.append('in_app')
+    elif notification_type == 'announcement':
+        if prefs.push_announcement:
+            channels.append('push')
+        elif prefs.email_notifications and has_email:
+            channels.append('email')
+        else:
+            channels.append('in_app')
+    elif prefs.push_notifications:
+        channels.append('push')
+    elif prefs.email_notifications and has_email:
+        channels.append('email')
+    else:
+        channels.append('in_app')
+    return channels
+
+
+# ==================== Fan-out ====================
+
+def load_preferences(user_ids: Iterable[int]) -> Dict[int, UserNotificationPreference]:
+    """
+    Preferences for many users in one query.
+
+    Users without a stored row get an unsaved instance with the model defaults.
+    """
+    user_ids = list(user_ids)
+    preferences = {
+        prefs.user_id: prefs
+        for prefs in UserNotificationPreference.objects.filter(user_id__in=user_ids)
+    }
+    for user_id in user_ids:
+        if user_id not in preferences:
+            preferences[user_id] = UserNotificationPreference(user_id=user_id)
+    return preferences
+
+
+def _chunks(recipients, size):
+    if isinstance(recipients, QuerySet):
+        recipients = recipients.select_related('profile').iterator(chunk_size=size)
+    chunk = []
+    for user in recipients:
+        chunk.append(user)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def fan_out_notification(recipients, title, message, notification_type='info', link='', priority='normal',
+                         channel='in_app', send_email=False, send_sms=False, send_push=False,
+                         smart=False, batch_size=None) -> FanOutResult:
+    """
+    Deliver one notification to many users.
+
+    Args:
+        recipients: QuerySet or list of User objects
+        message: Message text, or a callable returning it for a recipient
+        channel: Primary channel recorded on the notifications
+        send_email, send_sms, send_push: Also deliver on these channels
+        smart: Pick channels per user like ``send_notification_by_smart_routing``
+        batch_size: Recipients routed and inserted per chunk
+
+    Returns:
+        FanOutResult
+    """
+    batch_size = batch_size or settings.NOTIFICATION_FANOUT_BATCH_SIZE
+    result = FanOutResult()
+
+    for chunk in _chunks(recipients, batch_size):
+        result.recipients += len(chunk)
+        preferences = load_preferences(user.pk for user in chunk)
+        now = timezone.now()
+        notifications, emails, sms_messages, pushes = [], [], [], []
+
+        for user in chunk:
+            prefs = preferences[user.pk]
+            text = message(user) if callable(message) else message
+            if smart:
+                plans = [
+                    (user_channel, user_channel == 'email', user_channel == 'sms', user_channel == 'push')
+                    for user_channel in smart_channels(prefs, user, notification_type, priority)
+                ]
+            else:
+                plans = [(channel, send_email, send_sms, send_push)]
+
+            for plan_channel, plan_email, plan_sms, plan_push in plans:
+                decision = route_notification(
+                    prefs, plan_channel, notification_type, priority,
+                    plan_email, plan_sms, plan_push, now=now,
+                )
+                if decision.create:
+                    notifications.append(Notification(
+                        user=user, title=title, message=text, notification_type=notification_type,
+                        link=link, channel=plan_channel, priority=priority,
+                        scheduled_time=decision.scheduled_time,
+                    ))
+                if decision.scheduled_time:
+                    result.scheduled += 1
+                    continue
+
+                if decision.email and user.email:
+                    emails.append({
+                        'recipient_email': user.email,
+                        'subject': title,
+                        'message': text,
+                        'recipient_name': user.get_full_name(),
+                        'recipient_user_id': user.pk,
+                    })
+                phone = recipient_phone(user) if decision.sms else None
+                if phone:
+                    sms_messages.append({
+                        'recipient_phone': phone,
+                        'message': text,
+                        'recipient_user_id': user.pk,
+                        'priority': priority,
+                    })
+                if decision.push:
+                    pushes.append({
+                        'user_id': user.pk,
+                        'title': title,
+                        'message': text,
+                        'data': {'link': link} if link else {},
+                        'priority': priority,
+                    })
+
+        created = Notification.objects.bulk_create(notifications, batch_size=batch_size)
+        _after_bulk_create(created)
+        result.notifications.extend(created)
+        result.email += _enqueue('send_email_batch_task', emails)
+        result.sms += _enqueue('send_sms_batch_task', sms_messages)
+        result.push += _enqueue('send_push_batch_task', pushes)
+
+    logger.info(f"Fan-out '{title}': {result.as_dict()}")
+    return result
+
+
+def _after_bulk_create(notifications: List[Notification]) -> None:
+    """Side effects that ``Notification.save`` and its signals perform per row."""
+    cache.delete_many(list({
+        make_template_fragment_key('user_notifications', [notification.user_id])
+        for notification in notifications
+    }))
+    created_per_user = Counter(n.user_id for n in notifications if not n.is_read)
+    for user_id, created in created_per_user.items():
+        adjust_unread_count(user_id, created)
+    for notification in notifications:
+        notification._stored_is_read = notification.is_read
+        if notification.scheduled_time is None:
+            notification.send_real_time_notification()
+
+
+def _enqueue(task_name: str, items: List[dict]) -> int:
+    """Queue one Celery job for a chunk of deliveries on a channel."""
+    if not items:
+        return 0
+    from . import tasks
+
+    try:
+        getattr(tasks, task_name).delay(items)
+    except Exception as exc:
+        logger.error(f"Failed to queue {task_name} for {len(items)} deliveries: {exc}")
+        return 0
+    return len(items)
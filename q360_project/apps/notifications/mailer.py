@@ -0,0 +1,167 @@
+"""
+Batched email delivery.
+
+Messages are sent over one backend connection per batch
+(``get_connection`` + ``send_messages``), ``EmailTemplate`` contents are
+compiled once per template revision and reused for every recipient, and the
+``EmailLog`` rows of a batch are written with a single insert.
+"""
+import logging
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from .models import EmailLog, EmailTemplate
+
+logger = logging.getLogger(__name__)
+
+# Same placeholder syntax the per-recipient helpers substitute: "{{ name }}"
+PLACEHOLDER_RE = re.compile(r'\{\{ (.+?) \}\}')
+
+
+class CompiledText:
+    """Template text pre-split into literal parts and placeholder names."""
+
+    def __init__(self, source: str):
+        # re.split with a group alternates literal text and placeholder names
+        self.parts = PLACEHOLDER_RE.split(source or '')
+
+    def render(self, context: Dict) -> str:
+        rendered = []
+        for index, part in enumerate(self.parts):
+            if index % 2 == 0:
+                rendered.append(part)
+            elif part in context:
+                rendered.append(str(context[part]))
+            else:
+                rendered.append('{{ ' + part + ' }}')
+        return ''.join(rendered)
+
+
+@dataclass(frozen=True)
+class CompiledEmailTemplate:
+    """Compiled subject, HTML and text bodies of an ``EmailTemplate`` revision."""
+
+    template_id: int
+    updated_at: object
+    subject: CompiledText
+    html: CompiledText
+    text: Optional[CompiledText]
+
+    def render(self, context: Dict):
+        """Return (subject, text, html); text falls back to the stripped HTML."""
+        html = self.html.render(context)
+        text = self.text.render(context) if self.text else strip_tags(html)
+        return self.subject.render(context), text, html
+
+
+_compiled_templates: Dict[int, CompiledEmailTemplate] = {}
+
+
+def compile_email_template(template: EmailTemplate) -> CompiledEmailTemplate:
+    """Compiled template, reused until the template is edited."""
+    compiled = _compiled_templates.get(template.pk)
+    if compiled is None or compiled.updated_at != template.updated_at:
+        compiled = CompiledEmailTemplate(
+            template_id=template.pk,
+            updated_at=template.updated_at,
+            subject=CompiledText(template.subject),
+            html=CompiledText(template.html_content),
+            text=CompiledText(template.text_content) if template.text_content else None,
+        )
+        _compiled_templates[template.pk] = compiled
+    return compiled
+
+
+@dataclass
+class OutgoingEmail:
+    """One message of a batch."""
+
+    to: str
+    subject: str
+    text: str
+    html: str = ''
+    recipient_id: Optional[int] = None
+    template_id: Optional[int] = None
+
+
+def _chunks(items: List, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def send_email_batch(emails: Iterable[OutgoingEmail], log: bool = True,
+                     batch_size: Optional[int] = None) -> List[Optional[str]]:
+    """
+    Send messages reusing one backend connection per batch.
+
+    A failed message does not abort the batch; the connection is reopened and
+    the error is returned in its slot.
+
+    Args:
+        emails: Messages to send
+        log: Write ``EmailLog`` rows (one insert) for messages with a recipient user
+        batch_size: Messages per connection, defaults to ``EMAIL_BATCH_SIZE``
+
+    Returns:
+        list: None for each sent message, otherwise the error text, in input order
+    """
+    emails = list(emails)
+    batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+    errors: List[Optional[str]] = []
+
+    for batch in _chunks(emails, batch_size):
+        batch_errors: List[Optional[str]] = []
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+            for email in batch:
+                message = EmailMultiAlternatives(
+                    subject=email.subject,
+                    body=email.text,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    to=[email.to],
+                    connection=connection,
+                )
+                if email.html:
+                    message.attach_alternative(email.html, 'text/html')
+                try:
+                    connection.send_messages([message])
+                    batch_errors.append(None)
+                except Exception as exc:
+                    batch_errors.append(str(exc) or exc.__class__.__name__)
+                    # A broken session would fail the rest of the batch
+                    connection.close()
+                    connection.open()
+        except Exception as exc:
+            # The connection could not be (re)opened; the rest of the batch fails
+            logger.error(f"Email connection failed: {exc}")
+            batch_errors.extend([str(exc) or exc.__class__.__name__] * (len(batch) - len(batch_errors)))
+        finally:
+            connection.close()
+        errors.extend(batch_errors)
+
+    if log:
+        sent_at = timezone.now()
+        EmailLog.objects.bulk_create([
+            EmailLog(
+                template_id=email.template_id,
+                recipient_id=email.recipient_id,
+                recipient_email=email.to,
+                subject=email.subject[:200],
+                status='failed' if error else 'sent',
+                error_message=error or '',
+                sent_at=None if error else sent_at,
+            )
+            for email, error in zip(emails, errors)
+            if email.recipient_id
+        ])
+
+    failed = sum(1 for error in errors if error)
+    logger.info(f"Email batch: {len(emails) - failed} sent, {failed} failed")
+    return errors
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-17 12:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0005_alter_smsprovider_provider'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='digest_count',
+            field=models.PositiveIntegerField(default=1, verbose_name='Birləşdirilmiş Bildiriş Sayı'),
+        ),
+        migrations.AddField(
+            model_name='usernotificationpreference',
+            name='digest_window_minutes',
+            field=models.PositiveIntegerField(blank=True, help_text='Eyni növ bildirişlər bu müddət ərzində bir bildirişdə birləşdirilir. Boş: sistem dəyəri, 0: söndürülüb', null=True, verbose_name='Bildiriş Birləşdirmə Pəncərəsi (dəq)'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.1.4 on 2026-10-17 12:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('departments', '0014_remove_department_departments_department_tref4ab'),
+        ('notifications', '0006_notification_digest'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BroadcastNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200, verbose_name='Başlıq')),
+                ('message', models.TextField(verbose_name='Mesaj')),
+                ('notification_type', models.CharField(choices=[('info', 'Məlumat'), ('warning', 'Xəbərdarlıq'), ('success', 'Uğur'), ('error', 'Xəta'), ('assignment', 'Tapşırıq'), ('reminder', 'Xatırlatma'), ('security', 'Təhlükəsizlik'), ('announcement', 'Elan')], default='info', max_length=20, verbose_name='Növ')),
+                ('link', models.CharField(blank=True, max_length=500, verbose_name='Keçid')),
+                ('priority', models.CharField(default='normal', max_length=20, verbose_name='Prioritet')),
+                ('audience', models.CharField(choices=[('all', 'Bütün istifadəçilər'), ('role', 'Rol'), ('department', 'Şöbə')], default='all', max_length=20, verbose_name='Auditoriya')),
+                ('role', models.CharField(blank=True, max_length=20, verbose_name='Rol')),
+                ('excluded_user_ids', models.JSONField(blank=True, default=list, verbose_name='İstisna Edilən İstifadəçilər')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sent_broadcasts', to=settings.AUTH_USER_MODEL, verbose_name='Göndərən')),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='broadcast_notifications', to='departments.department', verbose_name='Şöbə')),
+            ],
+            options={
+                'verbose_name': 'Yayım Bildirişi',
+                'verbose_name_plural': 'Yayım Bildirişləri',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BroadcastReceipt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('read_at', models.DateTimeField(auto_now_add=True, verbose_name='Oxunma Vaxtı')),
+                ('broadcast', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='receipts', to='notifications.broadcastnotification', verbose_name='Yayım Bildirişi')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='broadcast_receipts', to=settings.AUTH_USER_MODEL, verbose_name='İstifadəçi')),
+            ],
+            options={
+                'verbose_name': 'Yayım Oxunma Qəbzi',
+                'verbose_name_plural': 'Yayım Oxunma Qəbzləri',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='broadcastnotification',
+            index=models.Index(fields=['audience', '-created_at'], name='notificatio_audienc_6dd295_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='broadcastreceipt',
+            constraint=models.UniqueConstraint(fields=('broadcast', 'user'), name='unique_broadcast_receipt'),
+        ),
+    ]
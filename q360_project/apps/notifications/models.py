@@ -130,6 +130,9 @@ class Notification(models.Model):
     scheduled_time = models.DateTimeField(null=True, blank=True, verbose_name=_('Planlaşdırılmış Vaxt'))
     sent_at = models.DateTimeField(null=True, blank=True, verbose_name=_('Göndərilmə Vaxtı'))
 
+    # Number of same-type notifications coalesced into this row (digest mode)
+    digest_count = models.PositiveIntegerField(default=1, verbose_name=_('Birləşdirilmiş Bildiriş Sayı'))
+
     class Meta:
         verbose_name = _('Bildiriş')
         verbose_name_plural = _('Bildirişlər')
@@ -137,12 +140,23 @@ class Notification(models.Model):
 
     def __str__(self):
         return f"{self.user.username} - {self.title}"
-    
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Stored read state, so saves can move the cached unread counter
+        if 'is_read' in field_names:
+            instance._stored_is_read = instance.is_read
+        return instance
+
     def save(self, *args, **kwargs):
         # Call the original save method
         is_new = self.pk is None
         skip_websocket = kwargs.pop('skip_websocket', False)
         super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'is_read' in update_fields:
+            self._stored_is_read = self.is_read
 
         # If this is a new notification and it's not scheduled, send it via WebSocket
         if is_new and not skip_websocket and self.scheduled_time is None:
@@ -168,7 +182,8 @@ class Notification(models.Model):
                 'type': self.notification_type,
                 'timestamp': self.created_at.isoformat(),
                 'is_read': self.is_read,
-                'link': self.link
+                'link': self.link,
+                'count': self.digest_count,
             }
 
             # Send to user's notification group
@@ -579,6 +594,14 @@ class UserNotificationPreference(models.Model):
     weekday_start = models.TimeField(default='08:00', verbose_name=_('İş Günü Başlama'))
     weekday_end = models.TimeField(default='18:00', verbose_name=_('İş Günü Bitmə'))
 
+    # Digest mode
+    digest_window_minutes = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name=_('Bildiriş Birləşdirmə Pəncərəsi (dəq)'),
+        help_text=_('Eyni növ bildirişlər bu müddət ərzində bir bildirişdə birləşdirilir. Boş: sistem dəyəri, 0: söndürülüb')
+    )
+
     class Meta:
         verbose_name = _('İstifadəçi Bildiriş Tənzimləmələri')
         verbose_name_plural = _('İstifadəçi Bildiriş Tənzimləmələri')
@@ -820,3 +843,141 @@ class EmailNotification(models.Model):
         self.status = 'failed'
         self.error_message = error_message
         self.save(update_fields=['status', 'error_message', 'updated_at'])
+
+
+class BroadcastQuerySet(models.QuerySet):
+    def for_user(self, user):
+        """Broadcasts addressed to a user (all users, their role or their department)."""
+        audience = models.Q(audience='all') | models.Q(audience='role', role=user.role)
+        if user.department_id:
+            audience |= models.Q(audience='department', department_id=user.department_id)
+        return (
+            self.filter(audience, created_at__gte=user.date_joined)
+            .exclude(excluded_user_ids__contains=[user.pk])
+        )
+
+    def unread_for_user(self, user):
+        return self.for_user(user).exclude(receipts__user=user)
+
+
+class BroadcastNotification(models.Model):
+    """
+    One notification addressed to a whole audience.
+
+    It is published once to the audience's channel-layer group; per-user state
+    is only stored as a ``BroadcastReceipt`` when a recipient reads it.
+    """
+    AUDIENCE_CHOICES = [
+        ('all', 'Bütün istifadəçilər'),
+        ('role', 'Rol'),
+        ('department', 'Şöbə'),
+    ]
+
+    title = models.CharField(max_length=200, verbose_name=_('Başlıq'))
+    message = models.TextField(verbose_name=_('Mesaj'))
+    notification_type = models.CharField(
+        max_length=20, choices=Notification.NOTIFICATION_TYPES, default='info', verbose_name=_('Növ')
+    )
+    link = models.CharField(max_length=500, blank=True, verbose_name=_('Keçid'))
+    priority = models.CharField(max_length=20, default='normal', verbose_name=_('Prioritet'))
+    audience = models.CharField(max_length=20, choices=AUDIENCE_CHOICES, default='all', verbose_name=_('Auditoriya'))
+    role = models.CharField(max_length=20, blank=True, verbose_name=_('Rol'))
+    department = models.ForeignKey(
+        Department,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='broadcast_notifications',
+        verbose_name=_('Şöbə'),
+    )
+    excluded_user_ids = models.JSONField(default=list, blank=True, verbose_name=_('İstisna Edilən İstifadəçilər'))
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='sent_broadcasts',
+        verbose_name=_('Göndərən'),
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = BroadcastQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _('Yayım Bildirişi')
+        verbose_name_plural = _('Yayım Bildirişləri')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['audience', '-created_at']),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    @property
+    def group_name(self):
+        """Channel-layer group the broadcast is published to."""
+        if self.audience == 'role':
+            return f"notifications_role_{self.role}"
+        if self.audience == 'department':
+            return f"notifications_department_{self.department_id}"
+        return "notifications_all"
+
+    def send_real_time_notification(self):
+        """Publish this broadcast once to its audience group."""
+        try:
+            from channels.layers import get_channel_layer
+            from asgiref.sync import async_to_sync
+
+            channel_layer = get_channel_layer()
+            if channel_layer is None:
+                return
+
+            async_to_sync(channel_layer.group_send)(
+                self.group_name,
+                {
+                    'type': 'notification_message',
+                    'message': {
+                        'id': self.id,
+                        'broadcast': True,
+                        'title': self.title,
+                        'message': self.message,
+                        'type': self.notification_type,
+                        'timestamp': self.created_at.isoformat(),
+                        'is_read': False,
+                        'link': self.link,
+                    },
+                    'excluded_user_ids': self.excluded_user_ids,
+                }
+            )
+        except Exception as e:
+            import logging
+            logger = logging.getLogger(__name__)
+            logger.warning(f"Failed to publish broadcast notification: {e}")
+
+
+class BroadcastReceipt(models.Model):
+    """Read receipt of a broadcast for one user."""
+    broadcast = models.ForeignKey(
+        BroadcastNotification,
+        on_delete=models.CASCADE,
+        related_name='receipts',
+        verbose_name=_('Yayım Bildirişi'),
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='broadcast_receipts',
+        verbose_name=_('İstifadəçi'),
+    )
+    read_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Oxunma Vaxtı'))
+
+    class Meta:
+        verbose_name = _('Yayım Oxunma Qəbzi')
+        verbose_name_plural = _('Yayım Oxunma Qəbzləri')
+        constraints = [
+            models.UniqueConstraint(fields=['broadcast', 'user'], name='unique_broadcast_receipt'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} • {self.broadcast}"
@@ -1,28 +1,37 @@
 """Notification service utilities."""
+from datetime import timedelta
 from typing import Optional
 
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
 from django.utils import timezone
 
 from .models import (
+    BroadcastNotification,
+    BroadcastReceipt,
     Notification,
     EmailNotification,
     SMSNotification,
     PushNotification,
     PushDevice,
     NotificationPreference,
+    UserNotificationPreference,
 )
 from .tasks import (
     deliver_email_notification,
     deliver_sms_notification,
     deliver_push_notification,
+    flush_notification_digest,
 )
 
 User = get_user_model()
 
+NOTIFICATION_DIGEST_WINDOW_CACHE_KEY = 'notifications:digest_window:{user_id}'
+
 
 def _should_send_channel(user: User, method: str, category: str, priority: str = 'normal') -> bool:
     """Return True if user allows this notification channel for provided category."""
@@ -163,9 +172,79 @@ def queue_push_notification(
     return record
 
 
+def digest_window(user_id) -> int:
+    """Seconds during which same-type notifications are coalesced for a user (0 = off)."""
+    cache_key = NOTIFICATION_DIGEST_WINDOW_CACHE_KEY.format(user_id=user_id)
+    window = cache.get(cache_key)
+    if window is None:
+        minutes = UserNotificationPreference.objects.filter(user_id=user_id).values_list(
+            'digest_window_minutes', flat=True
+        ).first()
+        if minutes is None:
+            minutes = settings.NOTIFICATION_DIGEST_WINDOW_MINUTES
+        window = minutes * 60
+        cache.set(cache_key, window, 3600)
+    return window
+
+
+def coalesce_notification(user_id, title, message, notification_type='info', link='', window=None):
+    """
+    Fold a notification into the user's open digest of the same type.
+
+    A digest is an unread notification of the same type created within the
+    window. It takes over the latest title, message and link and counts the
+    coalesced notifications; its state is pushed once when the window closes.
+
+    Returns:
+        The updated digest Notification, or None when there is no open digest
+    """
+    window = digest_window(user_id) if window is None else window
+    if not window:
+        return None
+
+    now = timezone.now()
+    with transaction.atomic():
+        digest = (
+            Notification.objects.select_for_update()
+            .filter(
+                user_id=user_id,
+                notification_type=notification_type,
+                is_read=False,
+                scheduled_time__isnull=True,
+                created_at__gte=now - timedelta(seconds=window),
+            )
+            .order_by('-created_at')
+            .first()
+        )
+        if digest is None:
+            return None
+        digest.title = title
+        digest.message = message
+        digest.link = link or digest.link
+        digest.digest_count += 1
+        digest.save(update_fields=['title', 'message', 'link', 'digest_count'])
+
+        if digest.digest_count == 2:
+            # First coalesced notification: push the digest once the window closes
+            countdown = max(window - (now - digest.created_at).total_seconds(), 0)
+            transaction.on_commit(
+                lambda: flush_notification_digest.apply_async((digest.pk,), countdown=countdown)
+            )
+    return digest
+
+
 def send_notification_to_user(user_id, title, message, notification_type='info', link='', create_in_db=True):
-    """Send a real-time in-app notification to a specific user."""
+    """
+    Send a real-time in-app notification to a specific user.
+
+    In digest mode (see ``digest_window``) notifications of the same type
+    arriving within the window are coalesced into one row and one push.
+    """
     if create_in_db:
+        digest = coalesce_notification(user_id, title, message, notification_type, link)
+        if digest is not None:
+            return digest
+        # Saving a new notification pushes it over the channel layer
         notification = Notification.objects.create(
             user_id=user_id,
             title=title,
@@ -173,14 +252,7 @@ def send_notification_to_user(user_id, title, message, notification_type='info',
             notification_type=notification_type,
             link=link,
         )
-        notification_id = notification.id
-        timestamp = notification.created_at.isoformat()
-        is_read = notification.is_read
-    else:
-        now = timezone.now()
-        notification_id = None
-        timestamp = now.isoformat()
-        is_read = False
+        return notification
 
     try:
         channel_layer = get_channel_layer()
@@ -188,12 +260,12 @@ def send_notification_to_user(user_id, title, message, notification_type='info',
             return
 
         notification_data = {
-            'id': notification_id,
+            'id': None,
             'title': title,
             'message': message,
             'type': notification_type,
-            'timestamp': timestamp,
-            'is_read': is_read,
+            'timestamp': timezone.now().isoformat(),
+            'is_read': False,
             'link': link,
         }
 
@@ -208,17 +280,45 @@ def send_notification_to_user(user_id, title, message, notification_type='info',
         logger.warning('Failed to send WebSocket notification to user %s: %s', user_id, exc)
 
 
-def broadcast_notification(title, message, notification_type='info', exclude_user_ids=None):
-    """Broadcast notification to all active users (optionally excluding some)."""
-    from django.db.models import Q
+def broadcast_notification(title, message, notification_type='info', exclude_user_ids=None,
+                           role=None, department=None, link='', priority='normal', created_by=None):
+    """
+    Broadcast a notification to all users, a role or a department.
+
+    A single ``BroadcastNotification`` row is stored and published once to the
+    audience's channel-layer group, which ``NotificationConsumer`` joins on
+    connect; per-user rows are only written as read receipts.
+    """
+    if department is not None:
+        audience = 'department'
+    elif role:
+        audience = 'role'
+    else:
+        audience = 'all'
+
+    broadcast = BroadcastNotification.objects.create(
+        title=title,
+        message=message,
+        notification_type=notification_type,
+        link=link,
+        priority=priority,
+        audience=audience,
+        role=role or '',
+        department=department,
+        excluded_user_ids=sorted(set(exclude_user_ids or [])),
+        created_by=created_by,
+    )
+    transaction.on_commit(broadcast.send_real_time_notification)
+    return broadcast
 
-    query = Q(is_active=True)
-    if exclude_user_ids:
-        query &= ~Q(id__in=exclude_user_ids)
 
-    active_users = User.objects.filter(query).values_list('id', flat=True)
-    for user_id in active_users:
-        send_notification_to_user(user_id, title, message, notification_type)
+def mark_broadcast_as_read(broadcast_id, user):
+    """Store the user's read receipt; returns False when the broadcast is not addressed to them."""
+    broadcast = BroadcastNotification.objects.for_user(user).filter(pk=broadcast_id).first()
+    if broadcast is None:
+        return False
+    BroadcastReceipt.objects.get_or_create(broadcast=broadcast, user=user)
+    return True
 
 
 def broadcast_notification_smart(title, message, notification_type='info', priority='normal', exclude_user_ids=None):
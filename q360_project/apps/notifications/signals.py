@@ -7,7 +7,7 @@ from django.dispatch import receiver
 from django.core.cache import cache
 from django.core.cache.utils import make_template_fragment_key
 
-from .models import Notification
+from .models import BroadcastNotification, BroadcastReceipt, Notification, UserNotificationPreference
 
 
 @receiver(post_save, sender=Notification)
@@ -38,3 +38,57 @@ def invalidate_notification_cache_on_delete(sender, instance, **kwargs):
     cache.delete(cache_key)
 
     print(f"[Cache] Notification cache invalidated for user {instance.user.pk} (deleted notification)")
+
+
+@receiver(post_save, sender=Notification)
+def update_unread_count_on_save(sender, instance, created, update_fields=None, **kwargs):
+    """Move the cached unread counter when a notification is created or its read state changes."""
+    from .counters import adjust_unread_count, invalidate_unread_counts
+
+    if created:
+        was_read = True
+    elif update_fields is not None and 'is_read' not in update_fields:
+        return
+    else:
+        was_read = getattr(instance, '_stored_is_read', None)
+
+    if was_read is None:
+        # Previous state unknown (instance not loaded from the database)
+        invalidate_unread_counts([instance.user_id])
+    elif was_read != instance.is_read:
+        adjust_unread_count(instance.user_id, -1 if instance.is_read else 1)
+
+
+@receiver(post_delete, sender=Notification)
+def update_unread_count_on_delete(sender, instance, **kwargs):
+    """Drop a deleted unread notification from the cached counter."""
+    from .counters import adjust_unread_count
+
+    if not getattr(instance, '_stored_is_read', instance.is_read):
+        adjust_unread_count(instance.user_id, -1)
+
+
+@receiver(post_save, sender=BroadcastNotification)
+@receiver(post_delete, sender=BroadcastNotification)
+def invalidate_broadcast_counts_on_change(sender, instance, **kwargs):
+    """A new or removed broadcast changes the unread broadcast count of its audience."""
+    from .counters import invalidate_broadcast_counts
+
+    invalidate_broadcast_counts()
+
+
+@receiver(post_save, sender=BroadcastReceipt)
+@receiver(post_delete, sender=BroadcastReceipt)
+def invalidate_broadcast_count_on_receipt(sender, instance, **kwargs):
+    """A read receipt changes the reader's unread broadcast count."""
+    from .counters import invalidate_broadcast_counts
+
+    invalidate_broadcast_counts(instance.user_id)
+
+
+@receiver(post_save, sender=UserNotificationPreference)
+def invalidate_digest_window_on_save(sender, instance, **kwargs):
+    """Pick up a changed digest window on the next notification."""
+    from .services import NOTIFICATION_DIGEST_WINDOW_CACHE_KEY
+
+    cache.delete(NOTIFICATION_DIGEST_WINDOW_CACHE_KEY.format(user_id=instance.user_id))
@@ -1,14 +1,17 @@
 """Celery tasks for notifications."""
-from datetime import timedelta
+import logging
+from datetime import datetime, timedelta
 
 from celery import shared_task
 from django.conf import settings
+from django.core.cache import cache
 from django.core.mail import send_mail
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from apps.accounts.models import User
 from .models import (
+    Notification,
     EmailNotification,
     EmailLog,
     SMSNotification,
@@ -19,6 +22,8 @@ from .models import (
 from .sms_utils import send_sms_notification
 from .push_utils import send_push_notification as dispatch_push
 
+logger = logging.getLogger(__name__)
+
 
 def _reschedule_later(task, record, eta):
     """Reschedule a task for future delivery respecting existing ETA."""
@@ -140,6 +145,15 @@ def deliver_push_notification(self, push_notification_id):
         record.mark_failed(_('Push bildirişi göndərilmədi'))
 
 
+@shared_task
+def flush_notification_digest(notification_id):
+    """Push a digest notification's coalesced state once its window has closed."""
+    notification = Notification.objects.select_related('user').filter(pk=notification_id).first()
+    if notification is None or notification.is_read:
+        return
+    notification.send_real_time_notification()
+
+
 @shared_task
 def send_email_notification(subject, message, recipient_list):
     """Legacy helper to send email immediately."""
@@ -152,58 +166,174 @@ def send_email_notification(subject, message, recipient_list):
     )
 
 
-@shared_task
-def send_campaign_start_notification(campaign_id):
-    """Send notification when an evaluation campaign starts."""
+CAMPAIGN_START_PROGRESS_KEY = 'notifications:campaign_start:{campaign_id}'
+CAMPAIGN_START_PROGRESS_TIMEOUT = 60 * 60 * 24
+
+# Evaluatee names listed in a digest before it switches to "and N more"
+DIGEST_NAME_LIMIT = 5
+
+
+def _progress_keys(campaign_id):
+    key = CAMPAIGN_START_PROGRESS_KEY.format(campaign_id=campaign_id)
+    return key, f'{key}:chunks_done', f'{key}:notified'
+
+
+def campaign_start_progress(campaign_id):
+    """
+    Progress of a campaign-start dispatch.
+
+    Returns:
+        dict with status, evaluators, chunks, chunks_done and notified, or None
+    """
+    meta_key, chunks_key, notified_key = _progress_keys(campaign_id)
+    values = cache.get_many([meta_key, chunks_key, notified_key])
+    if meta_key not in values:
+        return None
+    return {
+        **values[meta_key],
+        'chunks_done': values.get(chunks_key, 0),
+        'notified': values.get(notified_key, 0),
+    }
+
+
+def _digest_message(campaign, evaluatee_names):
+    names = ', '.join(evaluatee_names[:DIGEST_NAME_LIMIT])
+    if len(evaluatee_names) > DIGEST_NAME_LIMIT:
+        names += f' və daha {len(evaluatee_names) - DIGEST_NAME_LIMIT} nəfər'
+    return (
+        f'{campaign.title} kampaniyasında sizə {len(evaluatee_names)} qiymətləndirmə təyin edildi: {names}. '
+        f'Bitmə tarixi: {campaign.end_date.strftime("%d.%m.%Y")}'
+    )
+
+
+@shared_task(bind=True)
+def send_campaign_start_notification(self, campaign_id):
+    """
+    Send one digest per evaluator when an evaluation campaign starts.
+
+    Evaluators with pending assignments are split into chunks that are
+    processed in parallel by a chord; progress is kept in the cache (see
+    ``campaign_start_progress``) and finalized by the chord callback.
+    """
+    from celery import chord
     from apps.evaluations.models import EvaluationCampaign, EvaluationAssignment
-    from apps.notifications.models import Notification
 
     try:
         campaign = EvaluationCampaign.objects.get(id=campaign_id)
+    except EvaluationCampaign.DoesNotExist:
+        return f'Campaign {campaign_id} not found'
+
+    evaluator_ids = list(
+        EvaluationAssignment.objects.filter(campaign=campaign, status='pending')
+        .order_by('evaluator_id')
+        .values_list('evaluator_id', flat=True)
+        .distinct()
+    )
+    chunk_size = settings.CAMPAIGN_NOTIFICATION_CHUNK_SIZE
+    chunks = [evaluator_ids[i:i + chunk_size] for i in range(0, len(evaluator_ids), chunk_size)]
+
+    started_at = timezone.now()
+    meta_key, chunks_key, notified_key = _progress_keys(campaign_id)
+    cache.set_many({
+        meta_key: {
+            'campaign_id': campaign_id,
+            'status': 'running' if chunks else 'completed',
+            'evaluators': len(evaluator_ids),
+            'chunks': len(chunks),
+            'started_at': started_at.isoformat(),
+        },
+        chunks_key: 0,
+        notified_key: 0,
+    }, CAMPAIGN_START_PROGRESS_TIMEOUT)
+
+    if not chunks:
+        return f'0 notification(s) sent for campaign {campaign.title}'
+
+    chord(
+        send_campaign_start_digest_chunk.s(campaign_id, chunk, started_at.isoformat()) for chunk in chunks
+    )(finalize_campaign_start_notification.s(campaign_id))
+
+    logger.info(f"Campaign {campaign_id} start: {len(evaluator_ids)} evaluators in {len(chunks)} chunks")
+    return f'{len(evaluator_ids)} evaluator(s) queued in {len(chunks)} chunk(s) for campaign {campaign.title}'
+
+
+def _add_progress(key, delta):
+    """Advance a progress counter; counters missing from this worker's cache start at zero."""
+    cache.add(key, 0, CAMPAIGN_START_PROGRESS_TIMEOUT)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, delta, CAMPAIGN_START_PROGRESS_TIMEOUT)
+
 
-        # Get all participants (evaluators)
-        assignments = EvaluationAssignment.objects.filter(
-            campaign=campaign,
-            status='pending'
-        ).select_related('evaluator', 'evaluatee')
-
-        # Send notification to each evaluator
-        notifications_created = 0
-        for assignment in assignments:
-            # Create in-app notification
-            Notification.objects.create(
-                user=assignment.evaluator,
-                title=f'Yeni Qiymətləndirmə: {campaign.title}',
-                message=f'{assignment.evaluatee.get_full_name()} üçün qiymətləndirmə təyin edildi. Bitmə tarixi: {campaign.end_date.strftime("%d.%m.%Y")}',
-                notification_type='assignment',
-                link=f'/evaluations/assignment/{assignment.id}/',
-                priority='high'
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def send_campaign_start_digest_chunk(self, campaign_id, evaluator_ids, started_at=None):
+    """
+    Send the campaign-start digest to one chunk of evaluators.
+
+    Evaluators that already got this dispatch's digest (an earlier attempt
+    failed half-way) are skipped, so a retry never notifies anyone twice.
+    """
+    from apps.evaluations.models import EvaluationCampaign, EvaluationAssignment
+    from .fanout import fan_out_notification
+
+    try:
+        campaign = EvaluationCampaign.objects.get(id=campaign_id)
+        title = f'Yeni Qiymətləndirmə: {campaign.title}'
+        link = '/evaluations/my-assignments/'
+        already_notified = set()
+        if started_at:
+            already_notified = set(
+                Notification.objects.filter(
+                    user_id__in=evaluator_ids, title=title, link=link, notification_type='assignment',
+                    created_at__gte=datetime.fromisoformat(started_at),
+                ).values_list('user_id', flat=True)
             )
 
-            # Send email notification
-            from apps.notifications.utils import send_notification_by_smart_routing
-            send_notification_by_smart_routing(
-                user=assignment.evaluator,
-                title=f'Yeni Qiymətləndirmə: {campaign.title}',
-                message=f'{assignment.evaluatee.get_full_name()} üçün qiymətləndirmə təyin edildi.',
-                notification_type='email',
-                priority='high',
-                context={
-                    'campaign_title': campaign.title,
-                    'evaluatee_name': assignment.evaluatee.get_full_name(),
-                    'end_date': campaign.end_date,
-                    'assignment_link': f'/evaluations/assignment/{assignment.id}/'
-                }
+        evaluatees = {}
+        for evaluator_id, first_name, last_name, username in (
+            EvaluationAssignment.objects.filter(
+                campaign=campaign, status='pending', evaluator_id__in=evaluator_ids
             )
+            .exclude(evaluator_id__in=already_notified)
+            .order_by('evaluator_id', 'evaluatee__last_name', 'evaluatee__first_name')
+            .values_list('evaluator_id', 'evaluatee__first_name', 'evaluatee__last_name', 'evaluatee__username')
+        ):
+            name = f'{first_name} {last_name}'.strip() or username
+            evaluatees.setdefault(evaluator_id, []).append(name)
+
+        result = fan_out_notification(
+            User.objects.filter(pk__in=evaluatees).order_by('pk'),
+            title=title,
+            message=lambda user: _digest_message(campaign, evaluatees[user.pk]),
+            notification_type='assignment',
+            link=link,
+            priority='high',
+            smart=True,
+        )
+    except EvaluationCampaign.DoesNotExist:
+        return 0
+    except Exception as exc:
+        raise self.retry(exc=exc)
 
-            notifications_created += 1
+    notified = len(already_notified) + result.recipients
+    _, chunks_key, notified_key = _progress_keys(campaign_id)
+    _add_progress(chunks_key, 1)
+    _add_progress(notified_key, notified)
+    return notified
 
-        return f'{notifications_created} notification(s) sent for campaign {campaign.title}'
 
-    except EvaluationCampaign.DoesNotExist:
-        return f'Campaign {campaign_id} not found'
-    except Exception as e:
-        return f'Error sending campaign notifications: {str(e)}'
+@shared_task
+def finalize_campaign_start_notification(chunk_results, campaign_id):
+    """Chord callback: mark the campaign-start dispatch as completed."""
+    meta_key, _, _ = _progress_keys(campaign_id)
+    notified = sum(chunk_results)
+    meta = cache.get(meta_key) or {'campaign_id': campaign_id}
+    meta.update(status='completed', finished_at=timezone.now().isoformat())
+    cache.set(meta_key, meta, CAMPAIGN_START_PROGRESS_TIMEOUT)
+    logger.info(f"Campaign {campaign_id} start notifications sent to {notified} evaluators")
+    return f'{notified} notification(s) sent for campaign {campaign_id}'
 
 
 @shared_task
@@ -302,3 +432,104 @@ def send_push_notification_task(user_id, title, message, data=None, device_id=No
     )
     deliver_push_notification.delay(record.id)
     return record.id
+
+
+def _deliver_batch(deliver, records):
+    """Deliver queued records in this worker; failures are kept on the record."""
+    sent = 0
+    for record in records:
+        try:
+            deliver(record.pk)
+            sent += 1
+        except Exception as exc:
+            logger.warning(f"{deliver.name} failed for record {record.pk}: {exc}")
+    return sent
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def send_email_batch_task(self, items):
+    """Queue a fan-out chunk of emails with one insert and send it over pooled connections."""
+    from .mailer import OutgoingEmail, send_email_batch
+
+    try:
+        records = EmailNotification.objects.bulk_create([
+            EmailNotification(
+                recipient_id=item.get('recipient_user_id'),
+                recipient_email=item['recipient_email'],
+                subject=item['subject'],
+                body=item['message'],
+                status='sending',
+                task_id=getattr(self.request, 'id', None) or '',
+                metadata={'recipient_name': item['recipient_name']} if item.get('recipient_name') else {},
+            )
+            for item in items
+        ])
+    except Exception as exc:
+        raise self.retry(exc=exc)
+
+    errors = send_email_batch(
+        OutgoingEmail(
+            to=record.recipient_email, subject=record.subject, text=record.body,
+            recipient_id=record.recipient_id,
+        )
+        for record in records
+    )
+
+    now = timezone.now()
+    for record, error in zip(records, errors):
+        record.status = 'failed' if error else 'sent'
+        record.error_message = error or ''
+        record.sent_at = None if error else now
+        record.updated_at = now
+    EmailNotification.objects.bulk_update(
+        records, ['status', 'error_message', 'sent_at', 'updated_at'], batch_size=500
+    )
+    return sum(1 for error in errors if not error)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def send_sms_batch_task(self, items):
+    """Queue and deliver a fan-out chunk of SMS messages with one insert."""
+    try:
+        records = SMSNotification.objects.bulk_create([
+            SMSNotification(
+                recipient_id=item.get('recipient_user_id'),
+                recipient_phone=item['recipient_phone'],
+                message=item['message'],
+                metadata={'priority': item.get('priority', 'normal')},
+            )
+            for item in items
+        ])
+    except Exception as exc:
+        raise self.retry(exc=exc)
+    return _deliver_batch(deliver_sms_notification, records)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def send_push_batch_task(self, items):
+    """Queue and deliver a fan-out chunk of push notifications with one insert."""
+    try:
+        records = PushNotification.objects.bulk_create([
+            PushNotification(
+                user_id=item['user_id'],
+                title=item['title'],
+                message=item['message'],
+                data=item.get('data') or {},
+                priority=item.get('priority', 'normal'),
+            )
+            for item in items
+        ])
+    except Exception as exc:
+        raise self.retry(exc=exc)
+    return _deliver_batch(deliver_push_notification, records)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def reconcile_unread_counts_task(self):
+    """Correct drift of the cached unread counters (schedule periodically via Celery Beat)."""
+    from .counters import reconcile_unread_counts
+
+    try:
+        return reconcile_unread_counts()
+    except Exception as exc:
+        raise self.retry(exc=exc)
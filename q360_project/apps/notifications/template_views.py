@@ -11,7 +11,10 @@ from django.utils import timezone
 from django.http import JsonResponse
 from django.db.models import Q
 
-from .models import Notification, EmailTemplate
+from .counters import get_badge_count, get_unread_count as cached_unread_count
+from .models import BroadcastNotification, Notification, EmailTemplate
+from .services import mark_broadcast_as_read as services_mark_broadcast_as_read
+from .utils import mark_all_as_read as utils_mark_all_as_read
 
 
 @login_required
@@ -39,7 +42,7 @@ def inbox(request):
     # Statistics
     from datetime import date
     total_count = Notification.objects.filter(user=user).count()
-    unread_count = Notification.objects.filter(user=user, is_read=False).count()
+    unread_count = cached_unread_count(user.pk)
     read_count = Notification.objects.filter(user=user, is_read=True).count()
     today_count = Notification.objects.filter(user=user, created_at__date=date.today()).count()
 
@@ -50,6 +53,7 @@ def inbox(request):
         'read_count': read_count,
         'today_count': today_count,
         'filter_type': filter_type,
+        'broadcasts': BroadcastNotification.objects.unread_for_user(user)[:10],
     }
 
     return render(request, 'notifications/inbox.html', context)
@@ -97,14 +101,23 @@ def mark_as_read(request, pk):
     return redirect('notifications:inbox')
 
 
+@login_required
+def mark_broadcast_as_read(request, pk):
+    """Mark a broadcast notification as read for the current user."""
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Yalnız POST sorğuları qəbul edilir.'}, status=405)
+
+    if not services_mark_broadcast_as_read(pk, request.user):
+        return JsonResponse({'success': False, 'message': 'Bildiriş tapılmadı.'}, status=404)
+
+    return JsonResponse({'success': True, 'message': 'Bildiriş oxunmuş kimi işarələndi.'})
+
+
 @login_required
 def mark_all_as_read(request):
     """Mark all notifications as read."""
     if request.method == 'POST':
-        Notification.objects.filter(
-            user=request.user,
-            is_read=False
-        ).update(is_read=True, read_at=timezone.now())
+        utils_mark_all_as_read(request.user)
 
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             return JsonResponse({'success': True, 'message': 'Bütün bildirişlər oxunmuş kimi işarələndi.'})
@@ -257,10 +270,7 @@ def delete_email_template(request, pk):
 @login_required
 def get_unread_count(request):
     """Get unread notification count (AJAX endpoint)."""
-    count = Notification.objects.filter(
-        user=request.user,
-        is_read=False
-    ).count()
+    count = get_badge_count(request.user)
 
     return JsonResponse({'count': count})
 
@@ -275,7 +285,7 @@ def get_recent_notifications(request):
 
         # Get all notifications for the user (for unread count)
         all_notifications = Notification.objects.filter(user=request.user)
-        unread_count = all_notifications.filter(is_read=False).count()
+        unread_count = get_badge_count(request.user)
 
         # Get limited notifications for display
         notifications = all_notifications.order_by('-created_at')[:limit]
@@ -290,6 +300,19 @@ def get_recent_notifications(request):
             'created_at': n.created_at.isoformat(),
         } for n in notifications]
 
+        # Unread broadcasts have no per-user rows; they are marked read via their own endpoint
+        data.extend({
+            'id': b.id,
+            'broadcast': True,
+            'title': b.title,
+            'message': b.message,
+            'type': b.notification_type,
+            'is_read': False,
+            'link': b.link,
+            'created_at': b.created_at.isoformat(),
+        } for b in BroadcastNotification.objects.unread_for_user(request.user)[:limit])
+        data = sorted(data, key=lambda item: item['created_at'], reverse=True)[:limit]
+
         return JsonResponse({
             'success': True,
             'results': data,  # Changed from 'notifications' to 'results' for JS compatibility
@@ -0,0 +1,104 @@
+"""
+Tests for channel-layer group broadcasts.
+"""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.accounts.models import User
+from apps.departments.models import Department, Organization
+from apps.notifications.counters import get_badge_count
+from apps.notifications.models import BroadcastNotification, BroadcastReceipt, Notification
+from apps.notifications.services import broadcast_notification, mark_broadcast_as_read
+
+
+class BroadcastNotificationTests(TestCase):
+    """Test single-row broadcasts with lazy read receipts."""
+
+    def setUp(self):
+        cache.clear()
+        organization = Organization.objects.create(name='Test Təşkilat', short_name='TT')
+        self.finance = Department.objects.create(organization=organization, name='Maliyyə', code='FIN')
+        self.manager = User.objects.create_user(username='manager', password='x', role='manager',
+                                                department=self.finance)
+        self.employee = User.objects.create_user(username='employee', password='x', role='employee')
+        self.channel_layer = MagicMock(group_send=AsyncMock())
+
+    def broadcast(self, **kwargs):
+        with patch('channels.layers.get_channel_layer', return_value=self.channel_layer):
+            with self.captureOnCommitCallbacks(execute=True):
+                return broadcast_notification('Texniki işlər', 'Sistem 22:00-da yenilənəcək', 'system', **kwargs)
+
+    def test_publishes_once_without_per_user_rows(self):
+        with self.assertNumQueries(1):
+            broadcast = self.broadcast()
+
+        self.channel_layer.group_send.assert_awaited_once()
+        group, event = self.channel_layer.group_send.await_args.args
+        self.assertEqual(group, 'notifications_all')
+        self.assertEqual(event['message']['id'], broadcast.pk)
+        self.assertTrue(event['message']['broadcast'])
+        self.assertFalse(Notification.objects.exists())
+
+    def test_audience_groups(self):
+        self.assertEqual(self.broadcast(role='manager').group_name, 'notifications_role_manager')
+        self.assertEqual(
+            self.broadcast(department=self.finance).group_name,
+            f'notifications_department_{self.finance.pk}',
+        )
+        self.assertEqual(BroadcastNotification.objects.for_user(self.manager).count(), 2)
+        self.assertEqual(BroadcastNotification.objects.for_user(self.employee).count(), 0)
+
+    def test_excluded_users_do_not_see_broadcast(self):
+        broadcast = self.broadcast(exclude_user_ids=[self.employee.pk])
+        self.assertEqual(self.channel_layer.group_send.await_args.args[1]['excluded_user_ids'], [self.employee.pk])
+        self.assertFalse(BroadcastNotification.objects.for_user(self.employee).exists())
+        self.assertFalse(mark_broadcast_as_read(broadcast.pk, self.employee))
+
+    def test_read_receipts(self):
+        broadcast = self.broadcast()
+        self.assertEqual(list(BroadcastNotification.objects.unread_for_user(self.employee)), [broadcast])
+
+        self.assertTrue(mark_broadcast_as_read(broadcast.pk, self.employee))
+        self.assertTrue(mark_broadcast_as_read(broadcast.pk, self.employee))
+        self.assertEqual(BroadcastReceipt.objects.count(), 1)
+        self.assertFalse(BroadcastNotification.objects.unread_for_user(self.employee).exists())
+        self.assertTrue(BroadcastNotification.objects.unread_for_user(self.manager).exists())
+
+    def test_mark_read_endpoint(self):
+        broadcast = self.broadcast(role='manager')
+        self.client.login(username='employee', password='x')
+        response = self.client.post(f'/notifications/broadcasts/{broadcast.pk}/read/')
+        self.assertEqual(response.status_code, 404)
+
+        self.client.login(username='manager', password='x')
+        response = self.client.post(f'/notifications/broadcasts/{broadcast.pk}/read/')
+        self.assertEqual(response.json()['success'], True)
+        self.assertTrue(BroadcastReceipt.objects.filter(broadcast=broadcast, user=self.manager).exists())
+
+    def test_badge_counts_unread_broadcasts(self):
+        self.assertEqual(get_badge_count(self.employee), 0)
+        broadcast = self.broadcast()
+        self.assertEqual(get_badge_count(self.employee), 1)
+        with self.assertNumQueries(0):
+            get_badge_count(self.employee)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            mark_broadcast_as_read(broadcast.pk, self.employee)
+        self.assertEqual(get_badge_count(self.employee), 0)
+        self.assertEqual(get_badge_count(self.manager), 1)
+
+    def test_recent_notifications_list_unread_broadcasts(self):
+        broadcast = self.broadcast()
+        self.client.login(username='employee', password='x')
+
+        data = self.client.get('/notifications/api/recent/').json()
+        self.assertEqual(data['unread_count'], 1)
+        self.assertEqual([(item['id'], item.get('broadcast')) for item in data['results']], [(broadcast.pk, True)])
+        self.assertEqual(self.client.get('/notifications/api/unread-count/').json()['count'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/notifications/mark-all-read/', HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(self.client.get('/notifications/api/unread-count/').json()['count'], 0)
+        self.assertEqual(self.client.get('/notifications/api/recent/').json()['results'], [])
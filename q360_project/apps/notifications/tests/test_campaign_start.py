@@ -0,0 +1,89 @@
+"""
+Tests for the chunked campaign-start digest dispatch.
+"""
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.accounts.models import User
+from apps.evaluations.models import EvaluationAssignment, EvaluationCampaign
+from apps.notifications.models import Notification
+from apps.notifications.tasks import campaign_start_progress, send_campaign_start_notification
+
+
+@override_settings(CAMPAIGN_NOTIFICATION_CHUNK_SIZE=2)
+class CampaignStartDigestTests(TestCase):
+    """Test per-evaluator digests dispatched through a chord."""
+
+    def setUp(self):
+        cache.clear()
+        admin = User.objects.create_user(username='digest_admin', password='x')
+        self.campaign = EvaluationCampaign.objects.create(
+            title='Digest Campaign',
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=30),
+            created_by=admin,
+        )
+        self.evaluators = [
+            User.objects.create_user(username=f'digest_evaluator_{i}', password='x', email=f'e{i}@example.com')
+            for i in range(3)
+        ]
+        evaluatees = [
+            User.objects.create_user(username=f'digest_evaluatee_{i}', password='x', first_name='Ad', last_name=f'S{i}')
+            for i in range(7)
+        ]
+        for evaluatee in evaluatees:
+            EvaluationAssignment.objects.create(
+                campaign=self.campaign, evaluator=self.evaluators[0], evaluatee=evaluatee, relationship='peer'
+            )
+        for evaluator in self.evaluators[1:]:
+            EvaluationAssignment.objects.create(
+                campaign=self.campaign, evaluator=evaluator, evaluatee=evaluatees[0], relationship='peer'
+            )
+        Notification.objects.all().delete()
+
+    def test_one_digest_per_evaluator(self):
+        send_campaign_start_notification.delay(self.campaign.pk)
+
+        digests = Notification.objects.filter(title='Yeni Qiymətləndirmə: Digest Campaign', channel='in_app')
+        self.assertEqual(sorted(digests.values_list('user_id', flat=True)), [u.pk for u in self.evaluators])
+        busy = digests.get(user=self.evaluators[0])
+        self.assertIn('7 qiymətləndirmə', busy.message)
+        self.assertIn('və daha 2 nəfər', busy.message)
+        self.assertEqual(busy.link, '/evaluations/my-assignments/')
+
+    def test_progress_is_reported(self):
+        send_campaign_start_notification.delay(self.campaign.pk)
+
+        progress = campaign_start_progress(self.campaign.pk)
+        self.assertEqual(progress['status'], 'completed')
+        self.assertEqual(progress['evaluators'], 3)
+        self.assertEqual(progress['chunks'], 2)
+        self.assertEqual(progress['chunks_done'], 2)
+        self.assertEqual(progress['notified'], 3)
+
+    def test_missing_campaign(self):
+        self.assertEqual(send_campaign_start_notification(0), 'Campaign 0 not found')
+        self.assertIsNone(campaign_start_progress(0))
+
+    def test_retried_chunk_skips_notified_evaluators(self):
+        from django.utils import timezone
+        from apps.notifications.tasks import send_campaign_start_digest_chunk
+
+        started_at = timezone.now().isoformat()
+        evaluator_ids = [u.pk for u in self.evaluators]
+        send_campaign_start_digest_chunk(self.campaign.pk, evaluator_ids[:1], started_at)
+        sent = Notification.objects.count()
+
+        self.assertEqual(send_campaign_start_digest_chunk(self.campaign.pk, evaluator_ids, started_at), 3)
+        digests = Notification.objects.filter(title='Yeni Qiymətləndirmə: Digest Campaign', channel='in_app')
+        self.assertEqual(digests.filter(user=self.evaluators[0]).count(), 1)
+        self.assertGreater(Notification.objects.count(), sent)
+
+    def test_chunk_survives_missing_progress_counters(self):
+        from apps.notifications.tasks import send_campaign_start_digest_chunk
+
+        # Counters set by the parent live in another worker's cache
+        self.assertEqual(send_campaign_start_digest_chunk(self.campaign.pk, [self.evaluators[1].pk]), 1)
+        self.assertEqual(cache.get(f'notifications:campaign_start:{self.campaign.pk}:chunks_done'), 1)
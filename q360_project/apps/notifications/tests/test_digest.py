@@ -0,0 +1,64 @@
+"""
+Tests for digest mode of in-app notifications.
+"""
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.accounts.models import User
+from apps.notifications.models import Notification, UserNotificationPreference
+from apps.notifications.services import digest_window, send_notification_to_user
+
+
+class NotificationDigestTests(TestCase):
+    """Test coalescing of same-type notifications within the digest window."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='digest_user', password='x')
+
+    def reminder_storm(self, count, notification_type='reminder'):
+        with self.captureOnCommitCallbacks(execute=True):
+            for index in range(count):
+                send_notification_to_user(self.user.pk, f'Xatırlatma {index}', 'Mətn', notification_type)
+
+    def test_disabled_by_default(self):
+        self.reminder_storm(3)
+        self.assertEqual(Notification.objects.filter(user=self.user).count(), 3)
+
+    @patch.object(Notification, 'send_real_time_notification', autospec=True)
+    def test_same_type_notifications_are_coalesced(self, push):
+        UserNotificationPreference.objects.create(user=self.user, digest_window_minutes=10)
+
+        self.reminder_storm(5)
+        self.reminder_storm(1, notification_type='assignment')
+
+        digest = Notification.objects.get(user=self.user, notification_type='reminder')
+        self.assertEqual(digest.digest_count, 5)
+        self.assertEqual(digest.title, 'Xatırlatma 4')
+        self.assertEqual(Notification.objects.filter(user=self.user).count(), 2)
+        # The first reminder, its digest flush and the assignment
+        self.assertEqual(push.call_count, 3)
+
+    def test_read_digest_starts_a_new_one(self):
+        UserNotificationPreference.objects.create(user=self.user, digest_window_minutes=10)
+        self.reminder_storm(2)
+        Notification.objects.filter(user=self.user).update(is_read=True)
+
+        self.reminder_storm(2)
+        self.assertEqual(
+            list(Notification.objects.filter(user=self.user).values_list('digest_count', flat=True)),
+            [2, 2],
+        )
+
+    @override_settings(NOTIFICATION_DIGEST_WINDOW_MINUTES=5)
+    def test_window_setting_and_user_override(self):
+        self.assertEqual(digest_window(self.user.pk), 300)
+
+        prefs = UserNotificationPreference.objects.create(user=self.user, digest_window_minutes=0)
+        self.assertEqual(digest_window(self.user.pk), 0)
+
+        prefs.digest_window_minutes = None
+        prefs.save()
+        self.assertEqual(digest_window(self.user.pk), 300)
@@ -0,0 +1,97 @@
+"""
+Tests for bulk notification fan-out.
+"""
+from datetime import datetime, time, timezone as dt_timezone
+
+from django.core import mail
+from django.test import TestCase
+
+from apps.accounts.models import User
+from apps.notifications.fanout import fan_out_notification, route_notification
+from apps.notifications.models import (
+    EmailNotification, Notification, PushNotification, UserNotificationPreference
+)
+from apps.notifications.utils import send_bulk_notification, send_bulk_notification_smart
+
+
+class RoutingRuleTests(TestCase):
+    """Test the in-memory routing rules."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='rule_user', password='x', email='rule@example.com')
+        # Wednesday 23:00 UTC
+        self.now = datetime(2026, 10, 14, 23, 0, tzinfo=dt_timezone.utc)
+
+    def test_defaults_of_unsaved_preferences(self):
+        decision = route_notification(
+            UserNotificationPreference(user=self.user), send_email=True, send_sms=True, now=self.now
+        )
+        self.assertTrue(decision.create)
+        self.assertTrue(decision.email)
+        self.assertFalse(decision.sms)
+        self.assertIsNone(decision.scheduled_time)
+
+    def test_overnight_dnd_defers_non_urgent(self):
+        prefs = UserNotificationPreference(user=self.user, dnd_start_time=time(22), dnd_end_time=time(7, 30))
+
+        decision = route_notification(prefs, send_email=True, now=self.now)
+        self.assertEqual(decision.scheduled_time, self.now.replace(day=15, hour=7, minute=30))
+        self.assertFalse(decision.email)
+
+        urgent = route_notification(prefs, channel='email', priority='urgent', send_email=True, now=self.now)
+        self.assertTrue(urgent.create)
+        self.assertTrue(urgent.email)
+
+    def test_channel_type_opt_out(self):
+        prefs = UserNotificationPreference(user=self.user, email_announcement=False)
+        decision = route_notification(prefs, channel='email', notification_type='announcement', now=self.now)
+        self.assertFalse(decision.create)
+
+
+class FanOutTests(TestCase):
+    """Test chunked fan-out to many recipients."""
+
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=f'fan_{index}', password='x', email=f'fan_{index}@example.com')
+            for index in range(12)
+        ]
+        UserNotificationPreference.objects.create(user=self.users[0], email_notifications=False)
+        UserNotificationPreference.objects.create(
+            user=self.users[1], weekend_notifications=False, dnd_start_time=time(0), dnd_end_time=time(23, 59)
+        )
+
+    def test_in_app_fan_out_queries_per_chunk(self):
+        """Recipients are streamed; each chunk costs one preference read and one insert."""
+        recipients = User.objects.filter(username__startswith='fan_').order_by('pk')
+        with self.assertNumQueries(5):
+            result = fan_out_notification(recipients, 'Elan', 'Mətn', batch_size=6)
+
+        self.assertEqual(result.recipients, 12)
+        self.assertEqual(Notification.objects.count(), 12)
+        self.assertEqual(Notification.objects.filter(scheduled_time__isnull=False).count(), result.scheduled)
+
+    def test_email_deliveries_are_batched(self):
+        notifications = send_bulk_notification(self.users[2:], 'Elan', 'Mətn', send_email=True)
+
+        self.assertEqual(len(notifications), 10)
+        self.assertEqual(EmailNotification.objects.count(), 10)
+        self.assertEqual(len(mail.outbox), 10)
+        self.assertEqual(mail.outbox[0].to, ['fan_2@example.com'])
+
+    def test_email_opt_out_is_respected(self):
+        result = fan_out_notification(self.users[:1], 'Elan', 'Mətn', send_email=True)
+        self.assertEqual(result.email, 0)
+        self.assertEqual(len(result.notifications), 1)
+
+    def test_smart_fan_out(self):
+        """High priority goes out on push, email and in-app for every recipient."""
+        sent = send_bulk_notification_smart(self.users[2:5], 'Vacib', 'Mətn', priority='high')
+
+        self.assertEqual(sent, 3)
+        self.assertEqual(
+            sorted(Notification.objects.values_list('channel', flat=True)),
+            sorted(['push', 'email', 'in_app'] * 3),
+        )
+        self.assertEqual(PushNotification.objects.count(), 3)
+        self.assertEqual(EmailNotification.objects.count(), 3)
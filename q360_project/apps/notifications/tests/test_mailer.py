@@ -0,0 +1,130 @@
+"""
+Tests for batched email delivery.
+"""
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+
+from apps.accounts.models import User
+from apps.notifications.mailer import OutgoingEmail, compile_email_template, send_email_batch
+from apps.notifications.models import BulkNotification, EmailLog, EmailTemplate
+from apps.notifications.utils import send_bulk_emails
+
+
+class CountingBackend(EmailBackend):
+    """Locmem backend that counts opened connections and rejects one address."""
+
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        if any('reject@' in address for message in messages for address in message.to):
+            raise ConnectionError('rejected')
+        return super().send_messages(messages)
+
+
+@override_settings(
+    EMAIL_BACKEND='apps.notifications.tests.test_mailer.CountingBackend',
+    EMAIL_BATCH_SIZE=4,
+)
+class SendEmailBatchTests(TestCase):
+    """Test connection reuse, failure isolation and bulk logging."""
+
+    def setUp(self):
+        CountingBackend.opened = 0
+        self.users = [
+            User.objects.create_user(username=f'mail_{i}', password='x', email=f'mail_{i}@example.com')
+            for i in range(6)
+        ]
+
+    def test_one_connection_per_batch_and_one_log_insert(self):
+        emails = [OutgoingEmail(to=u.email, subject='S', text='T', recipient_id=u.pk) for u in self.users]
+
+        with self.assertNumQueries(1):
+            errors = send_email_batch(emails)
+
+        self.assertEqual(errors, [None] * 6)
+        self.assertEqual(CountingBackend.opened, 2)
+        self.assertEqual(len(mail.outbox), 6)
+        self.assertEqual(EmailLog.objects.filter(status='sent').count(), 6)
+
+    def test_failed_message_does_not_abort_batch(self):
+        emails = [
+            OutgoingEmail(to='a@example.com', subject='S', text='T'),
+            OutgoingEmail(to='reject@example.com', subject='S', text='T', recipient_id=self.users[0].pk),
+            OutgoingEmail(to='b@example.com', subject='S', text='T', html='<p>T</p>'),
+        ]
+        errors = send_email_batch(emails)
+
+        self.assertEqual(errors, [None, 'rejected', None])
+        self.assertEqual([m.to for m in mail.outbox], [['a@example.com'], ['b@example.com']])
+        self.assertEqual(mail.outbox[1].alternatives[0][1], 'text/html')
+        log = EmailLog.objects.get()
+        self.assertEqual((log.status, log.error_message), ('failed', 'rejected'))
+
+
+@override_settings(EMAIL_BACKEND='apps.notifications.tests.test_mailer.CountingBackend')
+class BulkEmailTests(TestCase):
+    """Test template compilation and the bulk mailing helper."""
+
+    def setUp(self):
+        CountingBackend.opened = 0
+        self.template = EmailTemplate.objects.create(
+            name='announce',
+            subject='{{ title }} elanı',
+            html_content='<p>Salam, {{ title }} başlayır. {{ missing }}</p>',
+        )
+
+    def test_compiled_template_matches_placeholder_substitution(self):
+        compiled = compile_email_template(self.template)
+        self.assertIs(compile_email_template(self.template), compiled)
+
+        subject, text, html = compiled.render({'title': 'Kampaniya'})
+        self.assertEqual(subject, 'Kampaniya elanı')
+        self.assertEqual(html, '<p>Salam, Kampaniya başlayır. {{ missing }}</p>')
+        self.assertEqual(text, 'Salam, Kampaniya başlayır. {{ missing }}')
+
+        self.template.subject = 'Yeni {{ title }}'
+        self.template.save()
+        self.assertEqual(compile_email_template(self.template).render({'title': 'X'})[0], 'Yeni X')
+
+    def test_bulk_emails_to_users(self):
+        users = [
+            User.objects.create_user(username=f'bulk_{i}', password='x', email=f'bulk_{i}@example.com')
+            for i in range(3)
+        ]
+        result = send_bulk_emails(
+            User.objects.filter(username__startswith='bulk_'), 'Mövzu', 'Mətn',
+            template_name='announce', context={'title': 'Q360'},
+        )
+
+        self.assertEqual(result, {'total': 3, 'sent': 3, 'failed': 0})
+        self.assertEqual(CountingBackend.opened, 1)
+        self.assertEqual({m.subject for m in mail.outbox}, {'Q360 elanı'})
+        self.assertEqual(EmailLog.objects.filter(template=self.template).count(), len(users))
+        self.assertEqual(BulkNotification.objects.get().sent_count, 3)
+
+    def test_simple_bulk_emails_greet_each_user(self):
+        users = [
+            User.objects.create_user(username='greet_a', password='x', email='a@example.com',
+                                     first_name='Aynur', last_name='<Əliyeva>'),
+            User.objects.create_user(username='greet_b', password='x', email='b@example.com'),
+        ]
+        result = send_bulk_emails(users, 'Mövzu', 'Mətn')
+
+        self.assertEqual(result['sent'], 2)
+        named, unnamed = sorted(mail.outbox, key=lambda message: message.to)
+        self.assertIn('Salam Aynur <Əliyeva>,', named.body)
+        self.assertIn('Salam Aynur &lt;Əliyeva&gt;,', named.alternatives[0][0])
+        self.assertNotIn('Salam', unnamed.body)
+        self.assertNotIn('__q360', named.alternatives[0][0] + unnamed.alternatives[0][0])
+
+    def test_bulk_emails_to_addresses_and_missing_template(self):
+        self.assertEqual(send_bulk_emails(['x@example.com'], 'Mövzu', 'Mətn')['sent'], 1)
+        self.assertEqual(mail.outbox[0].subject, 'Q360 - Mövzu')
+
+        result = send_bulk_emails(['x@example.com'], 'Mövzu', 'Mətn', template_name='absent')
+        self.assertEqual(result['failed'], 1)
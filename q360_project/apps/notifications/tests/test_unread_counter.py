@@ -0,0 +1,120 @@
+"""
+Tests for cached unread notification counters.
+"""
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.accounts.models import User
+from apps.notifications.counters import (
+    UNREAD_COUNT_CACHE_KEY,
+    get_total_unread_count,
+    get_unread_count,
+    reconcile_unread_counts,
+)
+from apps.notifications.fanout import fan_out_notification
+from apps.notifications.models import Notification
+from apps.notifications.utils import mark_all_as_read, mark_as_read
+
+
+class UnreadCounterTests(TestCase):
+    """Test counter maintenance on create, read and delete."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='badge_user', password='x')
+        self.other = User.objects.create_user(username='badge_other', password='x')
+
+    def notify(self, user, count=1):
+        with self.captureOnCommitCallbacks(execute=True):
+            return [
+                Notification.objects.create(user=user, title=f'Bildiriş {index}', message='Mətn')
+                for index in range(count)
+            ]
+
+    def test_cached_read_costs_no_queries(self):
+        self.notify(self.user, 2)
+        self.assertEqual(get_unread_count(self.user.pk), 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(self.user.pk), 2)
+
+    def test_counter_follows_create_read_and_delete(self):
+        get_unread_count(self.user.pk)
+        get_total_unread_count()
+        first, second, third = self.notify(self.user, 3)
+        self.notify(self.other)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(mark_as_read(first.pk, self.user))
+            # Saving an already read notification again does not count twice
+            mark_as_read(first.pk, self.user)
+            second.mark_as_read()
+            third.delete()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(self.user.pk), 0)
+            self.assertEqual(get_total_unread_count(), 1)
+
+    def test_mark_all_as_read_resets_counter(self):
+        self.notify(self.user, 3)
+        self.notify(self.other, 2)
+        get_total_unread_count()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(mark_all_as_read(self.user), 3)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(self.user.pk), 0)
+            self.assertEqual(get_total_unread_count(), 2)
+
+    def test_bulk_fan_out_increments_counters(self):
+        get_unread_count(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            fan_out_notification(User.objects.all(), 'Elan', 'Mətn', notification_type='announcement')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(self.user.pk), 1)
+        self.assertEqual(get_unread_count(self.other.pk), 1)
+
+    def test_reconcile_corrects_drift(self):
+        self.notify(self.user, 2)
+        self.notify(self.other, 1)
+        get_unread_count(self.user.pk)
+        cache.set(UNREAD_COUNT_CACHE_KEY.format(user_id=self.user.pk), 7)
+
+        self.assertEqual(reconcile_unread_counts(), 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(self.user.pk), 2)
+            self.assertEqual(get_unread_count(self.other.pk), 1)
+            self.assertEqual(get_total_unread_count(), 3)
+
+    def test_change_during_count_is_not_lost(self):
+        from unittest.mock import patch
+        from django.db.models import QuerySet
+        from apps.notifications.counters import adjust_unread_count
+
+        self.notify(self.user, 1)
+        count = QuerySet.count
+
+        def count_then_commit(queryset):
+            counted = count(queryset)
+            # A notification committed after the COUNT(*) but before the counter is stored
+            Notification.objects.create(user=self.user, title='Gecikmiş', message='Mətn')
+            with self.captureOnCommitCallbacks(execute=True):
+                adjust_unread_count(self.user.pk, 1)
+            return counted
+
+        with patch.object(QuerySet, 'count', count_then_commit):
+            self.assertEqual(get_unread_count(self.user.pk), 1)
+        self.assertEqual(get_unread_count(self.user.pk), Notification.objects.filter(user=self.user).count())
+
+    def test_reconcile_is_scheduled(self):
+        from django.conf import settings
+
+        tasks = {entry['task'] for entry in settings.CELERY_BEAT_SCHEDULE.values()}
+        self.assertIn('apps.notifications.tasks.reconcile_unread_counts_task', tasks)
+
+    def test_unread_count_endpoint(self):
+        self.notify(self.user, 2)
+        self.client.login(username='badge_user', password='x')
+        response = self.client.get('/notifications/api/unread-count/')
+        self.assertEqual(response.json(), {'count': 2})
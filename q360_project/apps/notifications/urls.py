@@ -14,6 +14,7 @@ urlpatterns = [
     path('<int:pk>/read/', template_views.mark_as_read, name='mark-as-read'),
     path('<int:pk>/mark-read/', template_views.mark_as_read, name='mark-read'),  # Alternative URL
     path('mark-all-read/', template_views.mark_all_as_read, name='mark-all-as-read'),
+    path('broadcasts/<int:pk>/read/', template_views.mark_broadcast_as_read, name='mark-broadcast-read'),
     path('<int:pk>/delete/', template_views.delete_notification, name='delete-notification'),
     path('delete-all/', template_views.delete_all_notifications, name='delete-all-notifications'),
     path('settings/', template_views.notification_settings, name='settings'),
@@ -1,13 +1,21 @@
 """
 Utility functions for notifications app.
 """
+import logging
+
 from django.core.mail import send_mail
 from django.conf import settings
 from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+from django.utils.html import escape, strip_tags
 from django.utils import timezone
+from .fanout import fan_out_notification, recipient_phone, route_notification, smart_channels
 from .models import Notification, EmailTemplate, EmailLog
 
+logger = logging.getLogger(__name__)
+
+# Stand-in for the recipient's name while the simple bulk email is rendered once
+RECIPIENT_NAME_PLACEHOLDER = '__q360_recipient_name__'
+
 
 def send_notification(recipient, title, message, notification_type='info', link='', send_email=True, send_sms=False, send_push=False, channel='in_app', priority='normal'):
     """
@@ -29,115 +37,28 @@ def send_notification(recipient, title, message, notification_type='info', link=
         Notification object
     """
     from .models import UserNotificationPreference
-    from django.utils import timezone
-    from datetime import datetime, time
-    
-    # Get user preferences
+
     user_prefs, created = UserNotificationPreference.objects.get_or_create(user=recipient)
-    
-    # Check Do Not Disturb settings
-    current_time = timezone.now().time()
-    is_dnd_time = False
-    if user_prefs.dnd_start_time and user_prefs.dnd_end_time:
-        if user_prefs.dnd_start_time <= user_prefs.dnd_end_time:
-            # Same day DND (e.g., 22:00 to 08:00)
-            is_dnd_time = user_prefs.dnd_start_time <= current_time <= user_prefs.dnd_end_time
-        else:
-            # Overnight DND (e.g., 22:00 to 08:00 next day)
-            is_dnd_time = current_time >= user_prefs.dnd_start_time or current_time <= user_prefs.dnd_end_time
-    
-    # Check if it's a weekend and user doesn't want weekend notifications
-    if not user_prefs.weekend_notifications and timezone.now().weekday() >= 5:  # 5 = Saturday, 6 = Sunday
-        is_dnd_time = True
-    
-    # Check if it's outside working hours
-    is_working_hours = False
-    if not (user_prefs.weekday_start <= current_time <= user_prefs.weekday_end):
-        is_working_hours = True
-    if timezone.now().weekday() >= 5:  # Weekend
-        is_working_hours = False
-    
-    # Check if user wants this type of notification via this channel
-    notification_allowed = True
-    if channel == 'email':
-        notification_allowed = user_prefs.email_notifications
-        if notification_type == 'assignment' and not user_prefs.email_assignment:
-            notification_allowed = False
-        elif notification_type == 'reminder' and not user_prefs.email_reminder:
-            notification_allowed = False
-        elif notification_type == 'announcement' and not user_prefs.email_announcement:
-            notification_allowed = False
-        elif notification_type == 'security' and not user_prefs.email_security:
-            notification_allowed = False
-    elif channel == 'sms':
-        # For SMS, also check if it's urgent and user only wants urgent SMS
-        notification_allowed = user_prefs.sms_notifications
-        if user_prefs.sms_important_only and priority not in ['high', 'urgent']:
-            notification_allowed = False
-        if notification_type == 'assignment' and not user_prefs.sms_assignment:
-            notification_allowed = False
-        elif notification_type == 'reminder' and not user_prefs.sms_reminder:
-            notification_allowed = False
-        elif notification_type == 'security' and not user_prefs.sms_security:
-            notification_allowed = False
-    elif channel == 'push':
-        notification_allowed = user_prefs.push_notifications
-        if notification_type == 'assignment' and not user_prefs.push_assignment:
-            notification_allowed = False
-        elif notification_type == 'reminder' and not user_prefs.push_reminder:
-            notification_allowed = False
-        elif notification_type == 'announcement' and not user_prefs.push_announcement:
-            notification_allowed = False
-
-    # If in DND time and notification is not urgent, defer it
-    if is_dnd_time and priority not in ['high', 'urgent']:
-        # Create a scheduled notification for when DND ends
-        from .models import Notification
-        scheduled_time = None
-        if user_prefs.dnd_end_time:
-            now = timezone.now()
-            if current_time < user_prefs.dnd_end_time:
-                # DND ends today
-                scheduled_time = now.replace(
-                    hour=user_prefs.dnd_end_time.hour,
-                    minute=user_prefs.dnd_end_time.minute,
-                    second=0,
-                    microsecond=0
-                )
-            else:
-                # DND ends tomorrow
-                from datetime import timedelta
-                scheduled_time = (now + timedelta(days=1)).replace(
-                    hour=user_prefs.dnd_end_time.hour,
-                    minute=user_prefs.dnd_end_time.minute,
-                    second=0,
-                    microsecond=0
-                )
-        
-        if scheduled_time:
-            notification = Notification.objects.create(
-                user=recipient,
-                title=title,
-                message=message,
-                notification_type=notification_type,
-                link=link,
-                channel=channel,
-                priority=priority,
-                scheduled_time=scheduled_time
-            )
-            return notification
-    elif is_dnd_time and priority in ['high', 'urgent'] and is_working_hours:
-        # For urgent notifications outside working hours, check if user allows them
-        if priority == 'urgent' or user_prefs.push_notifications:
-            # Send as urgent notification bypassing DND
-            pass
-        else:
-            notification_allowed = False
+    decision = route_notification(
+        user_prefs, channel, notification_type, priority, send_email, send_sms, send_push
+    )
+
+    # Non-urgent notifications during Do Not Disturb are scheduled for when it ends
+    if decision.scheduled_time:
+        return Notification.objects.create(
+            user=recipient,
+            title=title,
+            message=message,
+            notification_type=notification_type,
+            link=link,
+            channel=channel,
+            priority=priority,
+            scheduled_time=decision.scheduled_time
+        )
 
     # Create system notification if allowed
     notification = None
-    if notification_allowed or channel == 'in_app':
-        from .models import Notification
+    if decision.create:
         notification = Notification.objects.create(
             user=recipient,
             title=title,
@@ -149,7 +70,7 @@ def send_notification(recipient, title, message, notification_type='info', link=
         )
 
     # Send email if requested and user allows it
-    if send_email and recipient.email and user_prefs.email_notifications:
+    if decision.email and recipient.email:
         try:
             from .tasks import send_email_notification_task
             send_email_notification_task.delay(
@@ -163,11 +84,9 @@ def send_notification(recipient, title, message, notification_type='info', link=
             print(f"Email sending failed: {e}")
 
     # Send SMS if requested and user allows it
-    if send_sms and user_prefs.sms_notifications:
+    if decision.sms:
         try:
-            phone_number = getattr(recipient, 'phone_number', None) or \
-                          getattr(recipient.profile, 'work_phone', None) or \
-                          getattr(recipient.profile, 'phone_number', None) if hasattr(recipient, 'profile') else None
+            phone_number = recipient_phone(recipient)
             if phone_number:
                 from .tasks import send_sms_notification_task
                 send_sms_notification_task.delay(
@@ -179,7 +98,7 @@ def send_notification(recipient, title, message, notification_type='info', link=
             print(f"SMS sending failed: {e}")
 
     # Send push notification if requested and user allows it
-    if send_push and user_prefs.push_notifications:
+    if decision.push:
         try:
             from .tasks import send_push_notification_task
             send_push_notification_task.delay(
@@ -213,60 +132,10 @@ def send_notification_by_smart_routing(recipient, title, message, notification_t
         Notification object
     """
     from .models import UserNotificationPreference
-    from django.utils import timezone
-    
+
     user_prefs, created = UserNotificationPreference.objects.get_or_create(user=recipient)
-    
-    # Determine best channels based on priority and preferences
-    channels = []
-    
-    # For urgent notifications, always try all enabled channels
-    if priority in ['high', 'urgent']:
-        if user_prefs.push_notifications:
-            channels.append('push')
-        if user_prefs.email_notifications and recipient.email:
-            channels.append('email')
-        if user_prefs.sms_notifications:
-            phone_number = getattr(recipient, 'phone_number', None) or \
-                          getattr(recipient.profile, 'work_phone', None) if hasattr(recipient, 'profile') else None
-            if phone_number:
-                channels.append('sms')
-        if user_prefs.email_notifications:  # also send in-app for important
-            channels.append('in_app')
-    else:
-        # For normal notifications, use user's preferred primary channel
-        if notification_type == 'assignment':
-            if user_prefs.push_assignment or user_prefs.email_assignment:
-                if user_prefs.push_notifications:
-                    channels.append('push')
-                elif user_prefs.email_notifications and recipient.email:
-                    channels.append('email')
-            else:
-                channels.append('in_app')
-        elif notification_type == 'reminder':
-            if user_prefs.push_reminder or user_prefs.email_reminder:
-                if user_prefs.push_notifications:
-                    channels.append('push')
-                elif user_prefs.email_notifications and recipient.email:
-                    channels.append('email')
-            else:
-                channels.append('in_app')
-        elif notification_type == 'announcement':
-            if user_prefs.push_announcement:
-                channels.append('push')
-            elif user_prefs.email_notifications and recipient.email:
-                channels.append('email')
-            else:
-                channels.append('in_app')
-        else:
-            # Default to user's preference
-            if user_prefs.push_notifications:
-                channels.append('push')
-            elif user_prefs.email_notifications and recipient.email:
-                channels.append('email')
-            else:
-                channels.append('in_app')
-    
+    channels = smart_channels(user_prefs, recipient, notification_type, priority)
+
     # Send notification through all selected channels
     notification = None
     for channel in channels:
@@ -521,6 +390,10 @@ def send_bulk_emails(recipients, subject, message, template_name=None, context=N
     """
     Send bulk emails to multiple recipients.
 
+    The body is rendered once and all messages go out through
+    ``send_email_batch`` over pooled connections. Without a template each
+    user is greeted by name, which is filled into the rendered body.
+
     Args:
         recipients: List of email addresses or User queryset
         subject: Email subject
@@ -528,47 +401,80 @@ def send_bulk_emails(recipients, subject, message, template_name=None, context=N
         template_name: Optional template name to use
         context: Context data for template
     """
+    from .mailer import OutgoingEmail, compile_email_template, send_email_batch
     from .models import BulkNotification
     from django.contrib.auth import get_user_model
     
     User = get_user_model()
     
-    # Convert to email list
-    email_list = []
+    # Convert to (email, user id, full name) triples
+    addresses = []
     if recipients and hasattr(recipients, 'model') and recipients.model == User:
         # This is a User queryset
-        email_list = [user.email for user in recipients if user.email]
+        addresses = [
+            (user.email, user.id, user.get_full_name())
+            for user in recipients.exclude(email='').only('email', 'first_name', 'middle_name', 'last_name')
+        ]
     elif isinstance(recipients, list) and recipients:
         if isinstance(recipients[0], User):
             # List of User objects
-            email_list = [user.email for user in recipients if user.email]
+            addresses = [(user.email, user.id, user.get_full_name()) for user in recipients if user.email]
         else:
             # List of email addresses
-            email_list = recipients
+            addresses = [(email, None, '') for email in recipients]
     
     # Create bulk notification record
     bulk_notif = BulkNotification.objects.create(
         title=subject,
         message=message,
-        recipients_count=len(email_list),
+        recipients_count=len(addresses),
         filter_criteria={'type': 'email'},
         channels=['email'],
         initiated_by=getattr(recipients, 'initiated_by', None) if hasattr(recipients, 'initiated_by') else None
     )
-    
-    sent_count = 0
-    failed_count = 0
-    
-    for email in email_list:
-        try:
-            if template_name:
-                send_template_email(email, template_name, context or {})
-            else:
-                send_simple_email(email, subject, message)
-            sent_count += 1
-        except Exception as e:
-            failed_count += 1
-            print(f"Failed to send email to {email}: {e}")
+
+    # Render once for the whole mailing
+    template = None
+    bodies = {}
+    if template_name:
+        template = EmailTemplate.objects.filter(name=template_name, is_active=True).first()
+        if template is None:
+            logger.error(f"Email template '{template_name}' not found")
+        else:
+            rendered_subject, text, html = compile_email_template(template).render(context or {})
+    else:
+        rendered_subject = f'Q360 - {subject}'
+        # The greeting is only shown with a name, so render both variants
+        for greeted in (False, True):
+            body = render_to_string('notifications/simple_email.html', {
+                'recipient_name': RECIPIENT_NAME_PLACEHOLDER if greeted else '',
+                'message': message,
+                'year': 2024,
+            })
+            bodies[greeted] = (strip_tags(body), body)
+
+    def body_for(name):
+        if template is not None:
+            return text, html
+        if not name:
+            return bodies[False]
+        named_text, named_html = bodies[True]
+        return (named_text.replace(RECIPIENT_NAME_PLACEHOLDER, name),
+                named_html.replace(RECIPIENT_NAME_PLACEHOLDER, escape(name)))
+
+    if template_name and template is None:
+        errors = [f"Template '{template_name}' not found"] * len(addresses)
+    else:
+        emails = []
+        for email, user_id, name in addresses:
+            text_body, html_body = body_for(name)
+            emails.append(OutgoingEmail(
+                to=email, subject=rendered_subject, text=text_body, html=html_body,
+                recipient_id=user_id, template_id=template.pk if template else None,
+            ))
+        errors = send_email_batch(emails)
+    failed_count = sum(1 for error in errors if error)
+    sent_count = len(addresses) - failed_count
     
     # Update bulk notification record
     bulk_notif.status = 'completed'
@@ -578,7 +484,7 @@ def send_bulk_emails(recipients, subject, message, template_name=None, context=N
     bulk_notif.save()
     
     return {
-        'total': len(email_list),
+        'total': len(addresses),
         'sent': sent_count,
         'failed': failed_count
     }
@@ -601,21 +507,17 @@ def send_bulk_notification(recipients, title, message, notification_type='info',
     Returns:
         List of created notifications
     """
-    notifications = []
-    for recipient in recipients:
-        notification = send_notification(
-            recipient=recipient,
-            title=title,
-            message=message,
-            notification_type=notification_type,
-            link=link,
-            send_email=send_email and not send_sms and not send_push,  # For bulk, just send to DB unless other channels are specified
-            send_sms=send_sms,
-            send_push=send_push
-        )
-        notifications.append(notification)
-
-    return notifications
+    result = fan_out_notification(
+        recipients,
+        title=title,
+        message=message,
+        notification_type=notification_type,
+        link=link,
+        send_email=send_email and not send_sms and not send_push,  # For bulk, just send to DB unless other channels are specified
+        send_sms=send_sms,
+        send_push=send_push,
+    )
+    return result.notifications
 
 
 def send_bulk_notification_smart(recipients, title, message, notification_type='info', priority='normal'):
@@ -632,18 +534,15 @@ def send_bulk_notification_smart(recipients, title, message, notification_type='
     Returns:
         Count of notifications sent
     """
-    sent_count = 0
-    for recipient in recipients:
-        send_notification_by_smart_routing(
-            recipient=recipient,
-            title=title,
-            message=message,
-            notification_type=notification_type,
-            priority=priority
-        )
-        sent_count += 1
-    
-    return sent_count
+    result = fan_out_notification(
+        recipients,
+        title=title,
+        message=message,
+        notification_type=notification_type,
+        priority=priority,
+        smart=True,
+    )
+    return result.recipients
 
 
 def mark_as_read(notification_id, user):
@@ -670,7 +569,7 @@ def mark_as_read(notification_id, user):
 
 def mark_all_as_read(user):
     """
-    Mark all notifications as read for a user.
+    Mark all notifications, and the broadcasts addressed to the user, as read.
 
     Args:
         user: User object
@@ -679,6 +578,8 @@ def mark_all_as_read(user):
         Number of notifications marked as read
     """
     from django.utils import timezone
+    from .counters import clear_unread_count, invalidate_broadcast_counts
+    from .models import BroadcastNotification, BroadcastReceipt
     count = Notification.objects.filter(
         user=user,
         is_read=False
@@ -686,12 +587,26 @@ def mark_all_as_read(user):
         is_read=True,
         read_at=timezone.now()
     )
+    clear_unread_count(user.pk, count)
+
+    BroadcastReceipt.objects.bulk_create(
+        [
+            BroadcastReceipt(broadcast_id=broadcast_id, user=user)
+            for broadcast_id in BroadcastNotification.objects.unread_for_user(user).values_list('pk', flat=True)
+        ],
+        ignore_conflicts=True,
+    )
+    # bulk_create bypasses the receipt signals
+    invalidate_broadcast_counts(user.pk)
     return count
 
 
 def get_unread_count(user):
     """
-    Get count of unread notifications for a user.
+    Get count of unread notifications for a user, unread broadcasts included.
+
+    Served from the cached counters (see ``counters``); only a missing counter
+    costs a query.
 
     Args:
         user: User object
@@ -699,7 +614,8 @@ def get_unread_count(user):
     Returns:
         Integer count of unread notifications
     """
-    return Notification.objects.filter(user=user, is_read=False).count()
+    from .counters import get_badge_count
+    return get_badge_count(user)
 
 
 def delete_old_notifications(days=30):
@@ -61,7 +61,8 @@ def notification_settings_dashboard(request):
     # Get statistics
     from .models import Notification
     total_notifications = Notification.objects.filter(user=request.user).count()
-    unread_notifications = Notification.objects.filter(user=request.user, is_read=False).count()
+    from .utils import get_unread_count
+    unread_notifications = get_unread_count(request.user)
     
     context = {
         'user_pref': user_pref,
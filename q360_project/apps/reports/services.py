@@ -8,7 +8,7 @@ from datetime import timedelta
 from typing import Dict, List, Optional
 
 from django.apps import apps
-from django.core.files.base import ContentFile
+from django.core.files.base import ContentFile, File
 from django.utils.text import slugify
 from django.db.models import Avg, Count
 from django.utils import timezone
@@ -21,7 +21,7 @@ from .models import (
     ReportScheduleLog,
     ReportGenerationLog,
 )
-from .utils import build_dataset_excel, build_dataset_pdf, build_dataset_csv
+from .utils import build_dataset_pdf, build_dataset_csv, excel_to_tempfile
 
 
 @dataclass
@@ -111,17 +111,21 @@ def export_report_source(report_source, export_format: str, requested_by, params
 
     try:
         if report_type == 'excel':
-            content = build_dataset_excel(dataset.title, dataset.columns, dataset.rows, dataset.metadata)
+            # Written through a temporary file so the workbook is never held in memory
+            content = File(excel_to_tempfile(
+                dataset.title, dataset.columns, dataset.rows, dataset.metadata, min_width=12
+            ), name=f'{slug}.xlsx')
             extension = 'xlsx'
         elif report_type == 'pdf':
-            content = build_dataset_pdf(dataset.title, dataset.columns, dataset.rows, dataset.metadata)
+            content = ContentFile(build_dataset_pdf(dataset.title, dataset.columns, dataset.rows, dataset.metadata))
             extension = 'pdf'
         else:
-            content = build_dataset_csv(dataset.title, dataset.columns, dataset.rows)
+            content = ContentFile(build_dataset_csv(dataset.title, dataset.columns, dataset.rows))
             extension = 'csv'
 
         filename = f"{slug}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
-        log.file.save(filename, ContentFile(content), save=False)
+        with content:
+            log.file.save(filename, content, save=False)
         log.status = 'completed'
         log.completed_at = timezone.now()
         log.metadata = {**log.metadata, **dataset.metadata}
@@ -4,10 +4,12 @@ Prevents timeout issues during PDF/Excel generation.
 """
 from celery import shared_task
 from django.utils import timezone
-from django.core.files.base import ContentFile
+from django.core.files.base import ContentFile, File
 
 from apps.reports.models import ReportGenerationLog
-from apps.reports.utils import generate_pdf_report, generate_excel_report
+from apps.reports.utils import (
+    CAMPAIGN_RESULT_HEADERS, excel_to_tempfile, generate_pdf_report, iter_campaign_result_rows
+)
 from apps.notifications.utils import send_notification
 
 
@@ -116,12 +118,15 @@ def generate_excel_report_async(self, campaign_id, user_id):
         # Get the campaign
         campaign = EvaluationCampaign.objects.get(pk=campaign_id)
 
-        # Generate Excel
-        excel_content = generate_excel_report(campaign)
+        # Generate Excel into a temporary file, streaming rows from the database
+        excel_file = excel_to_tempfile(
+            "Nəticələr", CAMPAIGN_RESULT_HEADERS, iter_campaign_result_rows(campaign), header_size=12
+        )
 
         # Save Excel file
         filename = f'kampaniya_{campaign.pk}_neticeler_{timezone.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-        log.file.save(filename, ContentFile(excel_content), save=False)
+        with File(excel_file, name=filename) as content:
+            log.file.save(filename, content, save=False)
 
         # Update log status
         log.status = 'completed'
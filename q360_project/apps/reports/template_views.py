@@ -28,13 +28,14 @@ from .models import (
 )
 from .services import build_dataset_for_blueprint
 from .utils import (
-    build_dataset_csv,
-    build_dataset_excel,
+    CAMPAIGN_RESULT_HEADERS,
+    EXPORT_CHUNK_SIZE,
     build_dataset_pdf,
     calculate_radar_data,
-    generate_csv_report,
-    generate_excel_report,
     generate_pdf_report,
+    iter_campaign_result_rows,
+    stream_csv_response,
+    stream_excel_response,
 )
 
 
@@ -306,25 +307,32 @@ def _apply_dynamic_filters(queryset, filter_rules):
     return queryset
 
 
-def _build_table_dataset(results, selected_columns):
+def _table_headers(selected_columns):
     headers = []
     column_meta = []
     for column_key in selected_columns:
         config = COLUMN_CONFIG[column_key]
         headers.append(str(config['label']))
         column_meta.append({'id': column_key, 'label': str(config['label']), 'type': config['type']})
+    return headers, column_meta
+
 
-    rows = []
+def _iter_table_rows(results, selected_columns):
+    """Yield table rows one result at a time."""
+    configs = [COLUMN_CONFIG[column_key] for column_key in selected_columns]
     for result in results:
         row = []
-        for column_key in selected_columns:
-            config = COLUMN_CONFIG[column_key]
+        for config in configs:
             value = config['value'](result)
             if config['type'] == 'number':
                 value = round(float(value), 2) if value not in ('-', None) else 0
             row.append(value)
-        rows.append(row)
+        yield row
+
 
+def _build_table_dataset(results, selected_columns):
+    headers, column_meta = _table_headers(selected_columns)
+    rows = list(_iter_table_rows(results, selected_columns))
     return headers, rows, column_meta
 
 
@@ -676,16 +684,18 @@ def export_excel(request, campaign_pk):
         messages.error(request, 'Bu hesabatı ixrac etmək icazəniz yoxdur.')
         return redirect('dashboard')
 
-    # Generate Excel
-    excel_content = generate_excel_report(campaign)
-
-    response = HttpResponse(
-        excel_content,
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = f'attachment; filename="kampaniya_{campaign.pk}_neticeler.xlsx"'
+    rows = iter_campaign_result_rows(campaign)
+    if request.GET.get('format') == 'csv':
+        return stream_csv_response(f'kampaniya_{campaign.pk}_neticeler.csv', CAMPAIGN_RESULT_HEADERS, rows)
 
-    return response
+    try:
+        return stream_excel_response(
+            f'kampaniya_{campaign.pk}_neticeler.xlsx', "Nəticələr", CAMPAIGN_RESULT_HEADERS, rows,
+            header_size=12
+        )
+    except RuntimeError as exc:
+        messages.error(request, str(exc))
+        return redirect('dashboard')
 
 
 @login_required
@@ -1305,20 +1315,23 @@ def export_custom_report(request):
     results_query = _apply_dynamic_filters(results_query, filter_rules)
     results = results_query.all()
 
-    if not results.exists():
+    first_result = results.first()
+    if first_result is None:
         messages.error(request, _('Seçilmiş meyarlara uyğun heç bir nəticə tapılmadı.'))
         return redirect('reports:custom-builder')
 
-    headers, rows, column_meta = _build_table_dataset(results, selected_columns)
+    headers, column_meta = _table_headers(selected_columns)
+    # Rows are produced lazily from a server-side cursor so large exports stay in bounded memory
+    rows = _iter_table_rows(results.iterator(chunk_size=EXPORT_CHUNK_SIZE), selected_columns)
 
-    campaign_title = results.first().campaign.title if results and results.first().campaign else _('Fərdi hesabat')
+    campaign_title = first_result.campaign.title if first_result.campaign else _('Fərdi hesabat')
     title = f"{campaign_title} - {_('Xüsusi Hesabat')}"
 
     metadata = {
         'kampaniya': campaign_title,
         'seçilmiş_sütunlar': [meta['label'] for meta in column_meta],
         'filtrlər': _serialize_filters_for_metadata(filter_rules) or [_('Filtr tətbiq edilməyib')],
-        'hesabat_sətirləri': len(rows),
+        'hesabat_sətirləri': results.count(),
         'yaradılma_tarixi': timezone.localtime(timezone.now()).strftime('%d.%m.%Y %H:%M'),
     }
 
@@ -1328,21 +1341,15 @@ def export_custom_report(request):
         if export_format == 'pdf':
             content = build_dataset_pdf(title, headers, rows, metadata)
             response = HttpResponse(content, content_type='application/pdf')
-            filename = f'custom_report_{timestamp}.pdf'
+            response['Content-Disposition'] = f'attachment; filename="custom_report_{timestamp}.pdf"'
         elif export_format == 'csv':
-            content = build_dataset_csv(title, headers, rows)
-            response = HttpResponse(content, content_type='text/csv; charset=utf-8-sig')
-            filename = f'custom_report_{timestamp}.csv'
+            response = stream_csv_response(f'custom_report_{timestamp}.csv', headers, rows)
         else:
-            content = build_dataset_excel(title, headers, rows, metadata)
-            response = HttpResponse(
-                content,
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            response = stream_excel_response(
+                f'custom_report_{timestamp}.xlsx', title, headers, rows, metadata, min_width=12
             )
-            filename = f'custom_report_{timestamp}.xlsx'
     except RuntimeError as exc:
         messages.error(request, str(exc))
         return redirect('reports:custom-builder')
 
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
     return response
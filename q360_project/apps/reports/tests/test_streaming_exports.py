@@ -0,0 +1,92 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO
+
+import openpyxl
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.accounts.models import User
+from apps.evaluations.models import EvaluationCampaign, EvaluationResult
+from apps.reports.utils import (
+    CAMPAIGN_RESULT_HEADERS,
+    build_dataset_csv,
+    build_dataset_excel,
+    generate_excel_report,
+    iter_campaign_result_rows,
+    iter_csv,
+)
+
+
+class StreamingExportTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="export_admin",
+            password="pass1234",
+            role="admin",
+        )
+        self.campaign = EvaluationCampaign.objects.create(
+            title="Export Campaign",
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=30),
+            created_by=self.admin,
+        )
+        for index, score in enumerate(["4.50", "3.25", "2.00"]):
+            evaluatee = User.objects.create_user(
+                username=f"export_user_{index}",
+                password="pass1234",
+                first_name="Ad",
+                last_name=f"Soyad {index}",
+            )
+            EvaluationResult.objects.create(
+                campaign=self.campaign,
+                evaluatee=evaluatee,
+                overall_score=Decimal(score),
+                total_evaluators=index + 1,
+                completion_rate=Decimal("100.00"),
+            )
+
+    def test_campaign_rows_are_read_without_model_instances(self):
+        with self.assertNumQueries(1):
+            rows = list(iter_campaign_result_rows(self.campaign))
+
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0][:2], ["export_user_0", "Ad Soyad 0"])
+        self.assertEqual(rows[0][4], 4.5)
+        self.assertEqual(len(rows[0]), len(CAMPAIGN_RESULT_HEADERS))
+
+    def test_csv_is_generated_row_by_row(self):
+        chunks = list(iter_csv(["A", "B"], ([i, i * 2] for i in range(3))))
+
+        self.assertEqual(len(chunks), 4)
+        self.assertTrue(chunks[0].startswith("\ufeff".encode("utf-8")))
+        self.assertEqual(b"".join(chunks), build_dataset_csv("t", ["A", "B"], [[0, 0], [1, 2], [2, 4]]))
+
+    def test_write_only_workbook_contents(self):
+        content = build_dataset_excel("Dataset", ["Ad", "Bal"], ([f"r{i}", i] for i in range(500)), {"a": 1})
+
+        workbook = openpyxl.load_workbook(BytesIO(content))
+        sheet = workbook["Dataset"]
+        self.assertEqual(sheet.max_row, 501)
+        self.assertEqual(sheet["A1"].value, "Ad")
+        self.assertEqual(sheet["B501"].value, 499)
+        self.assertGreaterEqual(sheet.column_dimensions["A"].width, 12)
+        self.assertEqual(workbook["Metadata"]["A2"].value, "a")
+
+        report = openpyxl.load_workbook(BytesIO(generate_excel_report(self.campaign)))
+        self.assertEqual(report.active.max_row, 4)
+
+    def test_export_views_stream(self):
+        self.client.login(username="export_admin", password="pass1234")
+        url = reverse("reports:export-excel", kwargs={"campaign_pk": self.campaign.pk})
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        workbook = openpyxl.load_workbook(BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(workbook.active.max_row, 4)
+
+        response = self.client.get(url, {"format": "csv"})
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode("utf-8-sig").splitlines()
+        self.assertEqual(len(lines), 4)
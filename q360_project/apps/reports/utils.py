@@ -1,10 +1,29 @@
 """
 Utility functions for report generation.
 """
-from io import BytesIO
+import csv
+import tempfile
+from io import BytesIO, StringIO
+
 from django.conf import settings
+from django.http import FileResponse, StreamingHttpResponse
+
 from apps.evaluations.models import Response, QuestionCategory
 
+EXCEL_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Rows fetched per database round-trip while streaming exports
+EXPORT_CHUNK_SIZE = 2000
+
+# Rows inspected to estimate column widths (write-only sheets cannot be re-read)
+COLUMN_WIDTH_SAMPLE_ROWS = 200
+
+CAMPAIGN_RESULT_HEADERS = [
+    'İşçi ID', 'Ad Soyad', 'Şöbə', 'Vəzifə',
+    'Ümumi Bal', 'Özüm', 'Rəhbər', 'Həmkar', 'Tabelik',
+    'Qiymətləndirən Sayı', 'Tamamlanma %'
+]
+
 
 def calculate_radar_data(evaluation_result):
     """Calculate radar chart data for an evaluation result."""
@@ -144,177 +163,232 @@ def generate_pdf_report(evaluation_result):
     return pdf_content
 
 
-def generate_excel_report(campaign):
-    """Generate Excel report for campaign results."""
-    try:
-        import openpyxl
-        from openpyxl.styles import Font, Alignment, PatternFill
-    except ImportError:
-        return b"Excel generation requires openpyxl package"
-
-    from apps.evaluations.models import EvaluationResult
-
-    # Create workbook
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Nəticələr"
+def _score(value):
+    return float(value) if value else 0
 
-    # Header style
-    header_fill = PatternFill(start_color="0d6efd", end_color="0d6efd", fill_type="solid")
-    header_font = Font(color="FFFFFF", bold=True, size=12)
 
-    # Headers
-    headers = [
-        'İşçi ID', 'Ad Soyad', 'Şöbə', 'Vəzifə',
-        'Ümumi Bal', 'Özüm', 'Rəhbər', 'Həmkar', 'Tabelik',
-        'Qiymətləndirən Sayı', 'Tamamlanma %'
-    ]
+def iter_campaign_result_rows(campaign, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield campaign result rows for export without loading model instances.
 
-    for col, header in enumerate(headers, start=1):
-        cell = ws.cell(row=1, column=col)
-        cell.value = header
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal='center')
+    Rows are read with ``values_list().iterator()`` so memory use stays flat
+    regardless of the number of results.
+    """
+    from apps.evaluations.models import EvaluationResult
 
-    # Data
     results = EvaluationResult.objects.filter(
         campaign=campaign
-    ).select_related('evaluatee', 'evaluatee__department').order_by('-overall_score')
-
-    for row, result in enumerate(results, start=2):
-        ws.cell(row=row, column=1).value = result.evaluatee.employee_id or result.evaluatee.username
-        ws.cell(row=row, column=2).value = result.evaluatee.get_full_name()
-        ws.cell(row=row, column=3).value = str(result.evaluatee.department) if result.evaluatee.department else '-'
-        ws.cell(row=row, column=4).value = result.evaluatee.position or '-'
-        ws.cell(row=row, column=5).value = float(result.overall_score) if result.overall_score else 0
-        ws.cell(row=row, column=6).value = float(result.self_score) if result.self_score else 0
-        ws.cell(row=row, column=7).value = float(result.supervisor_score) if result.supervisor_score else 0
-        ws.cell(row=row, column=8).value = float(result.peer_score) if result.peer_score else 0
-        ws.cell(row=row, column=9).value = float(result.subordinate_score) if result.subordinate_score else 0
-        ws.cell(row=row, column=10).value = result.total_evaluators
-        ws.cell(row=row, column=11).value = float(result.completion_rate)
-
-    # Auto-size columns
-    for column in ws.columns:
-        max_length = 0
-        column_letter = column[0].column_letter
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(cell.value)
-            except:
-                pass
-        adjusted_width = (max_length + 2)
-        ws.column_dimensions[column_letter].width = adjusted_width
-
-    # Save to BytesIO
-    buffer = BytesIO()
-    wb.save(buffer)
-    excel_content = buffer.getvalue()
-    buffer.close()
-
-    return excel_content
-
-
-def generate_csv_report(results_queryset, include_fields=None):
-    """Generate CSV report from queryset."""
-    import csv
-    from io import StringIO
-
-    output = StringIO()
-    writer = csv.writer(output)
+    ).order_by('-overall_score').values_list(
+        'evaluatee__employee_id', 'evaluatee__username',
+        'evaluatee__first_name', 'evaluatee__middle_name', 'evaluatee__last_name',
+        'evaluatee__department__name', 'evaluatee__department__organization__short_name',
+        'evaluatee__position',
+        'overall_score', 'self_score', 'supervisor_score', 'peer_score', 'subordinate_score',
+        'total_evaluators', 'completion_rate',
+    )
 
-    # Default fields if not specified
-    if not include_fields:
-        include_fields = [
-            'employee_id', 'full_name', 'department', 'position',
-            'overall_score', 'self_score', 'supervisor_score',
-            'peer_score', 'subordinate_score'
+    for (employee_id, username, first_name, middle_name, last_name,
+         department_name, organization_short_name, position,
+         overall, self_score, supervisor, peer, subordinate,
+         total_evaluators, completion_rate) in results.iterator(chunk_size=chunk_size):
+        yield [
+            employee_id or username,
+            ' '.join(filter(None, [first_name, middle_name, last_name])),
+            f"{organization_short_name} - {department_name}" if department_name else '-',
+            position or '-',
+            _score(overall),
+            _score(self_score),
+            _score(supervisor),
+            _score(peer),
+            _score(subordinate),
+            total_evaluators,
+            float(completion_rate),
         ]
 
-    # Headers
-    headers = []
-    for field in include_fields:
-        headers.append(field.replace('_', ' ').title())
-    writer.writerow(headers)
-
-    # Data rows
-    for result in results_queryset:
-        row = []
-        for field in include_fields:
-            if field == 'employee_id':
-                row.append(result.evaluatee.employee_id or result.evaluatee.username)
-            elif field == 'full_name':
-                row.append(result.evaluatee.get_full_name())
-            elif field == 'department':
-                row.append(str(result.evaluatee.department) if result.evaluatee.department else '-')
-            elif field == 'position':
-                row.append(result.evaluatee.position or '-')
-            elif field == 'overall_score':
-                row.append(float(result.overall_score) if result.overall_score else 0)
-            elif field == 'self_score':
-                row.append(float(result.self_score) if result.self_score else 0)
-            elif field == 'supervisor_score':
-                row.append(float(result.supervisor_score) if result.supervisor_score else 0)
-            elif field == 'peer_score':
-                row.append(float(result.peer_score) if result.peer_score else 0)
-            elif field == 'subordinate_score':
-                row.append(float(result.subordinate_score) if result.subordinate_score else 0)
-            elif field == 'campaign':
-                row.append(result.campaign.title if result.campaign else '-')
-            elif field == 'calculated_at':
-                row.append(result.calculated_at.strftime('%d.%m.%Y %H:%M') if result.calculated_at else '-')
-            else:
-                row.append('-')
-        writer.writerow(row)
 
-    csv_content = output.getvalue()
-    output.close()
+def _estimate_column_widths(columns, sample_rows, min_width=0):
+    widths = [len(str(column)) for column in columns]
+    for row in sample_rows:
+        for index, value in enumerate(row[:len(widths)]):
+            if value is not None:
+                widths[index] = max(widths[index], len(str(value)))
+    return [max(width + 2, min_width) for width in widths]
 
-    return csv_content.encode('utf-8-sig')  # BOM for Excel compatibility
 
+def write_excel(fileobj, title, columns, rows, metadata=None, header_size=None, min_width=0):
+    """
+    Write rows to an .xlsx file using an openpyxl write-only workbook.
 
-def build_dataset_excel(title, columns, rows, metadata=None):
-    """Generate a generic Excel workbook from dataset."""
+    Rows are appended as they are produced and never kept as cell objects,
+    so exports run in bounded memory. Column widths are estimated from the
+    header and the first rows instead of re-walking every cell.
+
+    Raises:
+        RuntimeError: If openpyxl is not installed
+    """
     try:
         import openpyxl
+        from openpyxl.cell import WriteOnlyCell
         from openpyxl.styles import Alignment, Font, PatternFill
+        from openpyxl.utils import get_column_letter
     except ImportError as exc:
         raise RuntimeError('Excel export requires openpyxl') from exc
 
-    metadata = metadata or {}
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = title[:31] if title else "Report"
+    rows = iter(rows)
+    sample = []
+    for row in rows:
+        sample.append(row)
+        if len(sample) >= COLUMN_WIDTH_SAMPLE_ROWS:
+            break
 
-    header_fill = PatternFill(start_color="0d6efd", end_color="0d6efd", fill_type="solid")
-    header_font = Font(color="FFFFFF", bold=True)
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(title[:31] if title else "Report")
 
-    for col_index, column in enumerate(columns, start=1):
-        cell = ws.cell(row=1, column=col_index, value=column)
+    for index, width in enumerate(_estimate_column_widths(columns, sample, min_width), start=1):
+        ws.column_dimensions[get_column_letter(index)].width = width
+
+    header_fill = PatternFill(start_color="0d6efd", end_color="0d6efd", fill_type="solid")
+    header_font = Font(color="FFFFFF", bold=True, size=header_size) if header_size else Font(color="FFFFFF", bold=True)
+    header = []
+    for column in columns:
+        cell = WriteOnlyCell(ws, value=column)
         cell.fill = header_fill
         cell.font = header_font
         cell.alignment = Alignment(horizontal="center")
+        header.append(cell)
+    ws.append(header)
 
-    for row_index, row in enumerate(rows, start=2):
-        for col_index, value in enumerate(row, start=1):
-            ws.cell(row=row_index, column=col_index).value = value
-
-    for column_cells in ws.columns:
-        max_length = max(len(str(cell.value)) if cell.value else 0 for cell in column_cells)
-        ws.column_dimensions[column_cells[0].column_letter].width = max(max_length + 2, 12)
+    for row in sample:
+        ws.append(row)
+    for row in rows:
+        ws.append(row)
 
     if metadata:
         meta_sheet = wb.create_sheet("Metadata")
-        meta_sheet["A1"].value = "Açar"
-        meta_sheet["B1"].value = "Dəyər"
-        for index, (key, value) in enumerate(metadata.items(), start=2):
-            meta_sheet.cell(row=index, column=1, value=str(key))
-            meta_sheet.cell(row=index, column=2, value=str(value))
+        meta_sheet.append(["Açar", "Dəyər"])
+        for key, value in metadata.items():
+            meta_sheet.append([str(key), str(value)])
+
+    wb.save(fileobj)
+
+
+def excel_to_tempfile(title, columns, rows, metadata=None, **options):
+    """Write an Excel export to an anonymous temporary file, rewound for reading."""
+    tmp = tempfile.TemporaryFile()
+    try:
+        write_excel(tmp, title, columns, rows, metadata, **options)
+    except Exception:
+        tmp.close()
+        raise
+    tmp.seek(0)
+    return tmp
+
+
+def stream_excel_response(filename, title, columns, rows, metadata=None, **options):
+    """
+    Build a file-backed Excel download.
+
+    The workbook is written to a temporary file and sent in blocks by
+    ``FileResponse``; the file is removed when the response is closed.
+    """
+    tmp = excel_to_tempfile(title, columns, rows, metadata, **options)
+    return FileResponse(tmp, as_attachment=True, filename=filename, content_type=EXCEL_CONTENT_TYPE)
+
+
+def iter_csv(columns, rows):
+    """
+    Yield encoded CSV lines one row at a time.
+
+    The first chunk carries a UTF-8 BOM so Excel detects the encoding.
+    """
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return value.encode('utf-8')
+
+    writer.writerow(columns)
+    yield '\ufeff'.encode('utf-8') + flush()
+    for row in rows:
+        writer.writerow(row)
+        yield flush()
+
+
+def stream_csv_response(filename, columns, rows):
+    """Stream a CSV download generated row by row."""
+    response = StreamingHttpResponse(iter_csv(columns, rows), content_type='text/csv; charset=utf-8-sig')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def generate_excel_report(campaign):
+    """Generate Excel report for campaign results."""
+    try:
+        tmp = excel_to_tempfile(
+            "Nəticələr", CAMPAIGN_RESULT_HEADERS, iter_campaign_result_rows(campaign), header_size=12
+        )
+    except RuntimeError:
+        return b"Excel generation requires openpyxl package"
+    with tmp:
+        return tmp.read()
+
+
+def generate_csv_report(results_queryset, include_fields=None):
+    """Generate CSV report from queryset."""
+    # Default fields if not specified
+    if not include_fields:
+        include_fields = [
+            'employee_id', 'full_name', 'department', 'position',
+            'overall_score', 'self_score', 'supervisor_score',
+            'peer_score', 'subordinate_score'
+        ]
+
+    # Headers
+    headers = [field.replace('_', ' ').title() for field in include_fields]
+
+    if hasattr(results_queryset, 'iterator'):
+        results_queryset = results_queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    def rows():
+        for result in results_queryset:
+            row = []
+            for field in include_fields:
+                if field == 'employee_id':
+                    row.append(result.evaluatee.employee_id or result.evaluatee.username)
+                elif field == 'full_name':
+                    row.append(result.evaluatee.get_full_name())
+                elif field == 'department':
+                    row.append(str(result.evaluatee.department) if result.evaluatee.department else '-')
+                elif field == 'position':
+                    row.append(result.evaluatee.position or '-')
+                elif field == 'overall_score':
+                    row.append(float(result.overall_score) if result.overall_score else 0)
+                elif field == 'self_score':
+                    row.append(float(result.self_score) if result.self_score else 0)
+                elif field == 'supervisor_score':
+                    row.append(float(result.supervisor_score) if result.supervisor_score else 0)
+                elif field == 'peer_score':
+                    row.append(float(result.peer_score) if result.peer_score else 0)
+                elif field == 'subordinate_score':
+                    row.append(float(result.subordinate_score) if result.subordinate_score else 0)
+                elif field == 'campaign':
+                    row.append(result.campaign.title if result.campaign else '-')
+                elif field == 'calculated_at':
+                    row.append(result.calculated_at.strftime('%d.%m.%Y %H:%M') if result.calculated_at else '-')
+                else:
+                    row.append('-')
+            yield row
+
+    return b''.join(iter_csv(headers, rows()))  # BOM for Excel compatibility
 
+
+def build_dataset_excel(title, columns, rows, metadata=None):
+    """Generate a generic Excel workbook from dataset."""
     buffer = BytesIO()
-    wb.save(buffer)
+    write_excel(buffer, title, columns, rows, metadata, min_width=12)
     return buffer.getvalue()
 
 
@@ -334,7 +408,7 @@ def build_dataset_pdf(title, columns, rows, metadata=None):
 
     story = [Paragraph(title or "Hesabat", styles['Title']), Spacer(1, 18)]
 
-    data = [columns] + rows
+    data = [list(columns)] + list(rows)
     table = Table(data, repeatRows=1)
     table.setStyle(TableStyle([
         ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#0d6efd')),
@@ -358,11 +432,4 @@ def build_dataset_pdf(title, columns, rows, metadata=None):
 
 def build_dataset_csv(title, columns, rows):
     """Generate CSV bytes from dataset."""
-    import csv
-    import io
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(columns)
-    writer.writerows(rows)
-    return output.getvalue().encode('utf-8-sig')
+    return b''.join(iter_csv(columns, rows))
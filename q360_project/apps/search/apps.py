@@ -3,4 +3,14 @@ from django.apps import AppConfig
 
 class SearchConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.search'
\ No newline at end of file
+    name = 'apps.search'
+
+    def ready(self):
+        """Keep the search document table in sync with searchable models."""
+        from django.db.models.signals import post_migrate
+
+        from .signals import connect_search_signals, populate_empty_search_index
+        connect_search_signals()
+        # Fills the index on the first migrate after deploy
+        post_migrate.connect(populate_empty_search_index, sender=self,
+                             dispatch_uid='search_populate_empty_index')
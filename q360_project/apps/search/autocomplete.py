@@ -0,0 +1,169 @@
+"""
+Prefix index for search-as-you-type autocomplete.
+
+The lowercased terms of every suggestible ``SearchDocument`` (users,
+departments, competencies and trainings) are stored in ``AutocompleteTerm``,
+with Azerbaijani letters also indexed in ASCII-folded form. A keystroke is
+answered by one query using prefix lookups on the indexed ``term`` column,
+and repeated prefixes (the same keystrokes from many users) are served from
+the cache for ``AUTOCOMPLETE_CACHE_TIMEOUT`` seconds without touching the
+database. Terms are replaced whenever their document is upserted (model
+signals and ``rebuild_search_index``) and removed with it; both bump a version
+that is part of the cache keys, so changes show up on the next keystroke.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Length, Lower
+
+from .models import AutocompleteTerm, SearchDocument
+
+logger = logging.getLogger(__name__)
+
+AUTOCOMPLETE_ENTITY_TYPES = ('user', 'department', 'competency', 'training')
+
+# Shortest query word that is looked up
+MIN_QUERY_LENGTH = 2
+
+TERM_MAX_LENGTH = 100
+
+# Azerbaijani letters typed without diacritics still match
+ASCII_FOLD = str.maketrans('əıöüşçğ', 'eiouscg')
+
+TERM_RE = re.compile(r'[\w@.]+')
+
+AUTOCOMPLETE_CACHE_KEY = 'search:autocomplete:{version}:{digest}'
+AUTOCOMPLETE_VERSION_KEY = 'search:autocomplete:version'
+
+
+def normalize_terms(text: str) -> List[str]:
+    """Lowercased terms of a text, with ASCII-folded variants added."""
+    terms = []
+    for term in TERM_RE.findall((text or '').lower()):
+        terms.append(term)
+        folded = term.translate(ASCII_FOLD)
+        if folded != term:
+            terms.append(folded)
+    return terms
+
+
+def terms_for(source, obj) -> List[str]:
+    """Autocomplete terms of an object, empty if it should not be suggested."""
+    if source.entity_type not in AUTOCOMPLETE_ENTITY_TYPES or not getattr(obj, 'is_active', True):
+        return []
+    keywords = [str(source.title(obj) or '')]
+    if source.entity_type == 'user':
+        keywords.append(obj.username)
+    return sorted({term[:TERM_MAX_LENGTH] for keyword in keywords for term in normalize_terms(keyword)})
+
+
+def _cache_version() -> int:
+    version = cache.get(AUTOCOMPLETE_VERSION_KEY)
+    if version is None:
+        # Start from the clock so an evicted version never reuses old entries
+        cache.add(AUTOCOMPLETE_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(AUTOCOMPLETE_VERSION_KEY)
+    return version
+
+
+def invalidate_autocomplete_cache() -> None:
+    """Stop serving cached suggestions once the current transaction commits."""
+    def bump():
+        try:
+            cache.incr(AUTOCOMPLETE_VERSION_KEY)
+        except ValueError:
+            cache.set(AUTOCOMPLETE_VERSION_KEY, time.time_ns(), None)
+
+    transaction.on_commit(bump)
+
+
+def replace_autocomplete_terms(source, documents: Sequence[SearchDocument], objects: Sequence) -> int:
+    """
+    Replace the terms of freshly upserted documents.
+
+    Args:
+        documents: Upserted documents (with primary keys), in the order of ``objects``
+
+    Returns:
+        int: Number of stored terms
+    """
+    if source.entity_type not in AUTOCOMPLETE_ENTITY_TYPES or not documents:
+        return 0
+    AutocompleteTerm.objects.filter(document__in=[document.pk for document in documents]).delete()
+    rows = [
+        AutocompleteTerm(document_id=document.pk, term=term)
+        for document, obj in zip(documents, objects)
+        for term in terms_for(source, obj)
+    ]
+    AutocompleteTerm.objects.bulk_create(rows, batch_size=2000)
+    invalidate_autocomplete_cache()
+    return len(rows)
+
+
+def autocomplete(query: str, limit: int = 10, entity_types: Optional[Iterable[str]] = None) -> List[Dict]:
+    """
+    Suggest objects whose terms start with every word of the query.
+
+    One indexed query, cached per normalized prefix, entity types and limit;
+    titles starting with the full query rank first.
+    """
+    from .indexing import SOURCES_BY_ENTITY
+
+    query_terms = TERM_RE.findall((query or '').lower())
+    if not query_terms or len(query_terms[0]) < MIN_QUERY_LENGTH:
+        return []
+    allowed = [
+        entity_type for entity_type in AUTOCOMPLETE_ENTITY_TYPES
+        if not entity_types or entity_type in entity_types
+    ]
+    if not allowed:
+        return []
+
+    phrase = ' '.join((query or '').lower().split())
+    limit = max(1, limit)
+    digest = hashlib.sha1(
+        '\x1f'.join([phrase, ','.join(allowed), str(limit)]).encode('utf-8')
+    ).hexdigest()
+    cache_key = AUTOCOMPLETE_CACHE_KEY.format(version=_cache_version(), digest=digest)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    documents = SearchDocument.objects.filter(entity_type__in=allowed, is_active=True)
+    for term in query_terms:
+        folded = term.translate(ASCII_FOLD)
+        documents = documents.filter(pk__in=AutocompleteTerm.objects.filter(
+            Q(term__startswith=term) | Q(term__startswith=folded)
+        ).values('document_id'))
+
+    rows = (
+        documents.annotate(
+            phrase_match=Case(When(title__istartswith=phrase, then=Value(0)), default=Value(1),
+                              output_field=IntegerField()),
+            title_length=Length('title'),
+        )
+        .order_by('phrase_match', 'title_length', Lower('title'))
+        .values('object_id', 'entity_type', 'title', 'summary', 'url')[:limit]
+    )
+    results = [
+        {
+            'id': row['object_id'],
+            'model': row['entity_type'],
+            'title': row['title'],
+            'content': row['summary'],
+            'url': row['url'],
+            'category': SOURCES_BY_ENTITY[row['entity_type']].category,
+        }
+        for row in rows
+    ]
+    cache.set(cache_key, results, settings.AUTOCOMPLETE_CACHE_TIMEOUT)
+    return results
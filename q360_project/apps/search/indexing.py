@@ -0,0 +1,215 @@
+"""
+Search index maintenance.
+
+Each searchable model is described by a ``SearchSource`` that maps an object
+to a ``SearchDocument``. Documents are upserted with their weighted
+``tsvector`` computed inside the same INSERT, kept current by model signals,
+and can be rebuilt in batches with ``rebuild_search_index``.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import SearchVector
+from django.db import transaction
+from django.db.models import TextField, Value
+
+from .autocomplete import invalidate_autocomplete_cache, replace_autocomplete_terms
+from .models import SearchDocument
+
+logger = logging.getLogger(__name__)
+
+
+def _truncate(text: str, length: int = 100) -> str:
+    text = text or ''
+    return text[:length] + '...' if len(text) > length else text
+
+
+@dataclass(frozen=True)
+class SearchSource:
+    """How a model is represented in the search index."""
+
+    entity_type: str
+    model_path: str
+    category: str
+    title: Callable
+    body: Callable
+    summary: Callable
+    url: Callable
+    # Saves touching none of these fields (e.g. last_login) skip re-indexing
+    index_fields: Tuple[str, ...] = ()
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_path)
+
+
+SEARCH_SOURCES: Tuple[SearchSource, ...] = (
+    SearchSource(
+        entity_type='user',
+        model_path='accounts.User',
+        category='İstifadəçilər',
+        title=lambda user: user.get_full_name() or user.username,
+        body=lambda user: ' '.join(filter(None, [user.username, user.email, user.position])),
+        summary=lambda user: f"İstifadəçi - {user.email}",
+        url=lambda user: f'/accounts/profile/{user.id}/',
+        index_fields=('first_name', 'middle_name', 'last_name', 'username', 'email', 'position', 'is_active'),
+    ),
+    SearchSource(
+        entity_type='competency',
+        model_path='competencies.Competency',
+        category='Kompetensiyalar',
+        title=lambda competency: competency.name,
+        body=lambda competency: competency.description,
+        summary=lambda competency: _truncate(competency.description),
+        url=lambda competency: f'/competencies/{competency.id}/',
+        index_fields=('name', 'description', 'is_active'),
+    ),
+    SearchSource(
+        entity_type='training',
+        model_path='training.TrainingResource',
+        category='Təlimlər',
+        title=lambda training: training.title,
+        body=lambda training: training.description,
+        summary=lambda training: _truncate(training.description),
+        url=lambda training: f'/training/{training.id}/',
+        index_fields=('title', 'description', 'is_active'),
+    ),
+    SearchSource(
+        entity_type='department',
+        model_path='departments.Department',
+        category='Şöbələr',
+        title=lambda department: department.name,
+        body=lambda department: department.description,
+        summary=lambda department: _truncate(department.description),
+        url=lambda department: f'/departments/{department.id}/',
+        index_fields=('name', 'description', 'is_active'),
+    ),
+    SearchSource(
+        entity_type='question',
+        model_path='evaluations.Question',
+        category='Suallar',
+        title=lambda question: _truncate(question.text, 200),
+        body=lambda question: question.text,
+        summary=lambda question: _truncate(question.text),
+        url=lambda question: f'/evaluations/questions/{question.id}/edit/',
+        index_fields=('text', 'is_active'),
+    ),
+)
+
+SOURCES_BY_ENTITY: Dict[str, SearchSource] = {source.entity_type: source for source in SEARCH_SOURCES}
+
+
+def source_for_model(model) -> Optional[SearchSource]:
+    label = model._meta.label
+    for source in SEARCH_SOURCES:
+        if source.model_path == label:
+            return source
+    return None
+
+
+def search_vector_for(title: str, body: str) -> SearchVector:
+    """Weighted tsvector expression built from literal values (no column references)."""
+    config = settings.SEARCH_TEXT_CONFIG
+    return (
+        SearchVector(Value(title or '', output_field=TextField()), weight='A', config=config)
+        + SearchVector(Value(body or '', output_field=TextField()), weight='B', config=config)
+    )
+
+
+def build_document(source: SearchSource, obj, content_type: ContentType) -> SearchDocument:
+    title = str(source.title(obj) or '')[:500]
+    body = str(source.body(obj) or '')
+    return SearchDocument(
+        content_type=content_type,
+        object_id=obj.pk,
+        entity_type=source.entity_type,
+        title=title,
+        summary=str(source.summary(obj) or '')[:300],
+        body=body,
+        url=source.url(obj)[:500],
+        is_active=getattr(obj, 'is_active', True),
+        search_vector=search_vector_for(title, body),
+    )
+
+
+def upsert_documents(documents: List[SearchDocument], batch_size: int = 500) -> int:
+    """Insert or refresh documents (vector included) with one upsert per batch."""
+    if not documents:
+        return 0
+    SearchDocument.objects.bulk_create(
+        documents,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['content_type', 'object_id'],
+        update_fields=[
+            'entity_type', 'title', 'summary', 'body', 'url', 'is_active',
+            'search_vector', 'updated_at',
+        ],
+    )
+    return len(documents)
+
+
+def _index_batch(source: SearchSource, objects: List, content_type: ContentType, batch_size: int = 500) -> int:
+    """Upsert the documents of ``objects`` and replace their autocomplete terms."""
+    documents = [build_document(source, obj, content_type) for obj in objects]
+    indexed = upsert_documents(documents, batch_size)
+    replace_autocomplete_terms(source, documents, objects)
+    return indexed
+
+
+def index_object(obj) -> bool:
+    """Index or refresh a single object. Returns False for unregistered models."""
+    source = source_for_model(type(obj))
+    if source is None:
+        return False
+    content_type = ContentType.objects.get_for_model(type(obj))
+    _index_batch(source, [obj], content_type)
+    return True
+
+
+def remove_object(obj) -> None:
+    """Remove an object's document from the index."""
+    SearchDocument.objects.filter(
+        content_type=ContentType.objects.get_for_model(type(obj)),
+        object_id=obj.pk,
+    ).delete()
+    invalidate_autocomplete_cache()
+
+
+def rebuild_search_index(entity_types: Optional[Iterable[str]] = None, batch_size: int = 1000) -> Dict[str, int]:
+    """
+    Rebuild documents for the given entity types (all by default).
+
+    Objects are read in chunks and upserted in batches; documents whose
+    object no longer exists are removed.
+
+    Returns:
+        dict: Number of indexed documents per entity type
+    """
+    sources = [SOURCES_BY_ENTITY[entity] for entity in entity_types] if entity_types else SEARCH_SOURCES
+    counts = {}
+    for source in sources:
+        model = source.model
+        content_type = ContentType.objects.get_for_model(model)
+        indexed = 0
+        batch = []
+        with transaction.atomic():
+            for obj in model.objects.order_by('pk').iterator(chunk_size=batch_size):
+                batch.append(obj)
+                if len(batch) >= batch_size:
+                    indexed += _index_batch(source, batch, content_type, batch_size)
+                    batch = []
+            indexed += _index_batch(source, batch, content_type, batch_size)
+
+            SearchDocument.objects.filter(content_type=content_type).exclude(
+                object_id__in=model.objects.values('pk')
+            ).delete()
+        counts[source.entity_type] = indexed
+        logger.info(f"Search index rebuilt for {source.entity_type}: {indexed} documents")
+    return counts
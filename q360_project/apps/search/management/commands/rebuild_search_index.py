@@ -0,0 +1,32 @@
+"""
+Management command to rebuild the unified search document table.
+
+An empty index is filled automatically after ``migrate`` (see
+``signals.populate_empty_search_index``); run this command to rebuild a
+populated index, e.g. after changing a search source.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.search.indexing import SOURCES_BY_ENTITY, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Axtarış indeksini (SearchDocument cədvəlini) yenidən qurur'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'entity_types', nargs='*',
+            help=f"Yalnız bu növlər: {', '.join(SOURCES_BY_ENTITY)}"
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        unknown = set(options['entity_types']) - set(SOURCES_BY_ENTITY)
+        if unknown:
+            raise CommandError(f"Naməlum növ: {', '.join(sorted(unknown))}")
+
+        counts = rebuild_search_index(options['entity_types'] or None, batch_size=options['batch_size'])
+
+        for entity_type, count in counts.items():
+            self.stdout.write(f'  {entity_type}: {count}')
+        self.stdout.write(self.style.SUCCESS(f'{sum(counts.values())} sənəd indeksləndi'))
@@ -0,0 +1,57 @@
+# Generated by Django 5.1.4 on 2026-10-17 12:02
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_text_search_config(apps, schema_editor):
+    """Saxlanılan vektorlar üçün azerbaijani mətn axtarışı konfiqurasiyasını yaradır."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("""
+            DO $$
+            BEGIN
+                IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'azerbaijani') THEN
+                    CREATE TEXT SEARCH CONFIGURATION azerbaijani (COPY = simple);
+                END IF;
+            END
+            $$;
+        """)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('search', '0001_add_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_text_search_config, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='Obyekt ID')),
+                ('entity_type', models.CharField(db_index=True, help_text='Qısa növ açarı (user, competency, training, department, question)', max_length=30, verbose_name='Obyekt Növü')),
+                ('title', models.CharField(max_length=500, verbose_name='Başlıq')),
+                ('summary', models.CharField(blank=True, max_length=300, verbose_name='Qısa Məzmun')),
+                ('body', models.TextField(blank=True, verbose_name='Mətn')),
+                ('url', models.CharField(blank=True, max_length=500, verbose_name='Link')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Aktiv')),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype', verbose_name='Məzmun Növü')),
+            ],
+            options={
+                'verbose_name': 'Axtarış Sənədi',
+                'verbose_name_plural': 'Axtarış Sənədləri',
+                'indexes': [django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='search_doc_vector_gin'), django.contrib.postgres.indexes.GinIndex(fields=['title'], name='search_doc_title_trgm', opclasses=['gin_trgm_ops']), models.Index(fields=['entity_type', 'is_active'], name='search_sear_entity__b0ae03_idx')],
+                'unique_together': {('content_type', 'object_id')},
+            },
+        ),
+    ]
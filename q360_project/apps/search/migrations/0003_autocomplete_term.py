@@ -0,0 +1,26 @@
+# Generated by Django 5.1.4 on 2026-10-17 13:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0002_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AutocompleteTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(db_index=True, max_length=100, verbose_name='Termin')),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='autocomplete_terms', to='search.searchdocument', verbose_name='Sənəd')),
+            ],
+            options={
+                'verbose_name': 'Avtotamamlama Termini',
+                'verbose_name_plural': 'Avtotamamlama Terminləri',
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.4 on 2026-10-17 13:54
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('search', '0003_autocomplete_term'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='searchdocument',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['body'], name='search_doc_body_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -1,3 +1,80 @@
+"""
+Models for search app.
+"""
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.utils.translation import gettext_lazy as _
 
-# Create your models here.
\ No newline at end of file
+
+class SearchDocument(models.Model):
+    """
+    Denormalized search entry for a searchable object.
+
+    Title, body and a precomputed, weighted ``tsvector`` are stored for every
+    indexed object, so global search runs as a single ranked query over one
+    GIN-indexed table instead of one full-text query per model.
+    """
+
+    content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        verbose_name=_('Məzmun Növü')
+    )
+    object_id = models.PositiveBigIntegerField(verbose_name=_('Obyekt ID'))
+    entity_type = models.CharField(
+        max_length=30,
+        db_index=True,
+        verbose_name=_('Obyekt Növü'),
+        help_text=_('Qısa növ açarı (user, competency, training, department, question)')
+    )
+
+    title = models.CharField(max_length=500, verbose_name=_('Başlıq'))
+    summary = models.CharField(max_length=300, blank=True, verbose_name=_('Qısa Məzmun'))
+    body = models.TextField(blank=True, verbose_name=_('Mətn'))
+    url = models.CharField(max_length=500, blank=True, verbose_name=_('Link'))
+    is_active = models.BooleanField(default=True, verbose_name=_('Aktiv'))
+
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('Axtarış Sənədi')
+        verbose_name_plural = _('Axtarış Sənədləri')
+        unique_together = [['content_type', 'object_id']]
+        indexes = [
+            GinIndex(fields=['search_vector'], name='search_doc_vector_gin'),
+            GinIndex(fields=['title'], name='search_doc_title_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['body'], name='search_doc_body_trgm', opclasses=['gin_trgm_ops']),
+            models.Index(fields=['entity_type', 'is_active']),
+        ]
+
+    def __str__(self):
+        return f"{self.entity_type}: {self.title[:50]}"
+
+
+class AutocompleteTerm(models.Model):
+    """
+    One lowercased term of a suggestible search document.
+
+    Autocomplete matches query words against these terms with prefix lookups
+    on the ``term`` index, so a keystroke is one indexed query instead of
+    ``icontains`` scans over every source model.
+    """
+
+    document = models.ForeignKey(
+        SearchDocument,
+        on_delete=models.CASCADE,
+        related_name='autocomplete_terms',
+        verbose_name=_('Sənəd')
+    )
+    term = models.CharField(max_length=100, db_index=True, verbose_name=_('Termin'))
+
+    class Meta:
+        verbose_name = _('Avtotamamlama Termini')
+        verbose_name_plural = _('Avtotamamlama Terminləri')
+
+    def __str__(self):
+        return self.term
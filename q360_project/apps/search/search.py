@@ -6,139 +6,173 @@ from django.contrib.postgres.search import (
     SearchVector, SearchQuery, SearchRank,
     TrigramSimilarity, SearchHeadline
 )
-from django.db.models import Q, F, Value, Count
+from django.db.models import Q, F, Value, Count, FloatField, Window
+from django.db.models.functions import RowNumber
 from django.apps import apps
 from django.conf import settings
+from django.core.cache import cache
 from django.db import connection
+import hashlib
+import json
+import re
 
-def advanced_search(query, user=None, use_trigram=True, min_similarity=0.3):
+from .indexing import SOURCES_BY_ENTITY
+from .models import SearchDocument
+
+SEARCH_CACHE_PREFIX = 'search:v2:'
+
+# Default pg_trgm.similarity_threshold used by the indexable % operator
+TRIGRAM_DEFAULT_THRESHOLD = 0.3
+
+# Entity types of the global search page and API (questions are only part of advanced_search)
+GLOBAL_SEARCH_ENTITY_TYPES = ('user', 'competency', 'training', 'department')
+
+
+def build_prefix_query(query):
     """
-    Advanced search with PostgreSQL Full-Text Search and Trigram similarity.
+    Build a prefix-matching tsquery (``word1:* & word2:*``) from user input.
+
+    Returns None when the query has no searchable words.
+    """
+    terms = re.findall(r'\w+', query.lower())
+    if not terms:
+        return None
+    return SearchQuery(
+        ' & '.join(f'{term}:*' for term in terms),
+        search_type='raw',
+        config=settings.SEARCH_TEXT_CONFIG,
+    )
+
+
+def _search_cache_key(**params):
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return SEARCH_CACHE_PREFIX + hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def search_documents(query, user=None, entity_types=None, limit=20, per_type_limit=None,
+                     use_trigram=True, min_similarity=TRIGRAM_DEFAULT_THRESHOLD, headline=False):
+    """
+    Ranked search across every indexed entity type with a single query.
+
+    Full-text matches use the stored, GIN-indexed search vector (with prefix
+    matching); fuzzy matches use the trigram index on the title. Substrings of
+    the title or body (e-mail, description) match too, via the trigram indexes
+    on both columns. Headlines are only built for the returned rows. Identical
+    queries are served from a short-lived cache.
 
     Args:
         query: Axtarış sorğusu
         user: İstifadəçi (icazə yoxlaması üçün)
+        entity_types: Yalnız bu növlər (user, competency, training, department, question)
+        limit: Maksimum nəticə sayı
+        per_type_limit: Hər növ üzrə maksimum nəticə sayı
         use_trigram: Trigram oxşarlığını istifadə et (fuzzy search)
         min_similarity: Minimum oxşarlıq dərəcəsi (0-1)
+        headline: Vurğulanmış mətn fraqmenti əlavə et
 
     Returns:
-        Sıralanmış axtarış nəticələri
+        list: Nəticələr (score üzrə sıralanmış)
     """
-    results = {}
-
-    # Define searchable models and their search configuration
-    search_configs = {
-        'accounts.User': {
-            'search_fields': ['first_name', 'last_name', 'username', 'email'],
-            'trigram_fields': ['first_name', 'last_name', 'username'],
-            'display_fields': ['get_full_name', 'email'],
-            'title_field': 'get_full_name',
-            'url_pattern': 'accounts:profile',
-            'url_field': 'id'
-        },
-        'competencies.Competency': {
-            'search_fields': ['name', 'description'],
-            'trigram_fields': ['name'],
-            'display_fields': ['name', 'description'],
-            'title_field': 'name',
-            'url_pattern': 'competencies:competency-detail',
-            'url_field': 'id'
-        },
-        'training.TrainingResource': {
-            'search_fields': ['title', 'description'],
-            'trigram_fields': ['title'],
-            'display_fields': ['title', 'description'],
-            'title_field': 'title',
-            'url_pattern': 'training:training-detail',
-            'url_field': 'id'
-        },
-        'departments.Department': {
-            'search_fields': ['name', 'description'],
-            'trigram_fields': ['name'],
-            'display_fields': ['name', 'description'],
-            'title_field': 'name',
-            'url_pattern': 'departments:detail',
-            'url_field': 'id'
-        },
-        'evaluations.Question': {
-            'search_fields': ['text'],
-            'trigram_fields': ['text'],
-            'display_fields': ['text'],
-            'title_field': 'text',
-            'url_pattern': 'evaluations:question-detail',
-            'url_field': 'id'
-        }
-    }
+    query = (query or '').strip()
+    search_query = build_prefix_query(query)
+    if search_query is None:
+        return []
+
+    cache_key = _search_cache_key(
+        query=query.lower(), entity_types=sorted(entity_types or []), limit=limit,
+        per_type_limit=per_type_limit, use_trigram=use_trigram,
+        min_similarity=min_similarity, headline=headline,
+    )
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    qs = SearchDocument.objects.all()
+    if entity_types:
+        qs = qs.filter(entity_type__in=list(entity_types))
+
+    match = Q(search_vector=search_query) | Q(title__icontains=query) | Q(body__icontains=query)
+    score = SearchRank(F('search_vector'), search_query)
+    if use_trigram:
+        qs = qs.annotate(similarity=TrigramSimilarity('title', query))
+        if min_similarity == TRIGRAM_DEFAULT_THRESHOLD:
+            match |= Q(title__trigram_similar=query)
+        else:
+            match |= Q(similarity__gte=min_similarity)
+        score = score + F('similarity')
+    qs = qs.filter(match).annotate(score=score)
+
+    if per_type_limit:
+        qs = qs.annotate(type_rank=Window(
+            RowNumber(), partition_by=[F('entity_type')], order_by=[F('score').desc(), F('id').asc()],
+        )).filter(type_rank__lte=per_type_limit)
+
+    rows = list(qs.order_by('-score', 'id').values(
+        'id', 'object_id', 'entity_type', 'title', 'summary', 'url', 'score',
+    )[:limit])
+
+    highlights = {}
+    if headline and rows:
+        # Second query over the returned rows only, not every match of the window subquery
+        highlights = dict(
+            SearchDocument.objects.filter(pk__in=[row['id'] for row in rows])
+            .annotate(highlighted=SearchHeadline(
+                'body', search_query, config=settings.SEARCH_TEXT_CONFIG,
+                start_sel='<mark>', stop_sel='</mark>', max_words=30, min_words=15,
+            ))
+            .values_list('pk', 'highlighted')
+        )
 
-    # For each model, perform advanced search
-    for model_path, config in search_configs.items():
-        try:
-            app_label, model_name = model_path.split('.')
-            model = apps.get_model(app_label, model_name)
+    results = []
+    for row in rows:
+        source = SOURCES_BY_ENTITY.get(row['entity_type'])
+        results.append({
+            'id': row['object_id'],
+            'title': row['title'],
+            'content': row['summary'],
+            'url': row['url'],
+            'category': source.category if source else row['entity_type'],
+            'model': row['entity_type'],
+            'rank': float(row['score'] or 0),
+            'highlighted': highlights.get(row['id']),
+        })
+
+    cache.set(cache_key, results, settings.SEARCH_RESULT_CACHE_TIMEOUT)
+    return results
 
-            # Build FTS search vector
-            search_vector = SearchVector(*config['search_fields'], config='azerbaijani')
-            search_query = SearchQuery(query, config='azerbaijani')
 
-            qs = model.objects.annotate(
-                search=search_vector,
-                rank=SearchRank(search_vector, search_query)
-            )
-
-            # Trigram similarity for fuzzy matching
-            if use_trigram and config.get('trigram_fields'):
-                # Calculate combined trigram similarity
-                trigram_annotations = {}
-                for i, field in enumerate(config['trigram_fields']):
-                    trigram_annotations[f'similarity_{i}'] = TrigramSimilarity(field, query)
-
-                qs = qs.annotate(**trigram_annotations)
-
-                # Build OR filter for all trigram fields
-                trigram_filter = Q()
-                for i in range(len(config['trigram_fields'])):
-                    trigram_filter |= Q(**{f'similarity_{i}__gte': min_similarity})
-
-                # Combine FTS and trigram results
-                qs = qs.filter(Q(search=search_query) | trigram_filter)
-
-                # Calculate combined score (FTS rank + avg trigram similarity)
-                similarity_sum = sum(F(f'similarity_{i}') for i in range(len(config['trigram_fields'])))
-                qs = qs.annotate(
-                    combined_score=F('rank') + (similarity_sum / len(config['trigram_fields']))
-                )
-                order_field = '-combined_score'
-            else:
-                # FTS only
-                qs = qs.filter(search=search_query)
-                order_field = '-rank'
-
-            # Apply user permissions
-            if user and hasattr(model, 'user'):
-                qs = filter_by_user_permissions(qs, user, model)
+def advanced_search(query, user=None, use_trigram=True, min_similarity=0.3):
+    """
+    Advanced search with PostgreSQL Full-Text Search and Trigram similarity.
 
-            qs = qs.order_by(order_field)[:10]
+    Results come from the unified search document table (see
+    ``search_documents``), grouped per model with at most 10 hits each.
 
-            # Convert to result format with search highlighting
-            results[model_name.lower()] = [
-                {
-                    'title': getattr(result, config['title_field'], str(result)),
-                    'display_text': format_display_text(result, config['display_fields']),
-                    'highlighted': generate_search_headline(result, config['search_fields'], query),
-                    'url': get_object_url(result, config),
-                    'model': model_name,
-                    'score': getattr(result, 'combined_score', getattr(result, 'rank', 0))
-                }
-                for result in qs
-            ]
-        except LookupError:
-            continue
-        except Exception as e:
-            # Log error but continue
-            print(f"Search error for {model_path}: {str(e)}")
-            continue
+    Args:
+        query: Axtarış sorğusu
+        user: İstifadəçi (icazə yoxlaması üçün)
+        use_trigram: Trigram oxşarlığını istifadə et (fuzzy search)
+        min_similarity: Minimum oxşarlıq dərəcəsi (0-1)
 
-    return results
+    Returns:
+        Sıralanmış axtarış nəticələri
+    """
+    grouped = {}
+    for result in search_documents(
+        query, user=user, limit=10 * len(SOURCES_BY_ENTITY), per_type_limit=10,
+        use_trigram=use_trigram, min_similarity=min_similarity, headline=True,
+    ):
+        source = SOURCES_BY_ENTITY[result['model']]
+        model_name = source.model_path.split('.')[1]
+        grouped.setdefault(model_name.lower(), []).append({
+            'title': result['title'],
+            'display_text': result['content'],
+            'highlighted': result['highlighted'],
+            'url': result['url'],
+            'model': model_name,
+            'score': result['rank'],
+        })
+    return grouped
 
 
 def global_search(query, user=None):
@@ -262,11 +296,20 @@ class FacetedSearch:
         """
         Faceted search icra edir.
 
+        Facet counts are computed with one grouped query per model and cached
+        per normalized query + filters key.
+
         Returns:
             Search results ilə birlikdə facet counts
         """
         from django.apps import apps
 
+        cache_key = _search_cache_key(
+            kind='facets', query=' '.join(self.query.lower().split()),
+            filters=self.filters, models=sorted(self.models),
+        )
+        cached_facets = cache.get(cache_key)
+
         for model_path in self.models:
             app_label, model_name = model_path.split('.')
             model = apps.get_model(app_label, model_name)
@@ -277,7 +320,7 @@ class FacetedSearch:
             # Apply text search
             if self.query:
                 search_vector = SearchVector(*self._get_search_fields(model))
-                search_query = SearchQuery(self.query, config='azerbaijani')
+                search_query = SearchQuery(self.query, config=settings.SEARCH_TEXT_CONFIG)
                 qs = qs.annotate(search=search_vector).filter(search=search_query)
 
             # Apply facet filters
@@ -289,7 +332,13 @@ class FacetedSearch:
             self.results[model_name.lower()] = list(qs[:50])
 
             # Calculate facets for this model
-            self.facets[model_name.lower()] = self._calculate_facets(model, qs)
+            if cached_facets is None:
+                self.facets[model_name.lower()] = self._calculate_facets(model, qs)
+
+        if cached_facets is None:
+            cache.set(cache_key, self.facets, settings.SEARCH_FACET_CACHE_TIMEOUT)
+        else:
+            self.facets = cached_facets
 
         return {
             'results': self.results,
@@ -307,39 +356,61 @@ class FacetedSearch:
         }
         return field_map.get(model.__name__, ['name'])
 
+    # Facet name -> grouped value field
+    FACET_FIELDS = {
+        'role': 'role',
+        'department': 'department__name',
+        'is_active': 'is_active',
+    }
+
     def _calculate_facets(self, model, queryset):
         """
         Facet counts hesablayır.
 
+        All facets come from a single query grouped by every facet field, with
+        the date ranges as filtered counts; the groups are rolled up per facet.
+
         Returns:
             Facet adı və count-ları
         """
-        facets = {}
-
-        # Role facets (for User model)
-        if hasattr(model, 'role'):
-            facets['role'] = queryset.values('role').annotate(count=Count('id'))
-
-        # Department facets
-        if hasattr(model, 'department'):
-            facets['department'] = queryset.values('department__name').annotate(count=Count('id'))
+        from django.utils import timezone
+        from datetime import timedelta
 
-        # Status facets
-        if hasattr(model, 'is_active'):
-            facets['is_active'] = queryset.values('is_active').annotate(count=Count('id'))
-
-        # Date range facets (created_at)
+        facet_fields = {
+            name: field for name, field in self.FACET_FIELDS.items() if hasattr(model, name)
+        }
+        date_ranges = {}
         if hasattr(model, 'created_at'):
-            from django.utils import timezone
-            from datetime import timedelta
-
             now = timezone.now()
-            facets['date_range'] = {
-                'today': queryset.filter(created_at__date=now.date()).count(),
-                'this_week': queryset.filter(created_at__gte=now - timedelta(days=7)).count(),
-                'this_month': queryset.filter(created_at__gte=now - timedelta(days=30)).count(),
-                'this_year': queryset.filter(created_at__year=now.year).count()
+            date_ranges = {
+                'today': Q(created_at__date=now.date()),
+                'this_week': Q(created_at__gte=now - timedelta(days=7)),
+                'this_month': Q(created_at__gte=now - timedelta(days=30)),
+                'this_year': Q(created_at__year=now.year),
             }
+        if not facet_fields and not date_ranges:
+            return {}
+
+        counts = {'count': Count('pk')}
+        counts.update({name: Count('pk', filter=condition) for name, condition in date_ranges.items()})
+        queryset = queryset.order_by()
+        if facet_fields:
+            rows = list(queryset.values(*facet_fields.values()).annotate(**counts))
+        else:
+            rows = [queryset.aggregate(**counts)]
+
+        facets = {}
+        for name, field in facet_fields.items():
+            totals = {}
+            for row in rows:
+                totals[row[field]] = totals.get(row[field], 0) + row['count']
+            facets[name] = [
+                {field: value, 'count': count}
+                for value, count in sorted(totals.items(), key=lambda item: -item[1])
+            ]
+
+        if date_ranges:
+            facets['date_range'] = {name: sum(row[name] for row in rows) for name in date_ranges}
 
         return facets
 
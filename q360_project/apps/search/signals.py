@@ -0,0 +1,64 @@
+"""
+Signal handlers keeping the search index in sync with searchable models.
+"""
+import logging
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models.signals import post_delete, post_save
+
+from .indexing import SEARCH_SOURCES, index_object, rebuild_search_index, remove_object, source_for_model
+from .models import AutocompleteTerm, SearchDocument
+
+logger = logging.getLogger(__name__)
+
+
+def _index_on_save(sender, instance, update_fields=None, raw=False, **kwargs):
+    """Refresh the object's search document and suggestions after the transaction commits."""
+    if raw:
+        return
+    source = source_for_model(sender)
+    if update_fields and source.index_fields and not set(update_fields) & set(source.index_fields):
+        return
+    transaction.on_commit(lambda: index_object(instance))
+
+
+def _remove_on_delete(sender, instance, **kwargs):
+    """Drop the object's search document and suggestions."""
+    remove_object(instance)
+
+
+def connect_search_signals():
+    """Connect index maintenance handlers for every registered search source."""
+    for source in SEARCH_SOURCES:
+        model = source.model
+        uid = f'search_index_{source.entity_type}'
+        post_save.connect(_index_on_save, sender=model, dispatch_uid=f'{uid}_save')
+        post_delete.connect(_remove_on_delete, sender=model, dispatch_uid=f'{uid}_delete')
+
+
+def populate_empty_search_index(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    Queue a full index build after ``migrate`` while the index is still empty.
+
+    Global search and autocomplete only read the search document table, so
+    the first deploy (or a database restored without it) would otherwise
+    return no results until ``rebuild_search_index`` was run by hand.
+    """
+    if using != DEFAULT_DB_ALIAS:
+        return
+    # A partial ``migrate <app>`` may not have created every table yet
+    models = [SearchDocument, AutocompleteTerm] + [source.model for source in SEARCH_SOURCES]
+    if not {model._meta.db_table for model in models} <= set(connections[using].introspection.table_names()):
+        return
+    if SearchDocument.objects.exists():
+        return
+    if not any(source.model.objects.exists() for source in SEARCH_SOURCES):
+        return
+
+    from .tasks import rebuild_search_index_task
+    try:
+        rebuild_search_index_task.delay()
+        logger.info("Search index is empty, queued a full rebuild")
+    except Exception as exc:
+        logger.warning(f"Could not queue the search index rebuild, building inline: {exc}")
+        rebuild_search_index()
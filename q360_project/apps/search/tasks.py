@@ -0,0 +1,19 @@
+"""
+Celery tasks for search index maintenance.
+"""
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def rebuild_search_index_task(self, entity_types=None):
+    """Rebuild search documents and their autocomplete terms outside the request cycle."""
+    from .indexing import rebuild_search_index
+
+    try:
+        return rebuild_search_index(entity_types)
+    except Exception as exc:
+        raise self.retry(exc=exc)
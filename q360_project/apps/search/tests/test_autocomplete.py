@@ -0,0 +1,100 @@
+"""
+Tests for the autocomplete prefix index.
+"""
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.accounts.models import User
+from apps.competencies.models import Competency
+from apps.departments.models import Department, Organization
+from apps.search.autocomplete import autocomplete
+from apps.search.models import AutocompleteTerm
+from apps.search.tasks import rebuild_search_index_task
+
+
+@override_settings(SEARCH_TEXT_CONFIG='simple')
+class AutocompleteIndexTests(TestCase):
+    """Test prefix suggestions and incremental index maintenance."""
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user = User.objects.create_user(
+                username='leyla', password='test123', first_name='Leyla', last_name='Məmmədova',
+                email='leyla@example.com'
+            )
+            User.objects.create_user(
+                username='leyla_old', password='test123', first_name='Leyla', last_name='Köhnə',
+                is_active=False
+            )
+            self.competency = Competency.objects.create(name='Liderlik', description='Komanda idarəetməsi')
+            organization = Organization.objects.create(name='Test Təşkilat', short_name='TT')
+            self.department = Department.objects.create(organization=organization, name='Maliyyə şöbəsi')
+
+    def test_keystroke_is_one_query(self):
+        """Prefix lookups are answered by one indexed query."""
+        with self.assertNumQueries(1):
+            results = autocomplete('le')
+        self.assertEqual([result['model'] for result in results], ['user'])
+        self.assertEqual(results[0]['url'], f'/accounts/profile/{self.user.pk}/')
+        self.assertNotIn('terms', results[0])
+
+    def test_repeated_keystroke_is_served_from_cache(self):
+        """The same prefix skips the database until the index changes."""
+        autocomplete('lid')
+        with self.assertNumQueries(0):
+            results = autocomplete(' LID ')
+        self.assertEqual(results[0]['title'], 'Liderlik')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.competency.name = 'Liderlik bacarığı'
+            self.competency.save()
+        self.assertEqual(autocomplete('lid')[0]['title'], 'Liderlik bacarığı')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.competency.delete()
+        self.assertEqual(autocomplete('lid'), [])
+
+    def test_multi_word_and_ascii_folded_prefixes(self):
+        """Every query word must prefix a term; diacritics are optional."""
+        self.assertEqual(len(autocomplete('leyla mem')), 1)
+        self.assertEqual(len(autocomplete('leyla məm')), 1)
+        self.assertEqual(autocomplete('leyla lid'), [])
+        self.assertEqual([r['model'] for r in autocomplete('mal', entity_types=['department'])], ['department'])
+        self.assertEqual(autocomplete('mal', entity_types=['user']), [])
+
+    def test_saves_and_deletes_update_index_incrementally(self):
+        """Renamed, deactivated and deleted objects are reflected without a rebuild."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.competency.name = 'Strateji düşüncə'
+            self.competency.save()
+        self.assertEqual(autocomplete('lid'), [])
+        self.assertEqual(autocomplete('str')[0]['title'], 'Strateji düşüncə')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(autocomplete('leyla'), [])
+
+        self.department.delete()
+        self.assertEqual(autocomplete('mal'), [])
+
+    def test_rebuild_task_restores_terms(self):
+        """The rebuild task recreates lost terms outside the request."""
+        AutocompleteTerm.objects.all().delete()
+        self.assertEqual(autocomplete('lid'), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            rebuild_search_index_task.delay(['competency'])
+        self.assertEqual(autocomplete('lid')[0]['id'], self.competency.pk)
+
+    def test_limit_is_at_least_one(self):
+        self.assertEqual(len(autocomplete('le', limit=0)), 1)
+
+    def test_endpoint(self):
+        """The AJAX endpoint returns suggestions from the index."""
+        self.client.login(username='leyla', password='test123')
+        response = self.client.get(reverse('search:autocomplete'), {'q': 'lider'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['category'], 'Kompetensiyalar')
+        self.assertEqual(self.client.get(reverse('search:autocomplete'), {'q': 'l'}).json()['results'], [])
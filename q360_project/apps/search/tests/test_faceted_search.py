@@ -0,0 +1,58 @@
+"""
+Tests for single-pass faceted search.
+"""
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.accounts.models import User
+from apps.competencies.models import Competency
+from apps.departments.models import Department, Organization
+from apps.search.search import FacetedSearch
+
+
+@override_settings(SEARCH_TEXT_CONFIG='simple')
+class FacetedSearchTests(TestCase):
+    """Test grouped facet computation and caching."""
+
+    def setUp(self):
+        cache.clear()
+        organization = Organization.objects.create(name='Test Təşkilat', short_name='TT')
+        finance = Department.objects.create(organization=organization, name='Maliyyə', code='FIN')
+        hr = Department.objects.create(organization=organization, name='HR', code='HR')
+        User.objects.create_user(username='anar', password='x', role='employee', department=finance)
+        User.objects.create_user(username='aysel', password='x', role='employee', department=hr)
+        User.objects.create_user(username='aqil', password='x', role='manager', department=finance,
+                                 is_active=False)
+        Competency.objects.create(name='Liderlik', description='Komanda idarəetməsi')
+
+    def test_facets_in_one_query_per_model(self):
+        """Each model costs a results query and a single facet query."""
+        search = FacetedSearch(models=['accounts.User', 'competencies.Competency'])
+        with self.assertNumQueries(4):
+            data = search.execute()
+
+        user_facets = data['facets']['user']
+        self.assertEqual(user_facets['role'][0], {'role': 'employee', 'count': 2})
+        self.assertEqual(
+            {row['department__name']: row['count'] for row in user_facets['department']},
+            {'Maliyyə': 2, 'HR': 1},
+        )
+        self.assertEqual(
+            {row['is_active']: row['count'] for row in user_facets['is_active']},
+            {True: 2, False: 1},
+        )
+        self.assertNotIn('date_range', user_facets)
+        self.assertEqual(data['facets']['competency']['date_range']['today'], 1)
+        self.assertEqual(data['facets']['competency']['date_range']['this_year'], 1)
+        self.assertEqual(data['facets']['competency']['is_active'], [{'is_active': True, 'count': 1}])
+
+    def test_facets_are_cached_per_normalized_query_and_filters(self):
+        """Repeated searches only run the result queries."""
+        FacetedSearch('  Anar ', models=['accounts.User']).add_filter('role', 'employee').execute()
+
+        with self.assertNumQueries(1):
+            data = FacetedSearch('anar', models=['accounts.User']).add_filter('role', 'employee').execute()
+        self.assertEqual(data['facets']['user']['role'], [{'role': 'employee', 'count': 1}])
+
+        with self.assertNumQueries(2):
+            FacetedSearch('anar', models=['accounts.User']).add_filter('role', 'manager').execute()
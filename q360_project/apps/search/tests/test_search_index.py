@@ -0,0 +1,128 @@
+"""
+Tests for the unified search document index.
+"""
+from unittest.mock import patch
+
+from django.contrib.postgres.search import SearchHeadline
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.accounts.models import User
+from apps.competencies.models import Competency
+from apps.evaluations.models import Question, QuestionCategory
+from apps.search.indexing import rebuild_search_index
+from apps.search.models import SearchDocument
+from apps.search.search import advanced_search, search_documents
+from apps.search.signals import populate_empty_search_index
+
+
+@override_settings(SEARCH_TEXT_CONFIG='simple')
+class SearchIndexTests(TestCase):
+    """Test index maintenance and the single-query search."""
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user = User.objects.create_user(
+                username='leyla', password='test123', first_name='Leyla', last_name='Məmmədova',
+                email='leyla@example.com'
+            )
+            self.inactive = User.objects.create_user(
+                username='leyla_old', password='test123', first_name='Leyla', last_name='Köhnə',
+                is_active=False
+            )
+            self.competency = Competency.objects.create(
+                name='Liderlik', description='Komanda idarəetməsi və liderlik bacarığı'
+            )
+
+    def test_signals_index_objects(self):
+        """Saved objects get a document with a stored search vector."""
+        document = SearchDocument.objects.get(entity_type='competency', object_id=self.competency.pk)
+        self.assertEqual(document.title, 'Liderlik')
+        self.assertIsNotNone(document.search_vector)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.competency.name = 'Strateji liderlik'
+            self.competency.save()
+        document.refresh_from_db()
+        self.assertEqual(document.title, 'Strateji liderlik')
+
+        self.competency.delete()
+        self.assertFalse(SearchDocument.objects.filter(entity_type='competency').exists())
+
+    def test_login_does_not_reindex(self):
+        """Saves that only touch unrelated fields skip re-indexing."""
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.user.save(update_fields=['last_login'])
+        self.assertEqual(callbacks, [])
+
+    def test_single_ranked_query_with_prefix_matching(self):
+        """All entity types are searched in one query, with prefix matches."""
+        with self.assertNumQueries(1):
+            results = search_documents('lider')
+        self.assertEqual([result['model'] for result in results], ['competency'])
+        self.assertEqual(results[0]['url'], f'/competencies/{self.competency.pk}/')
+
+        # Like the former views, inactive users are listed too
+        results = search_documents('leyla', user=self.user)
+        self.assertEqual({result['id'] for result in results}, {self.user.pk, self.inactive.pk})
+
+    def test_substring_of_email_and_description_matches(self):
+        """E-mail and description substrings match like the former icontains search."""
+        results = search_documents('example.com', user=self.user)
+        self.assertEqual([result['id'] for result in results], [self.user.pk])
+
+        results = search_documents('darəetmə', user=self.user)
+        self.assertEqual([result['model'] for result in results], ['competency'])
+
+    def test_questions_are_in_advanced_search_only(self):
+        """Questions are part of advanced search, not of the global search page."""
+        with self.captureOnCommitCallbacks(execute=True):
+            category = QuestionCategory.objects.create(name='Rəhbərlik')
+            Question.objects.create(category=category, text='Liderlik keyfiyyətlərini qiymətləndirin')
+
+        self.assertEqual(set(advanced_search('liderlik')), {'competency', 'question'})
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('search:api'), {'q': 'liderlik'})
+        self.assertEqual([result['model'] for result in response.json()['results']], ['competency'])
+
+    def test_headlines_are_built_for_returned_rows_only(self):
+        """Headlines take a second query over the limited rows."""
+        with self.assertNumQueries(2), \
+                patch('apps.search.search.SearchHeadline', wraps=SearchHeadline) as headline:
+            results = search_documents('leyla', limit=1, headline=True)
+        self.assertEqual(len(results), 1)
+        self.assertIn('<mark>', results[0]['highlighted'])
+        headline.assert_called_once()
+
+    def test_results_are_cached(self):
+        """Repeated queries are served from the cache."""
+        search_documents('leyla')
+        with self.assertNumQueries(0):
+            search_documents('  LEYLA ')
+
+    def test_advanced_search_groups_by_model(self):
+        """The legacy grouped format is built from the unified index."""
+        results = advanced_search('liderlik')
+        self.assertEqual(list(results), ['competency'])
+        self.assertIn('<mark>', results['competency'][0]['highlighted'])
+
+    def test_rebuild_restores_missing_documents(self):
+        """A batch rebuild re-creates documents and drops orphans."""
+        SearchDocument.objects.all().delete()
+        counts = rebuild_search_index(batch_size=1)
+        self.assertEqual(counts['user'], 2)
+        self.assertEqual(counts['competency'], 1)
+        self.assertEqual(SearchDocument.objects.count(), 3)
+
+    def test_empty_index_is_populated_after_migrate(self):
+        """The first migrate after deploy queues a full build of an empty index."""
+        with patch('apps.search.tasks.rebuild_search_index_task.delay') as delay:
+            populate_empty_search_index(sender=None)
+            delay.assert_not_called()
+
+            SearchDocument.objects.all().delete()
+            populate_empty_search_index(sender=None)
+            delay.assert_called_once_with()
@@ -2,8 +2,16 @@
 Sentiment analysis services using VADER.
 Provides text sentiment analysis for evaluation responses.
 """
+import hashlib
 import logging
-from typing import Tuple
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
 
 try:
     from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
@@ -15,6 +23,8 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+SENTIMENT_BATCH_SCHEDULED_CACHE_KEY = 'sentiment:batch_scheduled'
+
 
 def analyze_text(text: str) -> Tuple[float, str]:
     """
@@ -48,21 +58,9 @@ def analyze_text(text: str) -> Tuple[float, str]:
         return (0.0, 'neutral')
 
     try:
-        # Initialize VADER analyzer
-        analyzer = SentimentIntensityAnalyzer()
-
-        # Get sentiment scores
-        scores = analyzer.polarity_scores(text)
+        scores = get_analyzer().polarity_scores(text)
         compound_score = scores['compound']
-
-        # Categorize based on compound score
-        # VADER recommends thresholds: >= 0.05 positive, <= -0.05 negative
-        if compound_score >= 0.05:
-            category = 'positive'
-        elif compound_score <= -0.05:
-            category = 'negative'
-        else:
-            category = 'neutral'
+        category = categorize_score(compound_score)
 
         logger.debug(f"Sentiment analysis: score={compound_score:.4f}, category={category}, text_length={len(text)}")
 
@@ -73,6 +71,164 @@ def analyze_text(text: str) -> Tuple[float, str]:
         return (0.0, 'neutral')
 
 
+@lru_cache(maxsize=1)
+def get_analyzer():
+    """
+    Return the process-wide VADER analyzer.
+
+    Building an analyzer loads and parses the lexicon files, so the instance
+    is created once per process and reused for every analysis.
+    """
+    return SentimentIntensityAnalyzer()
+
+
+def categorize_score(compound_score: float) -> str:
+    """Categorize a compound score (VADER thresholds: >= 0.05 / <= -0.05)."""
+    if compound_score >= 0.05:
+        return 'positive'
+    if compound_score <= -0.05:
+        return 'negative'
+    return 'neutral'
+
+
+def _text_cache_key(text: str) -> str:
+    digest = hashlib.sha1(text.strip().encode('utf-8')).hexdigest()
+    return f'sentiment:v1:{digest}'
+
+
+def analyze_texts(texts: Iterable[str]) -> List[Tuple[float, str]]:
+    """
+    Analyze a batch of texts with the shared analyzer.
+
+    Identical texts are scored once per batch, and results are cached by
+    content hash so repeated comments are never rescored.
+
+    Args:
+        texts: Texts to analyze
+
+    Returns:
+        List of (score, category) tuples in input order
+    """
+    texts = list(texts)
+    keys = {}
+    for text in texts:
+        if text and len(text.strip()) >= 3:
+            keys.setdefault(text, _text_cache_key(text))
+
+    cached = cache.get_many(list(set(keys.values()))) if keys else {}
+    results: Dict[str, Tuple[float, str]] = {}
+    fresh = {}
+    for text, key in keys.items():
+        if key in cached:
+            results[text] = tuple(cached[key])
+        elif key in fresh:
+            results[text] = fresh[key]
+        else:
+            results[text] = fresh[key] = analyze_text(text)
+
+    if fresh:
+        cache.set_many(fresh, timeout=settings.SENTIMENT_CACHE_TIMEOUT)
+
+    return [results.get(text, (0.0, 'neutral')) for text in texts]
+
+
+def response_text(text_answer: Optional[str], comment: Optional[str]) -> str:
+    """Text analyzed for a response: the answer, falling back to the comment."""
+    text = text_answer.strip() if text_answer else ""
+    if not text and comment:
+        text = comment.strip()
+    return text
+
+
+def pending_responses():
+    """Responses with text whose sentiment has not been analyzed yet."""
+    from apps.evaluations.models import Response
+
+    return Response.objects.filter(
+        sentiment_analyzed_at__isnull=True
+    ).filter(
+        ~Q(text_answer='') | ~Q(comment='')
+    )
+
+
+def analyze_pending_responses(batch_size: Optional[int] = None, max_batches: Optional[int] = None) -> int:
+    """
+    Analyze pending responses in chunks and store results with bulk_update.
+
+    Args:
+        batch_size: Responses per chunk (defaults to settings)
+        max_batches: Stop after this many chunks (None drains everything)
+
+    Returns:
+        int: Number of responses analyzed
+    """
+    from apps.evaluations.models import Response
+
+    batch_size = batch_size or settings.SENTIMENT_BATCH_SIZE
+    analyzed = 0
+    batches = 0
+    last_id = 0
+
+    while max_batches is None or batches < max_batches:
+        read_at = timezone.now()
+        rows = list(
+            pending_responses()
+            .filter(pk__gt=last_id)
+            .order_by('pk')
+            .values_list('pk', 'text_answer', 'comment')[:batch_size]
+        )
+        if not rows:
+            break
+
+        last_id = rows[-1][0]
+        scores = analyze_texts(response_text(answer, comment) for _, answer, comment in rows)
+        now = timezone.now()
+        updates = [
+            Response(
+                pk=pk,
+                sentiment_score=score,
+                sentiment_category=category,
+                sentiment_analyzed_at=now,
+            )
+            for (pk, _, _), (score, category) in zip(rows, scores)
+        ]
+        Response.objects.bulk_update(
+            updates,
+            ['sentiment_score', 'sentiment_category', 'sentiment_analyzed_at'],
+        )
+        # Answers edited while this chunk was scored stay pending
+        Response.objects.filter(
+            pk__in=[pk for pk, _, _ in rows], updated_at__gt=read_at
+        ).update(sentiment_analyzed_at=None)
+        analyzed += len(updates)
+        batches += 1
+
+    return analyzed
+
+
+def queue_sentiment_analysis() -> None:
+    """
+    Schedule a debounced batch analysis run after the current transaction.
+
+    Only the first call in a debounce window schedules the Celery task; the
+    task then drains every pending response in chunks.
+    """
+    debounce = settings.SENTIMENT_BATCH_DEBOUNCE_SECONDS
+    if cache.add(SENTIMENT_BATCH_SCHEDULED_CACHE_KEY, True, timeout=max(debounce * 2, 60)):
+        transaction.on_commit(lambda: _schedule_batch(debounce))
+
+
+def _schedule_batch(countdown: int) -> None:
+    """Send the batch task, falling back to synchronous analysis without Celery."""
+    try:
+        from apps.evaluations.tasks import analyze_pending_sentiment_task
+        analyze_pending_sentiment_task.apply_async(countdown=countdown)
+    except Exception as exc:
+        logger.warning(f"Could not schedule sentiment batch task, analyzing inline: {exc}")
+        cache.delete(SENTIMENT_BATCH_SCHEDULED_CACHE_KEY)
+        analyze_pending_responses()
+
+
 def get_sentiment_label_az(category: str) -> str:
     """
     Get Azerbaijani label for sentiment category.
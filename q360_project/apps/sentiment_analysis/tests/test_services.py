@@ -0,0 +1,100 @@
+"""
+Tests for batched sentiment analysis services.
+"""
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.accounts.models import User
+from apps.evaluations.models import (
+    EvaluationAssignment, EvaluationCampaign, Question, QuestionCategory, Response
+)
+from apps.sentiment_analysis import services
+from apps.sentiment_analysis.services import (
+    SENTIMENT_BATCH_SCHEDULED_CACHE_KEY, analyze_pending_responses, analyze_texts, get_analyzer
+)
+
+
+class AnalyzeTextsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_analyzer_is_shared(self):
+        self.assertIs(get_analyzer(), get_analyzer())
+
+    def test_batch_matches_single_analysis(self):
+        texts = ['This is great work!', 'This is terrible', 'ok', '']
+        self.assertEqual(analyze_texts(texts), [services.analyze_text(text) for text in texts])
+
+    def test_identical_texts_scored_once(self):
+        with patch.object(services, 'analyze_text', wraps=services.analyze_text) as analyze:
+            analyze_texts(['Excellent teamwork'] * 5)
+            analyze_texts(['Excellent teamwork'])
+        self.assertEqual(analyze.call_count, 1)
+
+
+class PendingResponseAnalysisTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username='sentiment_user', password='test123')
+        campaign = EvaluationCampaign.objects.create(
+            title='Sentiment Campaign',
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=30),
+            created_by=user,
+        )
+        self.assignment = EvaluationAssignment.objects.create(
+            campaign=campaign, evaluator=user, evaluatee=user, relationship='self'
+        )
+        category = QuestionCategory.objects.create(name='Sentiment Category')
+        self.questions = [
+            Question.objects.create(category=category, text=f'Sentiment question {i}', question_type='text')
+            for i in range(3)
+        ]
+
+    def test_saving_responses_schedules_one_batch(self):
+        with patch('apps.sentiment_analysis.services._schedule_batch') as schedule:
+            with self.captureOnCommitCallbacks(execute=True):
+                for question in self.questions:
+                    Response.objects.create(
+                        assignment=self.assignment, question=question, text_answer='Very helpful colleague'
+                    )
+
+        self.assertEqual(schedule.call_count, 1)
+        self.assertEqual(
+            Response.objects.filter(sentiment_analyzed_at__isnull=True).count(), 3
+        )
+
+    def test_pending_responses_are_analyzed_in_chunks(self):
+        with patch('apps.sentiment_analysis.services._schedule_batch'):
+            Response.objects.create(
+                assignment=self.assignment, question=self.questions[0], text_answer='Great leader, very supportive'
+            )
+            Response.objects.create(
+                assignment=self.assignment, question=self.questions[1], comment='Poor and careless communication'
+            )
+            Response.objects.create(assignment=self.assignment, question=self.questions[2], score=4)
+
+        analyzed = analyze_pending_responses(batch_size=1)
+
+        self.assertEqual(analyzed, 2)
+        first, second = Response.objects.filter(question__in=self.questions[:2]).order_by('pk')
+        self.assertEqual(first.sentiment_category, 'positive')
+        self.assertEqual(second.sentiment_category, 'negative')
+        self.assertIsNotNone(first.sentiment_analyzed_at)
+        self.assertEqual(analyze_pending_responses(), 0)
+        score_only = Response.objects.get(question=self.questions[2])
+        self.assertIsNotNone(score_only.sentiment_analyzed_at)
+
+    def test_task_runs_after_commit(self):
+        cache.delete(SENTIMENT_BATCH_SCHEDULED_CACHE_KEY)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = Response.objects.create(
+                assignment=self.assignment, question=self.questions[0], text_answer='Wonderful mentor'
+            )
+
+        response.refresh_from_db()
+        self.assertEqual(response.sentiment_category, 'positive')
+        self.assertIsNotNone(response.sentiment_analyzed_at)
@@ -310,6 +310,26 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Periodic tasks run by ``celery -A config beat`` (schedules in seconds)
+CELERY_BEAT_SCHEDULE = {
+    'reconcile-unread-notification-counts': {
+        'task': 'apps.notifications.tasks.reconcile_unread_counts_task',
+        'schedule': int(os.getenv('NOTIFICATION_UNREAD_RECONCILE_INTERVAL', '120')),
+    },
+    'refresh-realtime-stats': {
+        'task': 'apps.dashboard.tasks.refresh_realtime_stats_task',
+        'schedule': int(os.getenv('REALTIME_STATS_REFRESH_INTERVAL', '60')),
+    },
+    'process-pending-result-recalculations': {
+        'task': 'apps.evaluations.tasks.process_pending_result_recalculations',
+        'schedule': int(os.getenv('EVALUATION_RECALC_SWEEP_INTERVAL', '300')),
+    },
+    'maintain-audit-partitions': {
+        'task': 'apps.audit.tasks.maintain_audit_partitions_task',
+        'schedule': int(os.getenv('AUDIT_PARTITION_MAINTENANCE_INTERVAL', '86400')),
+    },
+}
+
 # Email Configuration
 EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
 EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
@@ -318,6 +338,8 @@ EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True') == 'True'
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'noreply@q360.gov.az')
+# Messages sent over one SMTP connection by batched delivery
+EMAIL_BATCH_SIZE = int(os.getenv('EMAIL_BATCH_SIZE', '100'))
 
 # Professional Logging Configuration
 # Multi-level logging with rotation, JSON formatting for production monitoring
@@ -924,3 +946,109 @@ GENERAL_RATE_LIMIT = os.getenv('GENERAL_RATE_LIMIT', '100/m')
 
 # Rate limit view - uses custom error page
 RATELIMIT_VIEW = 'apps.accounts.middleware.rate_limit_middleware.ratelimit_handler'
+
+# ========================================
+# EVALUATION SCORING SETTINGS
+# ========================================
+
+# Seconds to wait before draining queued result recalculations (coalesces bursts)
+EVALUATION_RECALC_DEBOUNCE_SECONDS = int(os.getenv('EVALUATION_RECALC_DEBOUNCE_SECONDS', '30'))
+
+# Maximum number of queued results recalculated per worker run
+EVALUATION_RECALC_BATCH_SIZE = int(os.getenv('EVALUATION_RECALC_BATCH_SIZE', '500'))
+
+# Cache lifetime of per-campaign calibration statistics (seconds); invalidated on result changes
+CALIBRATION_STATS_CACHE_TIMEOUT = int(os.getenv('CALIBRATION_STATS_CACHE_TIMEOUT', '3600'))
+
+# ========================================
+# SENTIMENT ANALYSIS SETTINGS
+# ========================================
+
+# Seconds to wait before analyzing queued responses in one batch
+SENTIMENT_BATCH_DEBOUNCE_SECONDS = int(os.getenv('SENTIMENT_BATCH_DEBOUNCE_SECONDS', '10'))
+
+# Responses analyzed per chunk
+SENTIMENT_BATCH_SIZE = int(os.getenv('SENTIMENT_BATCH_SIZE', '500'))
+
+# Cache lifetime for sentiment results keyed by text content hash (seconds)
+SENTIMENT_CACHE_TIMEOUT = int(os.getenv('SENTIMENT_CACHE_TIMEOUT', str(60 * 60 * 24 * 7)))
+
+# ========================================
+# SEARCH SETTINGS
+# ========================================
+
+# PostgreSQL text search configuration used for stored search vectors and queries
+SEARCH_TEXT_CONFIG = os.getenv('SEARCH_TEXT_CONFIG', 'azerbaijani')
+
+# Short-lived cache for identical global search queries (seconds)
+SEARCH_RESULT_CACHE_TIMEOUT = int(os.getenv('SEARCH_RESULT_CACHE_TIMEOUT', '30'))
+
+# Faceted search counts per normalized query + filters (seconds)
+SEARCH_FACET_CACHE_TIMEOUT = int(os.getenv('SEARCH_FACET_CACHE_TIMEOUT', '300'))
+
+# Cached autocomplete suggestions per normalized prefix (seconds); index changes invalidate them
+AUTOCOMPLETE_CACHE_TIMEOUT = int(os.getenv('AUTOCOMPLETE_CACHE_TIMEOUT', '60'))
+
+# ========================================
+# NOTIFICATION SETTINGS
+# ========================================
+
+# Recipients routed, inserted and queued per chunk by bulk notification fan-out
+NOTIFICATION_FANOUT_BATCH_SIZE = int(os.getenv('NOTIFICATION_FANOUT_BATCH_SIZE', '1000'))
+
+# Evaluators per parallel chunk when dispatching campaign-start digests
+CAMPAIGN_NOTIFICATION_CHUNK_SIZE = int(os.getenv('CAMPAIGN_NOTIFICATION_CHUNK_SIZE', '200'))
+
+# Default digest window for coalescing same-type in-app notifications (minutes, 0 = off);
+# users can override it in their notification preferences
+NOTIFICATION_DIGEST_WINDOW_MINUTES = int(os.getenv('NOTIFICATION_DIGEST_WINDOW_MINUTES', '0'))
+
+# Lifetime of cached per-user unread notification counters (seconds). Counters are only
+# moved in the cache of the process that made the change, so this bounds how long a
+# badge can disagree with the database on a per-process cache backend; the beat
+# schedule also reconciles them every NOTIFICATION_UNREAD_RECONCILE_INTERVAL seconds
+NOTIFICATION_UNREAD_COUNT_TIMEOUT = int(os.getenv('NOTIFICATION_UNREAD_COUNT_TIMEOUT', '300'))
+
+# ========================================
+# AUDIT SETTINGS
+# ========================================
+
+# How record_audit_event writes entries: 'sync' (insert per event), 'buffer'
+# (per-process bulk inserts) or 'celery' (bulk inserts in a Celery task)
+AUDIT_WRITE_MODE = os.getenv('AUDIT_WRITE_MODE', 'sync')
+
+# Buffered entries that trigger a flush, and the maximum age of a buffered entry (seconds)
+AUDIT_WRITE_BUFFER_SIZE = int(os.getenv('AUDIT_WRITE_BUFFER_SIZE', '100'))
+AUDIT_WRITE_BUFFER_MAX_DELAY = float(os.getenv('AUDIT_WRITE_BUFFER_MAX_DELAY', '2'))
+
+# Threat scores are counted in the cache (apps.audit.threat); production needs a
+# cache shared by all processes (see the Redis example above), LocMemCache
+# counters only see the events of their own process
+
+# Monthly audit log partitions created ahead of time (daily beat task or manage_audit_partitions)
+AUDIT_PARTITION_MONTHS_AHEAD = int(os.getenv('AUDIT_PARTITION_MONTHS_AHEAD', '3'))
+
+# Audit logs older than this many whole months are exported and removed
+AUDIT_LOG_RETENTION_MONTHS = int(os.getenv('AUDIT_LOG_RETENTION_MONTHS', '12'))
+AUDIT_LOG_ARCHIVE_DIR = os.getenv('AUDIT_LOG_ARCHIVE_DIR', str(BASE_DIR / 'archives' / 'audit'))
+
+# ========================================
+# DASHBOARD SETTINGS
+# ========================================
+
+# Maximum age of the cached real-time statistics snapshot served by the API (seconds)
+REALTIME_STATS_MAX_AGE = int(os.getenv('REALTIME_STATS_MAX_AGE', '60'))
+
+# How long a snapshot stays cached; past its max age it is only served while another
+# request recomputes it (seconds)
+REALTIME_STATS_CACHE_TIMEOUT = int(os.getenv('REALTIME_STATS_CACHE_TIMEOUT', str(60 * 60)))
+
+# Trailing days recomputed by each metric rollup refresh (covers late and edited records)
+DASHBOARD_ROLLUP_REFRESH_DAYS = int(os.getenv('DASHBOARD_ROLLUP_REFRESH_DAYS', '3'))
+
+# Whole months per parallel chunk when backfilling metric rollups
+DASHBOARD_ROLLUP_BACKFILL_CHUNK_MONTHS = int(os.getenv('DASHBOARD_ROLLUP_BACKFILL_CHUNK_MONTHS', '3'))
+
+# Lifetime of cached dashboard statistics; saves of the underlying models invalidate them
+# earlier, so this only bounds time-window figures such as recent logins (seconds)
+DASHBOARD_STATS_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_STATS_CACHE_TIMEOUT', '300'))
@@ -98,7 +98,13 @@ class NotificationManager {
         // Create notification element
         const notificationEl = document.createElement('div');
         notificationEl.className = `notification-item animate-fade-in-up ${notification.is_read ? 'read' : 'unread'} bg-${notification.type}-50 dark:bg-${notification.type}-500/10 border border-${notification.type}-200 dark:border-${notification.type}-500 rounded-xl p-4 mb-3 cursor-pointer`;
-        notificationEl.dataset.notificationId = notification.id;
+        // Broadcast ids are not per-user notification ids
+        const isBroadcast = notification.broadcast === true;
+        if (isBroadcast) {
+            notificationEl.dataset.broadcastId = notification.id;
+        } else {
+            notificationEl.dataset.notificationId = notification.id;
+        }
         
         notificationEl.innerHTML = `
             <div class="flex items-start justify-between">
@@ -107,7 +113,7 @@ class NotificationManager {
                     <p class="mt-1 text-xs text-gray-600 dark:text-gray-300">${notification.message}</p>
                     <p class="mt-2 text-xs text-gray-500 dark:text-gray-400">${this.formatTime(notification.timestamp)}</p>
                 </div>
-                <button type="button" class="ml-3 text-gray-400 hover:text-gray-500 dark:text-gray-500 dark:hover:text-gray-400" onclick="notificationManager.markAsRead(${notification.id})">
+                <button type="button" class="ml-3 text-gray-400 hover:text-gray-500 dark:text-gray-500 dark:hover:text-gray-400" onclick="notificationManager.markAsRead(${notification.id}, ${isBroadcast})">
                     <i class="fas fa-times"></i>
                 </button>
             </div>
@@ -115,7 +121,7 @@ class NotificationManager {
         
         // Add click event to mark as read and redirect if link exists
         notificationEl.addEventListener('click', () => {
-            this.markAsRead(notification.id);
+            this.markAsRead(notification.id, isBroadcast);
             if (notification.link) {
                 window.location.href = notification.link;
             }
@@ -216,9 +222,12 @@ class NotificationManager {
         }
     }
     
-    markAsRead(notificationId) {
-        // Mark notification as read via AJAX
-        fetch(`/notifications/${notificationId}/read/`, {
+    markAsRead(notificationId, isBroadcast = false) {
+        // Mark notification as read via AJAX; broadcasts store a read receipt instead
+        const url = isBroadcast
+            ? `/notifications/broadcasts/${notificationId}/read/`
+            : `/notifications/${notificationId}/read/`;
+        fetch(url, {
             method: 'POST',
             headers: {
                 'X-Requested-With': 'XMLHttpRequest',
@@ -227,9 +236,10 @@ class NotificationManager {
         })
         .then(response => response.json())
         .then(data => {
-            if (data.status === 'success') {
+            if (data.success || data.status === 'success') {
                 // Update UI to mark as read
-                const notificationEl = document.querySelector(`[data-notification-id="${notificationId}"]`);
+                const attribute = isBroadcast ? 'data-broadcast-id' : 'data-notification-id';
+                const notificationEl = document.querySelector(`[${attribute}="${notificationId}"]`);
                 if (notificationEl) {
                     notificationEl.classList.remove('unread');
                     notificationEl.classList.add('read');